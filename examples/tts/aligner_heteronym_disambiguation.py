@@ -175,7 +175,9 @@ def disambiguate_candidates(aligner, text, spec, spec_len, confidence, device, h
             text_embeddings = aligner.embed(text_in).transpose(1, 2)
             l2_dists = aligner.alignment_encoder.get_dist(keys=text_embeddings, queries=spec_in).sqrt()
 
-            durations = aligner.alignment_encoder.get_durations(soft_attn, text_len_in, spec_len_in).int()
+            durations = aligner.alignment_encoder.get_durations(
+                soft_attn, text_len_in, spec_len_in, aligner.use_torch_mas
+            ).int()
 
             # Retrieve average embedding distances
             min_dist = float('inf')
@@ -21,14 +21,16 @@ import numpy as np
 import soundfile as sf
 import torch
 from omegaconf import OmegaConf
-from scipy.signal import convolve
+from scipy.signal import fftconvolve
 from scipy.signal.windows import cosine, hamming, hann
 from tqdm import tqdm
 
 from nemo.collections.asr.parts.preprocessing.perturb import process_augmentations
 from nemo.collections.asr.parts.utils.data_simulation_utils import (
+    AudioReadCache,
     DataAnnotator,
     SpeechSampler,
+    append_completed_session,
     build_speaker_samples_map,
     get_background_noise,
     get_cleaned_base_path,
@@ -41,6 +43,7 @@ from nemo.collections.asr.parts.utils.data_simulation_utils import (
     per_speaker_normalize,
     perturb_audio,
     read_audio_from_buffer,
+    read_completed_sessions,
     read_noise_manifest,
 )
 from nemo.collections.asr.parts.utils.manifest_utils import read_manifest
@@ -61,6 +64,9 @@ try:
 except ImportError:
     GPURIR = False
 
+# Decoded source audio shared by all the sessions generated in the current process (see `audio_cache_size`).
+_PROCESS_AUDIO_READ_CACHE = None
+
 
 class MultiSpeakerSimulator(object):
     """
@@ -85,6 +91,10 @@ class MultiSpeakerSimulator(object):
         - Re-organized MultiSpeakerSimulator class and moved util functions to util files.
         v1.1.1 March 2023
             - Changed `silence_mean` to use exactly the same sampling equation as `overlap_mean`.
+        v1.1.2
+            - Decoded source audio can be cached across sessions within a worker process (`audio_cache_size`)
+            - Completed sessions are checkpointed so that an interrupted run can be resumed (`outputs.resume`)
+            - RIR convolution is batched over microphone channels
 
 
     Args:
@@ -93,7 +103,10 @@ class MultiSpeakerSimulator(object):
     Parameters:
       manifest_filepath (str): Manifest file with paths to single speaker audio files
       sr (int): Sampling rate of the input audio files from the manifest
-      random_seed (int): Seed to random number generator
+      random_seed (int): Seed to random number generator. Session `idx` is generated with the seed `random_seed + idx`,
+                         so every session is a deterministic, independent unit of work.
+      audio_cache_size (int): Number of decoded audio segments each worker process keeps in memory across sessions.
+                              Set to 0 to decode source audio from scratch for every session (default: 0).
 
     session_config:
       num_speakers (int): Number of unique speakers per multispeaker audio session
@@ -148,6 +161,8 @@ class MultiSpeakerSimulator(object):
       output_dir (str): Output directory for audio sessions and corresponding label files
       output_filename (str): Output filename for the wav and RTTM files
       overwrite_output (bool): If true, delete the output directory if it exists
+      resume (bool): If true, keep the existing output directory and skip the sessions recorded as completed in
+                     `simulation_progress.txt`. Resumed runs must use the same configuration as the original run.
       output_precision (int): Number of decimal places in output files
 
     background_noise:
@@ -214,6 +229,7 @@ class MultiSpeakerSimulator(object):
         self._speaker_ids = None
         self._device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
         self._audio_read_buffer_dict = {}
+        self._audio_cache_size = self._params.data_simulator.get("audio_cache_size", 0)
         self.add_missing_overlap = self._params.data_simulator.session_params.get("add_missing_overlap", False)
 
         if (
@@ -404,6 +420,22 @@ class MultiSpeakerSimulator(object):
         if len(self._manifest) == 0:
             raise Exception("Manifest file is empty. Check that the source path is correct.")
 
+    def _get_audio_read_buffer(self) -> dict:
+        """
+        Get the buffer that holds decoded audio files for the session that is about to be generated.
+        If `audio_cache_size` is positive, a bounded cache that persists across all the sessions handled by the
+        current process is returned. Otherwise, an empty dictionary is returned and audio is re-read every session.
+
+        Returns:
+            (dict): Buffer to pass to `read_audio_from_buffer` as `buffer_dict`.
+        """
+        global _PROCESS_AUDIO_READ_CACHE
+        if self._audio_cache_size <= 0:
+            return {}
+        if _PROCESS_AUDIO_READ_CACHE is None or _PROCESS_AUDIO_READ_CACHE.max_items != self._audio_cache_size:
+            _PROCESS_AUDIO_READ_CACHE = AudioReadCache(max_items=self._audio_cache_size)
+        return _PROCESS_AUDIO_READ_CACHE
+
     def clean_up(self):
         """
         Clear the system memory. Cache data for audio files and alignments are removed.
@@ -1025,6 +1057,7 @@ class MultiSpeakerSimulator(object):
         np.random.seed(random_seed + idx)
 
         self._device = device
+        self._audio_read_buffer_dict = self._get_audio_read_buffer()
         speaker_dominance = self._get_speaker_dominance()  # randomly determine speaker dominance
         base_speaker_dominance = np.copy(speaker_dominance)
         self._set_speaker_volume()
@@ -1196,12 +1229,21 @@ class MultiSpeakerSimulator(object):
         np.random.seed(random_seed)
 
         output_dir = self._params.data_simulator.outputs.output_dir
+        resume = self._params.data_simulator.outputs.get("resume", False)
 
         basepath = get_cleaned_base_path(
-            output_dir, overwrite_output=self._params.data_simulator.outputs.overwrite_output
+            output_dir, overwrite_output=self._params.data_simulator.outputs.overwrite_output, resume=resume
         )
         OmegaConf.save(self._params, os.path.join(output_dir, "params.yaml"))
 
+        # Sessions are checkpointed once all of their output files are written, so an interrupted run can resume.
+        progress_filepath = os.path.join(basepath, "simulation_progress.txt")
+        completed_sessions = set(read_completed_sessions(progress_filepath)) if resume else set()
+        if not resume and os.path.exists(progress_filepath):
+            os.remove(progress_filepath)
+        if len(completed_sessions) > 0:
+            logging.info(f"Skipping {len(completed_sessions)} sessions that were completed in a previous run.")
+
         tp = concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers)
         futures = []
 
@@ -1234,18 +1276,28 @@ class MultiSpeakerSimulator(object):
             self._manifest = None
             self._speaker_samples = None
 
+        # the queue above is always built in full so that the random state of the remaining sessions is unchanged
+        for sess_idx in sorted(completed_sessions):
+            _, _, filename, *_ = queue[sess_idx]
+            self.annotator.add_to_filename_lists(basepath=basepath, filename=filename)
+
         # Chunk the sessions into smaller chunks for very large number of sessions (10K+ sessions)
         for chunk_idx in range(self.chunk_count):
             futures = []
+            futures_to_idx = {}
             stt_idx, end_idx = (
                 chunk_idx * self.multiprocessing_chunksize,
                 min((chunk_idx + 1) * self.multiprocessing_chunksize, num_sessions),
             )
             for sess_idx in range(stt_idx, end_idx):
+                if sess_idx in completed_sessions:
+                    continue
                 self._furthest_sample = [0 for n in range(self._params.data_simulator.session_config.num_speakers)]
                 self._audio_read_buffer_dict = {}
                 if self.num_workers > 1:
-                    futures.append(tp.submit(self._generate_session, *queue[sess_idx]))
+                    future = tp.submit(self._generate_session, *queue[sess_idx])
+                    futures_to_idx[future] = sess_idx
+                    futures.append(future)
                 else:
                     futures.append(queue[sess_idx])
 
@@ -1261,14 +1313,17 @@ class MultiSpeakerSimulator(object):
                 total=len(futures),
             ):
                 if self.num_workers > 1:
+                    sess_idx = futures_to_idx[future]
                     basepath, filename = future.result()
                 else:
+                    sess_idx = future[0]
                     self._noise_samples = self.sampler.sample_noise_manifest(
                         noise_manifest=source_noise_manifest,
                     )
                     basepath, filename = self._generate_session(*future)
 
                 self.annotator.add_to_filename_lists(basepath=basepath, filename=filename)
+                append_completed_session(progress_filepath=progress_filepath, sess_idx=sess_idx)
 
                 # throw warning if number of speakers is less than requested
                 self._check_missing_speakers()
@@ -1493,6 +1548,7 @@ class RIRMultiSpeakerSimulator(MultiSpeakerSimulator):
     def _convolve_rir(self, input, speaker_turn: int, RIR: torch.Tensor) -> Tuple[list, int]:
         """
         Augment one sentence (or background noise segment) using a synthetic RIR.
+        All the microphone channels are convolved in a single batched FFT convolution.
 
         Args:
             input (torch.tensor): Input audio.
@@ -1502,16 +1558,32 @@ class RIRMultiSpeakerSimulator(MultiSpeakerSimulator):
             output_sound (list): List of tensors containing augmented audio
             length (int): Length of output audio channels (or of the longest if they have different lengths)
         """
-        output_sound = []
-        length = 0
-        for channel in range(self._params.data_simulator.rir_generation.mic_config.num_channels):
+        if torch.is_tensor(input):
+            input = input.cpu().numpy()
+        num_channels = self._params.data_simulator.rir_generation.mic_config.num_channels
+        channel_rirs = []
+        for channel in range(num_channels):
             if self._params.data_simulator.rir_generation.toolkit == 'gpuRIR':
-                out_channel = convolve(input, RIR[speaker_turn, channel, : len(input)]).tolist()
+                channel_rir = RIR[speaker_turn, channel, : len(input)]
             elif self._params.data_simulator.rir_generation.toolkit == 'pyroomacoustics':
-                out_channel = convolve(input, RIR[channel][speaker_turn][: len(input)]).tolist()
-            if len(out_channel) > length:
-                length = len(out_channel)
-            output_sound.append(torch.tensor(out_channel))
+                channel_rir = RIR[channel][speaker_turn][: len(input)]
+            if torch.is_tensor(channel_rir):
+                channel_rir = channel_rir.cpu().numpy()
+            channel_rirs.append(np.asarray(channel_rir))
+
+        # Convolve all the channels at once. RIRs are zero-padded to a common length, which leaves the
+        # convolution unchanged, and the outputs are trimmed back to the per-channel lengths afterwards.
+        rir_lengths = [len(channel_rir) for channel_rir in channel_rirs]
+        rir_batch = np.zeros((num_channels, max(rir_lengths)), dtype=np.result_type(input, *channel_rirs))
+        for channel, channel_rir in enumerate(channel_rirs):
+            rir_batch[channel, : len(channel_rir)] = channel_rir
+        convolved = fftconvolve(input[np.newaxis, :], rir_batch, axes=-1).astype(np.float32, copy=False)
+
+        output_sound = [
+            torch.from_numpy(convolved[channel, : len(input) + rir_lengths[channel] - 1])
+            for channel in range(num_channels)
+        ]
+        length = max(len(out_channel) for out_channel in output_sound)
         return output_sound, length
 
     def _generate_session(
@@ -1542,6 +1614,7 @@ class RIRMultiSpeakerSimulator(MultiSpeakerSimulator):
         np.random.seed(random_seed + idx)
 
         self._device = device
+        self._audio_read_buffer_dict = self._get_audio_read_buffer()
         speaker_dominance = self._get_speaker_dominance()  # randomly determine speaker dominance
         base_speaker_dominance = np.copy(speaker_dominance)
         self._set_speaker_volume()
@@ -30,6 +30,7 @@ from nemo.collections.asr.metrics.der import score_labels
 from nemo.collections.asr.models.classification_models import EncDecClassificationModel
 from nemo.collections.asr.models.label_models import EncDecSpeakerLabelModel
 from nemo.collections.asr.parts.mixins.mixins import DiarizationMixin
+from nemo.collections.asr.parts.utils.speaker_embedding_cache import SpeakerEmbeddingCache, get_model_fingerprint
 from nemo.collections.asr.parts.utils.speaker_utils import (
     audio_rttm_map,
     get_embs_and_timestamps,
@@ -329,16 +330,27 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
             )
         validate_vad_manifest(self.AUDIO_RTTM_MAP, vad_manifest=self._speaker_manifest_path)
 
-    def _extract_embeddings(self, manifest_file: str, scale_idx: int, num_scales: int):
+    def _setup_embedding_cache(self):
         """
-        This method extracts speaker embeddings from segments passed through manifest_file
-        Optionally you may save the intermediate speaker embeddings for debugging or any use.
+        Opens the speaker embedding store if `embedding_cache_dir` is set in the speaker embedding parameters.
+        """
+        cache_dir = self._speaker_params.get('embedding_cache_dir', None)
+        if not cache_dir:
+            self._embedding_cache = None
+            return
+        if getattr(self, '_embedding_cache', None) is None or self._embedding_cache.cache_dir != cache_dir:
+            self._embedding_cache = SpeakerEmbeddingCache(cache_dir)
+        # embeddings depend on the weights of the speaker model and on the sample rate of the audio
+        self._speaker_model_fingerprint = get_model_fingerprint(
+            self._speaker_model, extra=f"sample_rate={self._cfg.sample_rate}"
+        )
+
+    def _infer_embeddings(self, manifest_file: str, scale_idx: int, num_scales: int) -> torch.Tensor:
+        """
+        Runs the speaker model on all the segments of manifest_file and returns their embeddings.
         """
-        logging.info("Extracting embeddings for Diarization")
         self._setup_spkr_test_data(manifest_file)
-        self.embeddings = {}
         self._speaker_model.eval()
-        self.time_stamps = {}
 
         all_embs = torch.empty([0])
         for test_batch in tqdm(
@@ -355,21 +367,62 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
                 embs = embs.view(-1, emb_shape)
                 all_embs = torch.cat((all_embs, embs.cpu().detach()), dim=0)
             del test_batch
+        return all_embs
+
+    def _extract_embeddings(self, manifest_file: str, scale_idx: int, num_scales: int):
+        """
+        This method extracts speaker embeddings from segments passed through manifest_file
+        Optionally you may save the intermediate speaker embeddings for debugging or any use.
+        If an embedding cache is set up, only the segments missing from the cache are passed to the speaker model.
+        """
+        logging.info("Extracting embeddings for Diarization")
+        self.embeddings = {}
+        self.time_stamps = {}
 
         with open(manifest_file, 'r', encoding='utf-8') as manifest:
-            for i, line in enumerate(manifest.readlines()):
-                line = line.strip()
-                dic = json.loads(line)
-                uniq_name = get_uniqname_from_filepath(dic['audio_filepath'])
-                if uniq_name in self.embeddings:
-                    self.embeddings[uniq_name] = torch.cat((self.embeddings[uniq_name], all_embs[i].view(1, -1)))
-                else:
-                    self.embeddings[uniq_name] = all_embs[i].view(1, -1)
-                if uniq_name not in self.time_stamps:
-                    self.time_stamps[uniq_name] = []
-                start = dic['offset']
-                end = start + dic['duration']
-                self.time_stamps[uniq_name].append([start, end])
+            segments = [json.loads(line.strip()) for line in manifest.readlines()]
+
+        embedding_cache = getattr(self, '_embedding_cache', None)
+        if embedding_cache is None:
+            all_embs = self._infer_embeddings(manifest_file, scale_idx, num_scales)
+        else:
+            keys = [
+                embedding_cache.segment_key(
+                    dic['audio_filepath'], dic['offset'], dic['duration'], self._speaker_model_fingerprint
+                )
+                for dic in segments
+            ]
+            cached_idx, missing_idx = embedding_cache.lookup(keys)
+            logging.info(f"Found {len(cached_idx)} out of {len(keys)} speaker embeddings in the embedding cache")
+
+            missing_embs = None
+            if len(missing_idx) > 0:
+                missing_manifest_file = os.path.join(
+                    self._speaker_dir, get_uniqname_from_filepath(manifest_file) + '_uncached.json'
+                )
+                with open(missing_manifest_file, 'w', encoding='utf-8') as missing_manifest:
+                    for idx in missing_idx:
+                        missing_manifest.write(json.dumps(segments[idx]) + '\n')
+                missing_embs = self._infer_embeddings(missing_manifest_file, scale_idx, num_scales)
+                embedding_cache.add([keys[idx] for idx in missing_idx], missing_embs)
+
+            all_embs = torch.empty([len(keys), embedding_cache.emb_dim or 0])
+            if len(cached_idx) > 0:
+                all_embs[cached_idx] = embedding_cache.get([keys[idx] for idx in cached_idx])
+            if missing_embs is not None:
+                all_embs[missing_idx] = missing_embs.float()
+
+        for i, dic in enumerate(segments):
+            uniq_name = get_uniqname_from_filepath(dic['audio_filepath'])
+            if uniq_name in self.embeddings:
+                self.embeddings[uniq_name] = torch.cat((self.embeddings[uniq_name], all_embs[i].view(1, -1)))
+            else:
+                self.embeddings[uniq_name] = all_embs[i].view(1, -1)
+            if uniq_name not in self.time_stamps:
+                self.time_stamps[uniq_name] = []
+            start = dic['offset']
+            end = start + dic['duration']
+            self.time_stamps[uniq_name].append([start, end])
 
         if self._speaker_params.save_embeddings:
             embedding_dir = os.path.join(self._speaker_dir, 'embeddings')
@@ -423,6 +476,9 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
         # Speech Activity Detection
         self._perform_speech_activity_detection()
 
+        # Embeddings computed by previous runs are reused if an embedding cache directory is set
+        self._setup_embedding_cache()
+
         # Segmentation
         scales = self.multiscale_args_dict['scale_dict'].items()
         for scale_idx, (window, shift) in scales:
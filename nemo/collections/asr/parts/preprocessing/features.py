@@ -214,11 +214,13 @@ class WaveformFeaturizer(object):
             channel_selector=channel_selector,
             normalize_db=normalize_db,
         )
-        return self.process_segment(audio)
+        # the segment is not used elsewhere, so its samples are handed off without a copy
+        self.augmentor.perturb(audio)
+        return torch.from_numpy(audio._samples).float()
 
     def process_segment(self, audio_segment):
         self.augmentor.perturb(audio_segment)
-        return torch.tensor(audio_segment.samples, dtype=torch.float)
+        return torch.from_numpy(audio_segment.samples).float()
 
     @classmethod
     def from_config(cls, input_config, perturbation_configs=None):
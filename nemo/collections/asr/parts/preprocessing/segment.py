@@ -36,6 +36,7 @@
 import math
 import os
 import random
+import threading
 from typing import Iterable, List, Optional, Union
 
 import librosa
@@ -57,6 +58,12 @@ try:
 except ModuleNotFoundError:
     HAVE_PYDUB = False
 
+HAVE_SOXR = True
+try:
+    import soxr
+except ModuleNotFoundError:
+    HAVE_SOXR = False
+
 
 available_formats = sf.available_formats()
 sf_supported_formats = ["." + i.lower() for i in available_formats.keys()]
@@ -143,11 +150,61 @@ def get_samples(audio_file: str, target_sr: int = 16000, dtype: str = 'float32')
     with sf.SoundFile(audio_file, 'r') as f:
         samples = f.read(dtype=dtype)
         if f.samplerate != target_sr:
-            samples = librosa.core.resample(samples, orig_sr=f.samplerate, target_sr=target_sr)
+            samples = resample(samples, orig_sr=f.samplerate, target_sr=target_sr)
         samples = samples.transpose()
     return samples
 
 
+# resamplers of every thread, by sample rates, number of channels and data type
+_resamplers = threading.local()
+
+
+def resample(signal: npt.NDArray, orig_sr: int, target_sr: int) -> npt.NDArray:
+    """
+    Resample a signal along its first axis, with the same output as `librosa.resample` with its default `soxr_hq`
+    method. The resampler, including its filter, is created once for every pair of sample rates and reused.
+
+    Args:
+        signal: numpy array with shape (num_samples,) or (num_samples, num_channels)
+        orig_sr: sample rate of the signal
+        target_sr: target sample rate
+
+    Returns:
+        numpy array with shape (ceil(num_samples * target_sr / orig_sr),) or
+        (ceil(num_samples * target_sr / orig_sr), num_channels)
+    """
+    if (
+        not HAVE_SOXR
+        or signal.ndim > 2
+        or signal.shape[0] == 0
+        or signal.dtype not in (np.float32, np.float64)
+        or not np.isfinite(signal).all()
+    ):
+        # librosa resamples the last axis, and raises on non-finite signals
+        return librosa.core.resample(signal.transpose(), orig_sr=orig_sr, target_sr=target_sr).transpose()
+
+    num_channels = 1 if signal.ndim == 1 else signal.shape[1]
+    key = (orig_sr, target_sr, num_channels, signal.dtype.name)
+    if not hasattr(_resamplers, 'cache'):
+        _resamplers.cache = {}
+    resampler = _resamplers.cache.get(key)
+    if resampler is None:
+        resampler = soxr.ResampleStream(orig_sr, target_sr, num_channels, dtype=signal.dtype.name, quality='HQ')
+        _resamplers.cache[key] = resampler
+    else:
+        resampler.clear()
+    resampled = resampler.resample_chunk(np.ascontiguousarray(signal), last=True)
+
+    # fix the length as librosa does
+    num_samples = int(np.ceil(signal.shape[0] * float(target_sr) / orig_sr))
+    if resampled.shape[0] > num_samples:
+        resampled = resampled[:num_samples]
+    elif resampled.shape[0] < num_samples:
+        pad_width = [(0, num_samples - resampled.shape[0])] + [(0, 0)] * (resampled.ndim - 1)
+        resampled = np.pad(resampled, pad_width)
+    return resampled
+
+
 class AudioSegment(object):
     """Audio segment abstraction.
     :param samples: Audio samples [num_samples x num_channels].
@@ -174,11 +231,13 @@ class AudioSegment(object):
         audio_file: Optional[Union[str, List[str]]] = None,
         offset: Optional[float] = None,
         duration: Optional[float] = None,
+        copy: bool = True,
     ):
         """Create audio segment from samples.
         Samples are convert float32 internally, with int scaled to [-1, 1].
+        If `copy` is False, float32 samples are used without a copy and may be modified in place by the segment.
         """
-        samples = self._convert_samples_to_float32(samples)
+        samples = self._convert_samples_to_float32(samples, copy=copy)
 
         # Check if channel selector is necessary
         if samples.ndim == 1 and channel_selector not in [None, 0, 'average']:
@@ -193,10 +252,7 @@ class AudioSegment(object):
             )
 
         if target_sr is not None and target_sr != sample_rate:
-            # resample along the temporal dimension (axis=0) will be in librosa 0.10.0 (#1561)
-            samples = samples.transpose()
-            samples = librosa.core.resample(samples, orig_sr=sample_rate, target_sr=target_sr)
-            samples = samples.transpose()
+            samples = resample(samples, orig_sr=sample_rate, target_sr=target_sr)
             sample_rate = target_sr
         if trim:
             # librosa is using channels-first layout (num_channels, num_samples), which is transpose of AudioSegment's layout
@@ -254,12 +310,13 @@ class AudioSegment(object):
             )
 
     @staticmethod
-    def _convert_samples_to_float32(samples):
+    def _convert_samples_to_float32(samples, copy=True):
         """Convert sample type to float32.
         Audio sample type is usually integer or float-point.
         Integers will be scaled to [-1, 1] in float32.
+        Float32 samples are returned without a copy if `copy` is False.
         """
-        float32_samples = samples.astype('float32')
+        float32_samples = samples.astype('float32', copy=copy)
         if samples.dtype in np.sctypes['int']:
             bits = np.iinfo(samples.dtype).bits
             float32_samples *= 1.0 / 2 ** (bits - 1)
@@ -351,17 +408,17 @@ class AudioSegment(object):
 
         if HAVE_PYDUB and samples is None:
             try:
-                samples = Audio.from_file(audio_file, codec=ffmpeg_codecs.get(os.path.splitext(audio_file)[-1]))
+                # only the requested range is decoded
+                samples = Audio.from_file(
+                    audio_file,
+                    codec=ffmpeg_codecs.get(os.path.splitext(audio_file)[-1]),
+                    start_second=offset if offset is not None and offset > 0 else None,
+                    duration=duration if duration is not None and duration > 0 else None,
+                )
                 sample_rate = samples.frame_rate
                 num_channels = samples.channels
-                if offset is not None and offset > 0:
-                    # pydub does things in milliseconds
-                    seconds = offset * 1000
-                    samples = samples[int(seconds) :]
-                if duration is not None and duration > 0:
-                    seconds = duration * 1000
-                    samples = samples[: int(seconds)]
-                samples = np.array(samples.get_array_of_samples())
+                samples = samples.get_array_of_samples()
+                samples = np.frombuffer(samples, dtype=samples.typecode)
                 # For multi-channel signals, channels are stacked in a one-dimensional vector
                 if num_channels > 1:
                     samples = np.reshape(samples, (-1, num_channels))
@@ -388,6 +445,8 @@ class AudioSegment(object):
             audio_file=audio_file,
             offset=offset,
             duration=duration,
+            # decoded samples are not used elsewhere
+            copy=False,
         )
 
     @classmethod
@@ -540,7 +599,13 @@ class AudioSegment(object):
             raise e
 
         features = cls(
-            samples, sample_rate, target_sr=target_sr, trim=trim, orig_sr=orig_sr, channel_selector=channel_selector
+            samples,
+            sample_rate,
+            target_sr=target_sr,
+            trim=trim,
+            orig_sr=orig_sr,
+            channel_selector=channel_selector,
+            copy=False,
         )
 
         if is_segmented:
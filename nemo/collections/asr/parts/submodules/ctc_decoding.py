@@ -16,7 +16,7 @@ import re
 import unicodedata
 from abc import abstractmethod
 from dataclasses import dataclass, field, is_dataclass
-from typing import Callable, Dict, List, Optional, Set, Union
+from typing import Dict, List, Optional, Set, Union
 
 import numpy as np
 import torch
@@ -25,6 +25,14 @@ from omegaconf import DictConfig, OmegaConf
 from nemo.collections.asr.parts.submodules import ctc_beam_decoding, ctc_greedy_decoding
 from nemo.collections.asr.parts.utils.asr_confidence_utils import ConfidenceConfig, ConfidenceMixin
 from nemo.collections.asr.parts.utils.rnnt_utils import Hypothesis, NBestHypotheses
+from nemo.collections.asr.parts.utils.timestamp_utils import (
+    TimestampTokenTable,
+    compute_batch_char_word_offsets,
+    compute_batch_subword_word_offsets,
+    compute_batch_token_offsets,
+    lengths_to_row_splits,
+    refine_punctuation_offsets,
+)
 from nemo.collections.common.tokenizers.aggregate_tokenizer import DummyTokenizer
 from nemo.collections.common.tokenizers.tokenizer_spec import TokenizerSpec
 from nemo.utils import logging, logging_mode
@@ -397,6 +405,9 @@ class AbstractCTCDecoding(ConfidenceMixin):
             )
             fold_consecutive = self.decoding.override_fold_consecutive_value
 
+        if self._can_finalize_greedy_batch(decoder_outputs, fold_consecutive, return_hypotheses):
+            return self._finalize_greedy_batch(decoder_outputs, decoder_lengths)
+
         with torch.inference_mode():
             # Resolve the forward step of the decoding strategy
             hypotheses_list = self.decoding(
@@ -421,8 +432,7 @@ class AbstractCTCDecoding(ConfidenceMixin):
                     # If computing timestamps
                     if self.compute_timestamps is True:
                         timestamp_type = self.cfg.get('ctc_timestamp_type', 'all')
-                        for hyp_idx in range(len(decoded_hyps)):
-                            decoded_hyps[hyp_idx] = self.compute_ctc_timestamps(decoded_hyps[hyp_idx], timestamp_type)
+                        decoded_hyps = self.compute_ctc_timestamps_batch(decoded_hyps, timestamp_type)
 
                     all_hypotheses.append(decoded_hyps)
 
@@ -451,14 +461,62 @@ class AbstractCTCDecoding(ConfidenceMixin):
                         for hyp in hypotheses:
                             hyp.text = hyp.text[:2]
                     timestamp_type = self.cfg.get('ctc_timestamp_type', 'all')
-                    for hyp_idx in range(len(hypotheses)):
-                        hypotheses[hyp_idx] = self.compute_ctc_timestamps(hypotheses[hyp_idx], timestamp_type)
+                    hypotheses = self.compute_ctc_timestamps_batch(hypotheses, timestamp_type)
 
             if return_hypotheses:
                 return hypotheses
 
             return [Hypothesis(h.score, h.y_sequence, h.text) for h in hypotheses]
 
+    def _can_finalize_greedy_batch(
+        self, decoder_outputs: torch.Tensor, fold_consecutive: bool, return_hypotheses: bool
+    ) -> bool:
+        """
+        Checks whether the decoded batch only needs its text, so that the whole batch can be collapsed
+        and detokenized at once instead of finalizing one Hypothesis at a time.
+        """
+        return (
+            self.cfg.strategy == 'greedy_batch'
+            and isinstance(decoder_outputs, torch.Tensor)
+            and hasattr(self.decoding, 'greedy_decode_collapsed_batch')
+            and fold_consecutive
+            and not return_hypotheses
+            and not self.compute_timestamps
+            and not self.preserve_alignments
+            and not self.preserve_frame_confidence
+        )
+
+    def _finalize_greedy_batch(
+        self, decoder_outputs: torch.Tensor, decoder_lengths: Optional[torch.Tensor]
+    ) -> List[Hypothesis]:
+        """
+        Greedy decoding with batched finalization. The ctc collapse (merging repeats and removing blanks)
+        is done on the whole batch tensor, the surviving tokens are moved to the host in one transfer
+        and detokenized with a single call to `decode_tokens_to_str_batch`.
+
+        Returns:
+            A list of Hypothesis objects holding only `score`, `y_sequence` and `text`, exactly as
+            returned by the per-hypothesis path when `return_hypotheses=False`.
+        """
+        with torch.inference_mode():
+            labels, lengths, scores, tokens, token_counts = self.decoding.greedy_decode_collapsed_batch(
+                decoder_output=decoder_outputs, decoder_lengths=decoder_lengths
+            )
+
+        tokens = tokens.tolist()
+        token_offsets = [0] + torch.cumsum(token_counts, dim=0).tolist()
+        tokens_batch = [tokens[start:end] for start, end in zip(token_offsets[:-1], token_offsets[1:])]
+        texts = self.decode_tokens_to_str_batch(tokens_batch)
+
+        hypotheses = []
+        for idx, text in enumerate(texts):
+            # collapse leading spaces before . , ? for PC models
+            text = re.sub(r'(\s+)([\.\,\?])', r'\2', text)
+            score = scores[idx] if scores is not None else -1.0
+            hypotheses.append(Hypothesis(score, labels[idx, : lengths[idx]], text))
+
+        return hypotheses
+
     def decode_hypothesis(
         self, hypotheses_list: List[Hypothesis], fold_consecutive: bool
     ) -> List[Union[Hypothesis, NBestHypotheses]]:
@@ -593,6 +651,19 @@ class AbstractCTCDecoding(ConfidenceMixin):
         """
         raise NotImplementedError()
 
+    def decode_tokens_to_str_batch(self, tokens_batch: List[List[int]]) -> List[str]:
+        """
+        Decodes a batch of token id lists into strings. Subclasses backed by a tokenizer with a
+        batched decoder may override this method to detokenize the whole batch in one call.
+
+        Args:
+            tokens_batch: List of lists of int representing the token ids.
+
+        Returns:
+            A list of decoded strings.
+        """
+        return [self.decode_tokens_to_str(tokens) for tokens in tokens_batch]
+
     @abstractmethod
     def decode_ids_to_tokens(self, tokens: List[int]) -> List[str]:
         """
@@ -625,276 +696,167 @@ class AbstractCTCDecoding(ConfidenceMixin):
             A Hypothesis object with a modified `timestep` value, which is now a dictionary containing
             the time stamp information.
         """
-        assert timestamp_type in ['char', 'word', 'segment', 'all']
-
-        # Unpack the temporary storage, and set the decoded predictions
-        decoded_prediction, token_lengths = hypothesis.text
-        hypothesis.text = decoded_prediction
+        return self.compute_ctc_timestamps_batch([hypothesis], timestamp_type)[0]
 
-        # Retrieve offsets
-        char_offsets = word_offsets = None
-        char_offsets = self._compute_offsets(hypothesis, token_lengths, self.blank_id)
-
-        # Assert number of offsets and hypothesis tokens are 1:1 match.
-        if len(char_offsets) != len(hypothesis.text):
-            raise ValueError(
-                f"`char_offsets`: {char_offsets} and `processed_tokens`: {hypothesis.text}"
-                " have to be of the same length, but are: "
-                f"`len(offsets)`: {len(char_offsets)} and `len(processed_tokens)`:"
-                f" {len(hypothesis.text)}"
-            )
-
-        # Correctly process the token ids to chars/subwords.
-        for i, char in enumerate(hypothesis.text):
-            char_offsets[i]["char"] = self.decode_tokens_to_str([char])
-
-        char_offsets = self._refine_timestamps(char_offsets, self.supported_punctuation)
-
-        # detect char vs subword models
-        lens = [len(list(v["char"])) > 1 for v in char_offsets]
-        if any(lens):
-            text_type = 'subword'
-        else:
-            text_type = 'char'
-
-        # retrieve word offsets from character offsets
-        word_offsets = None
-        if timestamp_type in ['word', 'segment', 'all']:
-            if text_type == 'char':
-                word_offsets = self._get_word_offsets_chars(char_offsets, word_delimiter_char=self.word_seperator)
-            else:
-                word_offsets = self._get_word_offsets_subwords_sentencepiece(
-                    char_offsets,
-                    hypothesis,
-                    decode_ids_to_tokens=self.decode_ids_to_tokens,
-                    decode_tokens_to_str=self.decode_tokens_to_str,
-                )
-
-        segment_offsets = None
-        if timestamp_type in ['segment', 'all']:
-            segment_offsets = segment_offsets = self._get_segment_offsets(
-                word_offsets,
-                segment_delimiter_tokens=self.segment_seperators,
-                supported_punctuation=self.supported_punctuation,
-                segment_gap_threshold=self.segment_gap_threshold,
-            )
-
-        # attach results
-        if len(hypothesis.timestamp) > 0:
-            timestep_info = hypothesis.timestamp
-        else:
-            timestep_info = []
-
-        # Setup defaults
-        hypothesis.timestamp = {"timestep": timestep_info}
-
-        # Add char / subword time stamps
-        if char_offsets is not None and timestamp_type in ['char', 'all']:
-            hypothesis.timestamp['char'] = char_offsets
-
-        # Add word time stamps
-        if word_offsets is not None and timestamp_type in ['word', 'all']:
-            hypothesis.timestamp['word'] = word_offsets
-
-        # Add segment time stamps
-        if segment_offsets is not None and timestamp_type in ['segment', 'all']:
-            hypothesis.timestamp['segment'] = segment_offsets
-
-        # Convert the token indices to text
-        hypothesis.text = self.decode_tokens_to_str(hypothesis.text)
-
-        return hypothesis
-
-    @staticmethod
-    def _compute_offsets(
-        hypothesis: Hypothesis, token_lengths: List[int], ctc_token: int
-    ) -> List[Dict[str, Union[str, int]]]:
+    def compute_ctc_timestamps_batch(self, hypotheses: List[Hypothesis], timestamp_type: str = "all"):
         """
-        Utility method that calculates the indidual time indices where a token starts and ends.
+        Batched version of `compute_ctc_timestamps`. The tokens of all the hypotheses are flattened into arrays
+        and the char/subword, word and segment offsets of the whole batch are computed with array operations,
+        using the per-token lookup tables of `timestamp_token_table` instead of per-token tokenizer calls.
 
         Args:
-            hypothesis: A Hypothesis object that contains `text` field that holds the character / subword token
-                emitted at every time step after ctc collapse.
-            token_lengths: A list of ints representing the lengths of each emitted token.
-            ctc_token: The integer of the ctc blank token used during ctc collapse.
+            hypotheses: A list of Hypothesis objects, with a wrapped `text` field (see `compute_ctc_timestamps`).
+            timestamp_type: A str value that represents the type of time stamp calculated.
+                Can be one of "char", "word" "segment" or "all"
 
         Returns:
-
+            The list of Hypothesis objects with a modified `timestep` value, which is now a dictionary containing
+            the time stamp information.
         """
-        start_index = 0
-
-        # If the exact timestep information is available, utilize the 1st non-ctc blank token timestep
-        # as the start index.
-        if hypothesis.timestamp is not None and len(hypothesis.timestamp) > 0:
-            start_index = max(0, hypothesis.timestamp[0] - 1)
+        assert timestamp_type in ['char', 'word', 'segment', 'all']
 
-        # Construct the start and end indices brackets
-        end_indices = np.asarray(token_lengths).cumsum()
-        start_indices = np.concatenate(([start_index], end_indices[:-1]))
+        if len(hypotheses) == 0:
+            return hypotheses
 
-        # Merge the results per token into a list of dictionaries
-        offsets = [
-            {"char": t, "start_offset": s, "end_offset": e}
-            for t, s, e in zip(hypothesis.text, start_indices, end_indices)
-        ]
+        # Unpack the temporary storage, and set the decoded predictions
+        token_ids, token_lengths, start_indices = [], [], []
+        for hypothesis in hypotheses:
+            decoded_prediction, hyp_token_lengths = hypothesis.text
+            hypothesis.text = decoded_prediction
 
-        # Filter out CTC token
-        offsets = list(filter(lambda offsets: offsets["char"] != ctc_token, offsets))
-        return offsets
+            # Assert number of offsets and hypothesis tokens are 1:1 match.
+            if len(hyp_token_lengths) != len(decoded_prediction):
+                raise ValueError(
+                    f"`token_lengths`: {hyp_token_lengths} and `processed_tokens`: {decoded_prediction}"
+                    " have to be of the same length, but are: "
+                    f"`len(token_lengths)`: {len(hyp_token_lengths)} and `len(processed_tokens)`:"
+                    f" {len(decoded_prediction)}"
+                )
 
-    @staticmethod
-    def _refine_timestamps(
-        char_offsets: List[Dict[str, Union[str, int]]], supported_punctuation: Optional[Set] = None
-    ) -> List[Dict[str, Union[str, int]]]:
+            # If the exact timestep information is available, utilize the 1st non-ctc blank token timestep
+            # as the start index.
+            start_index = 0
+            if hypothesis.timestamp is not None and len(hypothesis.timestamp) > 0:
+                start_index = max(0, int(hypothesis.timestamp[0]) - 1)
 
-        if not supported_punctuation:
-            return char_offsets
+            token_ids.append(np.asarray(decoded_prediction, dtype=np.int64).reshape(-1))
+            token_lengths.append(np.asarray(hyp_token_lengths, dtype=np.int64).reshape(-1))
+            start_indices.append(start_index)
 
-        for i, offset in enumerate(char_offsets):
-            # Check if token is a punctuation mark
-            # If so, set its start and end offset as start and end of the previous token
-            # This is done because there was observed a behaviour, when punctuation marks are predicted long after preceding token (i.e. after silence)
-            if offset['char'] and offset['char'][0] in supported_punctuation and i > 0:
-                offset['end_offset'] = offset['start_offset']
+        row_splits = lengths_to_row_splits(len(ids) for ids in token_ids)
+        token_ids = np.concatenate(token_ids)
+        if np.any(token_ids == self.blank_id):
+            raise ValueError("CTC collapsed token ids passed to timestamp computation must not contain blank tokens")
 
-        return char_offsets
+        table = self.timestamp_token_table
+        table.update(token_ids)
 
-    @staticmethod
-    def _get_word_offsets_chars(
-        offsets: Dict[str, Union[str, float]], word_delimiter_char: str = " "
-    ) -> Dict[str, Union[str, float]]:
-        """
-        Utility method which constructs word time stamps out of character time stamps.
+        # Retrieve char / subword offsets
+        start_offsets, end_offsets = compute_batch_token_offsets(
+            np.concatenate(token_lengths), row_splits, np.asarray(start_indices)
+        )
+        if self.supported_punctuation:
+            end_offsets = refine_punctuation_offsets(token_ids, start_offsets, end_offsets, row_splits, table)
 
-        References:
-            This code is a port of the Hugging Face code for word time stamp construction.
+        # detect char vs subword models
+        token_rows = np.repeat(np.arange(len(hypotheses)), np.diff(row_splits))
+        is_subword = np.bincount(token_rows, weights=table.token_text_len[token_ids] > 1, minlength=len(hypotheses))
+        is_subword = is_subword > 0
 
-        Args:
-            offsets: A list of dictionaries, each containing "char", "start_offset" and "end_offset".
-            word_delimiter_char: Character token that represents the word delimiter. By default, " ".
+        # retrieve word offsets from character offsets
+        char_words = subword_words = None
+        if timestamp_type in ['word', 'segment', 'all']:
+            if not is_subword.all():
+                char_words = compute_batch_char_word_offsets(
+                    token_ids, start_offsets, end_offsets, row_splits, table, word_delimiter_char=self.word_seperator
+                )
+            if is_subword.any():
+                subword_words = compute_batch_subword_word_offsets(
+                    token_ids,
+                    np.arange(len(token_ids)),
+                    row_splits,
+                    start_offsets,
+                    end_offsets,
+                    row_splits,
+                    table,
+                )
 
-        Returns:
-            A list of dictionaries containing the word offsets. Each item contains "word", "start_offset" and
-            "end_offset".
-        """
-        word_offsets = []
+        token_texts = table.token_text[token_ids].tolist()
+        start_offsets, end_offsets = start_offsets.tolist(), end_offsets.tolist()
+
+        for b, hypothesis in enumerate(hypotheses):
+            char_offsets = [
+                {"char": token_texts[i], "start_offset": start_offsets[i], "end_offset": end_offsets[i]}
+                for i in range(row_splits[b], row_splits[b + 1])
+            ]
+
+            word_offsets = None
+            words = subword_words if is_subword[b] else char_words
+            if words is not None:
+                word_offsets = []
+                for w in range(words['row_splits'][b], words['row_splits'][b + 1]):
+                    first_token, last_token = words['first_token'][w], words['last_token'][w] + 1
+                    if is_subword[b]:
+                        word = self.decode_tokens_to_str(token_ids[first_token:last_token].tolist())
+                    else:
+                        word = ''.join(token_texts[first_token:last_token])
+                    word_offsets.append(
+                        {
+                            "word": word,
+                            "start_offset": int(words['start_offset'][w]),
+                            "end_offset": int(words['end_offset'][w]),
+                        }
+                    )
 
-        last_state = "SPACE"
-        word = ""
-        start_offset = 0
-        end_offset = 0
-        for i, offset in enumerate(offsets):
-            char = offset["char"]
-            state = "SPACE" if char == word_delimiter_char else "WORD"
+            segment_offsets = None
+            if timestamp_type in ['segment', 'all']:
+                segment_offsets = self._get_segment_offsets(
+                    word_offsets,
+                    segment_delimiter_tokens=self.segment_seperators,
+                    supported_punctuation=self.supported_punctuation,
+                    segment_gap_threshold=self.segment_gap_threshold,
+                )
 
-            if state == last_state:
-                # If we are in the same state as before, we simply repeat what we've done before
-                end_offset = offset["end_offset"]
-                word += char
+            # attach results
+            if len(hypothesis.timestamp) > 0:
+                timestep_info = hypothesis.timestamp
             else:
-                # Switching state
-                if state == "SPACE":
-                    # Finishing a word
-                    word_offsets.append({"word": word, "start_offset": start_offset, "end_offset": end_offset})
-                else:
-                    # Starting a new word
-                    start_offset = offset["start_offset"]
-                    end_offset = offset["end_offset"]
-                    word = char
+                timestep_info = []
 
-            last_state = state
-        if last_state == "WORD":
-            word_offsets.append({"word": word, "start_offset": start_offset, "end_offset": end_offset})
+            # Setup defaults
+            hypothesis.timestamp = {"timestep": timestep_info}
 
-        return word_offsets
+            # Add char / subword time stamps
+            if timestamp_type in ['char', 'all']:
+                hypothesis.timestamp['char'] = char_offsets
 
-    @staticmethod
-    def _get_word_offsets_subwords_sentencepiece(
-        offsets: Dict[str, Union[str, float]],
-        hypothesis: Hypothesis,
-        decode_ids_to_tokens: Callable[[List[int]], str],
-        decode_tokens_to_str: Callable[[List[int]], str],
-    ) -> Dict[str, Union[str, float]]:
-        """
-        Utility method which constructs word time stamps out of sub-word time stamps.
+            # Add word time stamps
+            if word_offsets is not None and timestamp_type in ['word', 'all']:
+                hypothesis.timestamp['word'] = word_offsets
 
-        **Note**: Only supports Sentencepiece based tokenizers !
-
-        Args:
-            offsets: A list of dictionaries, each containing "char", "start_offset" and "end_offset".
-            hypothesis: Hypothesis object that contains `text` field, where each token is a sub-word id
-                after ctc collapse.
-            decode_ids_to_tokens: A Callable function that accepts a list of integers and maps it to a sub-word.
-            decode_tokens_to_str: A Callable function that accepts a list of integers and maps it to text / str.
+            # Add segment time stamps
+            if segment_offsets is not None and timestamp_type in ['segment', 'all']:
+                hypothesis.timestamp['segment'] = segment_offsets
 
-        Returns:
-            A list of dictionaries containing the word offsets. Each item contains "word", "start_offset" and
-            "end_offset".
-        """
-        word_offsets = []
-        built_token = []
-        previous_token_index = 0
-        # For every collapsed sub-word token
-        for i, char in enumerate(hypothesis.text):
-            # Compute the sub-word text representation, and the decoded text (stripped of sub-word markers).
-            token = decode_ids_to_tokens([char])[0]
-            token_text = decode_tokens_to_str([char])
-
-            # It is a sub-word token, or contains an identifier at the beginning such as _ or ## that was stripped
-            # after forcing partial text conversion of the token.
-            if token != token_text:
-                # If there are any partially or fully built sub-word token ids, construct to text.
-                # Note: This is "old" subword, that occurs *after* current sub-word has started.
-                if len(built_token) > 0:
-                    word_offsets.append(
-                        {
-                            "word": decode_tokens_to_str(built_token),
-                            "start_offset": offsets[previous_token_index]["start_offset"],
-                            "end_offset": offsets[i - 1]["end_offset"],
-                        }
-                    )
+            # Convert the token indices to text
+            hypothesis.text = self.decode_tokens_to_str(hypothesis.text)
 
-                # Prepare list of new sub-word ids
-                built_token.clear()
-                built_token.append(char)
-                previous_token_index = i
-            else:
-                # If the token does not contain any sub-word start mark, then the sub-word has not completed yet
-                # Append to current sub-word list.
-                built_token.append(char)
-
-        # Inject the start offset of the first token to word offsets
-        # This is because we always skip the delay the injection of the first sub-word due to the loop
-        # condition and check whether built token is ready or not.
-        # Therefore without this forced injection, the start_offset appears as off by 1.
-        if len(word_offsets) == 0:
-            # alaptev: sometimes word_offsets can be empty
-            if len(built_token) > 0:
-                word_offsets.append(
-                    {
-                        "word": decode_tokens_to_str(built_token),
-                        "start_offset": offsets[0]["start_offset"],
-                        "end_offset": offsets[-1]["end_offset"],
-                    }
-                )
-                built_token.clear()
-        else:
-            word_offsets[0]["start_offset"] = offsets[0]["start_offset"]
-
-            # If there are any remaining tokens left, inject them all into the final word offset.
-            # Note: The start offset of this token is the start time of the first token inside build_token.
-            # Note: The end offset of this token is the end time of the last token inside build_token
-            if len(built_token) > 0:
-                word_offsets.append(
-                    {
-                        "word": decode_tokens_to_str(built_token),
-                        "start_offset": offsets[-(len(built_token))]["start_offset"],
-                        "end_offset": offsets[-1]["end_offset"],
-                    }
-                )
-            built_token.clear()
+        return hypotheses
 
-        return word_offsets
+    @property
+    def timestamp_token_table(self) -> TimestampTokenTable:
+        """
+        Per-token lookup tables over the vocabulary (token text, word start and punctuation flags) used for
+        batched timestamp computation. Built on first use.
+        """
+        if getattr(self, '_timestamp_token_table', None) is None:
+            self._timestamp_token_table = TimestampTokenTable(
+                decode_ids_to_tokens=self.decode_ids_to_tokens,
+                decode_tokens_to_str=self.decode_tokens_to_str,
+                supported_punctuation=self.supported_punctuation,
+                vocab_size=self.blank_id,
+            )
+        return self._timestamp_token_table
 
     @staticmethod
     def _get_segment_offsets(
@@ -1450,6 +1412,18 @@ class CTCBPEDecoding(AbstractCTCDecoding):
         hypothesis = self.tokenizer.ids_to_text(tokens)
         return hypothesis
 
+    def decode_tokens_to_str_batch(self, tokens_batch: List[List[int]]) -> List[str]:
+        """
+        Decodes a batch of token id lists into strings with a single tokenizer call.
+
+        Args:
+            tokens_batch: List of lists of int representing the token ids.
+
+        Returns:
+            A list of decoded strings.
+        """
+        return self.tokenizer.ids_to_text_batch(tokens_batch)
+
     def decode_ids_to_tokens(self, tokens: List[int]) -> List[str]:
         """
         Implemented by subclass in order to decode a token id list into a token list.
@@ -413,6 +413,60 @@ class GreedyBatchedCTCInfer(Typing, ConfidenceMethodMixin):
         packed_result = pack_hypotheses(hypotheses, input_decoder_lengths)
         return (packed_result,)
 
+    @torch.no_grad()
+    def greedy_decode_collapsed_batch(
+        self,
+        decoder_output: torch.Tensor,
+        decoder_lengths: Optional[torch.Tensor],
+    ):
+        """Greedy decoding followed by the ctc collapse of the whole batch, without building Hypothesis objects.
+
+        Repeated labels are merged and blanks are removed on the device of `decoder_output`, so that only
+        the surviving tokens have to be moved to the host.
+
+        Args:
+            decoder_output: A tensor of size (batch, timesteps, features) or (batch, timesteps) (each timestep is a label).
+            decoder_lengths: list of int representing the length of each sequence
+                output sequence.
+
+        Returns:
+            A tuple of CPU tensors:
+                - labels: (batch, timesteps) greedy labels.
+                - lengths: (batch,) valid length of every sequence.
+                - scores: (batch,) sum of the non-blank log probabilities, or None if labels were provided.
+                - tokens: 1D tensor holding the collapsed tokens of all the sequences, one after another.
+                - token_counts: (batch,) number of collapsed tokens per sequence.
+        """
+        batch_size, max_time = decoder_output.shape[0], decoder_output.shape[1]
+
+        if decoder_lengths is None:
+            logging.warning(_DECODER_LENGTHS_NONE_WARNING, mode=logging_mode.ONCE)
+            decoder_lengths = torch.tensor([max_time], dtype=torch.long, device=decoder_output.device).expand(
+                batch_size
+            )
+        decoder_lengths = decoder_lengths.to(decoder_output.device)
+
+        if decoder_output.ndim == 2:
+            predictions_labels = decoder_output
+        else:
+            predictions_logprobs, predictions_labels = decoder_output.max(dim=-1)
+
+        time_steps = torch.arange(max_time, device=decoder_output.device).unsqueeze(0)
+        non_blank_ids_mask = torch.logical_and(
+            predictions_labels != self.blank_id, time_steps < decoder_lengths.unsqueeze(1)
+        )
+        scores = None
+        if decoder_output.ndim != 2:
+            scores = torch.where(non_blank_ids_mask, predictions_logprobs, 0.0).sum(axis=1).cpu()
+
+        # a label survives the collapse if it is not blank and differs from the label of the previous frame
+        previous_labels = torch.nn.functional.pad(predictions_labels[:, :-1], (1, 0), value=self.blank_id)
+        keep_mask = torch.logical_and(non_blank_ids_mask, predictions_labels != previous_labels)
+        tokens = predictions_labels[keep_mask].cpu()
+        token_counts = keep_mask.sum(dim=1).cpu()
+
+        return predictions_labels.cpu(), decoder_lengths.cpu(), scores, tokens, token_counts
+
     @torch.no_grad()
     def _greedy_decode_logprobs_batched(self, x: torch.Tensor, out_len: torch.Tensor):
         # x: [B, T, D]
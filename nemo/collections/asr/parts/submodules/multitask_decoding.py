@@ -288,6 +288,7 @@ class AbstractMultiTaskDecoding(ConfidenceMixin):
         Returns:
             A list of strings.
         """
+        predictions = []
         for ind in range(len(hypotheses_list)):
             # Extract the integer encoded hypothesis
             prediction = hypotheses_list[ind].y_sequence
@@ -295,13 +296,14 @@ class AbstractMultiTaskDecoding(ConfidenceMixin):
             if type(prediction) != list:
                 prediction = prediction.tolist()
 
-            hypothesis = self.decode_tokens_to_str(prediction)
-
             if self.compute_hypothesis_token_set:
                 hypotheses_list[ind].tokens = self.decode_ids_to_tokens(prediction)
 
-            # De-tokenize the integer tokens
-            hypotheses_list[ind].text = hypothesis
+            predictions.append(prediction)
+
+        # De-tokenize the integer tokens of the whole batch at once
+        for hypothesis, text in zip(hypotheses_list, self.decode_tokens_to_str_batch(predictions)):
+            hypothesis.text = text
 
         return hypotheses_list
 
@@ -350,6 +352,19 @@ class AbstractMultiTaskDecoding(ConfidenceMixin):
         """
         raise NotImplementedError()
 
+    def decode_tokens_to_str_batch(self, tokens_batch: List[List[int]]) -> List[str]:
+        """
+        Decodes a batch of token id lists into strings. Subclasses whose tokenizer has a batched decoder
+        should override this method.
+
+        Args:
+            tokens_batch: List of lists of int representing the token ids.
+
+        Returns:
+            A list of decoded strings.
+        """
+        return [self.decode_tokens_to_str(tokens) for tokens in tokens_batch]
+
     @abstractmethod
     def decode_ids_to_tokens(self, tokens: List[int]) -> List[str]:
         """
@@ -524,6 +539,18 @@ class MultiTaskDecoding(AbstractMultiTaskDecoding):
         hypothesis = self.tokenizer.ids_to_text(tokens)
         return hypothesis
 
+    def decode_tokens_to_str_batch(self, tokens_batch: List[List[int]]) -> List[str]:
+        """
+        Decodes a batch of token id lists into strings with a single tokenizer call.
+
+        Args:
+            tokens_batch: List of lists of int representing the token ids.
+
+        Returns:
+            A list of decoded strings.
+        """
+        return self.tokenizer.ids_to_text_batch(tokens_batch)
+
     def decode_ids_to_tokens(self, tokens: List[int]) -> List[str]:
         """
         Implemented by subclass in order to decode a token id list into a token list.
@@ -26,6 +26,7 @@ from omegaconf import OmegaConf
 from nemo.collections.asr.parts.submodules import rnnt_beam_decoding, rnnt_greedy_decoding, tdt_beam_decoding
 from nemo.collections.asr.parts.utils.asr_confidence_utils import ConfidenceConfig, ConfidenceMixin
 from nemo.collections.asr.parts.utils.rnnt_utils import Hypothesis, NBestHypotheses
+from nemo.collections.asr.parts.utils.timestamp_utils import TimestampTokenTable, get_word_offsets_from_step_offsets
 from nemo.collections.common.tokenizers.aggregate_tokenizer import AggregateTokenizer
 from nemo.collections.common.tokenizers.tokenizer_spec import TokenizerSpec
 from nemo.utils import logging, logging_mode
@@ -832,12 +833,16 @@ class AbstractRNNTDecoding(ConfidenceMixin):
 
         encoded_char_offsets = copy.deepcopy(char_offsets)
 
-        # Correctly process the token ids to chars/subwords.
-        for i, offsets in enumerate(char_offsets):
-            decoded_chars = []
-            for char in offsets['char'][:-1]:  # ignore the RNNT Blank token at end of every timestep with -1 subset
-                decoded_chars.append(self.decode_tokens_to_str([int(char)]))
-            char_offsets[i]["char"] = decoded_chars
+        # Correctly process the token ids to chars/subwords, using the cached per-token text of the vocabulary.
+        # ignore the RNNT Blank token at end of every timestep with -1 subset
+        step_token_ids = [
+            np.asarray([int(char) for char in offsets['char'][:-1]], dtype=np.int64) for offsets in char_offsets
+        ]
+        table = self.timestamp_token_table
+        if len(step_token_ids) > 0:
+            table.update(np.concatenate(step_token_ids))
+        for i, token_ids in enumerate(step_token_ids):
+            char_offsets[i]["char"] = table.token_text[token_ids].tolist()
 
         encoded_char_offsets, char_offsets = self._refine_timestamps(
             encoded_char_offsets, char_offsets, self.supported_punctuation
@@ -871,10 +876,10 @@ class AbstractRNNTDecoding(ConfidenceMixin):
             else:
                 # utilize the copy of char offsets with the correct integer ids for tokens
                 # so as to avoid tokenize -> detokenize -> compare -> merge steps.
-                word_offsets = self._get_word_offsets_subwords_sentencepiece(
+                # word boundaries are looked up in the shared token table instead of detokenizing every token.
+                word_offsets = get_word_offsets_from_step_offsets(
                     encoded_char_offsets,
-                    hypothesis,
-                    decode_ids_to_tokens=self.decode_ids_to_tokens,
+                    table=self.timestamp_token_table,
                     decode_tokens_to_str=self.decode_tokens_to_str,
                 )
 
@@ -913,6 +918,20 @@ class AbstractRNNTDecoding(ConfidenceMixin):
 
         return hypothesis
 
+    @property
+    def timestamp_token_table(self) -> TimestampTokenTable:
+        """
+        Per-token lookup tables (token text, word start and punctuation flags) shared with the batched CTC
+        timestamp computation. Filled lazily with the token ids seen during decoding.
+        """
+        if getattr(self, '_timestamp_token_table', None) is None:
+            self._timestamp_token_table = TimestampTokenTable(
+                decode_ids_to_tokens=self.decode_ids_to_tokens,
+                decode_tokens_to_str=self.decode_tokens_to_str,
+                supported_punctuation=self.supported_punctuation,
+            )
+        return self._timestamp_token_table
+
     @staticmethod
     def _compute_offsets(
         hypothesis: Hypothesis, token_repetitions: List[int], rnnt_token: int
@@ -15,7 +15,7 @@
 import copy
 import os
 import shutil
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import IO, Dict, List, Optional, Tuple
 
 import numpy as np
@@ -36,19 +36,23 @@ from nemo.collections.asr.parts.utils.speaker_utils import labels_to_rttmfile
 from nemo.utils import logging
 
 
-def get_cleaned_base_path(output_dir: str, overwrite_output: bool = True) -> str:
+def get_cleaned_base_path(output_dir: str, overwrite_output: bool = True, resume: bool = False) -> str:
     """
     Delete output directory if it exists or throw warning.
 
     Args:
         output_dir (str): Path to output directory
         overwrite_output (bool): If True, delete output directory if it exists
+        resume (bool): If True, keep the contents of an existing output directory so that an interrupted
+                       simulation run can be resumed. Takes precedence over `overwrite_output`.
 
     Returns:
         basepath (str): Path to base-path directory for writing output files
     """
     if os.path.isdir(output_dir) and os.listdir(output_dir):
-        if overwrite_output:
+        if resume:
+            logging.info(f"Resuming data simulation in the existing output directory: {output_dir}")
+        elif overwrite_output:
             if os.path.exists(output_dir):
                 shutil.rmtree(output_dir)
             os.mkdir(output_dir)
@@ -175,6 +179,8 @@ def read_audio_from_buffer(
     audio_file_id = f"{audio_manifest['audio_filepath']}#{offset_index}"
     if audio_file_id in buffer_dict:
         audio_file, sr, audio_manifest = buffer_dict[audio_file_id]
+        # Entries may be shared across sessions that run on different devices.
+        audio_file = audio_file.to(device)
     else:
         if read_subset:
             audio_manifest = get_subset_of_audio_manifest(
@@ -199,6 +205,74 @@ def read_audio_from_buffer(
     return audio_file, sr, audio_manifest
 
 
+class AudioReadCache(OrderedDict):
+    """
+    Bounded least-recently-used cache for decoded audio, used as a drop-in replacement for the plain dictionary
+    passed to `read_audio_from_buffer` and `get_random_offset_index`.
+
+    A plain dictionary is cleared after each session, so the same source utterances are decoded again for every
+    session. This cache is meant to live for the lifetime of a simulation process and is shared by all the sessions
+    the process generates, while `max_items` keeps its memory footprint bounded.
+
+    Args:
+        max_items (int): Maximum number of entries kept in the cache before the least recently used ones are evicted.
+    """
+
+    def __init__(self, max_items: int):
+        super().__init__()
+        if max_items <= 0:
+            raise ValueError(f"max_items should be a positive integer, but got {max_items}")
+        self.max_items = max_items
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_items:
+            self.popitem(last=False)
+
+
+def read_completed_sessions(progress_filepath: str) -> List[int]:
+    """
+    Read the indices of the sessions that have already been generated from a simulation progress file.
+
+    Args:
+        progress_filepath (str): Path to the progress file written by `append_completed_session`.
+
+    Returns:
+        completed_sessions (list): Sorted list of completed session indices. Empty if the file does not exist.
+    """
+    completed_sessions = set()
+    if not os.path.exists(progress_filepath):
+        return []
+    with open(progress_filepath, "r") as progress_file:
+        for line in progress_file:
+            line = line.strip()
+            # A partially written last line can be left behind by an interrupted run.
+            if line.isdigit():
+                completed_sessions.add(int(line))
+    return sorted(completed_sessions)
+
+
+def append_completed_session(progress_filepath: str, sess_idx: int):
+    """
+    Record a finished session in the simulation progress file so that an interrupted run can be resumed.
+    Only call this after all output files of the session have been written.
+
+    Args:
+        progress_filepath (str): Path to the progress file.
+        sess_idx (int): Index of the completed session.
+    """
+    with open(progress_filepath, "a") as progress_file:
+        progress_file.write(f"{sess_idx}\n")
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+
+
 def perturb_audio(
     audio: torch.Tensor, sr: int, augmentor: Optional[AudioAugmentor] = None, device: Optional[torch.device] = None
 ) -> torch.Tensor:
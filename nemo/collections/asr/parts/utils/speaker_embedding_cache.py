@@ -0,0 +1,220 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import torch
+from filelock import FileLock
+
+from nemo.utils import logging
+
+__all__ = ['SpeakerEmbeddingCache', 'get_model_fingerprint']
+
+
+def get_model_fingerprint(model: torch.nn.Module, extra: str = '') -> str:
+    """
+    Computes a hash of the weights of a model, used to identify the checkpoint that produced an embedding.
+
+    Args:
+        model (torch.nn.Module):
+            Model whose parameters and buffers are hashed.
+        extra (str):
+            Additional description mixed into the hash, e.g. the sample rate used for feature extraction.
+
+    Returns:
+        (str) Hex digest of the model weights.
+    """
+    hasher = hashlib.sha1(extra.encode('utf-8'))
+    for name, tensor in sorted(model.state_dict().items()):
+        hasher.update(name.encode('utf-8'))
+        tensor = tensor.detach().cpu().contiguous()
+        if tensor.dtype == torch.bfloat16:
+            tensor = tensor.float()
+        hasher.update(tensor.numpy().tobytes())
+    return hasher.hexdigest()
+
+
+class SpeakerEmbeddingCache:
+    """
+    Content-addressed store of speaker embeddings on disk.
+
+    Every embedding is keyed on the hash of the audio file content, the segment offset and duration and the
+    fingerprint of the speaker model (see `get_model_fingerprint`), so that embeddings can be reused across
+    `diarize()` calls, clustering parameter sweeps and output directories. Embeddings are rows of a
+    memory-mapped float32 matrix, and an append-only index maps keys to rows.
+
+    Several processes, e.g. diarization runs sharing `cache_dir`, can add embeddings to the same store: appends
+    hold a lock on the store, and pick up the rows added by other processes before writing new ones.
+
+    Layout of `cache_dir`:
+        embeddings.f32: raw float32 matrix of shape [num_embeddings, emb_dim]
+        index.json: one {"key": ..., "row": ...} line per embedding
+        meta.json: {"emb_dim": ...}
+        lock: lock file held while the store is written
+
+    Args:
+        cache_dir (str):
+            Directory of the store, created if it does not exist.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._data_path = os.path.join(cache_dir, 'embeddings.f32')
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        self._meta_path = os.path.join(cache_dir, 'meta.json')
+        self._lock = FileLock(os.path.join(cache_dir, 'lock'))
+        self._audio_hashes = {}
+        self._matrix = None
+        self.emb_dim = None
+        self.index = {}
+        self.num_rows = 0
+        # position in the index file up to which entries were read
+        self._index_offset = 0
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """
+        Reads the rows and index entries added to the store since the last call, by this or another process.
+        Must be called while holding the lock.
+        """
+        if self.emb_dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, 'r', encoding='utf-8') as meta_file:
+                self.emb_dim = json.load(meta_file)['emb_dim']
+        if self.emb_dim is None or not os.path.exists(self._data_path):
+            return
+
+        # rows are only appended after the previous ones were fully written, and the index after the rows,
+        # so entries pointing past the end of the matrix come from an interrupted run and are ignored
+        row_bytes = 4 * self.emb_dim
+        self.num_rows = os.path.getsize(self._data_path) // row_bytes
+        if os.path.getsize(self._data_path) != self.num_rows * row_bytes:
+            # drop a partially written row, so that new rows stay aligned
+            os.truncate(self._data_path, self.num_rows * row_bytes)
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'rb') as index_file:
+                index_file.seek(self._index_offset)
+                for line in index_file:
+                    if not line.endswith(b'\n'):
+                        # partially written by an interrupted run, terminated by the next append
+                        break
+                    self._index_offset += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry['row'] < self.num_rows:
+                        self.index[entry['key']] = entry['row']
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def audio_hash(self, audio_filepath: str) -> str:
+        """
+        Returns the hash of the content of an audio file. Hashes are memoized for the size and modification
+        time of the file, so every file is read only once.
+        """
+        stat = os.stat(audio_filepath)
+        memo_key = (os.path.abspath(audio_filepath), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._audio_hashes:
+            hasher = hashlib.sha1()
+            with open(audio_filepath, 'rb') as audio_file:
+                for chunk in iter(lambda: audio_file.read(1 << 20), b''):
+                    hasher.update(chunk)
+            self._audio_hashes[memo_key] = hasher.hexdigest()
+        return self._audio_hashes[memo_key]
+
+    def segment_key(self, audio_filepath: str, offset: float, duration: float, model_fingerprint: str) -> str:
+        """
+        Returns the key of the embedding of a segment of an audio file.
+        """
+        description = f"{self.audio_hash(audio_filepath)}|{offset:.4f}|{duration:.4f}|{model_fingerprint}"
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def lookup(self, keys: List[str]) -> Tuple[List[int], List[int]]:
+        """
+        Splits keys into the ones present in the store and the missing ones.
+
+        Returns:
+            cached_idx (list): indices of the keys found in the store
+            missing_idx (list): indices of the keys that have to be computed
+        """
+        cached_idx, missing_idx = [], []
+        for idx, key in enumerate(keys):
+            (cached_idx if key in self.index else missing_idx).append(idx)
+        return cached_idx, missing_idx
+
+    def get(self, keys: List[str]) -> torch.Tensor:
+        """
+        Reads the embeddings of the given keys, all of which must be present in the store.
+
+        Returns:
+            (torch.Tensor) Embeddings of shape [len(keys), emb_dim].
+        """
+        if len(keys) == 0:
+            return torch.empty([0, self.emb_dim or 0])
+        if self._matrix is None or self._matrix.shape[0] != self.num_rows:
+            self._matrix = np.memmap(self._data_path, dtype=np.float32, mode='r', shape=(self.num_rows, self.emb_dim))
+        rows = np.fromiter((self.index[key] for key in keys), dtype=np.int64, count=len(keys))
+        return torch.from_numpy(np.asarray(self._matrix[rows]))
+
+    def add(self, keys: List[str], embeddings: torch.Tensor):
+        """
+        Appends embeddings of shape [len(keys), emb_dim] to the store. Keys already in the store, including the
+        ones added by other processes, are skipped.
+        """
+        embeddings = embeddings.detach().cpu().float().numpy()
+        with self._lock:
+            self._refresh()
+            self._append(keys, embeddings)
+
+    def _append(self, keys: List[str], embeddings: np.ndarray):
+        if self.emb_dim is None:
+            self.emb_dim = embeddings.shape[-1]
+            self.num_rows = 0
+            with open(self._meta_path, 'w', encoding='utf-8') as meta_file:
+                json.dump({'emb_dim': self.emb_dim}, meta_file)
+        elif embeddings.shape[-1] != self.emb_dim:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[-1]} does not match the dimension of the store {self.emb_dim}"
+            )
+
+        new_entries: Dict[str, int] = {}
+        for idx, key in enumerate(keys):
+            if key not in self.index and key not in new_entries:
+                new_entries[key] = idx
+        if len(new_entries) == 0:
+            return
+
+        with open(self._data_path, 'ab') as data_file:
+            data_file.write(np.ascontiguousarray(embeddings[list(new_entries.values())]).tobytes())
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        with open(self._index_path, 'a', encoding='utf-8') as index_file:
+            if index_file.tell() > self._index_offset:
+                # end the partial entry of an interrupted run, which is then skipped as invalid
+                index_file.write('\n')
+            for row, key in enumerate(new_entries, start=self.num_rows):
+                index_file.write(json.dumps({'key': key, 'row': row}) + '\n')
+                self.index[key] = row
+        self.num_rows += len(new_entries)
+        logging.debug(f"Added {len(new_entries)} speaker embeddings to the cache in {self.cache_dir}")
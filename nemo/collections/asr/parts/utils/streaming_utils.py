@@ -14,7 +14,8 @@
 
 import copy
 import os
-from typing import Optional
+from collections import deque
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 import torch
@@ -575,6 +576,130 @@ class AudioBuffersDataLayer(IterableDataset):
         return 1
 
 
+class FeatureRingBuffer:
+    """
+    Keeps the most recent `buffer_len` feature frames of one or more streams and exposes them as windows
+    that are views into a preallocated storage, so that appending a frame never shifts or copies the buffer.
+
+    New frames are written after the current window. When the storage is full, the last window is moved
+    into a freshly allocated storage, so windows returned earlier stay valid until they are released.
+    """
+
+    def __init__(self, n_feat: int, buffer_len: int, capacity: int, batch_shape=(), fill_value: float = 0.0):
+        '''
+        Args:
+            n_feat: number of features of every frame
+            buffer_len: number of feature frames of a window
+            capacity: number of feature frames that can be appended before the storage is reallocated
+            batch_shape: leading dimensions of the buffer, e.g. (num_streams,)
+            fill_value: value of the window before any frame has been appended
+        '''
+        self.n_feat = n_feat
+        self.buffer_len = buffer_len
+        self.capacity = max(capacity, 1)
+        self.batch_shape = tuple(batch_shape)
+        self.fill_value = fill_value
+        self.reset()
+
+    def reset(self):
+        self._storage = np.full(
+            [*self.batch_shape, self.n_feat, self.buffer_len + self.capacity], self.fill_value, dtype=np.float32
+        )
+        self._end = self.buffer_len
+
+    def append(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Appends a frame of shape [*batch_shape, n_feat, T] and returns the updated window.
+        """
+        frame_len = frame.shape[-1]
+        if self._end + frame_len > self._storage.shape[-1]:
+            storage = np.empty(
+                [*self.batch_shape, self.n_feat, self.buffer_len + max(self.capacity, frame_len)], dtype=np.float32
+            )
+            storage[..., : self.buffer_len] = self.window()
+            self._storage = storage
+            self._end = self.buffer_len
+        self._storage[..., self._end : self._end + frame_len] = frame
+        self._end += frame_len
+        return self.window()
+
+    def window(self) -> np.ndarray:
+        """
+        Returns a view of the last `buffer_len` feature frames with shape [*batch_shape, n_feat, buffer_len].
+        """
+        return self._storage[..., self._end - self.buffer_len : self._end]
+
+
+class FeatureBuffersBatcher:
+    """
+    Replacement of `AudioBuffersDataLayer` wrapped into a DataLoader for buffered inference.
+    The feature buffers of a chunk are collated into a persistent device tensor which is reused across chunks,
+    instead of creating new tensors (and a new batch) through a DataLoader for every chunk.
+    Iterating over it yields `(processed_signal, processed_length)` batches, already on `device`.
+    """
+
+    def __init__(self, device: torch.device, batch_size: Optional[int] = None):
+        '''
+        Args:
+            device: device of the yielded batches
+            batch_size: maximum number of buffers per batch, all buffers form a single batch if None
+        '''
+        self.device = torch.device(device)
+        self.batch_size = batch_size
+        self.signal = []
+        self._device_batch = None
+        self._host_batch = None
+        self._copy_done = None
+
+    def set_signal(self, signals):
+        self.signal = signals
+
+    def __iter__(self):
+        batch_size = self.batch_size or max(len(self.signal), 1)
+        for start in range(0, len(self.signal), batch_size):
+            yield self._collate(self.signal[start : start + batch_size])
+
+    def __len__(self):
+        return 1
+
+    def _collate(self, signals):
+        lengths = [signal.shape[-1] for signal in signals]
+        batch_size, max_len = len(signals), max(lengths)
+        n_feat = signals[0].shape[-2]
+
+        batch = self._device_batch
+        if batch is None or batch.shape[0] < batch_size or batch.shape[1] != n_feat or batch.shape[2] < max_len:
+            shape = [batch_size, n_feat, max_len]
+            if batch is not None and batch.shape[1] == n_feat:
+                shape = [max(batch_size, batch.shape[0]), n_feat, max(max_len, batch.shape[2])]
+            self._device_batch = torch.empty(shape, dtype=torch.float32, device=self.device)
+            if self.device.type == 'cuda':
+                self._host_batch = torch.empty(shape, dtype=torch.float32).pin_memory()
+                self._copy_done = None
+
+        # on CPU, the buffers are collated directly into the persistent device batch
+        host_batch = self._device_batch if self._host_batch is None else self._host_batch
+        if self._copy_done is not None:
+            # the pinned batch may still be in flight to the device for the previous chunk
+            self._copy_done.synchronize()
+
+        for idx, (signal, length) in enumerate(zip(signals, lengths)):
+            host_batch[idx, :, :length].copy_(torch.as_tensor(signal).reshape(n_feat, length))
+            if length < max_len:
+                host_batch[idx, :, length:max_len].zero_()
+
+        processed_signal = self._device_batch[:batch_size, :, :max_len]
+        if host_batch is not self._device_batch:
+            processed_signal.copy_(host_batch[:batch_size, :, :max_len], non_blocking=True)
+            self._copy_done = torch.cuda.Event()
+            self._copy_done.record()
+
+        if not processed_signal.is_contiguous():
+            processed_signal = processed_signal.contiguous()
+        processed_length = torch.tensor(lengths, dtype=torch.int64).to(self.device, non_blocking=True)
+        return processed_signal, processed_length
+
+
 class FeatureFrameBufferer:
     """
     Class to append each feature frame to a buffer and return
@@ -600,7 +725,6 @@ class FeatureFrameBufferer:
 
         total_buffer_len = int(total_buffer / timestep_duration)
         self.n_feat = asr_model._cfg.preprocessor.features
-        self.buffer = np.ones([self.n_feat, total_buffer_len], dtype=np.float32) * self.ZERO_LEVEL_SPEC_DB_VAL
         self.pad_to_buffer_len = pad_to_buffer_len
         self.batch_size = batch_size
 
@@ -608,33 +732,45 @@ class FeatureFrameBufferer:
         self.frame_reader = None
         self.feature_buffer_len = total_buffer_len
 
-        self.feature_buffer = (
-            np.ones([self.n_feat, self.feature_buffer_len], dtype=np.float32) * self.ZERO_LEVEL_SPEC_DB_VAL
-        )
         self.frame_buffers = []
         self.buffered_features_size = 0
         self.reset()
         self.buffered_len = 0
 
+    def _create_ring_buffer(self):
+        # the buffers of a whole batch of frames are views into the ring, so reserve room for all of them
+        return FeatureRingBuffer(
+            self.n_feat,
+            self.feature_buffer_len,
+            capacity=self.batch_size * self.n_frame_len,
+            fill_value=self.ZERO_LEVEL_SPEC_DB_VAL,
+        )
+
+    @property
+    def buffer(self):
+        return self.ring_buffer.window()
+
+    @property
+    def feature_buffer(self):
+        return self.ring_buffer.window()
+
     def reset(self):
         '''
         Reset frame_history and decoder's state
         '''
-        self.buffer = np.ones(shape=self.buffer.shape, dtype=np.float32) * self.ZERO_LEVEL_SPEC_DB_VAL
+        self.ring_buffer = self._create_ring_buffer()
         self.prev_char = ''
         self.unmerged = []
         self.frame_buffers = []
         self.buffered_len = 0
-        self.feature_buffer = (
-            np.ones([self.n_feat, self.feature_buffer_len], dtype=np.float32) * self.ZERO_LEVEL_SPEC_DB_VAL
-        )
 
     def get_batch_frames(self):
         if self.signal_end:
             return []
         batch_frames = []
         for frame in self.frame_reader:
-            batch_frames.append(np.copy(frame))
+            # frames are copied into the ring buffer, so they can be kept as they are
+            batch_frames.append(np.asarray(frame))
             if len(batch_frames) == self.batch_size:
                 return batch_frames
         self.signal_end = True
@@ -642,38 +778,28 @@ class FeatureFrameBufferer:
         return batch_frames
 
     def get_frame_buffers(self, frames):
-        # Build buffers for each frame
+        # Build buffers for each frame, every buffer is a view into the ring buffer
         self.frame_buffers = []
         for frame in frames:
             curr_frame_len = frame.shape[1]
             self.buffered_len += curr_frame_len
             if curr_frame_len < self.feature_buffer_len and not self.pad_to_buffer_len:
-                self.frame_buffers.append(np.copy(frame))
+                self.frame_buffers.append(frame)
                 continue
-            self.buffer[:, :-curr_frame_len] = self.buffer[:, curr_frame_len:]
-            self.buffer[:, -self.n_frame_len :] = frame
-            self.frame_buffers.append(np.copy(self.buffer))
+            self.frame_buffers.append(self.ring_buffer.append(frame))
         return self.frame_buffers
 
     def set_frame_reader(self, frame_reader):
         self.frame_reader = frame_reader
         self.signal_end = False
 
-    def _update_feature_buffer(self, feat_frame):
-        curr_frame_len = feat_frame.shape[1]
-        if curr_frame_len < self.feature_buffer_len and not self.pad_to_buffer_len:
-            self.feature_buffer = np.copy(feat_frame)  # assume that only the last frame is less than the buffer length
-        else:
-            self.feature_buffer[:, : -feat_frame.shape[1]] = self.feature_buffer[:, feat_frame.shape[1] :]
-            self.feature_buffer[:, -feat_frame.shape[1] :] = feat_frame
-        self.buffered_features_size += feat_frame.shape[1]
-
     def get_norm_consts_per_frame(self, batch_frames):
+        # the feature buffer of every frame is the buffer built for it by `get_frame_buffers`
         norm_consts = []
-        for i, frame in enumerate(batch_frames):
-            self._update_feature_buffer(frame)
-            mean_from_buffer = np.mean(self.feature_buffer, axis=1)
-            stdev_from_buffer = np.std(self.feature_buffer, axis=1)
+        for frame, feature_buffer in zip(batch_frames, self.frame_buffers):
+            self.buffered_features_size += frame.shape[1]
+            mean_from_buffer = np.mean(feature_buffer, axis=1)
+            stdev_from_buffer = np.std(feature_buffer, axis=1)
             norm_consts.append((mean_from_buffer.reshape(self.n_feat, 1), stdev_from_buffer.reshape(self.n_feat, 1)))
         return norm_consts
 
@@ -732,6 +858,7 @@ class FrameBatchASR:
         self.decoder = getattr(asr_model, "decoder", None)
 
         self.batch_size = batch_size
+        self.total_buffer = total_buffer
         self.all_logits = []
         self.all_preds = []
 
@@ -766,8 +893,13 @@ class FrameBatchASR:
         """
         self.prev_char = ''
         self.unmerged = []
-        self.data_layer = AudioBuffersDataLayer()
-        self.data_loader = DataLoader(self.data_layer, batch_size=self.batch_size, collate_fn=speech_collate_fn)
+        # keep the batcher (and its persistent batch tensor) across audio files
+        if not isinstance(getattr(self, 'data_layer', None), FeatureBuffersBatcher):
+            self.data_layer = FeatureBuffersBatcher(device=self.asr_model.device)
+        self.data_layer.device = self.asr_model.device
+        self.data_layer.batch_size = self.batch_size
+        self.data_layer.set_signal([])
+        self.data_loader = self.data_layer
         self.all_logits = []
         self.all_preds = []
         self.toks_unmerged = []
@@ -864,13 +996,6 @@ class BatchedFeatureFrameBufferer(FeatureFrameBufferer):
         '''
         super().__init__(asr_model, frame_len=frame_len, batch_size=batch_size, total_buffer=total_buffer)
 
-        # OVERRIDES OF BASE CLASS
-        timestep_duration = asr_model._cfg.preprocessor.window_stride
-        total_buffer_len = int(total_buffer / timestep_duration)
-        self.buffer = (
-            np.ones([batch_size, self.n_feat, total_buffer_len], dtype=np.float32) * self.ZERO_LEVEL_SPEC_DB_VAL
-        )
-
         # Preserve list of buffers and indices, one for every sample
         self.all_frame_reader = [None for _ in range(self.batch_size)]
         self.signal_end = [False for _ in range(self.batch_size)]
@@ -881,15 +1006,21 @@ class BatchedFeatureFrameBufferer(FeatureFrameBufferer):
         del self.buffered_len
         del self.buffered_features_size
 
+    def _create_ring_buffer(self):
+        # one window per sample, the windows of a step are consumed before the next step
+        return FeatureRingBuffer(
+            self.n_feat,
+            self.feature_buffer_len,
+            capacity=self.feature_buffer_len,
+            batch_shape=(self.batch_size,),
+            fill_value=self.ZERO_LEVEL_SPEC_DB_VAL,
+        )
+
     def reset(self):
         '''
         Reset frame_history and decoder's state
         '''
         super().reset()
-        self.feature_buffer = (
-            np.ones([self.batch_size, self.n_feat, self.feature_buffer_len], dtype=np.float32)
-            * self.ZERO_LEVEL_SPEC_DB_VAL
-        )
         self.all_frame_reader = [None for _ in range(self.batch_size)]
         self.signal_end = [False for _ in range(self.batch_size)]
         self.signal_end_index = [None for _ in range(self.batch_size)]
@@ -905,7 +1036,7 @@ class BatchedFeatureFrameBufferer(FeatureFrameBufferer):
         for idx, frame_reader in enumerate(self.all_frame_reader):
             try:
                 frame = next(frame_reader)
-                frame = np.copy(frame)
+                frame = np.asarray(frame)
 
                 batch_frames.append(frame)
             except StopIteration:
@@ -924,24 +1055,21 @@ class BatchedFeatureFrameBufferer(FeatureFrameBufferer):
         return batch_frames
 
     def get_frame_buffers(self, frames):
-        # Build buffers for each frame
-        self.frame_buffers = []
-        # Loop over all buffers of all samples
-        for idx in range(self.batch_size):
-            frame = frames[idx]
-            # If the sample has a buffer, then process it as usual
+        # Append the frames of all samples to the ring buffer at once
+        step_frames = np.zeros([self.batch_size, self.n_feat, self.n_frame_len], dtype=np.float32)
+        for idx, frame in enumerate(frames):
             if frame is not None:
-                self.buffer[idx, :, : -self.n_frame_len] = self.buffer[idx, :, self.n_frame_len :]
-                self.buffer[idx, :, -self.n_frame_len :] = frame
-                # self.buffered_len += frame.shape[1]
-                # WRAP the buffer at index idx into a outer list
-                self.frame_buffers.append([np.copy(self.buffer[idx])])
-            else:
-                # If the buffer does not exist, the sample has finished processing
-                # set the entire buffer for that sample to 0
-                self.buffer[idx, :, :] *= 0.0
-                self.frame_buffers.append([np.copy(self.buffer[idx])])
+                step_frames[idx] = frame
+        buffers = self.ring_buffer.append(step_frames)
+
+        for idx, frame in enumerate(frames):
+            # If the buffer does not exist, the sample has finished processing
+            # set the entire buffer for that sample to 0
+            if frame is None:
+                buffers[idx] = 0.0
 
+        # Wrap the buffer of every sample into an outer batch dimension of size 1
+        self.frame_buffers = [buffers[idx : idx + 1] for idx in range(self.batch_size)]
         return self.frame_buffers
 
     def set_frame_reader(self, frame_reader, idx):
@@ -949,19 +1077,8 @@ class BatchedFeatureFrameBufferer(FeatureFrameBufferer):
         self.signal_end[idx] = False
         self.signal_end_index[idx] = None
 
-    def _update_feature_buffer(self, feat_frame, idx):
-        # Update the feature buffer for given sample, or reset if the sample has finished processing
-        if feat_frame is not None:
-            self.feature_buffer[idx, :, : -feat_frame.shape[1]] = self.feature_buffer[idx, :, feat_frame.shape[1] :]
-            self.feature_buffer[idx, :, -feat_frame.shape[1] :] = feat_frame
-            # self.buffered_features_size += feat_frame.shape[1]
-        else:
-            self.feature_buffer[idx, :, :] *= 0.0
-
     def get_norm_consts_per_frame(self, batch_frames):
-        for idx, frame in enumerate(batch_frames):
-            self._update_feature_buffer(frame, idx)
-
+        # The feature buffer of every sample is its window in the ring buffer, updated by `get_frame_buffers`
         mean_from_buffer = np.mean(self.feature_buffer, axis=2, keepdims=True)  # [B, self.n_feat, 1]
         stdev_from_buffer = np.std(self.feature_buffer, axis=2, keepdims=True)  # [B, self.n_feat, 1]
 
@@ -1698,19 +1815,18 @@ class FrameBatchChunkedRNNT(FrameBatchASR):
         for batch in iter(self.data_loader):
             feat_signal, feat_signal_len = batch
             feat_signal, feat_signal_len = feat_signal.to(device), feat_signal_len.to(device)
+            self.all_preds.extend(self.decode_feature_batch(feat_signal, feat_signal_len))
 
-            encoded, encoded_len = self.asr_model(
-                processed_signal=feat_signal, processed_signal_length=feat_signal_len
-            )
-
-            best_hyp_text, all_hyp_text = self.asr_model.decoding.rnnt_decoder_predictions_tensor(
-                encoder_output=encoded, encoded_lengths=encoded_len, return_hypotheses=False
-            )
-            self.all_preds.extend(best_hyp_text)
-            del best_hyp_text
-            del all_hyp_text
-            del encoded
-            del encoded_len
+    @torch.no_grad()
+    def decode_feature_batch(self, feat_signal: torch.Tensor, feat_signal_len: torch.Tensor) -> List[str]:
+        """
+        Transcribes a batch of normalized feature buffers, returns one transcript per buffer.
+        """
+        encoded, encoded_len = self.asr_model(processed_signal=feat_signal, processed_signal_length=feat_signal_len)
+        hypotheses = self.asr_model.decoding.rnnt_decoder_predictions_tensor(
+            encoder_output=encoded, encoded_lengths=encoded_len, return_hypotheses=False
+        )
+        return [hyp.text for hyp in hypotheses]
 
     def transcribe(
         self, tokens_per_chunk: Optional[int] = None, delay: Optional[int] = None, keep_logits: bool = False
@@ -1746,28 +1862,28 @@ class FrameBatchChunkedCTC(FrameBatchASR):
         for batch in iter(self.data_loader):
             feat_signal, feat_signal_len = batch
             feat_signal, feat_signal_len = feat_signal.to(device), feat_signal_len.to(device)
+            self.all_preds.extend(self.decode_feature_batch(feat_signal, feat_signal_len))
 
-            results = self.asr_model(processed_signal=feat_signal, processed_signal_length=feat_signal_len)
-            if len(results) == 2:  # hybrid model
-                encoded, encoded_len = results
-                log_probs = self.asr_model.ctc_decoder(encoder_output=encoded)
-                transcribed_texts, _ = self.asr_model.ctc_decoding.ctc_decoder_predictions_tensor(
-                    decoder_outputs=log_probs,
-                    decoder_lengths=encoded_len,
-                    return_hypotheses=False,
-                )
-            else:
-                log_probs, encoded_len, predictions = results
-                transcribed_texts, _ = self.asr_model.decoding.ctc_decoder_predictions_tensor(
-                    decoder_outputs=log_probs,
-                    decoder_lengths=encoded_len,
-                    return_hypotheses=False,
-                )
+    @torch.no_grad()
+    def decode_feature_batch(self, feat_signal: torch.Tensor, feat_signal_len: torch.Tensor) -> List[str]:
+        """
+        Transcribes a batch of normalized feature buffers, returns one transcript per buffer.
+        """
+        results = self.asr_model(processed_signal=feat_signal, processed_signal_length=feat_signal_len)
+        if len(results) == 2:  # hybrid model
+            encoded, encoded_len = results
+            log_probs = self.asr_model.ctc_decoder(encoder_output=encoded)
+            decoding = self.asr_model.ctc_decoding
+        else:
+            log_probs, encoded_len, _ = results
+            decoding = self.asr_model.decoding
 
-            self.all_preds.extend(transcribed_texts)
-            del log_probs
-            del encoded_len
-            del predictions
+        hypotheses = decoding.ctc_decoder_predictions_tensor(
+            decoder_outputs=log_probs,
+            decoder_lengths=encoded_len,
+            return_hypotheses=False,
+        )
+        return [hyp.text for hyp in hypotheses]
 
     def transcribe(
         self, tokens_per_chunk: Optional[int] = None, delay: Optional[int] = None, keep_logits: bool = False
@@ -1783,3 +1899,120 @@ class FrameBatchChunkedCTC(FrameBatchASR):
 
         print("keep_logits=True is not supported for FrameBatchChunkedCTC. Returning empty logits.")
         return hypothesis, []
+
+
+class MultiStreamFrameBatchChunkedASR:
+    """
+    Serves many concurrent long audio streams with a single `FrameBatchChunkedCTC` or `FrameBatchChunkedRNNT`.
+    Every step takes the next chunk of up to `batch_size` active streams in round-robin order, runs the model
+    once on this batch and appends every chunk transcript to its stream. Streams can be added between steps.
+
+    Example:
+        frame_asr = FrameBatchChunkedCTC(asr_model, frame_len=4, total_buffer=4, batch_size=16)
+        asr = MultiStreamFrameBatchChunkedASR(frame_asr)
+        for stream_id, audio_filepath in enumerate(audio_filepaths):
+            asr.add_stream(stream_id, audio_filepath)
+        transcripts = asr.transcribe()
+    """
+
+    def __init__(self, frame_asr: Union[FrameBatchChunkedCTC, FrameBatchChunkedRNNT]):
+        '''
+        Args:
+            frame_asr: chunked inference wrapper of the model, its `batch_size` is the number of chunks per step
+        '''
+        self.frame_asr = frame_asr
+        self.data_layer = FeatureBuffersBatcher(device=frame_asr.asr_model.device)
+        self.reset()
+
+    def reset(self):
+        """
+        Drops all the streams and their transcripts
+        """
+        self.active_streams = deque()
+        self.frame_bufferers = {}
+        self.chunk_transcripts = {}
+
+    def add_stream(self, stream_id, audio_filepath: str, delay: int = 0, model_stride_in_secs: float = 0.0):
+        '''
+        Args:
+            stream_id: unique hashable identifier of the stream
+            audio_filepath: path to the audio of the stream
+            delay: number of output frames of padding appended to the audio
+            model_stride_in_secs: duration of an output frame of the model, seconds
+        '''
+        if stream_id in self.chunk_transcripts:
+            raise ValueError(f"Stream {stream_id} has already been added")
+
+        frame_asr = self.frame_asr
+        samples = get_samples(audio_filepath)
+        samples = np.pad(samples, (0, int(delay * model_stride_in_secs * frame_asr.asr_model._cfg.sample_rate)))
+        frame_reader = AudioFeatureIterator(
+            samples,
+            frame_asr.frame_len,
+            frame_asr.raw_preprocessor,
+            frame_asr.asr_model.device,
+            pad_to_frame_len=False,
+        )
+        frame_bufferer = FeatureFrameBufferer(
+            asr_model=frame_asr.asr_model,
+            frame_len=frame_asr.frame_len,
+            batch_size=1,
+            total_buffer=frame_asr.total_buffer,
+            pad_to_buffer_len=False,
+        )
+        frame_bufferer.set_frame_reader(frame_reader)
+
+        self.frame_bufferers[stream_id] = frame_bufferer
+        self.chunk_transcripts[stream_id] = []
+        self.active_streams.append(stream_id)
+
+    @property
+    def num_active_streams(self) -> int:
+        return len(self.active_streams)
+
+    @torch.no_grad()
+    def step(self) -> List:
+        """
+        Transcribes the next chunk of up to `batch_size` active streams.
+
+        Returns:
+            Identifiers of the streams which have no audio left
+        """
+        frame_buffers, stream_ids, finished_streams = [], [], []
+        for _ in range(len(self.active_streams)):
+            if len(frame_buffers) == self.frame_asr.batch_size:
+                break
+            stream_id = self.active_streams.popleft()
+            stream_buffers = self.frame_bufferers[stream_id].get_buffers_batch()
+            if len(stream_buffers) == 0:
+                del self.frame_bufferers[stream_id]
+                finished_streams.append(stream_id)
+                continue
+            frame_buffers.extend(stream_buffers)
+            stream_ids.extend([stream_id] * len(stream_buffers))
+            self.active_streams.append(stream_id)
+
+        if len(frame_buffers) > 0:
+            self.data_layer.device = self.frame_asr.asr_model.device
+            self.data_layer.set_signal(frame_buffers)
+            transcripts = []
+            for feat_signal, feat_signal_len in self.data_layer:
+                transcripts.extend(self.frame_asr.decode_feature_batch(feat_signal, feat_signal_len))
+            for stream_id, transcript in zip(stream_ids, transcripts):
+                self.chunk_transcripts[stream_id].append(transcript)
+
+        return finished_streams
+
+    def get_transcript(self, stream_id) -> str:
+        return " ".join(self.chunk_transcripts[stream_id])
+
+    def transcribe(self) -> Dict:
+        """
+        Runs steps until all the streams are transcribed.
+
+        Returns:
+            A dictionary from stream identifier to its transcript
+        """
+        while len(self.active_streams) > 0:
+            self.step()
+        return {stream_id: self.get_transcript(stream_id) for stream_id in self.chunk_transcripts}
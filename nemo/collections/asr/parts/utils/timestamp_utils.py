@@ -0,0 +1,343 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched timestamp computation shared by the CTC and RNNT decoding classes.
+
+Tokens of all the hypotheses in a batch are flattened into a single array, and each hypothesis is described by its
+slice of that array through `row_splits` (hypothesis `b` owns elements `row_splits[b]:row_splits[b + 1]`).
+Char, word and segment offsets are computed with array operations over the flattened batch, using per-token lookup
+tables (decoded text, "starts a word" and "is punctuation" flags) that are built once per vocabulary.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+__all__ = [
+    'TimestampTokenTable',
+    'lengths_to_row_splits',
+    'segmented_cumsum',
+    'compute_batch_token_offsets',
+    'refine_punctuation_offsets',
+    'compute_batch_subword_word_offsets',
+    'compute_batch_char_word_offsets',
+    'get_word_offsets_from_step_offsets',
+]
+
+
+class TimestampTokenTable:
+    """
+    Lookup tables over the token ids of a decoding vocabulary, used to compute timestamps without calling the
+    tokenizer for every emitted token.
+
+    Tables are filled lazily: the first time a token id is seen, its text and sub-word representation are decoded
+    once and cached, so that after a few batches every lookup is a plain array gather.
+
+    Args:
+        decode_ids_to_tokens: A Callable function that accepts a list of integers and maps it to a list of sub-words.
+        decode_tokens_to_str: A Callable function that accepts a list of integers and maps it to text / str.
+        supported_punctuation: Set of punctuation marks in the vocabulary.
+        vocab_size: Optional number of token ids to decode eagerly.
+    """
+
+    def __init__(
+        self,
+        decode_ids_to_tokens: Callable[[List[int]], List[str]],
+        decode_tokens_to_str: Callable[[List[int]], str],
+        supported_punctuation: Optional[Set] = None,
+        vocab_size: int = 0,
+    ):
+        self._decode_ids_to_tokens = decode_ids_to_tokens
+        self._decode_tokens_to_str = decode_tokens_to_str
+        self.supported_punctuation = supported_punctuation
+
+        self.token_text = np.empty(0, dtype=object)
+        self.token_text_len = np.zeros(0, dtype=np.int64)
+        self.starts_word = np.zeros(0, dtype=bool)
+        self.is_punctuation = np.zeros(0, dtype=bool)
+        self._known = np.zeros(0, dtype=bool)
+        self._delimiter_masks = {}
+
+        if vocab_size > 0:
+            self.update(np.arange(vocab_size))
+
+    def _grow(self, size: int):
+        if size <= len(self._known):
+            return
+        extra = size - len(self._known)
+        self.token_text = np.concatenate([self.token_text, np.full(extra, '', dtype=object)])
+        self.token_text_len = np.concatenate([self.token_text_len, np.zeros(extra, dtype=np.int64)])
+        self.starts_word = np.concatenate([self.starts_word, np.zeros(extra, dtype=bool)])
+        self.is_punctuation = np.concatenate([self.is_punctuation, np.zeros(extra, dtype=bool)])
+        self._known = np.concatenate([self._known, np.zeros(extra, dtype=bool)])
+
+    def update(self, token_ids: np.ndarray):
+        """
+        Make sure that all the given token ids are present in the lookup tables.
+
+        Args:
+            token_ids: Integer numpy array of token ids.
+        """
+        if len(token_ids) == 0:
+            return
+        self._grow(int(token_ids.max()) + 1)
+        missing = np.unique(token_ids[~self._known[token_ids]])
+        if len(missing) == 0:
+            return
+
+        for token_id in missing.tolist():
+            text = self._decode_tokens_to_str([token_id])
+            token = self._decode_ids_to_tokens([token_id])[0]
+            self.token_text[token_id] = text
+            self.token_text_len[token_id] = len(text)
+            # A sub-word that contains an identifier such as _ or ## which is stripped by detokenization starts a word.
+            self.starts_word[token_id] = token != text
+            self.is_punctuation[token_id] = bool(
+                self.supported_punctuation and text and text[0] in self.supported_punctuation
+            )
+        self._known[missing] = True
+        self._delimiter_masks.clear()
+
+    def delimiter_mask(self, delimiter: str) -> np.ndarray:
+        """
+        Returns a boolean lookup table that is True for the token ids whose text equals `delimiter`.
+        """
+        if delimiter not in self._delimiter_masks:
+            self._delimiter_masks[delimiter] = np.asarray([text == delimiter for text in self.token_text], dtype=bool)
+        return self._delimiter_masks[delimiter]
+
+
+def lengths_to_row_splits(lengths: Iterable[int]) -> np.ndarray:
+    """
+    Converts per-hypothesis lengths to row splits, i.e. the offsets of each hypothesis in the flattened batch.
+    """
+    lengths = np.asarray(list(lengths), dtype=np.int64)
+    row_splits = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=row_splits[1:])
+    return row_splits
+
+
+def segmented_cumsum(values: np.ndarray, row_splits: np.ndarray) -> np.ndarray:
+    """
+    Inclusive cumulative sum of a flattened batch that restarts at the beginning of every hypothesis.
+    """
+    cumsum = np.cumsum(values, dtype=np.int64)
+    row_offsets = np.concatenate(([0], cumsum))[row_splits[:-1]]
+    return cumsum - np.repeat(row_offsets, np.diff(row_splits))
+
+
+def _positions_in_rows(row_splits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the row index and the position inside the row of every element of a flattened batch.
+    """
+    lengths = np.diff(row_splits)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    positions = np.arange(row_splits[-1]) - row_splits[:-1][rows]
+    return rows, positions
+
+
+def compute_batch_token_offsets(
+    token_lengths: np.ndarray, row_splits: np.ndarray, start_indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched equivalent of the `_compute_offsets` methods of the decoding classes: the end offset of every token is
+    the cumulative sum of the token lengths within its hypothesis, and its start offset is the end offset of the
+    previous token (or the start index of the hypothesis for the first token).
+
+    Args:
+        token_lengths: Flattened lengths (or repetitions) of every emitted token.
+        row_splits: Offsets of each hypothesis in the flattened batch.
+        start_indices: Start offset of the first token of every hypothesis.
+
+    Returns:
+        A tuple of flattened start and end offsets.
+    """
+    end_offsets = segmented_cumsum(token_lengths, row_splits)
+    start_offsets = np.empty_like(end_offsets)
+    if len(end_offsets) > 0:
+        start_offsets[1:] = end_offsets[:-1]
+        non_empty = np.diff(row_splits) > 0
+        start_offsets[row_splits[:-1][non_empty]] = np.asarray(start_indices, dtype=np.int64)[non_empty]
+    return start_offsets, end_offsets
+
+
+def refine_punctuation_offsets(
+    token_ids: np.ndarray, start_offsets: np.ndarray, end_offsets: np.ndarray, row_splits: np.ndarray, table
+) -> np.ndarray:
+    """
+    Refines CTC timestamps: punctuation marks that are not the first token of a hypothesis end where they start,
+    because they tend to be predicted long after the preceding token (i.e. after silence).
+
+    Returns:
+        The refined end offsets.
+    """
+    _, positions = _positions_in_rows(row_splits)
+    is_punctuation = table.is_punctuation[token_ids] & (positions > 0)
+    return np.where(is_punctuation, start_offsets, end_offsets)
+
+
+def compute_batch_subword_word_offsets(
+    token_ids: np.ndarray,
+    token_steps: np.ndarray,
+    token_row_splits: np.ndarray,
+    step_starts: np.ndarray,
+    step_ends: np.ndarray,
+    step_row_splits: np.ndarray,
+    table: TimestampTokenTable,
+) -> Dict[str, np.ndarray]:
+    """
+    Batched equivalent of `_get_word_offsets_subwords_sentencepiece` for Sentencepiece-like tokenizers.
+
+    Each token belongs to a step (a CTC token, or an RNNT time step that can hold several tokens) that carries the
+    start and end offsets. A new word begins at every token that starts a word and at the first token of every
+    hypothesis. A word starts at the start of the step of its first token and ends at the end of the step preceding
+    the step where the next word begins; the last word of a hypothesis ends at the end of its last step.
+
+    Args:
+        token_ids: Flattened token ids.
+        token_steps: Index into the flattened steps of the step that holds every token.
+        token_row_splits: Offsets of each hypothesis in the flattened tokens.
+        step_starts: Flattened start offsets of every step.
+        step_ends: Flattened end offsets of every step.
+        step_row_splits: Offsets of each hypothesis in the flattened steps.
+        table: Token lookup tables for the vocabulary.
+
+    Returns:
+        A dictionary of arrays with the index of the first (`first_token`) and last (`last_token`) token of every
+        word, the word `start_offset` and `end_offset`, and the `row_splits` of the words.
+    """
+    token_rows, token_positions = _positions_in_rows(token_row_splits)
+    word_start_mask = table.starts_word[token_ids] | (token_positions == 0)
+    first_token = np.flatnonzero(word_start_mask)
+    last_token = np.concatenate((first_token[1:] - 1, [len(token_ids) - 1]))[: len(first_token)]
+
+    word_rows = token_rows[first_token]
+    num_words = np.bincount(word_rows, minlength=len(token_row_splits) - 1)
+    word_row_splits = lengths_to_row_splits(num_words)
+
+    # The first word of a hypothesis starts at its first step, unless it is the only word and its first token
+    # explicitly starts a word, mirroring the reference implementation when leading steps hold no tokens.
+    word_start_steps = token_steps[first_token]
+    is_first_word = np.zeros(len(first_token), dtype=bool)
+    is_first_word[word_row_splits[:-1][num_words > 0]] = True
+    use_row_start = is_first_word & ((num_words[word_rows] > 1) | ~table.starts_word[token_ids[first_token]])
+    word_start_steps = np.where(use_row_start, step_row_splits[:-1][word_rows], word_start_steps)
+    start_offsets = step_starts[word_start_steps]
+
+    # By default a word ends where the step preceding the first step of the next word ends. The preceding step is
+    # taken modulo the number of steps of the hypothesis, mirroring python's negative indexing in the reference code.
+    step_base = step_row_splits[:-1][word_rows]
+    num_steps = np.diff(step_row_splits)[word_rows]
+    is_last_word = np.zeros(len(first_token), dtype=bool)
+    is_last_word[word_row_splits[1:][num_words > 0] - 1] = True
+    next_first = np.where(is_last_word, first_token, np.concatenate((first_token[1:], [0]))[: len(first_token)])
+    preceding_step = (token_steps[next_first] - step_base - 1) % np.maximum(num_steps, 1) + step_base
+    last_step = step_row_splits[1:][word_rows] - 1
+    end_offsets = step_ends[np.where(is_last_word, last_step, preceding_step)]
+
+    return {
+        'first_token': first_token,
+        'last_token': last_token,
+        'start_offset': start_offsets,
+        'end_offset': end_offsets,
+        'row_splits': word_row_splits,
+    }
+
+
+def compute_batch_char_word_offsets(
+    token_ids: np.ndarray,
+    start_offsets: np.ndarray,
+    end_offsets: np.ndarray,
+    row_splits: np.ndarray,
+    table: TimestampTokenTable,
+    word_delimiter_char: str = " ",
+) -> Dict[str, np.ndarray]:
+    """
+    Batched equivalent of `_get_word_offsets_chars` for character based models: words are the runs of tokens that
+    are not the word delimiter.
+
+    Returns:
+        A dictionary of arrays with the index of the first (`first_token`) and last (`last_token`) token of every
+        word, the word `start_offset` and `end_offset`, and the `row_splits` of the words.
+    """
+    token_rows, token_positions = _positions_in_rows(row_splits)
+    is_word = ~table.delimiter_mask(word_delimiter_char)[token_ids]
+    row_lengths = np.diff(row_splits)
+
+    prev_is_word = np.concatenate(([False], is_word[:-1])) & (token_positions > 0)
+    next_is_word = np.concatenate((is_word[1:], [False])) & (token_positions < row_lengths[token_rows] - 1)
+    first_token = np.flatnonzero(is_word & ~prev_is_word)
+    last_token = np.flatnonzero(is_word & ~next_is_word)
+
+    num_words = np.bincount(token_rows[first_token], minlength=len(row_lengths))
+    return {
+        'first_token': first_token,
+        'last_token': last_token,
+        'start_offset': start_offsets[first_token],
+        'end_offset': end_offsets[last_token],
+        'row_splits': lengths_to_row_splits(num_words),
+    }
+
+
+def get_word_offsets_from_step_offsets(
+    step_offsets: List[Dict], table: TimestampTokenTable, decode_tokens_to_str: Callable[[List[int]], str]
+) -> List[Dict]:
+    """
+    Constructs word time stamps of a single hypothesis out of step offsets whose "char" field holds the token ids
+    emitted at that step followed by a trailing blank (the encoded char offsets of RNNT / TDT decoding).
+    Equivalent to `AbstractRNNTDecoding._get_word_offsets_subwords_sentencepiece`, but word boundaries are looked
+    up in `table` instead of detokenizing every emitted token.
+
+    Args:
+        step_offsets: A list of dictionaries, each containing "char", "start_offset" and "end_offset".
+        table: Token lookup tables for the vocabulary.
+        decode_tokens_to_str: A Callable function that accepts a list of integers and maps it to text / str.
+
+    Returns:
+        A list of dictionaries containing the word offsets. Each item contains "word", "start_offset" and
+        "end_offset".
+    """
+    token_ids, token_steps = [], []
+    for step, offset in enumerate(step_offsets):
+        for char in offset['char'][:-1]:
+            token_ids.append(int(char))
+            token_steps.append(step)
+    if len(token_ids) == 0:
+        return []
+
+    token_ids = np.asarray(token_ids, dtype=np.int64)
+    table.update(token_ids)
+    words = compute_batch_subword_word_offsets(
+        token_ids,
+        np.asarray(token_steps, dtype=np.int64),
+        lengths_to_row_splits([len(token_ids)]),
+        np.asarray([offset['start_offset'] for offset in step_offsets]),
+        np.asarray([offset['end_offset'] for offset in step_offsets]),
+        lengths_to_row_splits([len(step_offsets)]),
+        table,
+    )
+    return [
+        {
+            "word": decode_tokens_to_str(token_ids[first_token : last_token + 1].tolist()),
+            "start_offset": start_offset,
+            "end_offset": end_offset,
+        }
+        for first_token, last_token, start_offset, end_offset in zip(
+            words['first_token'].tolist(),
+            words['last_token'].tolist(),
+            words['start_offset'].tolist(),
+            words['end_offset'].tolist(),
+        )
+    ]
@@ -82,6 +82,7 @@ class AggregateTokenizer(TokenizerSpec):
         # one, to convert the incoming token id -- e.g. 200 into its real id (200-127 = 73)
         # second, to compute the tokenizer id that should process that token (1)
         # third, the compute the lang id for that token ('es')
+        # the tables are numpy arrays indexed by token id, so that whole sequences are looked up at once
         offset_token_ids_by_token_id, tokenizers_by_token_id, langs_by_token_id = self._calculate_offsets()
 
         self.offset_token_ids_by_token_id = offset_token_ids_by_token_id
@@ -89,22 +90,50 @@ class AggregateTokenizer(TokenizerSpec):
         self.langs_by_token_id = langs_by_token_id
 
     def _calculate_offsets(self):
-        offsets = {}
-        tokenizers = {}
-        langs = {}
-        cur_num = 0
-        tot = len(self.tokenizers_dict)
-        for id in range(len(self.vocabulary)):
-            off_id = id - list(self.token_id_offset.values())[cur_num]
-            if cur_num + 1 < tot:
-                if id >= list(self.token_id_offset.values())[cur_num + 1]:
-                    cur_num += 1
-                    off_id = id - list(self.token_id_offset.values())[cur_num]
-            offsets[id] = off_id
-            tokenizers[id] = list(self.tokenizers_dict.values())[cur_num]
-            langs[id] = list(self.tokenizers_dict.keys())[cur_num]
-
-        return offsets, tokenizers, langs
+        tokenizers = list(self.tokenizers_dict.values())
+        langs = list(self.tokenizers_dict.keys())
+        sizes = [len(tokenizer.vocab) for tokenizer in tokenizers]
+
+        # index of the tokenizer of every token id, also the index of its language
+        self.tokenizer_nums_by_token_id = np.repeat(np.arange(len(tokenizers), dtype=np.int64), sizes)
+        self._tokenizers = np.empty(len(tokenizers), dtype=object)
+        self._tokenizers[:] = tokenizers
+        self._langs = np.empty(len(langs), dtype=object)
+        self._langs[:] = langs
+
+        offsets = np.arange(len(self.vocabulary), dtype=np.int64) - np.repeat(
+            np.array(list(self.token_id_offset.values()), dtype=np.int64), sizes
+        )
+        return (
+            offsets,
+            self._tokenizers[self.tokenizer_nums_by_token_id],
+            self._langs[self.tokenizer_nums_by_token_id],
+        )
+
+    def _lookup(self, ids):
+        """
+        Returns the tokenizer numbers and the offset ids of the token ids as numpy arrays.
+        """
+        if isinstance(ids, torch.Tensor):
+            ids = ids.cpu().numpy()
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if ids.size > 0 and (ids.min() < 0 or ids.max() >= self.vocab_size):
+            raise KeyError(f"Token ids must be in [0, {self.vocab_size}), got {ids.min()} to {ids.max()}")
+        return self.tokenizer_nums_by_token_id[ids], self.offset_token_ids_by_token_id[ids]
+
+    def _ids_to_tokens_and_nums(self, ids):
+        """
+        Returns the tokens and the tokenizer numbers of the token ids. Consecutive ids of the same tokenizer are
+        converted with a single call to that tokenizer.
+        """
+        tokenizer_nums, offset_ids = self._lookup(ids)
+        tokens = []
+        # starts of the runs of consecutive ids of the same tokenizer
+        starts = np.flatnonzero(np.diff(tokenizer_nums, prepend=-1))
+        for start, end in zip(starts.tolist(), starts[1:].tolist() + [len(offset_ids)]):
+            tokenizer = self._tokenizers[tokenizer_nums[start]]
+            tokens.extend(tokenizer.ids_to_tokens(offset_ids[start:end].tolist()))
+        return tokens, tokenizer_nums
 
     def text_to_tokens(self, text, lang_id):
         tokenizer = self.tokenizers_dict[lang_id]
@@ -125,93 +154,72 @@ class AggregateTokenizer(TokenizerSpec):
         return tokenizer.decode_pieces(tokens)
 
     def ids_to_text(self, ids):
-        if isinstance(ids, (np.ndarray, torch.Tensor)):
-            ids = ids.tolist()
-
-        tokens = []
-        for id in ids:
-            offset_id = self.offset_token_ids_by_token_id[id]
-            tokenizer = self.tokenizers_by_token_id[id]
-            tokens.extend(tokenizer.ids_to_tokens([offset_id]))
+        tokens, _ = self._ids_to_tokens_and_nums(ids)
         text = ''.join(tokens).replace('▁', ' ')
 
         return text
 
+    def ids_to_text_batch(self, ids_batch):
+        """
+        Decodes a batch of token id sequences into a list of strings, looking up the ids of the whole batch at once.
+        """
+        ids_batch = [ids.cpu().numpy() if isinstance(ids, torch.Tensor) else ids for ids in ids_batch]
+        lengths = [len(ids) for ids in ids_batch]
+        if sum(lengths) == 0:
+            return ['' for _ in ids_batch]
+        tokens, _ = self._ids_to_tokens_and_nums(
+            np.concatenate([np.asarray(ids, dtype=np.int64) for ids in ids_batch])
+        )
+        ends = np.cumsum(lengths).tolist()
+        return [''.join(tokens[end - length : end]).replace('▁', ' ') for end, length in zip(ends, lengths)]
+
     def token_to_id(self, token, lang_id):
         tokenizer = self.tokenizers_dict[lang_id]
         return tokenizer.token_to_id(token) + self.token_id_offset[lang_id]
 
     def ids_to_tokens(self, ids):
-        tokens = []
-
-        for id in ids:
-            offset_id = self.offset_token_ids_by_token_id[id]
-            tokenizer = self.tokenizers_by_token_id[id]
-            token = tokenizer.ids_to_tokens([offset_id])[0]
-            tokens.append(token)
+        tokens, _ = self._ids_to_tokens_and_nums(ids)
 
         return tokens
 
     def ids_to_text_and_langs(self, ids):
-        text_and_langs = []
+        tokens, tokenizer_nums = self._ids_to_tokens_and_nums(ids)
+        langs = self._langs[tokenizer_nums]
 
-        for id in ids:
-            offset_id = self.offset_token_ids_by_token_id[id]
-            tokenizer = self.tokenizers_by_token_id[id]
-            token = tokenizer.ids_to_tokens([offset_id])[0]
-            text = token.replace('▁', ' ')
-            text = text.strip()  # strip for display purposes
-            lang = self.langs_by_token_id[id]
-            text_and_langs.append({'char': text, 'lang': lang})
-
-        return text_and_langs
+        # strip for display purposes
+        return [{'char': token.replace('▁', ' ').strip(), 'lang': lang} for token, lang in zip(tokens, langs)]
 
     def ids_to_words_and_langs(self, ids):
-        words_and_langs = []
+        tokens, tokenizer_nums = self._ids_to_tokens_and_nums(ids)
+        if len(tokens) == 0:
+            return []
 
-        word_ids = []  # tokens belonging to the current word
-        for id in ids:
-            offset_id = self.offset_token_ids_by_token_id[id]
-            tokenizer = self.tokenizers_by_token_id[id]
-            token = tokenizer.ids_to_tokens([offset_id])[0]
-            if token.startswith('▁'):
-                if len(word_ids) > 0:  # if this isn't the first word
-                    word = self.ids_to_text(word_ids)
-                    word = word.strip()  # strip for display purposes
-                    lang = self.ids_to_lang(word_ids)
-                    wl = {'word': word, 'lang': lang}
-                    words_and_langs.append(wl)
-                word_ids = []
-            word_ids.append(id)
-
-        if len(word_ids) > 0:  # the last tokens
-            word = self.ids_to_text(word_ids)
+        # every word starts at a token starting with '▁', except the first one which starts at the first token
+        starts = [idx for idx, token in enumerate(tokens) if idx == 0 or token.startswith('▁')]
+        words_and_langs = []
+        for start, end in zip(starts, starts[1:] + [len(tokens)]):
+            word = ''.join(tokens[start:end]).replace('▁', ' ')
             word = word.strip()  # strip for display purposes
-            lang = self.ids_to_lang(word_ids)
-            wl = {'word': word, 'lang': lang}
-            words_and_langs.append(wl)
+            lang = self._majority_lang(tokenizer_nums[start:end])
+            words_and_langs.append({'word': word, 'lang': lang})
 
         return words_and_langs
 
     def ids_to_lang(self, ids):
-        lang_cnts = {}
-
-        for id in ids:
-            lang = self.langs_by_token_id[id]
-            lang_cnt = lang_cnts.get(lang)
-            if lang_cnt is not None:
-                lang_cnts[lang] = lang_cnt + 1
-            else:
-                lang_cnts[lang] = 1
-
-        max_lang = ''
-        max_lang_cnt = -1
-        for lang, lang_cnt in lang_cnts.items():
-            if lang_cnt > max_lang_cnt:
-                max_lang = lang
-                max_lang_cnt = lang_cnt
-
-        return max_lang
+        tokenizer_nums, _ = self._lookup(ids)
+
+        return self._majority_lang(tokenizer_nums)
+
+    def _majority_lang(self, tokenizer_nums):
+        """
+        Returns the most frequent language of the tokens, ties going to the language seen first.
+        """
+        if len(tokenizer_nums) == 0:
+            return ''
+        counts = np.bincount(tokenizer_nums, minlength=len(self._langs))
+        is_max = counts[tokenizer_nums] == counts.max()
+
+        return self._langs[tokenizer_nums[np.argmax(is_max)]]
 
     def tokens_to_ids(self, tokens: Union[str, List[str]], langs: Union[str, List[str]]) -> Union[int, List[int]]:
         if isinstance(tokens, str):
@@ -230,6 +230,14 @@ class SentencePieceTokenizer(TokenizerSpec, ChatTemplateMixin):
 
         return self.tokenizer.decode_ids(ids)
 
+    def ids_to_text_batch(self, ids_batch):
+        if self.legacy or len(ids_batch) == 0:
+            return [self.ids_to_text(ids) for ids in ids_batch]
+
+        ids_batch = [ids.tolist() if isinstance(ids, (np.ndarray, torch.Tensor)) else ids for ids in ids_batch]
+        # sentencepiece decodes a list of sequences in a single native call
+        return self.tokenizer.decode(ids_batch)
+
     def token_to_id(self, token):
         if self.legacy and token in self.special_token_to_id:
             return self.special_token_to_id[token]
@@ -17,7 +17,10 @@ import itertools
 import string
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
 
 from nemo.collections.common.tokenizers.text_to_speech.ipa_lexicon import (
     get_grapheme_character_set,
@@ -38,6 +41,13 @@ from nemo.utils import logging
 from nemo.utils.decorators import experimental
 
 
+class _DeletingTable(dict):
+    """Translation table for `str.translate`, which deletes the chars that are not in the table."""
+
+    def __missing__(self, key):
+        return None
+
+
 class BaseTokenizer(ABC):
     PAD, BLANK, OOV = '<pad>', '<blank>', '<oov>'
 
@@ -91,6 +101,32 @@ class BaseTokenizer(ABC):
         """Turns ints tokens into str text."""
         return self.sep.join(self._id2token[t] for t in tokens if t not in self._util_ids)
 
+    def encode_batch(self, texts: List[str]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Turns a batch of str texts into int tokens padded with `self.pad`, of shape [B, T], and their lengths [B]."""
+        token_ids = [self.encode(text) for text in texts]
+        lengths = np.array([len(ids) for ids in token_ids], dtype=np.int64)
+        tokens = np.full((len(texts), lengths.max(initial=0)), self.pad, dtype=np.int64)
+        for idx, ids in enumerate(token_ids):
+            tokens[idx, : len(ids)] = ids
+        return torch.from_numpy(tokens), torch.from_numpy(lengths)
+
+    @staticmethod
+    def _token_chars_to_ids(
+        token_chars: str, space_id: int, pad_with_space: bool, collapse_spaces: bool = True
+    ) -> List[int]:
+        """
+        Turns a str with one char `chr(token_id)` per token into int tokens, removing trailing spaces.
+        If `collapse_spaces`, also removes leading spaces and spaces following a space.
+        """
+        space = chr(space_id)
+        if collapse_spaces:
+            token_chars = space.join(filter(None, token_chars.split(space)))
+        else:
+            token_chars = token_chars.rstrip(space)
+        if pad_with_space:
+            token_chars = f'{space}{token_chars}{space}'
+        return list(map(ord, token_chars))
+
 
 class BaseCharsTokenizer(BaseTokenizer):
     # fmt: off
@@ -142,34 +178,36 @@ class BaseCharsTokenizer(BaseTokenizer):
 
         self.text_preprocessing_func = text_preprocessing_func
 
+    def _get_char_table(self) -> Dict[int, str]:
+        """
+        Returns the translation table of every char to its token id as a char `chr(token_id)`, built on first use.
+        Chars which are not tokens are deleted by the table.
+        """
+        if getattr(self, '_char_table', None) is None:
+            # Whitespaces, alphanumerics and apostrophes which are tokens, and punctuations that have a single char.
+            chars = [self.tokens[self.space]]
+            chars.extend(c for c in self.tokens if len(c) == 1 and (c.isalnum() or c == "'"))
+            if self.punct:
+                chars.extend(c for c in self.PUNCT_LIST if len(c) == 1)
+            self._char_table = _DeletingTable({ord(c): chr(self._token2id[c]) for c in chars})
+        return self._char_table
+
     def encode(self, text):
         """See base class."""
-        cs, space, tokens = [], self.tokens[self.space], set(self.tokens)
+        char_table = self._get_char_table()
 
         text = self.text_preprocessing_func(text)
-        for c in text:
-            # Add a whitespace if the current char is a whitespace while the previous char is not a whitespace.
-            if c == space and len(cs) > 0 and cs[-1] != space:
-                cs.append(c)
-            # Add the current char that is an alphanumeric or an apostrophe.
-            elif (c.isalnum() or c == "'") and c in tokens:
-                cs.append(c)
-            # Add a punctuation that has a single char.
-            elif (c in self.PUNCT_LIST) and self.punct:
-                cs.append(c)
-            # Warn about unknown char
-            elif c != space:
-                logging.warning(f"Text: [{text}] contains unknown char: [{c}]. Symbol will be skipped.")
+        token_chars = text.translate(char_table)
 
-        # Remove trailing spaces
-        if cs:
-            while cs[-1] == space:
-                cs.pop()
+        # Warn about unknown chars, which were deleted
+        if len(token_chars) < len(text):
+            for c in text:
+                if ord(c) not in char_table:
+                    logging.warning(f"Text: [{text}] contains unknown char: [{c}]. Symbol will be skipped.")
 
-        if self.pad_with_space:
-            cs = [space] + cs + [space]
-
-        return [self._token2id[p] for p in cs]
+        # Keep a whitespace only if the previous char is not a whitespace, and remove trailing spaces.
+        space_id = self._token2id[self.tokens[self.space]]
+        return self._token_chars_to_ids(token_chars, space_id, self.pad_with_space)
 
 
 class EnglishCharsTokenizer(BaseCharsTokenizer):
@@ -633,37 +671,48 @@ class EnglishPhonemesTokenizer(BaseTokenizer):
                 e.g. "see OOV" -> ['S', 'IY1', ' ', 'O', 'O', 'V']
             raw_text: original raw input
         """
-        ps, space, tokens = [], self.tokens[self.space], set(self.tokens)
-        for p in g2p_text:  # noqa
-            # Remove stress
-            if p.isalnum() and len(p) == 3 and not self.stresses:
-                p = p[:2]
-
-            # Add space if last one isn't one
-            if p == space and len(ps) > 0 and ps[-1] != space:
-                ps.append(p)
-            # Add next phoneme or char (if chars=True)
-            elif (p.isalnum() or p == "'") and p in tokens:
-                ps.append(p)
-            # Add punct
-            elif (p in self.PUNCT_LIST) and self.punct:
-                ps.append(p)
-            # Warn about unknown char/phoneme
-            elif p != space:
-                message = f"Text: [{''.join(g2p_text)}] contains unknown char/phoneme: [{p}]."
-                if raw_text is not None:
-                    message += f"Original text: [{raw_text}]. Symbol will be skipped."
-                logging.warning(message)
-
-        # Remove trailing spaces
-        if ps:
-            while ps[-1] == space:
-                ps.pop()
-
-        if self.pad_with_space:
-            ps = [space] + ps + [space]
-
-        return [self._token2id[p] for p in ps]
+        g2p_table = self._get_g2p_table()
+        try:
+            token_chars = ''.join([g2p_table[p] for p in g2p_text])
+        except KeyError:
+            for p in g2p_text:
+                if p not in g2p_table:
+                    g2p_table[p] = self._g2p_token_char(p)
+            token_chars = ''.join([g2p_table[p] for p in g2p_text])
+
+        # Warn about unknown chars/phonemes, which are skipped
+        if len(token_chars) < len(g2p_text):
+            for p in g2p_text:
+                if not g2p_table[p]:
+                    message = f"Text: [{''.join(g2p_text)}] contains unknown char/phoneme: [{p}]."
+                    if raw_text is not None:
+                        message += f"Original text: [{raw_text}]. Symbol will be skipped."
+                    logging.warning(message)
+
+        # Keep a space only if the previous token is not a space, and remove trailing spaces.
+        space_id = self._token2id[self.tokens[self.space]]
+        return self._token_chars_to_ids(token_chars, space_id, self.pad_with_space)
+
+    def _get_g2p_table(self) -> Dict[str, str]:
+        """Returns the cache of the token ids as chars of G2P outputs, filled by `_g2p_token_char`."""
+        if getattr(self, '_g2p_table', None) is None:
+            self._g2p_table = {}
+        return self._g2p_table
+
+    def _g2p_token_char(self, p: str) -> str:
+        """Returns the token id of a G2P output as a char `chr(token_id)`, or '' if it is skipped."""
+        # Remove stress
+        if p.isalnum() and len(p) == 3 and not self.stresses:
+            p = p[:2]
+
+        # Space, next phoneme or char (if chars=True), or punct
+        if (
+            p == self.tokens[self.space]
+            or ((p.isalnum() or p == "'") and p in self._token2id)
+            or ((p in self.PUNCT_LIST) and self.punct)
+        ):
+            return chr(self._token2id[p])
+        return ''
 
     @contextmanager
     def set_phone_prob(self, prob):
@@ -811,33 +860,22 @@ class IPATokenizer(BaseTokenizer):
 
         Returns: a list of integer IDs that tokenize the `g2p_text`.
         """
-        ps, space, tokens = [], self.tokens[self.space], set(self.tokens)
-        for p in g2p_text:
-            if p == space and len(ps) > 0 and ps[-1] != space:
-                # Add space if last token isn't one
-                ps.append(p)
-            elif p in tokens:
-                # Add next phoneme or char (if chars=True)
-                ps.append(p)
-            elif (p in self.punct_list) and self.punct:
-                # Add punct
-                ps.append(p)
-            elif p != space:
-                message = f"Text: [{''.join(g2p_text)}] contains unknown char/phoneme: [{p}]."
-                if raw_text is not None:
-                    message += f"Original text: [{raw_text}]. Symbol will be skipped."
-                logging.warning(message)
+        # Token index lookups, of phonemes, chars, punct and spaces, which are all tokens
+        if getattr(self, '_g2p_table', None) is None:
+            self._g2p_table = {p: chr(token_id) for p, token_id in self._token2id.items()}
+        token_chars = ''.join([self._g2p_table.get(p, '') for p in g2p_text])
+
+        if len(token_chars) < len(g2p_text):
+            for p in g2p_text:
+                if p not in self._g2p_table:
+                    message = f"Text: [{''.join(g2p_text)}] contains unknown char/phoneme: [{p}]."
+                    if raw_text is not None:
+                        message += f"Original text: [{raw_text}]. Symbol will be skipped."
+                    logging.warning(message)
 
         # Remove trailing spaces
-        if ps:
-            while ps[-1] == space:
-                ps.pop()
-
-        if self.pad_with_space:
-            ps = [space] + ps + [space]
-
-        # Token index lookups
-        return [self._token2id[p] for p in ps]
+        space_id = self._token2id[self.tokens[self.space]]
+        return self._token_chars_to_ids(token_chars, space_id, self.pad_with_space, collapse_spaces=False)
 
     @contextmanager
     def set_phone_prob(self, prob):
@@ -48,6 +48,15 @@ class TokenizerSpec(ABC):
     def ids_to_text(self, ids):
         pass
 
+    def ids_to_text_batch(self, ids_batch):
+        """
+        Decodes a batch of token id sequences into a list of strings.
+
+        The default implementation calls `ids_to_text` for every sequence; tokenizers backed by a library
+        with a native batched decoder should override this method.
+        """
+        return [self.ids_to_text(ids) for ids in ids_batch]
+
     def add_special_tokens(self, special_tokens: List[str]):
         raise NotImplementedError("To be implemented")
 
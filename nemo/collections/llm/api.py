@@ -558,16 +558,21 @@ def evaluate(
         top_p=params.top_p,
         top_k=params.top_k,
         add_bos=params.add_bos,
+        max_concurrent_requests=params.max_concurrent_requests,
+        loglikelihood_cache_path=params.loglikelihood_cache_path,
     )
 
     eval_task = eval_cfg.type
-    results = evaluator.simple_evaluate(
-        model=model,
-        tasks=eval_task,
-        limit=params.limit_samples,
-        num_fewshot=params.num_fewshot,
-        bootstrap_iters=params.bootstrap_iters,
-    )
+    try:
+        results = evaluator.simple_evaluate(
+            model=model,
+            tasks=eval_task,
+            limit=params.limit_samples,
+            num_fewshot=params.num_fewshot,
+            bootstrap_iters=params.bootstrap_iters,
+        )
+    finally:
+        model.close()
 
     print("score", results["results"][eval_task])
 
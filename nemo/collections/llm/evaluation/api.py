@@ -75,6 +75,14 @@ class ConfigParams(BaseModel):
         description="Number of iterations for bootstrap statistics",
         default=100000,
     )
+    max_concurrent_requests: int = Field(
+        description="Max number of batches of loglikelihood requests sent concurrently to the server",
+        default=4,
+    )
+    loglikelihood_cache_path: Optional[str] = Field(
+        description="JSON lines file caching loglikelihood results across runs. Default: no cache on disk.",
+        default=None,
+    )
 
 
 class EvaluationConfig(BaseModel):
@@ -12,9 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
+import hashlib
+import json
+import os
 import re
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from lm_eval.api.instance import Instance
@@ -35,7 +42,18 @@ class NeMoFWLMEval(LM):
     """
 
     def __init__(
-        self, model_name, api_url, tokenizer, batch_size, max_tokens_to_generate, temperature, top_p, top_k, add_bos
+        self,
+        model_name,
+        api_url,
+        tokenizer,
+        batch_size,
+        max_tokens_to_generate,
+        temperature,
+        top_p,
+        top_k,
+        add_bos,
+        max_concurrent_requests: int = 4,
+        loglikelihood_cache_path: Optional[str] = None,
     ):
         self.model_name = model_name
         self.api_url = api_url
@@ -46,14 +64,34 @@ class NeMoFWLMEval(LM):
         self.top_p = top_p
         self.top_k = top_k
         self.add_bos = add_bos
+        self.max_concurrent_requests = max_concurrent_requests
+        self.loglikelihood_cache_path = loglikelihood_cache_path
+        self._loglikelihood_cache = self._load_loglikelihood_cache()
+        self._server_side_scoring = None
+        # connections are kept open across requests, one per thread of the executor which is reused across calls
+        self._nq = NemoQueryLLM(url=self.api_url, model_name=self.model_name)
+        self._executor = None
         super().__init__()
 
+    def close(self):
+        """
+        Stops the threads sending loglikelihood requests and closes the connections to the server.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._nq.close()
+
     def _generate_tokens_logits(self, payload, single_prediction_token: bool = False, return_logits: bool = False):
         """
         A private method that sends post request to the model on PyTriton server and returns either generated text or
         logits.
         """
-        nq = NemoQueryLLM(url=self.api_url, model_name=payload['model'])
+        if payload['model'] == self.model_name:
+            nq_context = contextlib.nullcontext(self._nq)
+        else:
+            # closed after the query, since other models are rarely queried
+            nq_context = NemoQueryLLM(self.api_url, payload['model'])
 
         output_context_logits = False
         output_generation_logits = False
@@ -64,16 +102,17 @@ class NeMoFWLMEval(LM):
             else:
                 # In case of multiple token prediction return the full context logits
                 output_context_logits = True
-        response = nq.query_llm(
-            prompts=payload['prompt'] if isinstance(payload['prompt'], list) else [payload['prompt']],
-            max_output_len=payload['max_tokens'],
-            top_k=payload['top_k'],
-            top_p=payload['top_p'],
-            temperature=payload['temperature'],
-            output_context_logits=output_context_logits,
-            output_generation_logits=output_generation_logits,
-            openai_format_response=True,
-        )
+        with nq_context as nq:
+            response = nq.query_llm(
+                prompts=payload['prompt'] if isinstance(payload['prompt'], list) else [payload['prompt']],
+                max_output_len=payload['max_tokens'],
+                top_k=payload['top_k'],
+                top_p=payload['top_p'],
+                temperature=payload['temperature'],
+                output_context_logits=output_context_logits,
+                output_generation_logits=output_generation_logits,
+                openai_format_response=True,
+            )
 
         if return_logits:  # loglikelihood type tasks, return just logits and not text
             if output_context_logits:
@@ -97,18 +136,136 @@ class NeMoFWLMEval(LM):
                 "how to handle special tokens for this tokenizer"
             )
 
+    def _load_loglikelihood_cache(self) -> dict:
+        """
+        Loads the results of previous runs from `loglikelihood_cache_path`, a JSON lines file of
+        {"hash": ..., "logprob": ..., "is_greedy": ...} entries.
+        """
+        cache = {}
+        if self.loglikelihood_cache_path is not None and os.path.exists(self.loglikelihood_cache_path):
+            with open(self.loglikelihood_cache_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # last line of an interrupted run
+                        continue
+                    cache[entry["hash"]] = (entry["logprob"], entry["is_greedy"])
+            logging.info(f"Loaded {len(cache)} loglikelihood results from {self.loglikelihood_cache_path}")
+        return cache
+
+    def _request_hash(
+        self, context: str, continuation: str, server_side_scoring: bool, single_prediction_token: bool
+    ) -> str:
+        """
+        Returns the key of a loglikelihood request in the cache of results, which depends on how it is scored.
+        """
+        description = json.dumps(
+            [self.model_name, self.add_bos, server_side_scoring, single_prediction_token, context, continuation]
+        )
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    def _encode(self, text: str, special_tokens_kwargs: dict, is_continuation: bool = False) -> List[int]:
+        """
+        Encodes the context or the continuation of a loglikelihood request.
+        """
+        tokens = self.tokenizer.tokenizer.encode(text, **special_tokens_kwargs)
+        # for SentencePeice consider the encoded tokens of the continuation from the 2nd token since first encoded
+        # token is space. The context is sent to the server as token ids, so it keeps all its tokens.
+        if is_continuation and self.tokenizer_type(self.tokenizer) == "SentencePieceTokenizer":
+            tokens = tokens[1:]
+        return tokens
+
+    def _score_batch_on_server(self, batch: List[dict]) -> List[Tuple[float, bool]]:
+        """
+        Scores a batch of requests on the server, which only returns the sum of log-probabilities of the
+        continuation tokens and whether they are the greedy continuation.
+        """
+        logprobs, is_greedy = self._nq.query_loglikelihood(
+            # contexts must not be empty, since the first continuation token is predicted from the last context token
+            context_token_ids=[item["context_enc"] or [self.tokenizer.eos_id] for item in batch],
+            continuation_token_ids=[item["continuation_enc"] for item in batch],
+            max_batch_size=self.batch_size,
+        )
+        return [(float(logprob), bool(greedy)) for logprob, greedy in zip(logprobs, is_greedy)]
+
+    def _score_batch_from_logits(self, batch: List[dict], single_prediction_token: bool) -> List[Tuple[float, bool]]:
+        """
+        Scores a batch of requests from the logits returned by the server, for deployments without server side
+        scoring.
+        """
+        prompts = []
+        for item in batch:
+            # Delete the last token from continuation before passing it to the ip prompt by replacing with empty
+            # string
+            continuation = item["continuation"].replace(
+                self.tokenizer.tokenizer.decode(item["continuation_enc"][-1]), ""
+            )
+            prompts.append(item["context"] + continuation)
+
+        # Create a single payload for the entire batch
+        payload = {
+            "model": self.model_name,
+            "prompt": prompts,
+            "max_tokens": self.max_tokens_to_generate,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+        }
+
+        # Query the model deployed on PyTriton server with the batched payload to get the logits
+        logits_batch = self._generate_tokens_logits(payload, single_prediction_token, return_logits=True)
+
+        # Process each result in the batch
+        results = []
+        for item, logits in zip(batch, logits_batch):
+            continuation_enc = item["continuation_enc"]
+            num_cont_tokens = len(continuation_enc)
+
+            # In case of multiple token prediction where full context logits are returned (tasks other than mmlu),
+            # get only logits corresponding to the continuation tokens from context logits tensor. context_logits
+            # contains logits for all tokens in the ip prompt along with the logit for the next token prediction
+            # after the final token in the prompt. Shape of context_logits: [1, #tokens_in_prompt+1, vocab_size].
+            if not single_prediction_token:
+                # Discard zero padding if any
+                logits = logits[:, np.any(logits != 0, axis=(0, 2)), :]
+                # Get only logits corresponding to cont tokens
+                logits = logits[:, -num_cont_tokens:, :]
+            # Convert logits to torch tensor to easily get logprobs wo manual implementation of log_softmax
+            logProbs = F.log_softmax(torch.tensor(logits), dim=-1)
+            # Convert encoded continuation tokens to torch tensor
+            cont_toks = torch.tensor(continuation_enc, dtype=torch.long).unsqueeze(0)
+            # Get the greedy token from the logits (i.e token with the highest prob)
+            greedy_tokens = logProbs.argmax(dim=-1)
+            # Check if all greedy_tokens match the the actual continuation tokens
+            is_greedy = (greedy_tokens == cont_toks).all()
+            # Get the logits corresponding to the actual continuation tokens
+            logProbs_actual = torch.gather(logProbs, 2, cont_toks.unsqueeze(-1)).squeeze(-1)
+            # result is tuple of logProb of generating the continuation token and is_greedy
+            results.append((float(logProbs_actual.sum()), bool(is_greedy)))
+        return results
+
     def loglikelihood(self, requests: list[Instance]):
         """
         Defines the loglikelihood request. Takes input requests of type list[Instance] where Instance is a dataclass
         defined in lm_eval.api.instance. Each Instance conists of the input prompt, output prompt, request type(here
         loglikelihood) and other relevant args like few shot samples.
+
+        Requests are scored on the server when the deployed model supports it (see
+        `MegatronLLMDeployableNemo2.score`), otherwise from the logits returned by the server. Requests are sorted
+        by length and sent in up to `max_concurrent_requests` concurrent batches, and results are cached by
+        request, in memory and in `loglikelihood_cache_path` if provided.
         """
         special_tokens_kwargs = {}
+        continuation_special_tokens_kwargs = special_tokens_kwargs
         tokenizer_type = self.tokenizer_type(self.tokenizer)
         if tokenizer_type == "SentencePieceTokenizer":
+            # the first token of the continuation, BOS or a space, is dropped by `_encode`, not that of the context
             special_tokens_kwargs['add_bos'] = self.add_bos
         elif tokenizer_type == "AutoTokenizer":
             special_tokens_kwargs['add_special_tokens'] = self.add_bos
+            # the continuation is scored right after the context, so it must not get BOS or other special tokens
+            continuation_special_tokens_kwargs = {'add_special_tokens': False}
 
         single_prediction_token = False
         # Assuming evaluating on only one benchmark/task at a time, hence all instances in requests are of the same
@@ -121,83 +278,57 @@ class NeMoFWLMEval(LM):
         # Hard code max_tokens_to_generate to 1 to always generate just 1 token in case of loglikelihood type tasks
         self.max_tokens_to_generate = 1
 
-        results = []
-        for i in tqdm(range(0, len(requests), self.batch_size)):
-            # Group requests into batches
-            batch = requests[i : i + self.batch_size]
-            prompts = []
-            continuations = []
-            continuation_encs = []
-            num_ctx_tokens_list = []
-            num_cont_tokens_list = []
-            # Prepare inputs for the batch
-            for request in batch:
-                # get the input prompt from the request
-                context = request.arguments[0]
-                # get the output prompt from the request
-                continuation = request.arguments[1]
-                # get encoded tokens of context
-                context_enc = self.tokenizer.tokenizer.encode(context, **special_tokens_kwargs)
-                # get encoded tokens of continuation
-                continuation_enc = self.tokenizer.tokenizer.encode(continuation, **special_tokens_kwargs)
-                # for SentencePeice consider the encoded tokens from the 2nd token since first encoded token is space.
-                if self.tokenizer_type(self.tokenizer) == "SentencePieceTokenizer":
-                    context_enc = context_enc[1:]
-                    continuation_enc = continuation_enc[1:]
-                num_ctx_tokens = len(context_enc)
-                num_cont_tokens = len(continuation_enc)
-                # Delete the last token from continuation before passing it to the ip prompt by replacing with empty
-                # string
-                prompt = context + continuation.replace(self.tokenizer.tokenizer.decode(continuation_enc[-1]), "")
-
-                prompts.append(prompt)
-                continuations.append(continuation)
-                continuation_encs.append(continuation_enc)
-                num_ctx_tokens_list.append(num_ctx_tokens)
-                num_cont_tokens_list.append(num_cont_tokens)
-
-            # Create a single payload for the entire batch
-            payload = {
-                "model": self.model_name,
-                "prompt": prompts,
-                "max_tokens": self.max_tokens_to_generate,
-                "temperature": self.temperature,
-                "top_p": self.top_p,
-                "top_k": self.top_k,
-            }
+        if self._server_side_scoring is None:
+            self._server_side_scoring = self._nq.supports_loglikelihood()
+
+        results = [None] * len(requests)
+        # requests to score, grouped by hash since the same request may appear several times
+        pending = {}
+        for idx, request in enumerate(requests):
+            # get the input prompt and the output prompt from the request
+            context, continuation = request.arguments[0], request.arguments[1]
+            key = self._request_hash(context, continuation, self._server_side_scoring, single_prediction_token)
+            if key in self._loglikelihood_cache:
+                results[idx] = self._loglikelihood_cache[key]
+            elif key in pending:
+                pending[key]["indices"].append(idx)
+            else:
+                pending[key] = {
+                    "hash": key,
+                    "indices": [idx],
+                    "context": context,
+                    "continuation": continuation,
+                    "context_enc": self._encode(context, special_tokens_kwargs),
+                    "continuation_enc": self._encode(
+                        continuation, continuation_special_tokens_kwargs, is_continuation=True
+                    ),
+                }
+        if not pending:
+            return results
+
+        if self._server_side_scoring:
+            score_batch = self._score_batch_on_server
+        else:
+            score_batch = partial(self._score_batch_from_logits, single_prediction_token=single_prediction_token)
 
-            # Query the model deployed on PyTriton server with the batched payload to get the logits
-            logits_batch = self._generate_tokens_logits(payload, single_prediction_token, return_logits=True)
-
-            # Process each result in the batch
-            for j, logits in enumerate(logits_batch):
-                continuation_enc = continuation_encs[j]
-                num_ctx_tokens = num_ctx_tokens_list[j]
-                num_cont_tokens = num_cont_tokens_list[j]
-
-                # In case of multiple token prediction where full context logits are returned (tasks other than mmlu),
-                # get only logits corresponding to the continuation tokens from context logits tensor. context_logits
-                # contains logits for all tokens in the ip prompt along with the logit for the next token prediction
-                # after the final token in the prompt. Shape of context_logits: [1, #tokens_in_prompt+1, vocab_size].
-                if not single_prediction_token:
-                    # Discard zero padding if any
-                    logits = logits[:, np.any(logits != 0, axis=(0, 2)), :]
-                    # Get only logits corresponding to cont tokens
-                    logits = logits[:, -num_cont_tokens:, :]
-                # Convert logits to torch tensor to easily get logprobs wo manual implementation of log_softmax
-                logProbs = F.log_softmax(torch.tensor(logits), dim=-1)
-                # Convert encoded continuation tokens to torch tensor
-                cont_toks = torch.tensor(continuation_enc, dtype=torch.long).unsqueeze(0)
-                # Get the greedy token from the logits (i.e token with the highest prob)
-                greedy_tokens = logProbs.argmax(dim=-1)
-                # Check if all greedy_tokens match the the actual continuation tokens
-                is_greedy = (greedy_tokens == cont_toks).all()
-                # Get the logits corresponding to the actual continuation tokens
-                logProbs_actual = torch.gather(logProbs, 2, cont_toks.unsqueeze(-1)).squeeze(-1)
-                # result is tuple of logProb of generating the continuation token and is_greedy
-                result = (float(logProbs_actual.sum()), bool(is_greedy))
-                # Append the result of this input in the batch to results list
-                results.append(result)
+        # longest requests first, so that batches hold requests of similar lengths and the slowest ones start first
+        items = sorted(
+            pending.values(), key=lambda item: len(item["context_enc"]) + len(item["continuation_enc"]), reverse=True
+        )
+        batches = [items[i : i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        # the threads are kept across calls, so that their connections are reused instead of opened for every task
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests)
+        for batch, scores in tqdm(zip(batches, self._executor.map(score_batch, batches)), total=len(batches)):
+            for item, score in zip(batch, scores):
+                self._loglikelihood_cache[item["hash"]] = score
+                for idx in item["indices"]:
+                    results[idx] = score
+            if self.loglikelihood_cache_path is not None:
+                with open(self.loglikelihood_cache_path, "a") as f:
+                    for item, (logprob, is_greedy) in zip(batch, scores):
+                        f.write(json.dumps({"hash": item["hash"], "logprob": logprob, "is_greedy": is_greedy}))
+                        f.write("\n")
 
         return results
 
@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json
 import math
+import os
 import re
 from pathlib import Path
 from typing import List, Mapping, Optional
@@ -26,13 +28,17 @@ from datasets import load_dataset
 from nemo.collections.common.tokenizers import TokenizerSpec
 from nemo.collections.llm.gpt.data.utils import (
     _get_samples_mapping,
+    _index_fn,
     _JSONLMemMapDataset,
     _OnlineSampleMapping,
     _preprocess,
+    _TokenizationCache,
+    lightning_prepare_data,
 )
 from nemo.core.classes import Dataset
 from nemo.lightning.base import NEMO_DATASETS_CACHE
-from nemo.utils import logging
+from nemo.utils import AppState, logging
+from nemo.utils.sequence_packing_utils import load_packed_sequences
 
 # hack to avoid the "not enough disk space" error in some slurm cluster
 datasets.builder.has_sufficient_disk_space = lambda needed_bytes, directory='.': True
@@ -53,6 +59,17 @@ def get_dataset_root(name: str) -> Path:
     return output
 
 
+def _tokenizer_fingerprint(tokenizer: "TokenizerSpec") -> list:
+    """Describes a tokenizer by its type, vocabulary size and the tokenization of a probe text."""
+    probe = "Hello, world! 0123456789\n\t  <extra_id_0> Überprüfung 你好"
+    return [
+        f"{type(tokenizer).__module__}.{type(tokenizer).__qualname__}",
+        getattr(tokenizer, 'vocab_size', None),
+        str(getattr(getattr(tokenizer, 'tokenizer', None), 'name_or_path', '')),
+        [int(token) for token in tokenizer.text_to_ids(probe)],
+    ]
+
+
 def create_sft_dataset(
     path: Path,
     tokenizer: "TokenizerSpec",
@@ -153,6 +170,7 @@ class GPTSFTDataset(Dataset):
         ceil_to_power_2: bool = False,
         get_attention_mask_from_fusion: bool = False,
         sanity_check_dist_workers: bool = True,
+        tokenization_cache: bool = False,
     ):
         """
         file_path: Path to a JSONL GPT supervised fine-tuning dataset.
@@ -200,6 +218,9 @@ class GPTSFTDataset(Dataset):
         is_test: Whether this dataset is the test split.
         output_original_text (bool): if true, will keep the original text in the output alongside the tokenized ids.
         sanity_check_dist_workers (bool): if true, will run sanity check across workers when making mapping.
+        tokenization_cache (bool): if true, all the examples are tokenized once, using `memmap_workers` processes,
+            into memory-mapped arrays next to the index files, keyed on the tokenizer and the prompt template,
+            so that examples are not tokenized again at every epoch and on every rank.
         """
         self.tokenizer = tokenizer
         self.file_path = file_path
@@ -229,6 +250,7 @@ class GPTSFTDataset(Dataset):
         self.ceil_to_power_2 = ceil_to_power_2
         self.get_attention_mask_from_fusion = get_attention_mask_from_fusion
         self.sanity_check_dist_workers = sanity_check_dist_workers
+        self.tokenization_cache = tokenization_cache
 
         if special_tokens is None:
             self.special_tokens = {
@@ -249,6 +271,8 @@ class GPTSFTDataset(Dataset):
         # Will be None after this call if `max_num_samples` is None
         self._build_samples_mapping()
 
+        self._maybe_build_tokenization_cache()
+
     def _load_dataset(self):
         if self.hf_dataset:
             self.indexed_dataset = load_dataset(
@@ -315,6 +339,76 @@ class GPTSFTDataset(Dataset):
         else:
             self.samples_mapping = None
 
+    def _tokenization_config(self) -> dict:
+        """Returns the settings of the dataset which change the result of `_tokenize_example`."""
+        return {
+            'prompt_template': self.prompt_template,
+            'label_key': self.label_key,
+            'is_test': self.is_test,
+            'space_sensitive': getattr(self.tokenizer, 'space_sensitive', False),
+        }
+
+    def _tokenization_cache_root(self) -> str:
+        """Returns the base name of the tokenization cache files, keyed on the data file, tokenizer and template."""
+        stat = os.stat(self.file_path)
+        config = {
+            'file': [stat.st_size, stat.st_mtime_ns],
+            'tokenizer': _tokenizer_fingerprint(self.tokenizer),
+            'tokenization': self._tokenization_config(),
+        }
+        key = hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return f"{_index_fn(self.file_path, self.index_mapping_dir)}.tok-{key}"
+
+    def _maybe_build_tokenization_cache(self):
+        self._tokenization_cache = None
+        if not self.tokenization_cache:
+            return
+
+        def tokenize_fn(idx):
+            return self._tokenize_example(self.indexed_dataset[idx])
+
+        root = self._tokenization_cache_root()
+        is_distributed = torch.distributed.is_available() and torch.distributed.is_initialized()
+        # built on global rank 0, then on the local rank 0 of every node if the file system is not shared,
+        # like the index files of the dataset
+        if not is_distributed or torch.distributed.get_rank() == 0:
+            if not _TokenizationCache.exists(root):
+                _TokenizationCache.build(root, len(self.indexed_dataset), tokenize_fn, workers=self.memmap_workers)
+        if is_distributed and not lightning_prepare_data():
+            torch.distributed.barrier()
+        if is_distributed and AppState().local_rank == 0 and not _TokenizationCache.exists(root):
+            _TokenizationCache.build(root, len(self.indexed_dataset), tokenize_fn, workers=self.memmap_workers)
+        if is_distributed and not lightning_prepare_data():
+            torch.distributed.barrier()
+
+        self._tokenization_cache = _TokenizationCache(root)
+        logging.info(f"Loaded tokenization cache {root} of {len(self._tokenization_cache)} examples")
+
+    def get_sample_lengths(self) -> Optional[np.ndarray]:
+        """
+        Returns an estimate of the length of every sample, used to batch samples of similar lengths together:
+        the number of tokens when the tokenization cache is enabled, the size of the JSONL record otherwise.
+        Returns None when the lengths are not known without loading the samples.
+        """
+        if self._tokenization_cache is not None:
+            lengths = self._tokenization_cache.get_example_lengths()
+        elif isinstance(self.indexed_dataset, _JSONLMemMapDataset):
+            lengths = self.indexed_dataset.get_sample_sizes()
+        else:
+            return None
+
+        if self.samples_mapping is None:
+            return lengths
+        if isinstance(self.samples_mapping, np.ndarray):
+            indices = self.samples_mapping[:, 0].astype(np.int64)
+        else:
+            indices = np.fromiter(
+                (self.samples_mapping[i][0] for i in range(len(self.samples_mapping))),
+                dtype=np.int64,
+                count=len(self.samples_mapping),
+            )
+        return lengths[indices]
+
     def __len__(self):
         if self.max_num_samples is None:
             return len(self.indexed_dataset)
@@ -345,6 +439,8 @@ class GPTSFTDataset(Dataset):
         except Exception as e:
             logging.error(f"Error while loading example {idx} from dataset {self.file_path}")
             raise e
+        if self._tokenization_cache is not None:
+            return self._process_example(example, fields=[ids.tolist() for ids in self._tokenization_cache[idx]])
         return self._process_example(example)
 
     def _separate_template(self, prompt_template_values: List[str]):
@@ -494,12 +590,7 @@ class GPTSFTDataset(Dataset):
         else:
             raise ValueError(f'{self.truncation_method} is not supported')
 
-    def _process_example(self, example):
-        """
-        Create an example by concatenating text and answer.
-        Truncation is carried out when needed, but it is performed only on the prompt side.
-        BOS, EOS, and SEP, are added if specified.
-        """
+    def _get_prompt_template_values(self, example):
         prompt_template_values = []
         for c in self.prompt_template_keys:
             try:
@@ -511,9 +602,29 @@ class GPTSFTDataset(Dataset):
                     prompt_template_values.append("")
                 else:
                     raise e
+        return prompt_template_values
+
+    def _tokenize_example(self, example):
+        """
+        Returns the token ids of every part of the prompt template filled with the example,
+        which is what the tokenization cache stores.
+        """
+        template_strings, _ = self._separate_template(self._get_prompt_template_values(example))
+        return [self.tokenizer.text_to_ids(s) for s in template_strings]
 
+    def _process_example(self, example, fields=None):
+        """
+        Create an example by concatenating text and answer.
+        Truncation is carried out when needed, but it is performed only on the prompt side.
+        BOS, EOS, and SEP, are added if specified.
+        `fields` are the token ids of the example from the tokenization cache, if any.
+        """
+        prompt_template_values = self._get_prompt_template_values(example)
         template_strings, template_strings_keys = self._separate_template(prompt_template_values)
-        template_ids = [self.tokenizer.text_to_ids(s) for s in template_strings]
+        if fields is None:
+            template_ids = self._tokenize_example(example)
+        else:
+            template_ids = fields
         context_ids, answer_ids = self._multiple_truncation(template_ids, template_strings_keys)
 
         if self.virtual_tokens:
@@ -691,12 +802,12 @@ class GPTSFTPackedDataset(GPTSFTDataset):
         seq_boundaries = self.indexed_dataset[idx]['seq_start_id'] + [len(input_ids)]
         loss_mask = self.indexed_dataset[idx]['loss_mask']
         if idx < 0:
-            loss_mask = [0] * len(loss_mask)
+            loss_mask = [0] * len(input_ids)
         return {'input_ids': input_ids, 'seq_boundaries': seq_boundaries, 'loss_mask': loss_mask}
 
     def _load_dataset(self):
         try:
-            self.indexed_dataset = np.load(self.file_path, allow_pickle=True)
+            self.indexed_dataset = load_packed_sequences(self.file_path)
         except Exception as e:
             logging.error(
                 f"Failed to load packed dataset. The dataset should be a `.npy` file. "
@@ -704,6 +815,10 @@ class GPTSFTPackedDataset(GPTSFTDataset):
             )
             exit(1)
 
+    def _maybe_build_tokenization_cache(self):
+        # packed sequences are already tokenized
+        self._tokenization_cache = None
+
     def _build_samples_mapping(self):
         if self.max_num_samples is not None:
             # custom samples mapping logic, following the format for unpacked sft dataset
@@ -905,13 +1020,18 @@ class GPTSFTChatDataset(GPTSFTDataset):
         id2 = self.tokenizer.text_to_ids(PREFIX_STR)
         self.num_turn_start_tokens = len(id1) - len(id2)
 
-    def _process_example(self, example):
+    def _tokenization_config(self) -> dict:
+        return {'special_tokens': self.special_tokens}
+
+    def _tokenize_example(self, example):
         """
-        Create an example by concatenating text and answer.
-        Truncation is carried out when needed, but it is performed only on the prompt side.
-        BOS, EOS, and SEP, are added if specified.
+        Returns the token ids and the loss mask of the conversation, which is what the tokenization cache stores.
         """
-        result = _preprocess(
+        result = self._preprocess(example)
+        return [result['input_ids'].tolist(), result['mask'].int().tolist()]
+
+    def _preprocess(self, example):
+        return _preprocess(
             example,
             self.tokenizer,
             self.name_end_token_ids,
@@ -920,6 +1040,27 @@ class GPTSFTChatDataset(GPTSFTDataset):
             self.num_turn_start_tokens,
         )
 
+    def _process_example(self, example, fields=None):
+        """
+        Create an example by concatenating text and answer.
+        Truncation is carried out when needed, but it is performed only on the prompt side.
+        BOS, EOS, and SEP, are added if specified.
+        `fields` are the token ids and the loss mask of the example from the tokenization cache, if any.
+        """
+        if fields is None:
+            result = self._preprocess(example)
+        else:
+            input_ids = torch.LongTensor(fields[0])
+            mask = torch.tensor(fields[1], dtype=torch.bool)
+            # the last conversation is the answer, other history is context
+            last_ignore_index_pos = torch.nonzero(~mask)[-1].item() + 1
+            result = dict(
+                input_ids=input_ids,
+                mask=mask,
+                context_ids=input_ids[:last_ignore_index_pos],
+                answer_ids=input_ids[last_ignore_index_pos:],
+            )
+
         # store metadata in dataset, in case user may have keys required in the prediction json files
         metadata = {k: v for k, v in example.items() if k not in ['conversations']}
         result['metadata'] = metadata
@@ -57,6 +57,10 @@ class FineTuningDataModule(pl.LightningDataModule):
             Defaults to False.
         packed_sequence_specs (PackedSequenceSpecs, optional): See PackedSequenceSpecs for details
         dataset_kwargs (Optional[Dict[str, Any]], optional): Keyword arguments to pass into the GPTSFTDataset class
+        length_grouped_batching (bool, optional): Whether to group samples of similar lengths into the same global
+            batch to reduce padding, see MegatronLengthGroupedBatchSampler. Lengths are token counts when the
+            tokenization cache of the dataset is enabled, JSONL record sizes otherwise. Ignored for packed
+            sequences. Defaults to False.
     """
 
     def __init__(
@@ -74,6 +78,7 @@ class FineTuningDataModule(pl.LightningDataModule):
         persistent_workers: bool = False,
         packed_sequence_specs: Optional["PackedSequenceSpecs"] = None,
         dataset_kwargs: Optional[Dict[str, Any]] = None,
+        length_grouped_batching: bool = False,
     ):
         super().__init__()
         self.seq_length = seq_length
@@ -95,6 +100,7 @@ class FineTuningDataModule(pl.LightningDataModule):
         self.dataset_kwargs = dataset_kwargs or {}
         self._pad_cu_seqlens = False if not packed_sequence_specs else packed_sequence_specs.pad_cu_seqlens
         self.init_global_step = 0
+        self.length_grouped_batching = length_grouped_batching
 
     def validate_batch_size_for_packed_sequence(self):
         """
@@ -152,7 +158,8 @@ class FineTuningDataModule(pl.LightningDataModule):
             micro_batch_size=self.micro_batch_size,
             global_batch_size=self.global_batch_size,
             rampup_batch_size=self.rampup_batch_size,
-            dataloader_type="batch",
+            dataloader_type="length_grouped" if self.length_grouped_batching else "batch",
+            seed=self.seed,
         )
 
         # Follows the calculation in nemo.collections.nlp.data.language_modeling.megatron.
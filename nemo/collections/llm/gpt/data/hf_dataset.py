@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import lightning.pytorch as pl
+import numpy as np
 import torch
 from datasets import Dataset, DatasetDict, load_dataset
+from datasets.fingerprint import Hasher
 from torch.utils.data import DataLoader
 
 from nemo.lightning.pytorch.plugins import MegatronDataSampler
@@ -124,6 +128,11 @@ class HFDatasetDataModule(pl.LightningDataModule):
 
     - loading multiple splits (train, validation) from a dataset
     llm.HFDatasetDataModule("rajpurkar/squad", split=["train", "validation"])
+
+    Examples are preprocessed (e.g. tokenized) ahead of training with `map`, which runs `datasets.map`
+    with `map_num_proc` processes. When `map_cache_dir` is set, the result is saved there as Arrow files named
+    after the fingerprint of the dataset and of the mapped function, and loaded back by later runs.
+    With the default `collate_fn`, mapped columns are kept in numpy format and padded with numpy.
     """
 
     def __init__(
@@ -143,6 +152,8 @@ class HFDatasetDataModule(pl.LightningDataModule):
         train_aliases=["train", "training"],
         test_aliases=["test", "testing"],
         val_aliases=["val", "validation", "valid", "eval"],
+        map_num_proc=None,
+        map_cache_dir=None,
         **kwargs,
     ) -> None:
         super().__init__()
@@ -170,6 +181,10 @@ class HFDatasetDataModule(pl.LightningDataModule):
             self._collate_fn = lambda x: HFDatasetDataModule.collate_fn(x, pad_token_id=self.pad_token_id)
         else:
             self._collate_fn = collate_fn
+        # the default collate_fn pads numpy arrays, custom ones may expect python lists
+        self._numpy_format = collate_fn is None
+        self.map_num_proc = map_num_proc
+        self.map_cache_dir = map_cache_dir
 
         self.num_workers = num_workers
         self.pin_memory = pin_memory
@@ -190,7 +205,7 @@ class HFDatasetDataModule(pl.LightningDataModule):
 
     @staticmethod
     def collate_fn(batch, pad_token_id=0):
-        """Default batch collator"""
+        """Default batch collator, pads the values of every key to the longest one in the batch"""
 
         def batchify(tensor):
             if tensor.ndim == 1:
@@ -201,12 +216,15 @@ class HFDatasetDataModule(pl.LightningDataModule):
             return list(map(lambda x: x[key], batch))
 
         def pad_within_micro(batch, pad_token_id):
-            max_len = max(map(len, batch))
-            return [item + [pad_token_id] * (max_len - len(item)) for item in batch]
+            lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+            padded = np.full((len(batch), lengths.max()), pad_token_id, dtype=np.int64)
+            # row i holds its values in its first lengths[i] columns, which come in the order of the concatenation
+            padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.concatenate(batch)
+            return padded
 
         return {
             key: batchify(
-                torch.LongTensor(
+                torch.from_numpy(
                     pad_within_micro(
                         extract_key_from_dicts(batch, key),
                         pad_token_id if key != 'loss_mask' else 0,
@@ -270,19 +288,55 @@ class HFDatasetDataModule(pl.LightningDataModule):
         """Returns the test dataloader"""
         return self._make_dataloader(self.test, self._collate_fn)
 
-    def map(self, function=None, split_names=None, **kwargs):
-        """Maps a function to the dataset"""
+    def map(self, function=None, split_names=None, fingerprint=None, **kwargs):
+        """Maps a function to the dataset
+
+        Args:
+            function: The function applied to the examples, see `datasets.Dataset.map`.
+            split_names (str or list, optional): The splits to map, all of them by default.
+            fingerprint (str, optional): Identifies the function in the name of the cache files in
+                `map_cache_dir`, e.g. the name of the tokenizer and the version of the prompt. By default,
+                the function is hashed, which is not possible for all functions.
+            **kwargs: Keyword arguments of `datasets.Dataset.map`, `num_proc` defaults to `map_num_proc`.
+        """
         if isinstance(split_names, str):
-            dataset_splits = {split_names: self.dataset_splits[split_names]}
-        elif isinstance(split_names, list):
-            dataset_splits = {k: self.dataset_splits[k] for k in split_names}
-        else:
-            dataset_splits = self.dataset_splits
+            split_names = [split_names]
+        elif split_names is None:
+            split_names = list(self.dataset_splits.keys())
+        kwargs.setdefault('num_proc', self.map_num_proc)
 
-        for split_name, subset in dataset_splits.items():
+        for split_name in split_names:
+            subset = self.dataset_splits[split_name]
             if subset is None:
                 continue
-            dataset_splits[split_name] = subset.map(function, **kwargs)
+            if subset.format['type'] == 'numpy':
+                # as set by a previous call, the function expects python lists
+                subset = subset.with_format(None)
+            map_kwargs = dict(kwargs)
+            if self.map_cache_dir is not None and 'cache_file_name' not in map_kwargs:
+                new_fingerprint = self._map_fingerprint(subset, function, fingerprint, kwargs)
+                if new_fingerprint is not None:
+                    os.makedirs(self.map_cache_dir, exist_ok=True)
+                    map_kwargs['cache_file_name'] = os.path.join(
+                        self.map_cache_dir, f"{split_name}-{new_fingerprint}.arrow"
+                    )
+                    map_kwargs['new_fingerprint'] = new_fingerprint
+            subset = subset.map(function, **map_kwargs)
+            if self._numpy_format:
+                subset = subset.with_format('numpy')
+            self.dataset_splits[split_name] = subset
+
+    @staticmethod
+    def _map_fingerprint(subset, function, fingerprint, map_kwargs):
+        """Returns the fingerprint of the result of `subset.map(function, **map_kwargs)`, None if the function
+        cannot be hashed"""
+        # the number of processes does not change the result
+        map_kwargs = {k: v for k, v in map_kwargs.items() if k not in ('num_proc', 'desc')}
+        try:
+            return Hasher.hash([subset._fingerprint, function if fingerprint is None else fingerprint, map_kwargs])
+        except Exception as e:
+            logging.warning(f"Could not hash the mapped function ({e}), pass a `fingerprint` to cache the result")
+            return None
 
 
 class SquadHFDataModule(HFDatasetDataModule):
@@ -12,32 +12,67 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import multiprocessing as mp
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
 
 from nemo.collections.common.tokenizers import TokenizerSpec
 from nemo.collections.llm.gpt.data.core import create_sft_dataset
 from nemo.utils import logging
-from nemo.utils.sequence_packing_utils import create_hist, create_packing_strategy, fill_packing_strategy
+from nemo.utils.sequence_packing_utils import (
+    create_packing_strategy,
+    fill_packing_strategy_columnar,
+    save_packed_sequences,
+)
+
+# dataset shared with the forked tokenization workers
+_TOKENIZATION_DATASET = None
+
+
+def _tokenize_shard(shard: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Tokenizes examples [start, end) of the shared dataset into flat token ids, lengths and answer start indices,
+    which are None if an example has no `answer_start_idx`.
+    """
+    start, end = shard
+    examples = [_TOKENIZATION_DATASET[i] for i in range(start, end)]
+    lengths = np.array([len(example['input_ids']) for example in examples], dtype=np.int64)
+    if all('answer_start_idx' in example for example in examples):
+        answer_start_idx = np.array([example['answer_start_idx'] for example in examples], dtype=np.int64)
+    else:
+        answer_start_idx = None
+    input_ids = np.fromiter(
+        (token for example in examples for token in example['input_ids']), dtype=np.int64, count=lengths.sum()
+    )
+    return input_ids, lengths, answer_start_idx
 
 
-def tokenize_dataset(path: Path, tokenizer: TokenizerSpec, max_seq_length: int, seed: int):
+def tokenize_dataset_to_arrays(
+    path: Path, tokenizer: TokenizerSpec, max_seq_length: int, seed: int, num_workers: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
     """
-    Tokenizes a dataset from the provided path using the specified tokenizer
-    and prepares it for further processing.
+    Tokenizes a dataset from the provided path using the specified tokenizer, in parallel worker processes,
+    and returns the tokenized dataset as flat arrays.
 
     Args:
         path (Path): Path to the dataset file.
         tokenizer (TokenizerSpec): The tokenizer to use for tokenization.
         max_seq_length (int): Maximum sequence length for the tokens.
         seed (int): Random seed for shuffling the dataset (optional).
+        num_workers (Optional[int]): Number of tokenization processes, defaults to half of the CPU cores.
 
     Returns:
-        np.ndarray: A NumPy array containing the tokenized data.
+        input_ids (np.ndarray): Token ids of all the examples, concatenated.
+        offsets (np.ndarray): Start of every example in `input_ids`, followed by the total number of tokens.
+        answer_start_idx (Optional[np.ndarray]): Index of the first answer token of every example, or None if the
+            examples have no `answer_start_idx`, in which case the packed dataset has no loss mask.
     """
+    global _TOKENIZATION_DATASET
+
     dataset = create_sft_dataset(
         path=path,
         tokenizer=tokenizer,
@@ -45,7 +80,33 @@ def tokenize_dataset(path: Path, tokenizer: TokenizerSpec, max_seq_length: int,
         seed=seed,
         is_test=True,
     )
-    return np.array([dataset[i] for i in range(len(dataset))])
+    if num_workers is None:
+        num_workers = max(1, os.cpu_count() // 2)
+    num_shards = min(len(dataset), 4 * num_workers) or 1
+    bounds = np.linspace(0, len(dataset), num_shards + 1, dtype=np.int64).tolist()
+    shards = list(zip(bounds[:-1], bounds[1:]))
+
+    _TOKENIZATION_DATASET = dataset
+    try:
+        if num_workers > 1 and len(shards) > 1:
+            logging.info(f"Tokenizing {len(dataset)} examples using {num_workers} workers")
+            with mp.get_context("fork").Pool(num_workers) as p:
+                results = p.map(_tokenize_shard, shards)
+        else:
+            results = [_tokenize_shard(shard) for shard in shards]
+    finally:
+        _TOKENIZATION_DATASET = None
+
+    input_ids, lengths, answer_start_idx = zip(*results)
+    input_ids, lengths = np.concatenate(input_ids), np.concatenate(lengths)
+    if any(shard_answer_start_idx is None for shard_answer_start_idx in answer_start_idx):
+        logging.warning("Some examples have no `answer_start_idx`, the packed dataset will have no loss mask")
+        answer_start_idx = None
+    else:
+        answer_start_idx = np.concatenate(answer_start_idx)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return input_ids, offsets, answer_start_idx
 
 
 def prepare_packed_sequence_data(
@@ -57,6 +118,7 @@ def prepare_packed_sequence_data(
     max_seq_length: int,
     seed: Optional[int] = 0,
     packing_algorithm: str = "first_fit_shuffle",
+    num_workers: Optional[int] = None,
 ):
     """
     Prepares a packed sequence dataset from a given input file and saves it to an output file.
@@ -70,20 +132,39 @@ def prepare_packed_sequence_data(
         seed (Optional[int]): Random seed for shuffling (optional).
         packing_algorithm (str): The algorithm used for packing sequences
                 currently supports "first_fit_shuffle" and "first_fit_decreasing".
+        num_workers (Optional[int]): Number of tokenization processes, defaults to half of the CPU cores.
 
     Returns:
-        None: Saves the packed sequence data to the specified output path.
+        None: Saves the packed sequence data to the specified output path. The packed sequences are stored in a
+            columnar format (see `save_packed_sequences`) which `GPTSFTPackedDataset` memory-maps.
     """
 
     logging.info(f"Preparing packed sequence from {input_path}")
-    dataset = tokenize_dataset(input_path, tokenizer, max_seq_length, seed)
-    sequences, histogram = create_hist(dataset, max_seq_length)
+    input_ids, offsets, answer_start_idx = tokenize_dataset_to_arrays(
+        input_path, tokenizer, max_seq_length, seed, num_workers=num_workers
+    )
+    # histogram of sequence lengths minus 1, see `create_hist`
+    seq_lens = np.diff(offsets) - 1
+    num_dropped = int(np.count_nonzero(seq_lens > max_seq_length))
+    if num_dropped > 0:
+        logging.warning(f"{num_dropped} sequences are longer than max_seq_length={max_seq_length} and are dropped")
+        keep = np.flatnonzero(seq_lens <= max_seq_length)
+        lengths = seq_lens[keep] + 1
+        kept_offsets = np.zeros(len(keep) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=kept_offsets[1:])
+        input_ids = input_ids[np.repeat(offsets[keep] - kept_offsets[:-1], lengths) + np.arange(kept_offsets[-1])]
+        offsets, seq_lens = kept_offsets, seq_lens[keep]
+        if answer_start_idx is not None:
+            answer_start_idx = answer_start_idx[keep]
+    histogram = np.bincount(seq_lens, minlength=max_seq_length + 1).tolist()
 
     assignments, packing_metadata = create_packing_strategy(histogram, packed_sequence_size, packing_algorithm)
-    output_data = fill_packing_strategy(assignments, sequences, packed_sequence_size, tokenizer.eos_id)
+    output_data = fill_packing_strategy_columnar(
+        assignments, input_ids, offsets, answer_start_idx, packed_sequence_size, tokenizer.eos_id
+    )
 
     # save output data
-    np.save(output_path, output_data)
+    save_packed_sequences(output_path, output_data)
 
     # save packing metadata, packing_metadata is appended to the packing file if it exists
     if output_metadata_path is not None:
@@ -232,6 +232,17 @@ class _TextMemMapDataset(Dataset):
 
         return data
 
+    def get_sample_sizes(self) -> np.ndarray:
+        """
+        Returns the size in bytes of every record, computed from the index files without reading the records.
+        """
+        sizes = []
+        for _, midx in self.mdata_midx_list:
+            midx = np.asarray(midx, dtype=np.int64)
+            starts = np.concatenate([[0], midx[:-1] + 1])
+            sizes.append((midx - starts)[self._header_lines :])
+        return np.concatenate(sizes)
+
     def _fetch_sample_from_memmap(self, mdata, i, j):
         """
         Fetchs the text sample.
@@ -348,6 +359,116 @@ class _JSONLMemMapDataset(_TextMemMapDataset):
         return record
 
 
+# tokenization function shared with the forked workers building a tokenization cache
+_TOKENIZE_FN = None
+
+
+def _tokenize_examples_shard(shard):
+    """Tokenizes examples [start, end) with the shared tokenization function into flat ids and field lengths."""
+    start, end = shard
+    fields = [_TOKENIZE_FN(idx) for idx in range(start, end)]
+    num_fields = np.array([len(example_fields) for example_fields in fields], dtype=np.int64)
+    field_lengths = np.array([len(ids) for example_fields in fields for ids in example_fields], dtype=np.int64)
+    ids = np.fromiter(
+        (token for example_fields in fields for ids in example_fields for token in ids),
+        dtype=np.int64,
+        count=field_lengths.sum(),
+    )
+    return ids, field_lengths, num_fields
+
+
+class _TokenizationCache:
+    """
+    Token ids of the text fields of every example of a dataset, stored in memory-mapped arrays next to the
+    index files of the dataset, so that examples are tokenized once and the result is shared across epochs,
+    ranks and runs. Every example holds a list of fields, e.g. the tokenized parts of a prompt template.
+
+    Files, where `<root>` is the index file name of the dataset followed by the cache key:
+        <root>.ids.npy: token ids of all the fields of all the examples, concatenated
+        <root>.field_offsets.npy: start of every field in the ids, followed by the total number of ids
+        <root>.example_offsets.npy: index of the first field of every example, followed by the number of fields
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._ids = np.load(root + ".ids.npy", mmap_mode="r")
+        self._field_offsets = np.load(root + ".field_offsets.npy", mmap_mode="r")
+        self._example_offsets = np.load(root + ".example_offsets.npy", mmap_mode="r")
+
+    def __getstate__(self):
+        # reopen the files instead of pickling the content of the memory maps, e.g. for dataloader workers
+        return {"root": self.root}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"])
+
+    def __len__(self):
+        return len(self._example_offsets) - 1
+
+    def get_example_lengths(self) -> np.ndarray:
+        """Returns the total number of token ids of the fields of every example."""
+        field_offsets = np.asarray(self._field_offsets)
+        example_offsets = np.asarray(self._example_offsets)
+        return field_offsets[example_offsets[1:]] - field_offsets[example_offsets[:-1]]
+
+    def __getitem__(self, idx: int) -> List[np.ndarray]:
+        """Returns the token ids of every field of an example."""
+        first, last = self._example_offsets[idx], self._example_offsets[idx + 1]
+        offsets = self._field_offsets[first : last + 1].tolist()
+        return [self._ids[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    @staticmethod
+    def exists(root: str) -> bool:
+        """Whether the cache was fully written, the example offsets are written last."""
+        return os.path.exists(root + ".example_offsets.npy")
+
+    @staticmethod
+    def build(root: str, num_examples: int, tokenize_fn: Callable[[int], List[List[int]]], workers=None):
+        """
+        Tokenizes all the examples and writes the cache, tokenizing shards of the examples in worker processes.
+
+        Args:
+            root: base name of the cache files.
+            num_examples: number of examples of the dataset.
+            tokenize_fn: returns the token ids of every field of the example of a given index.
+            workers: number of tokenization processes, defaults to half of the CPU cores.
+        """
+        global _TOKENIZE_FN
+
+        if workers is None:
+            workers = max(1, os.cpu_count() // 2)
+        num_shards = min(num_examples, 4 * workers) or 1
+        bounds = np.linspace(0, num_examples, num_shards + 1, dtype=np.int64).tolist()
+        shards = list(zip(bounds[:-1], bounds[1:]))
+
+        logging.info(f"Building tokenization cache {root} for {num_examples} examples using {workers} workers")
+        start_time = time.time()
+        _TOKENIZE_FN = tokenize_fn
+        try:
+            if workers > 1 and len(shards) > 1:
+                with mp.get_context("fork").Pool(workers) as p:
+                    results = p.map(_tokenize_examples_shard, shards)
+            else:
+                results = [_tokenize_examples_shard(shard) for shard in shards]
+        finally:
+            _TOKENIZE_FN = None
+
+        ids, field_lengths, num_fields = (np.concatenate(column) for column in zip(*results))
+        field_offsets = np.zeros(len(field_lengths) + 1, dtype=np.int64)
+        np.cumsum(field_lengths, out=field_offsets[1:])
+        example_offsets = np.zeros(len(num_fields) + 1, dtype=np.int64)
+        np.cumsum(num_fields, out=example_offsets[1:])
+        # the smallest dtype holding the token ids, to keep the cache small
+        ids = ids.astype(np.int32 if ids.size == 0 or ids.max() < 2**31 else np.int64)
+
+        # write to temporary files renamed at the end, so that a cache is never partially read
+        for suffix, array in (("ids", ids), ("field_offsets", field_offsets), ("example_offsets", example_offsets)):
+            tmp_path = f"{root}.{suffix}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, f"{root}.{suffix}.npy")
+        logging.info(f"Time building tokenization cache: {datetime.timedelta(seconds=time.time() - start_time)}")
+
+
 class _OnlineSampleMapping:
     """
     This class replaces NeMo's get_samples_mapping function which pre-computes.
@@ -570,6 +570,7 @@ def sample_sequence_batch(
             num_audios,
             context_start_idx,
         )
+        inference_strategy.reset_end_of_generation_state()
         audio_text_context_lengths = context_lengths + audio_feat_lens
         context_length = audio_text_context_lengths.min().item()
         # added eos_id to support the function generate_samples_eval that passes
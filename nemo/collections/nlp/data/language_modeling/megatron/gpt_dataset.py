@@ -16,6 +16,8 @@
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import numpy as np
 import torch
@@ -331,6 +333,10 @@ class GPTDataset(Dataset):
             self.add_extra_token = 0
         self.shuffle_documents = cfg.data.get('shuffle_documents', True)
         self.exchange_indices_distributed = cfg.data.get('exchange_indices_distributed', False)
+        # number of samples following the requested one in the shuffled order to read ahead in the background,
+        # hides the latency of page faults on network filesystems
+        self.read_ahead_samples = cfg.data.get('read_ahead_samples', 0)
+        self._read_ahead_end = 0
 
         # save index mappings to a configurable dir
         self.index_mapping_dir = cfg.data.get('index_mapping_dir', None)
@@ -367,8 +373,44 @@ class GPTDataset(Dataset):
         #    sample i --> [sample_idx[i], sample_idx[i+1])
         return self.sample_idx.shape[0] - 1
 
+    def _get_sample_ranges(self, idx: int):
+        """Returns the documents, offsets and lengths of the portions of documents making up a sample,
+        the arguments of `MMapIndexedDataset.get_many`."""
+        return _get_sample_ranges(
+            self.indexed_dataset.sizes, self.doc_idx, self.sample_idx, self.shuffle_idx[idx], self.add_extra_token
+        )
+
+    def _read_ahead(self, idx: int):
+        """Reads the samples following `idx` in the background, so that they are in the page cache when requested."""
+        end = min(idx + 1 + self.read_ahead_samples, len(self))
+        if not idx < self._read_ahead_end <= end:
+            # not iterating in order from the last read-ahead, e.g. at the start of an epoch
+            self._read_ahead_end = idx + 1
+        if self._read_ahead_end >= end:
+            return
+        ranges = [self._get_sample_ranges(i) for i in range(self._read_ahead_end, end)]
+        self.indexed_dataset.read_ahead(*(np.concatenate(arrays) for arrays in zip(*ranges)))
+        self._read_ahead_end = end
+
     def _get_text(self, idx: int) -> np.ndarray:
+        if hasattr(self.indexed_dataset, 'get_many'):
+            if self.read_ahead_samples > 0 and idx >= 0:
+                self._read_ahead(idx)
+            # assemble the portions of documents of the sample in a single copy
+            sample = self.indexed_dataset.get_many(*self._get_sample_ranges(idx))
+        else:
+            sample = self._get_text_from_documents(idx)
+        if len(sample) != (self.seq_length + self.add_extra_token):
+            logging.info(
+                F' > WARNING: Got sample of length: {len(sample)} for sequence length={self.seq_length+self.add_extra_token}, padding the sample to match sequence length'
+            )
+            sample = np.array(sample, dtype=np.int64)
+            sample = np.pad(
+                sample, (0, self.seq_length + self.add_extra_token - len(sample)), mode='constant', constant_values=-1
+            )
+        return sample.astype(np.int64)
 
+    def _get_text_from_documents(self, idx: int) -> np.ndarray:
         # Get the shuffled index.
         idx = self.shuffle_idx[idx]
         # Start and end documents and offsets.
@@ -392,15 +434,7 @@ class GPTDataset(Dataset):
                 self.indexed_dataset.get(self.doc_idx[doc_index_l], length=offset_l + self.add_extra_token)
             )
             sample = np.concatenate(sample_list)
-        if len(sample) != (self.seq_length + self.add_extra_token):
-            logging.info(
-                F' > WARNING: Got sample of length: {len(sample)} for sequence length={self.seq_length+self.add_extra_token}, padding the sample to match sequence length'
-            )
-            sample = np.array(sample, dtype=np.int64)
-            sample = np.pad(
-                sample, (0, self.seq_length + self.add_extra_token - len(sample)), mode='constant', constant_values=-1
-            )
-        return sample.astype(np.int64)
+        return sample
 
     def __getitem__(self, idx):
         text = torch.from_numpy(self._get_text(idx))
@@ -643,34 +677,31 @@ def _build_index_mappings(
 
             # doc-idx.
             start_time = time.time()
-            doc_idx = _build_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, shuffle_documents)
-            np.save(doc_idx_filename, doc_idx, allow_pickle=True)
+            with _index_file(doc_idx_filename, np.int32, (num_epochs * len(documents),)) as doc_idx:
+                _build_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, shuffle_documents, out=doc_idx)
             logging.info(
                 ' > elasped time to build and save doc-idx mapping '
                 '(seconds): {:4f}'.format(time.time() - start_time)
             )
             # sample-idx.
             start_time = time.time()
-            # Use C++ implementation for speed.
-            # First compile and then import.
-            assert doc_idx.dtype == np.int32
-            assert sizes.dtype == np.int32
-            try:
-                from nemo.collections.nlp.data.language_modeling.megatron.dataset_utils import compile_helper
-
-                compile_helper()
-                from nemo.collections.nlp.data.language_modeling.megatron import helpers
-            except ImportError:
-                raise ImportError(
-                    f'Could not compile megatron dataset C++ helper functions and therefore cannot import helpers python file.'
-                )
-
-            sample_idx = helpers.build_sample_idx(
-                sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch, drop_last, add_extra_token
+            doc_idx = np.load(doc_idx_filename, mmap_mode='r')
+            num_sample_idx_samples = _num_sample_idx_samples(
+                num_epochs, tokens_per_epoch, seq_length, drop_last, add_extra_token
             )
-            # sample_idx = _build_sample_idx(sizes, doc_idx, seq_length,
-            #                              num_epochs, tokens_per_epoch, drop_last, add_extra_token)
-            np.save(sample_idx_filename, sample_idx, allow_pickle=True)
+            sample_idx_dtype = np.int32 if len(doc_idx) <= np.iinfo(np.int32).max else np.int64
+            with _index_file(sample_idx_filename, sample_idx_dtype, (num_sample_idx_samples + 1, 2)) as sample_idx:
+                _build_sample_idx_parallel(
+                    sizes,
+                    doc_idx,
+                    seq_length,
+                    num_epochs,
+                    tokens_per_epoch,
+                    drop_last,
+                    add_extra_token,
+                    out=sample_idx,
+                )
+            sample_idx = np.load(sample_idx_filename, mmap_mode='r')
             logging.info(
                 ' > elasped time to build and save sample-idx mapping '
                 '(seconds): {:4f}'.format(time.time() - start_time)
@@ -743,23 +774,109 @@ def _num_epochs(tokens_per_epoch, seq_length, num_samples, add_extra_token=1):
             return num_epochs
 
 
-def _build_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, shuffle=True):
+@contextmanager
+def _index_file(filename, dtype, shape):
+    """Yields a writable memory map of a new .npy file, which is moved to `filename` once it is complete,
+    so that an interrupted build never leaves a partial index mapping behind."""
+    tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    array = np.lib.format.open_memmap(tmp_filename, mode='w+', dtype=dtype, shape=shape)
+    try:
+        yield array
+        array.flush()
+    except BaseException:
+        del array
+        os.remove(tmp_filename)
+        raise
+    del array
+    os.replace(tmp_filename, filename)
+
+
+def _build_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, shuffle=True, out=None):
     """Build an array with length = number-of-epochs * number-of-dcuments.
-    Each index is mapped to a corresponding document."""
+    Each index is mapped to a corresponding document.
+    The array is built in place in `out`, e.g. a memory map, when given."""
+    if out is None:
+        out = np.empty(num_epochs * len(documents), dtype=np.int32)
     if not separate_last_epoch or num_epochs == 1:
-        doc_idx = np.mgrid[0:num_epochs, 0 : len(documents)][1]
-        doc_idx[:] = documents
-        doc_idx = doc_idx.reshape(-1)
-        doc_idx = doc_idx.astype(np.int32)
+        # numpy only shuffles in place with its fast path for arrays of exact type ndarray, not memory maps
+        doc_idx = out.view(np.ndarray)
+        doc_idx.reshape(num_epochs, len(documents))[:] = documents
         if shuffle:
             np_rng.shuffle(doc_idx)
         else:
             logging.info('Document shuffling disabled')
-        return doc_idx
+        return out
+
+    num_first_epochs_docs = (num_epochs - 1) * len(documents)
+    _build_doc_idx(documents, num_epochs - 1, np_rng, False, shuffle, out=out[:num_first_epochs_docs])
+    _build_doc_idx(documents, 1, np_rng, False, shuffle, out=out[num_first_epochs_docs:])
+    return out
 
-    doc_idx_first = _build_doc_idx(documents, num_epochs - 1, np_rng, False, shuffle)
-    doc_idx_last = _build_doc_idx(documents, 1, np_rng, False, shuffle)
-    return np.concatenate((doc_idx_first, doc_idx_last))
+
+def _num_sample_idx_samples(num_epochs, tokens_per_epoch, seq_length, drop_last=True, add_extra_token=1):
+    """Number of samples of the sample index mapping, as computed by the C++ helper `build_sample_idx`."""
+    num_tokens = int(num_epochs) * int(tokens_per_epoch) - add_extra_token
+    if not drop_last:
+        # single precision, like the C++ helper, so that existing index mappings are reproduced
+        return int(np.ceil(np.float32(num_tokens) / np.float32(seq_length)))
+    return num_tokens // seq_length
+
+
+def _build_sample_idx_parallel(
+    sizes,
+    doc_idx,
+    seq_length,
+    num_epochs,
+    tokens_per_epoch,
+    drop_last=True,
+    add_extra_token=1,
+    out=None,
+    chunk_size=2**24,
+    num_workers=None,
+):
+    """Vectorized `_build_sample_idx`, producing the same mapping.
+
+    Sample i starts at token i * seq_length of the documents of `doc_idx` concatenated, which is located with a
+    binary search in the cumulative document sizes. `doc_idx` is processed in chunks of `chunk_size` documents
+    by `num_workers` threads, so memory stays bounded and `doc_idx` can be a memory map.
+    """
+    num_samples = _num_sample_idx_samples(num_epochs, tokens_per_epoch, seq_length, drop_last, add_extra_token)
+    if out is None:
+        out = np.empty([num_samples + 1, 2], dtype=np.int32)
+    num_docs = len(doc_idx)
+    chunk_starts = list(range(0, num_docs, chunk_size))
+    num_workers = num_workers or min(32, os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        chunk_tokens = list(
+            pool.map(lambda start: sizes[doc_idx[start : start + chunk_size]].sum(dtype=np.int64), chunk_starts)
+        )
+        chunk_offsets = np.concatenate([[0], np.cumsum(chunk_tokens, dtype=np.int64)])
+        total_tokens = int(chunk_offsets[-1])
+
+        def fill_chunk(chunk):
+            start, offset = chunk_starts[chunk], int(chunk_offsets[chunk])
+            # samples whose last token (the extra one included) is in this chunk
+            first_sample = max(1, (offset - add_extra_token) // seq_length + 1)
+            last_sample = min(num_samples, (int(chunk_offsets[chunk + 1]) - add_extra_token) // seq_length)
+            if last_sample < first_sample:
+                return
+            doc_sizes = sizes[doc_idx[start : start + chunk_size]].astype(np.int64)
+            doc_ends = offset + np.cumsum(doc_sizes)
+            sample_starts = np.arange(first_sample, last_sample + 1, dtype=np.int64) * seq_length
+            docs = np.searchsorted(doc_ends, sample_starts + add_extra_token, side='left')
+            out[first_sample : last_sample + 1, 0] = start + docs
+            out[first_sample : last_sample + 1, 1] = sample_starts - (doc_ends[docs] - doc_sizes[docs])
+
+        list(pool.map(fill_chunk, range(len(chunk_starts))))
+
+    out[0] = 0
+    # without drop_last, the last sample ends with the last document
+    first_partial_sample = max(1, (total_tokens - add_extra_token) // seq_length + 1)
+    if first_partial_sample <= num_samples:
+        out[first_partial_sample:, 0] = num_docs - 1
+        out[first_partial_sample:, 1] = sizes[doc_idx[num_docs - 1]] - add_extra_token
+    return out
 
 
 def _build_sample_idx(sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch, drop_last=True, add_extra_token=1):
@@ -819,6 +936,22 @@ def _build_sample_idx(sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch,
     return sample_idx
 
 
+def _get_sample_ranges(sizes, doc_idx, sample_idx, sample, add_extra_token=1):
+    """Returns the documents, offsets and lengths of the portions of documents making up sample `sample` of
+    `sample_idx` (before shuffling), the arguments of `MMapIndexedDataset.get_many`."""
+    # Start and end documents and offsets.
+    doc_index_f, offset_f = sample_idx[sample]
+    doc_index_l, offset_l = sample_idx[sample + 1]
+    doc_ids = np.asarray(doc_idx[doc_index_f : doc_index_l + 1], dtype=np.int64)
+    offsets = np.zeros(len(doc_ids), dtype=np.int64)
+    offsets[0] = offset_f
+    lengths = sizes[doc_ids].astype(np.int64)
+    lengths[0] -= offset_f
+    # the last document is cut after the offset, the first one before
+    lengths[-1] = offset_l + add_extra_token - offsets[-1]
+    return doc_ids, offsets, lengths
+
+
 def _build_shuffle_idx(num_samples, total_size, np_rng):
     """Build the range [0, size) and shuffle."""
     print(
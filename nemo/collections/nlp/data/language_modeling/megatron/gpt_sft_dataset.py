@@ -30,6 +30,7 @@ from nemo.collections.nlp.data.language_modeling.megatron.dataset_utils import g
 from nemo.collections.nlp.data.language_modeling.text_memmap_dataset import JSONLMemMapDataset, OnlineSampleMapping
 from nemo.core.classes import Dataset
 from nemo.utils import logging
+from nemo.utils.sequence_packing_utils import load_packed_sequences
 
 __all__ = ['GPTSFTDataset']
 
@@ -569,12 +570,12 @@ class GPTSFTPackedDataset(GPTSFTDataset):
         seq_boundaries = self.indexed_dataset[idx]['seq_start_id'] + [len(input_ids)]
         loss_mask = self.indexed_dataset[idx]['loss_mask']
         if idx < 0:
-            loss_mask = [0] * len(loss_mask)
+            loss_mask = [0] * len(input_ids)
         return {'input_ids': input_ids, 'seq_boundaries': seq_boundaries, 'loss_mask': loss_mask}
 
     def _load_dataset(self):
         try:
-            self.indexed_dataset = np.load(self.file_path, allow_pickle=True)
+            self.indexed_dataset = load_packed_sequences(self.file_path)
         except Exception as e:
             logging.error(
                 f"Failed to load packed dataset. The dataset should be a `.npy` file. "
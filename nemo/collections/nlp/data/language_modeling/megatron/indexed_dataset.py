@@ -30,6 +30,7 @@
 import os
 import shutil
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from itertools import accumulate
 
@@ -377,7 +378,29 @@ def _warmup_mmap_file(path):
             pass
 
 
+def _read_ahead(fd, start, length, block_size=1024 * 1024):
+    """Reads a byte range of a file, discarding the data, so that it is in the page cache when accessed."""
+    end = start + length
+    while start < end:
+        if not os.pread(fd, min(block_size, end - start), start):
+            break
+        start += block_size
+
+
+def _coalesce_ranges(starts, lengths):
+    """Merges byte ranges which directly follow each other, returns the starts and lengths of the merged ranges."""
+    if len(starts) == 0:
+        return starts, lengths
+    is_first = np.ones(len(starts), dtype=bool)
+    is_first[1:] = starts[1:] != starts[:-1] + lengths[:-1]
+    firsts = np.flatnonzero(is_first)
+    return starts[firsts], np.add.reduceat(lengths, firsts)
+
+
 class MMapIndexedDataset(torch.utils.data.Dataset):
+    # number of threads reading ahead the ranges passed to `read_ahead`
+    READ_AHEAD_WORKERS = 8
+
     class Index(object):
         _HDR_MAGIC = b'MMIDIDX\x00\x00'
 
@@ -508,6 +531,10 @@ class MMapIndexedDataset(torch.utils.data.Dataset):
     def _do_init(self, path, skip_warmup=True, delay_data_mmap=False):
         self._path = path
         self._index = self.Index(index_file_path(self._path), skip_warmup)
+        # the read-ahead file descriptor and threads are created lazily in the process using them
+        self._read_ahead_pid = None
+        self._read_ahead_fd = None
+        self._read_ahead_pool = None
 
         if not delay_data_mmap:
             self._create_data_mmap(skip_warmup)
@@ -526,6 +553,9 @@ class MMapIndexedDataset(torch.utils.data.Dataset):
         self._bin_buffer = memoryview(self._bin_buffer_mmap)
 
     def __del__(self):
+        if getattr(self, '_read_ahead_pid', None) == os.getpid():
+            self._read_ahead_pool.shutdown(wait=False, cancel_futures=True)
+            os.close(self._read_ahead_fd)
         if self._bin_buffer_mmap is not None:
             self._bin_buffer_mmap._mmap.close()
         del self._bin_buffer_mmap
@@ -565,6 +595,60 @@ class MMapIndexedDataset(torch.utils.data.Dataset):
         np_array = np.frombuffer(self._bin_buffer, dtype=self._index.dtype, count=length, offset=ptr)
         return np_array
 
+    def _get_byte_ranges(self, doc_ids, offsets=None, lengths=None):
+        """Returns the start in the data file and the number of elements of document ranges,
+        see `get_many`."""
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        itemsize = np.dtype(self._index.dtype).itemsize
+        offsets = np.zeros(len(doc_ids), dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        if lengths is None:
+            lengths = self._index._sizes[doc_ids] - offsets
+        lengths = np.asarray(lengths, dtype=np.int64)
+        return self._index._pointers[doc_ids] + offsets * itemsize, lengths
+
+    def get_many(self, doc_ids, offsets=None, lengths=None, out=None):
+        """Retrieves portions of several items, concatenated into a single array.
+
+        Portion i is `get(doc_ids[i], offsets[i], lengths[i])`, offsets default to 0 and lengths to the rest of
+        the items. Portions which directly follow each other in the data file are copied at once.
+
+        Args:
+            doc_ids: The indices of the items.
+            offsets: The offset of every portion in its item.
+            lengths: The number of elements of every portion.
+            out: The preallocated array to assemble the portions into, a new array is allocated if None.
+
+        Returns:
+            The concatenated portions.
+        """
+        starts, lengths = self._get_byte_ranges(doc_ids, offsets, lengths)
+        itemsize = np.dtype(self._index.dtype).itemsize
+        starts, nbytes = _coalesce_ranges(starts, lengths * itemsize)
+        if out is None:
+            out = np.empty(int(nbytes.sum()) // itemsize, dtype=self._index.dtype)
+        position = 0
+        for start, count in zip(starts.tolist(), (nbytes // itemsize).tolist()):
+            out[position : position + count] = np.frombuffer(
+                self._bin_buffer, dtype=self._index.dtype, count=count, offset=start
+            )
+            position += count
+        return out
+
+    def read_ahead(self, doc_ids, offsets=None, lengths=None):
+        """Reads portions of items (see `get_many`) into the page cache on background threads and returns
+        immediately, so that accessing them later does not stall on page faults, e.g. on network filesystems."""
+        starts, lengths = self._get_byte_ranges(doc_ids, offsets, lengths)
+        order = np.argsort(starts, kind='stable')
+        starts, nbytes = _coalesce_ranges(starts[order], lengths[order] * np.dtype(self._index.dtype).itemsize)
+
+        if self._read_ahead_pid != os.getpid():
+            # after a fork, the threads of the parent process do not exist in the child
+            self._read_ahead_fd = os.open(data_file_path(self._path), os.O_RDONLY)
+            self._read_ahead_pool = ThreadPoolExecutor(max_workers=self.READ_AHEAD_WORKERS)
+            self._read_ahead_pid = os.getpid()
+        for start, length in zip(starts.tolist(), nbytes.tolist()):
+            self._read_ahead_pool.submit(_read_ahead, self._read_ahead_fd, start, length)
+
     def create_data_mmap(self):
         self._create_data_mmap(self._skip_warmup)
 
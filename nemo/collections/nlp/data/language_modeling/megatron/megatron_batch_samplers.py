@@ -13,13 +13,15 @@
 # limitations under the License.
 import abc
 import warnings
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
+import numpy as np
 import torch
 
 from nemo.utils.decorators import experimental
 
 __all__ = [
+    "MegatronLengthGroupedBatchSampler",
     "MegatronPretrainingBatchSampler",
     "MegatronPretrainingRandomBatchSampler",
 ]
@@ -261,3 +263,119 @@ class MegatronPretrainingRandomBatchSampler(BaseMegatronBatchSampler):
         # Check the last partial batch and see drop_last is set
         if len(batch) > 0 and not self.drop_last:
             yield batch
+
+
+class MegatronLengthGroupedBatchSampler(BaseMegatronBatchSampler):
+    """Megatron style BatchSampler grouping samples of similar lengths into the same global batch.
+
+    Samples of a global batch are padded to the longest one, so drawing samples regardless of their length
+    wastes most of the tokens of a batch on padding when lengths are skewed. At every epoch, samples are shuffled
+    and split into megabatches of `megabatch_multiplier` global batches, samples of a megabatch are sorted by
+    length and cut into global batches, and the order of the global batches of the epoch is shuffled. Every
+    global batch is split across data parallel ranks like in `MegatronPretrainingBatchSampler`, so all ranks
+    get samples of similar lengths.
+
+    The order only depends on `seed` and the epoch, so training resumes from `consumed_samples`.
+
+    Args:
+        lengths: The length of every sample, e.g. its number of tokens, or any estimate of it.
+        megabatch_multiplier: The number of global batches sorted together. Larger values reduce padding
+            further, but make batches less random.
+        seed: The seed of the shuffling.
+        shuffle: Whether to shuffle the samples, otherwise global batches are only sorted within megabatches.
+    """
+
+    def __init__(
+        self,
+        total_samples: int,
+        consumed_samples: int,
+        micro_batch_size: int,
+        global_batch_size: int,
+        data_parallel_rank: int,
+        data_parallel_size: int,
+        drop_last: bool,
+        lengths,
+        pad_samples_to_global_batch_size: bool = False,
+        megabatch_multiplier: int = 64,
+        seed: int = 0,
+        shuffle: bool = True,
+    ) -> None:
+        super().__init__(
+            total_samples=total_samples,
+            consumed_samples=consumed_samples,
+            micro_batch_size=micro_batch_size,
+            global_batch_size=global_batch_size,
+            data_parallel_rank=data_parallel_rank,
+            data_parallel_size=data_parallel_size,
+            drop_last=drop_last,
+            pad_samples_to_global_batch_size=pad_samples_to_global_batch_size,
+        )
+        self.lengths = np.asarray(lengths)
+        if len(self.lengths) != total_samples:
+            raise RuntimeError(f"Got {len(self.lengths)} sample lengths for {total_samples} samples")
+        if megabatch_multiplier <= 0:
+            raise RuntimeError(f"megabatch_multiplier must be greater than 0, but {megabatch_multiplier}")
+        self.megabatch_multiplier = megabatch_multiplier
+        self.seed = seed
+        self.shuffle = shuffle
+
+    @property
+    def _samples_per_epoch(self) -> int:
+        if self.drop_last:
+            return self.total_samples - self.total_samples % self._global_batch_size
+        return self.total_samples
+
+    def __len__(self) -> int:
+        num_available_samples = self._samples_per_epoch - self.consumed_samples % max(self._samples_per_epoch, 1)
+        if self.drop_last:
+            return num_available_samples // self.global_batch_size
+        else:
+            return (num_available_samples + self.global_batch_size - 1) // self.global_batch_size
+
+    def get_global_batches(self, epoch: int):
+        """Returns the global batches of an epoch, as a list of arrays of sample indices."""
+        rng = np.random.default_rng((self.seed, epoch))
+        order = rng.permutation(self.total_samples) if self.shuffle else np.arange(self.total_samples)
+
+        megabatch_size = self.megabatch_multiplier * self._global_batch_size
+        batches = []
+        for start in range(0, self.total_samples, megabatch_size):
+            megabatch = order[start : start + megabatch_size]
+            # stable sort, longest first, so that the order is fully determined by the seed
+            megabatch = megabatch[np.argsort(-self.lengths[megabatch], kind="stable")]
+            batches.extend(
+                np.split(megabatch, range(self._global_batch_size, len(megabatch), self._global_batch_size))
+            )
+
+        # only the last batch of the epoch can be partial, and it stays last
+        last_batch = batches.pop() if len(batches[-1]) < self._global_batch_size else None
+        if self.shuffle:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        if last_batch is not None and not self.drop_last:
+            batches.append(last_batch)
+        return batches
+
+    def __iter__(self):
+        samples_per_epoch = self._samples_per_epoch
+        if samples_per_epoch == 0:
+            return
+        epoch = self.consumed_samples // samples_per_epoch
+        current_epoch_samples = self.consumed_samples % samples_per_epoch
+        assert current_epoch_samples % self._global_batch_size == 0
+
+        for batch in self.get_global_batches(epoch)[current_epoch_samples // self._global_batch_size :]:
+            indices = batch[self.data_parallel_rank :: self.data_parallel_size].tolist()
+            if len(batch) < self._global_batch_size and self.pad_samples_to_global_batch_size:
+                num_pad = self._global_batch_size // self.data_parallel_size - len(indices)
+                indices = indices + [-1] * num_pad
+            self.consumed_samples += len(batch)
+            yield indices
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state of the sampler, to resume iteration with `load_state_dict`."""
+        return {"consumed_samples": self.consumed_samples, "seed": self.seed}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """Restores the state of the sampler returned by `state_dict`."""
+        self.consumed_samples = state_dict["consumed_samples"]
+        self.seed = state_dict["seed"]
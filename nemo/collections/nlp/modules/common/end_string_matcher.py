@@ -0,0 +1,188 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import weakref
+from collections import deque
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from nemo.utils import logging
+
+__all__ = ['EndStringMatcher']
+
+# text prepended to every token when computing its string, so that tokenizers which strip leading whitespace
+# when decoding (e.g. SentencePiece) keep the whitespace of the token
+_DECODING_PREFIX = "a"
+
+# character decoded from incomplete UTF-8 sequences, such as the single bytes of byte fallback tokens
+_REPLACEMENT_CHAR = "\ufffd"
+
+
+def _build_automaton(end_strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    Builds the deterministic Aho-Corasick automaton of a set of strings.
+
+    Returns:
+        transitions (np.ndarray): [num_states, len(alphabet) + 1] next state for every state and character index,
+            the last column is for characters which do not appear in any end string
+        is_match (np.ndarray): [num_states] whether the text read so far ends with one of the end strings
+        alphabet (dict): index of every character appearing in the end strings
+    """
+    alphabet = {char: idx for idx, char in enumerate(sorted(set(''.join(end_strings))))}
+    goto: List[Dict[int, int]] = [{}]
+    is_match = [False]
+    for end_string in end_strings:
+        state = 0
+        for char in end_string:
+            char_idx = alphabet[char]
+            if char_idx not in goto[state]:
+                goto.append({})
+                is_match.append(False)
+                goto[state][char_idx] = len(goto) - 1
+            state = goto[state][char_idx]
+        is_match[state] = True
+
+    transitions = np.zeros([len(goto), len(alphabet) + 1], dtype=np.int64)
+    fail = [0] * len(goto)
+    queue = deque()
+    for char_idx, state in goto[0].items():
+        transitions[0, char_idx] = state
+        queue.append(state)
+    # breadth-first traversal, so that the states of the failure links are complete when they are used
+    while queue:
+        state = queue.popleft()
+        is_match[state] = is_match[state] or is_match[fail[state]]
+        transitions[state] = transitions[fail[state]]
+        for char_idx, next_state in goto[state].items():
+            fail[next_state] = transitions[fail[state], char_idx]
+            transitions[state, char_idx] = next_state
+            queue.append(next_state)
+    return transitions, np.array(is_match), alphabet
+
+
+class EndStringMatcher:
+    """
+    Detects end strings in generated text without detokenizing it at every step.
+
+    End strings are compiled into an Aho-Corasick automaton over characters, which is then lifted to tokens: the
+    transition table maps every (state, token) pair to the state reached after reading the string of the token.
+    The state of every sequence of the batch is a tensor advanced with a single gather per generated token,
+    and a sequence ends when the text read so far ends with one of the end strings, like
+    `tokenizer.ids_to_text(tokens).endswith(end_string)`. The string of a token is what it appends to the decoded
+    text, so matching is exact for tokenizers whose decoding is a concatenation of the strings of the tokens.
+
+    Characters split across several tokens, such as the bytes of byte fallback tokens, have no per-token string.
+    End strings which contain such characters, or characters which no token string contains, are not compiled
+    into the automaton and are listed in `decoded_end_strings`, to be matched against the decoded text instead.
+
+    Args:
+        token_strings (List[str]): string of every token of the vocabulary
+        end_strings (List[str]): the list of end of generation strings
+    """
+
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, token_strings: List[str], end_strings: List[str]):
+        end_strings = [end_string for end_string in end_strings if end_string]
+        token_chars = set(''.join(token_strings))
+        # with tokens of partial characters, any non-ASCII character may be generated without a token string for it
+        has_partial_chars = _REPLACEMENT_CHAR in token_chars
+        self.decoded_end_strings = [
+            end_string
+            for end_string in end_strings
+            if not token_chars.issuperset(end_string) or (has_partial_chars and not end_string.isascii())
+        ]
+        if self.decoded_end_strings:
+            logging.warning(
+                f"End strings {self.decoded_end_strings} can not be matched token by token and are matched against "
+                "the decoded text, which is slower"
+            )
+        end_strings = [end_string for end_string in end_strings if end_string not in self.decoded_end_strings]
+        transitions, is_match, alphabet = _build_automaton(end_strings)
+        num_states, other_char = transitions.shape[0], len(alphabet)
+        max_len = max((len(end_string) for end_string in end_strings), default=0)
+
+        # only the last `max_len` characters of a token can be part of a state, and the state reached after a token
+        # with at least `max_len` characters does not depend on the previous state
+        tails = np.full([len(token_strings), max_len], -1, dtype=np.int64)
+        is_long = np.zeros(len(token_strings), dtype=bool)
+        for token, string in enumerate(token_strings):
+            tail = string[-max_len:] if max_len > 0 else ''
+            if tail:
+                tails[token, max_len - len(tail) :] = [alphabet.get(char, other_char) for char in tail]
+            is_long[token] = len(string) >= max_len
+
+        token_transitions = np.empty([num_states, len(token_strings)], dtype=np.int32)
+        for state in range(num_states):
+            states = np.where(is_long, 0, state)
+            for column in tails.T:
+                states = np.where(column >= 0, transitions[states, np.maximum(column, 0)], states)
+            token_transitions[state] = states
+
+        self.end_strings = end_strings
+        self.token_transitions = torch.from_numpy(token_transitions)
+        self.is_match = torch.from_numpy(is_match)
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer, end_strings: List[str]) -> 'EndStringMatcher':
+        """
+        Returns the matcher of a set of end strings for a tokenizer. Matchers are cached for every tokenizer,
+        so that the vocabulary is only decoded once.
+        """
+        if tokenizer not in cls._cache:
+            prefix_ids = tokenizer.text_to_ids(_DECODING_PREFIX)
+            prefix_text = tokenizer.ids_to_text(prefix_ids)
+            texts = tokenizer.ids_to_text_batch([prefix_ids + [token] for token in range(tokenizer.vocab_size)])
+            token_strings = [
+                text[len(prefix_text) :] if text.startswith(prefix_text) else tokenizer.ids_to_text([token])
+                for token, text in enumerate(texts)
+            ]
+            cls._cache[tokenizer] = {'token_strings': token_strings, 'matchers': {}}
+
+        cache = cls._cache[tokenizer]
+        key = tuple(sorted(set(end_strings)))
+        if key not in cache['matchers']:
+            cache['matchers'][key] = cls(cache['token_strings'], list(key))
+        return cache['matchers'][key]
+
+    def to(self, device: torch.device) -> 'EndStringMatcher':
+        """Moves the transition tables to `device`."""
+        if self.token_transitions.device != device:
+            self.token_transitions = self.token_transitions.to(device)
+            self.is_match = self.is_match.to(device)
+        return self
+
+    def init_state(self, tokens: torch.Tensor) -> torch.Tensor:
+        """
+        Returns the state of every sequence after reading the tokens of shape [batch_size, num_tokens].
+        """
+        self.to(tokens.device)
+        state = torch.zeros(tokens.size(0), dtype=torch.long, device=tokens.device)
+        for idx in range(tokens.size(1)):
+            state = self.advance(state, tokens[:, idx])
+        return state
+
+    def advance(self, state: torch.Tensor, tokens: torch.Tensor) -> torch.Tensor:
+        """
+        Returns the state of every sequence after reading one more token, `tokens` is of shape [batch_size].
+        """
+        return self.token_transitions[state, tokens.long()].long()
+
+    def is_end(self, state: torch.Tensor) -> torch.Tensor:
+        """
+        Returns whether the text of every sequence ends with one of the end strings.
+        """
+        return self.is_match[state]
@@ -23,6 +23,7 @@ import torch
 from transformers import CLIPImageProcessor
 
 from nemo.collections.common.tokenizers.chat_template_mixin import explode_chat_template_input, is_chat_input
+from nemo.collections.nlp.modules.common.end_string_matcher import EndStringMatcher
 from nemo.collections.nlp.modules.common.lm_utils import pad_batch
 from nemo.collections.nlp.modules.common.megatron.module import Float16Module
 from nemo.collections.nlp.modules.common.megatron.utils import get_ltor_masks_and_position_ids
@@ -66,6 +67,7 @@ class TextGenerationStrategy:
             )
             self.model.eval()
         self._end_of_generation_cache = None
+        self._end_string_state = None
 
     def forward_step(self, batch, tensor_shape):
         fwd_bwd_function = get_forward_backward_func()
@@ -185,19 +187,53 @@ class TextGenerationStrategy:
         is_end = torch.isin(prev, torch.tensor(list(end_tokens), dtype=prev.dtype, device=prev.device))
 
         if end_strings_to_check:
-            # The loop below is inefficient (see warning in `_get_end_of_generation_tokens_and_strings()`)
-            # TODO In addition, we will not stop if the model generates an end string followed by extra characters,
+            # Equivalent to checking `ids_to_text(token_seq).endswith(end_string)` for every sequence, but the state
+            # of the matcher is advanced with the last token only (see `EndStringMatcher`).
+            # TODO We will not stop if the model generates an end string followed by extra characters,
             # e.g., if `end_string` is "Done" and there exists a "Done!" token it could generate tokens
             #       [..., ".", "Done!"]
             # which would fail the `endswith("Done")` check. However, stopping when "Done!" is generated would not
             # work either, since we would need to post-process the generated string to truncate the extra "!".
             # ==> this is left for future work if there is a compelling use case requiring this feature.
-            for idx, token_seq in enumerate(tokens):
-                text = self.model.tokenizer.ids_to_text(token_seq.tolist())
-                is_end[idx] |= any(text.endswith(end_string) for end_string in end_strings_to_check)
+            matcher = EndStringMatcher.from_tokenizer(self.model.tokenizer, end_strings_to_check)
+            if matcher.end_strings:
+                # `tokens` are views of the token buffer of the generation, which is kept alive by the state so that
+                # the buffer of another generation can not be mistaken for it
+                tokens_buffer = tokens if tokens._base is None else tokens._base
+                state = self._end_string_state
+                if (
+                    state is not None
+                    and state['matcher'] is matcher
+                    and state['tokens_buffer'] is tokens_buffer
+                    and state['num_tokens'] == tokens.size(1) - 1
+                    and state['state'].size(0) == tokens.size(0)
+                ):
+                    matcher_state = matcher.advance(state['state'], tokens[:, -1])
+                else:
+                    matcher_state = matcher.init_state(tokens)
+                self._end_string_state = {
+                    'matcher': matcher,
+                    'tokens_buffer': tokens_buffer,
+                    'num_tokens': tokens.size(1),
+                    'state': matcher_state,
+                }
+                is_end |= matcher.is_end(matcher_state)
+
+            if matcher.decoded_end_strings:
+                # end strings which the strings of single tokens can not represent, e.g. with characters produced by
+                # byte fallback tokens, are matched against the decoded text
+                for idx, token_seq in enumerate(tokens):
+                    text = self.model.tokenizer.ids_to_text(token_seq.tolist())
+                    is_end[idx] |= any(text.endswith(end_string) for end_string in matcher.decoded_end_strings)
 
         return is_end
 
+    def reset_end_of_generation_state(self):
+        """
+        Forgets the end string matching state of the previous generation, must be called after `init_batch`.
+        """
+        self._end_string_state = None
+
     def post_generation_process(self, output):
         """
         At the end of the text generation, post process the results
@@ -258,8 +294,9 @@ class TextGenerationStrategy:
             else:
                 # No special token.
                 warnings.warn(
-                    f"The end string '{end_string}' has no associated special token: this may slow down "
-                    "generation (consider using a different tokenizer or modifying `end_strings`)"
+                    f"The end string '{end_string}' has no associated special token: it is matched against the "
+                    "decoded tokens, which may slow down the start of generation (consider using a different "
+                    "tokenizer or modifying `end_strings`)"
                 )
                 self._end_of_generation_cache["end_strings_to_check"].add(end_string)
                 end_strings_to_check.append(end_string)
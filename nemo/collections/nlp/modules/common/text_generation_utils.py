@@ -940,6 +940,7 @@ def sample_sequence_batch(
 
         else:
             inference_strategy.init_batch(context_tokens, context_length, compute_attention_mask)
+        inference_strategy.reset_end_of_generation_state()
         # added eos_id to support the function generate_samples_eval that passes
         # eos_id as an argument and needs termination when that id id found.
         eod_id = tokenizer.eos_id
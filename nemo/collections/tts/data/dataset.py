@@ -34,6 +34,7 @@ from nemo.collections.common.tokenizers.text_to_speech.tts_tokenizers import (
     EnglishCharsTokenizer,
     EnglishPhonemesTokenizer,
 )
+from nemo.collections.tts.parts.utils.text_normalization_cache import CachedTextNormalizer
 from nemo.collections.tts.parts.utils.tts_dataset_utils import (
     BetaBinomialInterpolator,
     beta_binomial_prior_distribution,
@@ -109,6 +110,7 @@ class TTSDataset(Dataset):
         pitch_augment: bool = False,
         cache_pitch_augment: bool = True,
         pad_multiple: int = 1,
+        text_normalizer_num_workers: int = 1,
         **kwargs,
     ):
         """Dataset which can be used for training spectrogram generators and end-to-end TTS models.
@@ -174,6 +176,7 @@ class TTSDataset(Dataset):
             pitch_augment (bool): Whether to apply pitch-shift transform and return a pitch-shifted audio. If set as False, audio_shifted will be None (used in SSLDisentangler)
             cache_pitch_augment (bool): Whether to cache pitch augmented audio or not. Defaults to False (used in SSLDisentangler)
             pad_multiple (int): If audio length is not divisible by pad_multiple, pad the audio with zeros to make it divisible by pad_multiple (used in SSLDisentangler)
+            text_normalizer_num_workers (int): Number of processes normalizing the texts of the manifests which are not normalized yet. If -1, all CPUs are used. Defaults to 1.
             pitch_norm (Optional[bool]): Whether to normalize pitch or not. If True, requires providing either
                 pitch_stats_path or (pitch_mean and pitch_std).
             pitch_stats_path (Optional[Path, str]): Path to file containing speaker level pitch statistics.
@@ -208,7 +211,8 @@ class TTSDataset(Dataset):
                 "If you wish to continue without text normalization, please remove the text_normalizer part in your TTS yaml file."
             )
         else:
-            self.text_normalizer_call = (
+            # repeated transcripts are normalized once
+            self.text_normalizer_call = CachedTextNormalizer(
                 self.text_normalizer.normalize
                 if isinstance(self.text_normalizer, Normalizer)
                 else self.text_normalizer
@@ -224,6 +228,7 @@ class TTSDataset(Dataset):
         self.lengths = []  # Needed for BucketSampling
 
         data = []
+        texts_to_normalize = []
         total_duration = 0
         for manifest_file in self.manifest_filepath:
             with open(Path(manifest_file).expanduser(), 'r') as f:
@@ -244,13 +249,9 @@ class TTSDataset(Dataset):
                     elif "text_normalized" in item:
                         file_info["normalized_text"] = item["text_normalized"]
                     else:
-                        text = item["text"]
+                        file_info["normalized_text"] = item["text"]
                         if self.text_normalizer is not None:
-                            text = self.text_normalizer_call(text, **self.text_normalizer_call_kwargs)
-                        file_info["normalized_text"] = text
-
-                    if self.cache_text:
-                        file_info["text_tokens"] = self.text_tokenizer(file_info["normalized_text"])
+                            texts_to_normalize.append(file_info)
 
                     data.append(file_info)
                     # Calculating length of spectrogram from input audio for batch sampling
@@ -265,6 +266,21 @@ class TTSDataset(Dataset):
                     if total_duration is not None:
                         total_duration += item["duration"]
 
+        # Texts are normalized together, across processes if requested
+        if texts_to_normalize:
+            logging.info(f"Normalizing {len(texts_to_normalize)} texts.")
+            normalized_texts = self.text_normalizer_call.normalize_batch(
+                [file_info["normalized_text"] for file_info in texts_to_normalize],
+                num_workers=text_normalizer_num_workers,
+                **self.text_normalizer_call_kwargs,
+            )
+            for file_info, normalized_text in zip(texts_to_normalize, normalized_texts):
+                file_info["normalized_text"] = normalized_text
+
+        if self.cache_text:
+            for file_info in data:
+                file_info["text_tokens"] = self.text_tokenizer(file_info["normalized_text"])
+
         logging.info(f"Loaded dataset with {len(data)} files.")
         if total_duration is not None:
             logging.info(f"Dataset contains {total_duration / 3600:.2f} hours.")
@@ -15,7 +15,7 @@
 import itertools
 from math import ceil
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 import torch
 import torch.nn.functional as F
@@ -317,6 +317,93 @@ class AudioCodecModel(ModelPT):
 
         return audio, audio_len
 
+    @staticmethod
+    def _get_chunks(num_frames: int, chunk_frames: int, overlap_frames: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Yields the frames `[start, end)` of every chunk, and the frames `[context_start, context_end)` processed
+        for it, with up to `overlap_frames` frames of context on each side.
+        """
+        if chunk_frames <= 0 or overlap_frames < 0:
+            raise ValueError(f'Invalid chunk size {chunk_frames} or overlap {overlap_frames}, in frames.')
+        for start in range(0, num_frames, chunk_frames):
+            end = min(start + chunk_frames, num_frames)
+            yield start, end, max(0, start - overlap_frames), min(num_frames, end + overlap_frames)
+
+    @torch.no_grad()
+    def encode_chunked(
+        self, audio: torch.Tensor, audio_len: torch.Tensor, chunk_frames: int = 1024, overlap_frames: int = 64
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Convert long input audio into tokens chunk by chunk, so that memory does not grow with the audio length.
+
+        Every chunk of `chunk_frames` frames is encoded with `overlap_frames` frames of audio before and after it as
+        context, and only the tokens of the chunk itself are kept. Every token is thus computed by exactly one chunk,
+        and with `overlap_frames` covering the receptive field of the encoder the tokens are those of `encode`.
+
+        Args:
+            audio: input time-domain signal, shape `(batch, number of samples)`
+            audio_len: valid length for each example in the batch, shape `(batch size,)`
+            chunk_frames: number of frames encoded per chunk
+            overlap_frames: number of frames of context on each side of a chunk
+
+        Returns:
+            Tokens for each codebook for each frame, shape `(batch, number of codebooks, number of frames)`,
+            and the corresponding valid lengths, shape `(batch,)`
+        """
+        audio, audio_len = self.pad_audio(audio, audio_len)
+        tokens_len = audio_len // self.samples_per_frame
+        num_frames = audio.shape[1] // self.samples_per_frame
+
+        tokens = None
+        for start, end, context_start, context_end in self._get_chunks(num_frames, chunk_frames, overlap_frames):
+            chunk_audio = audio[:, context_start * self.samples_per_frame : context_end * self.samples_per_frame]
+            chunk_audio_len = (audio_len - context_start * self.samples_per_frame).clamp(
+                min=self.samples_per_frame, max=chunk_audio.shape[1]
+            )
+            chunk_tokens, _ = self.encode(audio=chunk_audio, audio_len=chunk_audio_len)
+            if tokens is None:
+                tokens = chunk_tokens.new_zeros(chunk_tokens.shape[0], chunk_tokens.shape[1], num_frames)
+            tokens[:, :, start:end] = chunk_tokens[:, :, start - context_start : end - context_start]
+        return tokens, tokens_len
+
+    @torch.no_grad()
+    def stream_decode(
+        self, tokens: torch.Tensor, tokens_len: torch.Tensor, chunk_frames: int = 1024, overlap_frames: int = 64
+    ) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """Convert tokens into time-domain audio chunk by chunk, yielding the audio of every chunk as it is decoded.
+
+        Like `encode_chunked`, every chunk is decoded with `overlap_frames` frames of tokens before and after it as
+        context, and only the audio of the chunk itself is kept.
+
+        Args:
+            tokens: discrete tokens for each codebook for each time frame, shape `(batch, number of codebooks, number of frames)`
+            tokens_len: valid lengths, shape `(batch,)`
+            chunk_frames: number of frames decoded per chunk
+            overlap_frames: number of frames of context on each side of a chunk
+
+        Yields:
+            Decoded `audio` of a chunk, shape `(batch, chunk_frames * samples_per_frame)` except for the last chunk,
+            and its valid length in number of samples `audio_len`, 0 for examples ending before the chunk.
+        """
+        for start, end, context_start, context_end in self._get_chunks(tokens.shape[2], chunk_frames, overlap_frames):
+            chunk_tokens_len = (tokens_len - context_start).clamp(min=1, max=context_end - context_start)
+            chunk_audio, _ = self.decode(tokens=tokens[:, :, context_start:context_end], tokens_len=chunk_tokens_len)
+            audio = chunk_audio[
+                :, (start - context_start) * self.samples_per_frame : (end - context_start) * self.samples_per_frame
+            ]
+            audio_len = (tokens_len - start).clamp(min=0, max=end - start) * self.samples_per_frame
+            yield audio, audio_len
+
+    def decode_chunked(
+        self, tokens: torch.Tensor, tokens_len: torch.Tensor, chunk_frames: int = 1024, overlap_frames: int = 64
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Convert tokens into time-domain audio chunk by chunk, see `stream_decode`.
+
+        Returns:
+            Decoded output `audio` in the time domain and its length in number of samples `audio_len`.
+        """
+        chunks = self.stream_decode(tokens, tokens_len, chunk_frames, overlap_frames)
+        audio = torch.cat([chunk_audio for chunk_audio, _ in chunks], dim=1)
+        return audio, tokens_len * self.samples_per_frame
+
     @typecheck(
         input_types={
             "audio": NeuralType(('B', 'T_audio'), AudioSignal()),
@@ -19,10 +19,11 @@ from typing import List, Optional
 
 import torch
 from hydra.utils import instantiate
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from tqdm import tqdm
 
 from nemo.collections.tts.parts.utils.helpers import OperationMode
+from nemo.collections.tts.parts.utils.text_normalization_cache import CachedTextNormalizer
 from nemo.core.classes import ModelPT
 from nemo.core.classes.common import PretrainedModelInfo, typecheck
 from nemo.core.neural_types.elements import AudioSignal
@@ -55,7 +56,14 @@ class NeedsNormalizer:
                 )
 
             self.normalizer = instantiate(cfg.text_normalizer, **normalizer_kwargs)
-            self.text_normalizer_call = self.normalizer.normalize
+            # normalized sentences are memoized, in memory and optionally on disk, as normalization is expensive
+            self.text_normalizer_call = CachedTextNormalizer(
+                self.normalizer.normalize,
+                cache_size=cfg.get("text_normalizer_cache_size", 1024),
+                cache_dir=cfg.get("text_normalizer_cache_dir", None),
+                config=OmegaConf.to_yaml(cfg.text_normalizer),
+                split_sentences=cfg.get("text_normalizer_split_sentences", False),
+            )
             if "text_normalizer_call_kwargs" in cfg:
                 self.text_normalizer_call_kwargs = cfg.text_normalizer_call_kwargs
 
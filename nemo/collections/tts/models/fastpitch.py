@@ -14,7 +14,7 @@
 import contextlib
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import torch
 from hydra.utils import instantiate
@@ -155,6 +155,7 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
         speaker_emb_condition_aligner = cfg.get("speaker_emb_condition_aligner", False)
         min_token_duration = cfg.get("min_token_duration", 0)
         use_log_energy = cfg.get("use_log_energy", True)
+        use_torch_mas = cfg.get("use_torch_mas", False)
         if n_speakers > 1 and "add" not in input_fft.cond_input.condition_types:
             input_fft.cond_input.condition_types.append("add")
         if speaker_emb_condition_prosody:
@@ -181,6 +182,7 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
             min_token_duration,
             cfg.max_token_duration,
             use_log_energy,
+            use_torch_mas,
         )
         self._input_types = self._output_types = None
         self.export_config = {
@@ -266,12 +268,17 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
             )
         return self._parser
 
-    def parse(self, str_input: str, normalize=True) -> torch.tensor:
+    def parse(self, str_input: Union[str, List[str]], normalize=True) -> torch.tensor:
+        """
+        Tokenizes a text into a tensor of shape [1, T], or a list of texts into a tensor of shape [B, T] padded with
+        the padding index of the encoder, which masks the padding.
+        """
         if self.training:
             logging.warning("parse() is meant to be called in eval mode.")
 
+        texts = [str_input] if isinstance(str_input, str) else list(str_input)
         if normalize and self.text_normalizer_call is not None:
-            str_input = self.text_normalizer_call(str_input, **self.text_normalizer_call_kwargs)
+            texts = [self.text_normalizer_call(text, **self.text_normalizer_call_kwargs) for text in texts]
 
         if self.learn_alignment:
             eval_phon_mode = contextlib.nullcontext()
@@ -280,12 +287,21 @@ class FastPitchModel(SpectrogramGenerator, Exportable, FastPitchAdapterModelMixi
 
             # Disable mixed g2p representation if necessary
             with eval_phon_mode:
-                tokens = self.parser(str_input)
+                if hasattr(self.vocab, "encode_batch"):
+                    x, _ = self.vocab.encode_batch(texts)
+                    return x.to(self.device)
+                tokens = [self.parser(text) for text in texts]
         else:
-            tokens = self.parser(str_input)
+            tokens = [self.parser(text) for text in texts]
 
-        x = torch.tensor(tokens).unsqueeze_(0).long().to(self.device)
-        return x
+        x = torch.full(
+            (len(tokens), max((len(ids) for ids in tokens), default=0)),
+            self.fastpitch.encoder.padding_idx,
+            dtype=torch.long,
+        )
+        for idx, ids in enumerate(tokens):
+            x[idx, : len(ids)] = torch.tensor(ids, dtype=torch.long)
+        return x.to(self.device)
 
     @typecheck(
         input_types={
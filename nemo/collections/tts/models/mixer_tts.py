@@ -93,6 +93,8 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
         self.bin_loss_scale = 0.0
         self.bin_loss_start_ratio = cfg.bin_loss_start_ratio
         self.bin_loss_warmup_epochs = cfg.bin_loss_warmup_epochs
+        # binarize the attention on its device with `batched_mas_width1`, faster on GPU but slower on CPU
+        self.use_torch_mas = cfg.get("use_torch_mas", False)
 
         self.cond_on_lm_embeddings = cfg.get("cond_on_lm_embeddings", False)
 
@@ -253,7 +255,7 @@ class MixerTTSModel(SpectrogramGenerator, Exportable):
             mask=text_mask == 0,
             attn_prior=attn_prior,
         )
-        attn_hard = binarize_attention_parallel(attn_soft, text_len, spect_len)
+        attn_hard = binarize_attention_parallel(attn_soft, text_len, spect_len, self.use_torch_mas)
         attn_hard_dur = attn_hard.sum(2)[:, 0, :]
         assert torch.all(torch.eq(attn_hard_dur.sum(dim=1), spect_len))
         return attn_soft, attn_logprob, attn_hard, attn_hard_dur
@@ -119,15 +119,16 @@ class AlignmentEncoder(torch.nn.Module):
         return cosine_dist
 
     @staticmethod
-    def get_durations(attn_soft, text_len, spect_len):
+    def get_durations(attn_soft, text_len, spect_len, use_torch_mas=False):
         """Calculation of durations.
 
         Args:
             attn_soft (torch.tensor): B x 1 x T1 x T2 tensor.
             text_len (torch.tensor): B tensor, lengths of text.
             spect_len (torch.tensor): B tensor, lengths of mel spectrogram.
+            use_torch_mas (bool): binarize the attention on its device, see `binarize_attention_parallel`.
         """
-        attn_hard = binarize_attention_parallel(attn_soft, text_len, spect_len)
+        attn_hard = binarize_attention_parallel(attn_soft, text_len, spect_len, use_torch_mas)
         durations = attn_hard.sum(2)[:, 0, :]
         assert torch.all(torch.eq(durations.sum(dim=1), spect_len))
         return durations
@@ -172,6 +172,7 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         min_token_duration: int = 0,
         max_token_duration: int = 75,
         use_log_energy: bool = True,
+        use_torch_mas: bool = False,
     ):
         super().__init__()
 
@@ -186,6 +187,8 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
         self.use_duration_predictor = True
         self.binarize = False
         self.use_log_energy = use_log_energy
+        # binarize the attention on its device with `batched_mas_width1`, faster on GPU but slower on CPU
+        self.use_torch_mas = use_torch_mas
 
         # TODO: combine self.speaker_emb with self.speaker_encoder
         # cfg: remove `n_speakers`, create `speaker_encoder.lookup_module`
@@ -311,7 +314,7 @@ class FastPitchModule(NeuralModule, adapter_mixins.AdapterModuleMixin):
             attn_soft, attn_logprob = self.aligner(
                 spec, text_emb.permute(0, 2, 1), enc_mask == 0, attn_prior, conditioning=spk_emb
             )
-            attn_hard = binarize_attention_parallel(attn_soft, input_lens, mel_lens)
+            attn_hard = binarize_attention_parallel(attn_soft, input_lens, mel_lens, self.use_torch_mas)
             attn_hard_dur = attn_hard.sum(2)[:, 0, :]
 
         # Predict pitch
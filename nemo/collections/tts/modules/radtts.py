@@ -26,7 +26,12 @@ from nemo.collections.tts.modules.common import (
     LinearNorm,
     get_radtts_encoder,
 )
-from nemo.collections.tts.parts.utils.helpers import get_mask_from_lengths, mas_width1, regulate_len
+from nemo.collections.tts.parts.utils.helpers import (
+    batched_mas_width1,
+    get_mask_from_lengths,
+    mas_width1,
+    regulate_len,
+)
 from nemo.core.classes import Exportable, NeuralModule
 from nemo.core.neural_types.elements import Index, LengthsType, MelSpectrogramType, TokenDurationType, TokenIndex
 from nemo.core.neural_types.neural_type import NeuralType
@@ -133,6 +138,8 @@ class RadTTSModule(NeuralModule, Exportable):
     dur_model_config: model configuration for duration
     f0_model_config: model configuration for Pitch
     energy_model_config: model configuration for energy
+    use_torch_mas (bool): binarize attention with `batched_mas_width1` on the device of the attention, which is
+        faster on GPU than `mas_width1` on the host but slower on CPU
     """
 
     def __init__(
@@ -167,6 +174,7 @@ class RadTTSModule(NeuralModule, Exportable):
         use_first_order_features=False,
         unvoiced_bias_activation='',
         ap_pred_log_f0=False,
+        use_torch_mas=False,
         **kwargs,
     ):
         super(RadTTSModule, self).__init__()
@@ -192,6 +200,7 @@ class RadTTSModule(NeuralModule, Exportable):
         self.use_first_order_features = bool(use_first_order_features)
         self.decoder_use_unvoiced_bias = kwargs['decoder_use_unvoiced_bias']
         self.ap_pred_log_f0 = ap_pred_log_f0
+        self.use_torch_mas = bool(use_torch_mas)
         self.ap_use_unvoiced_bias = kwargs['ap_use_unvoiced_bias']
 
         if 'atn' in include_modules or 'dec' in include_modules:
@@ -392,6 +401,8 @@ class RadTTSModule(NeuralModule, Exportable):
         """
         b_size = attn.shape[0]
         with torch.no_grad():
+            if self.use_torch_mas:
+                return batched_mas_width1(attn.data, in_lens, out_lens)
             attn_cpu = attn.data.cpu().numpy()
             attn_out = torch.zeros_like(attn)
             for ind in range(b_size):
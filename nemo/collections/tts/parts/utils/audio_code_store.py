@@ -0,0 +1,149 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+__all__ = ['AudioCodeStore', 'AudioCodeStoreWriter']
+
+METADATA_FILENAME = 'metadata.json'
+INDEX_FILENAME = 'index.npy'
+
+
+def _shard_filename(shard: int) -> str:
+    return f'shard_{shard:05d}.bin'
+
+
+class AudioCodeStoreWriter:
+    """
+    Writes the audio codec tokens of many utterances into a store, read back with `AudioCodeStore`.
+
+    The store is a directory of shards, each holding the raw tokens of consecutive utterances, every utterance
+    as a `(number of frames, number of codebooks)` array so that a range of frames is contiguous. A new shard
+    is started once a shard holds `max_shard_frames` frames. The location of every utterance is in `index.npy`.
+
+    Args:
+        path: directory of the store, created if needed.
+        num_codebooks: number of codebooks of the tokens.
+        dtype: integer type the tokens are stored as, which must hold all token values.
+        max_shard_frames: number of frames after which a new shard is started.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], num_codebooks: int, dtype: str = 'int16', max_shard_frames: int = 2**24
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.num_codebooks = num_codebooks
+        self.dtype = np.dtype(dtype)
+        self.max_shard_frames = max_shard_frames
+
+        # shard, frame offset in the shard and number of frames of every utterance
+        self._index: List[List[int]] = []
+        self._shard = 0
+        self._shard_frames = 0
+        self._file = open(self.path / _shard_filename(self._shard), 'wb')
+
+    def __enter__(self) -> 'AudioCodeStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self._file.close()
+
+    def add(self, tokens: np.ndarray) -> int:
+        """
+        Adds the tokens of an utterance, of shape `(number of codebooks, number of frames)`.
+
+        Returns:
+            Index of the utterance in the store.
+        """
+        if tokens.ndim != 2 or tokens.shape[0] != self.num_codebooks:
+            raise ValueError(f'Expected tokens of shape ({self.num_codebooks}, number of frames), got {tokens.shape}')
+        info = np.iinfo(self.dtype)
+        if tokens.size and (tokens.min() < info.min or tokens.max() > info.max):
+            raise ValueError(f'Tokens in [{tokens.min()}, {tokens.max()}] do not fit in {self.dtype}')
+
+        if self._shard_frames > 0 and self._shard_frames + tokens.shape[1] > self.max_shard_frames:
+            self._file.close()
+            self._shard += 1
+            self._shard_frames = 0
+            self._file = open(self.path / _shard_filename(self._shard), 'wb')
+
+        self._file.write(np.ascontiguousarray(tokens.T, dtype=self.dtype).tobytes())
+        self._index.append([self._shard, self._shard_frames, tokens.shape[1]])
+        self._shard_frames += tokens.shape[1]
+        return len(self._index) - 1
+
+    def finalize(self):
+        """Closes the last shard, and writes the index and metadata of the store."""
+        self._file.close()
+        np.save(self.path / INDEX_FILENAME, np.array(self._index, dtype=np.int64).reshape(-1, 3))
+        metadata = {'num_codebooks': self.num_codebooks, 'dtype': self.dtype.name, 'num_shards': self._shard + 1}
+        with open(self.path / METADATA_FILENAME, 'w') as f:
+            json.dump(metadata, f)
+
+
+class AudioCodeStore:
+    """
+    Reads audio codec tokens written by `AudioCodeStoreWriter`. Shards are memory-mapped when first read, so that
+    opening a store is cheap and tokens are only read from disk when accessed.
+
+    Args:
+        path: directory of the store.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path / METADATA_FILENAME) as f:
+            metadata = json.load(f)
+        self.num_codebooks = metadata['num_codebooks']
+        self.dtype = np.dtype(metadata['dtype'])
+        self.index = np.load(self.path / INDEX_FILENAME, mmap_mode='r')
+        self._shards: Dict[int, np.memmap] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def num_frames(self) -> np.ndarray:
+        """Number of frames of every utterance."""
+        return self.index[:, 2]
+
+    def _get_shard(self, shard: int) -> np.ndarray:
+        if shard not in self._shards:
+            filename = self.path / _shard_filename(shard)
+            if filename.stat().st_size == 0:
+                self._shards[shard] = np.empty((0, self.num_codebooks), dtype=self.dtype)
+            else:
+                self._shards[shard] = np.memmap(filename, dtype=self.dtype, mode='r').reshape(-1, self.num_codebooks)
+        return self._shards[shard]
+
+    def get(self, idx: int, start: int = 0, length: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the tokens of frames `[start, start + length)` of utterance `idx`, of shape
+        `(number of codebooks, number of frames)`, as a view of the memory-mapped shard.
+        """
+        shard, offset, num_frames = (int(value) for value in self.index[idx])
+        start = min(max(start, 0), num_frames)
+        end = num_frames if length is None else min(start + length, num_frames)
+        return self._get_shard(shard)[offset + start : offset + end].T
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.get(idx)
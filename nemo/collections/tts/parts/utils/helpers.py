@@ -100,19 +100,23 @@ def get_num_workers(trainer):
     return trainer.num_devices * trainer.num_nodes
 
 
-def binarize_attention(attn, in_len, out_len):
+def binarize_attention(attn, in_len, out_len, use_torch_mas: bool = False):
     """Convert soft attention matrix to hard attention matrix.
 
     Args:
         attn (torch.Tensor): B x 1 x max_mel_len x max_text_len. Soft attention matrix.
         in_len (torch.Tensor): B. Lengths of texts.
         out_len (torch.Tensor): B. Lengths of spectrograms.
+        use_torch_mas (bool): run MAS with `batched_mas_width1` on the device of the attention, which avoids the copy
+            to the host and is faster on GPU, but slower than numba on CPU.
 
     Output:
         attn_out (torch.Tensor): B x 1 x max_mel_len x max_text_len. Hard attention matrix, final dim max_text_len should sum to 1.
     """
     b_size = attn.shape[0]
     with torch.no_grad():
+        if use_torch_mas:
+            return batched_mas_width1(torch.log(attn.data), in_len, out_len)
         attn_cpu = attn.data.cpu().numpy()
         attn_out = torch.zeros_like(attn)
         for ind in range(b_size):
@@ -121,14 +125,18 @@ def binarize_attention(attn, in_len, out_len):
     return attn_out
 
 
-def binarize_attention_parallel(attn, in_lens, out_lens):
+def binarize_attention_parallel(attn, in_lens, out_lens, use_torch_mas: bool = False):
     """For training purposes only. Binarizes attention with MAS.
        These will no longer receive a gradient.
 
     Args:
         attn: B x 1 x max_mel_len x max_text_len
+        use_torch_mas (bool): run MAS with `batched_mas_width1` on the device of the attention instead of `b_mas`
+            on the host, which is faster on GPU but slower on CPU.
     """
     with torch.no_grad():
+        if use_torch_mas:
+            return batched_mas_width1(torch.log(attn.data), in_lens, out_lens)
         log_attn_cpu = torch.log(attn.data).cpu().numpy()
         attn_out = b_mas(log_attn_cpu, in_lens.cpu().numpy(), out_lens.cpu().numpy(), width=1)
     return torch.from_numpy(attn_out).to(attn.device)
@@ -251,6 +259,55 @@ def mas_width1(log_attn_map):
     return opt
 
 
+def batched_mas_width1(log_attn_map: torch.Tensor, in_lens: torch.Tensor, out_lens: torch.Tensor) -> torch.Tensor:
+    """Batched `mas_width1` on the device of the attention, which gives the same alignments as `b_mas`.
+
+    The best path score of a mel frame only depends on the scores of the previous frame, so the dynamic programming
+    runs over mel frames with all texts and text tokens at once, and the path is then traced back for all texts
+    at once. Padding beyond the lengths is ignored, since the scores of the valid area never depend on it.
+
+    Args:
+        log_attn_map: B x 1 x max_mel_len x max_text_len. Log of the soft attention matrix.
+        in_lens: B. Lengths of texts.
+        out_lens: B. Lengths of spectrograms.
+
+    Returns:
+        B x 1 x max_mel_len x max_text_len hard attention matrix, with a single 1 per mel frame.
+    """
+    log_attn_map = log_attn_map[:, 0]
+    batch_size, max_mel_len, max_text_len = log_attn_map.shape
+    device = log_attn_map.device
+    in_lens = in_lens.to(device=device, dtype=torch.long)
+    out_lens = out_lens.to(device=device, dtype=torch.long)
+    neg_inf = torch.tensor(-float('inf'), dtype=log_attn_map.dtype, device=device)
+
+    log_p = torch.empty_like(log_attn_map)
+    log_p[:, 0] = log_attn_map[:, 0]
+    log_p[:, 0, 1:] = neg_inf
+    for i in range(1, max_mel_len):
+        prev_log = log_p[:, i - 1]
+        prev_log_diag = torch.cat([neg_inf.expand(batch_size, 1), prev_log[:, :-1]], dim=1)
+        log_p[:, i] = log_attn_map[:, i] + torch.maximum(prev_log_diag, prev_log)
+
+    # whether the path to (i, j) comes from (i - 1, j - 1), ties go to the diagonal like in mas_width1
+    from_diag = torch.zeros_like(log_p, dtype=torch.bool)
+    from_diag[:, 1:, 1:] = log_p[:, :-1, :-1] >= log_p[:, :-1, 1:]
+
+    text_idx = (in_lens - 1).clamp(min=0)
+    path = torch.empty(batch_size, max_mel_len, dtype=torch.long, device=device)
+    for i in range(max_mel_len - 1, 0, -1):
+        path[:, i] = text_idx
+        move = from_diag[:, i].gather(1, text_idx.unsqueeze(1)).squeeze(1) & (i < out_lens)
+        text_idx = text_idx - move.long()
+    path[:, 0] = text_idx
+
+    attn_out = torch.zeros_like(log_attn_map)
+    attn_out.scatter_(2, path.unsqueeze(2), 1)
+    mel_mask = torch.arange(max_mel_len, device=device).unsqueeze(0) < out_lens.unsqueeze(1)
+    attn_out *= (mel_mask & (in_lens > 0).unsqueeze(1)).unsqueeze(2)
+    return attn_out.unsqueeze(1)
+
+
 @jit(nopython=True, parallel=True)
 def b_mas(b_log_attn_map, in_lens, out_lens, width=1):
     assert width == 1
@@ -0,0 +1,260 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import torch
+
+from nemo.utils import logging
+
+__all__ = ['StreamingMetrics', 'StreamingTTS', 'split_text_for_streaming']
+
+_SENTENCE_END = re.compile(r'(?<=[.!?;…])\s+')
+_PHRASE_END = re.compile(r'(?<=[,:—])\s+')
+
+
+def _merge_pieces(pieces: List[str], max_chars: int) -> List[str]:
+    """Greedily joins consecutive pieces with a space, as long as the result has at most `max_chars` characters."""
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] = f'{chunks[-1]} {piece}'
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def split_text_for_streaming(text: str, max_chars: int = 200) -> List[str]:
+    """
+    Splits text into chunks which are synthesized one after the other when streaming.
+
+    Every sentence is a chunk, so that the first audio is available once the first sentence is synthesized.
+    Sentences longer than `max_chars` are split at phrase boundaries (commas, colons, dashes) into chunks of
+    at most `max_chars` characters, and phrases which are still longer are split at whitespace.
+
+    Args:
+        text: text to split.
+        max_chars: maximum number of characters of a chunk, unless it is a single word.
+
+    Returns:
+        List of chunks, whose concatenation with spaces is the text with normalized whitespace.
+    """
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        phrases = []
+        for phrase in _PHRASE_END.split(sentence):
+            if len(phrase) <= max_chars:
+                phrases.append(phrase)
+            else:
+                phrases.extend(_merge_pieces(phrase.split(), max_chars))
+        chunks.extend(_merge_pieces(phrases, max_chars))
+    return [chunk for chunk in chunks if chunk]
+
+
+@dataclass
+class StreamingMetrics:
+    """
+    Latency metrics of a streamed request, in seconds from the start of the synthesis.
+
+    Attributes:
+        first_chunk_latency: time until the first audio chunk was yielded.
+        synthesis_time: time until the last audio chunk was yielded.
+        audio_duration: duration of the audio yielded so far.
+        num_chunks: number of text chunks synthesized so far.
+    """
+
+    first_chunk_latency: Optional[float] = None
+    synthesis_time: float = 0.0
+    audio_duration: float = 0.0
+    num_chunks: int = 0
+
+    @property
+    def rtf(self) -> float:
+        """Real-time factor, the synthesis time divided by the duration of the audio."""
+        return self.synthesis_time / self.audio_duration if self.audio_duration > 0 else float('inf')
+
+
+@dataclass
+class _RequestState:
+    chunks: List[str]
+    speaker: Optional[int]
+    metrics: StreamingMetrics
+    # tokens of the previous chunk, the left context of the next one
+    prev_tokens: Optional[torch.Tensor] = None
+    # last frames of the previous mel chunk, vocoded again with the next chunk
+    prev_mel_tail: Optional[torch.Tensor] = None
+    # audio of `prev_mel_tail`, held back to be crossfaded with the audio of the next chunk
+    pending_audio: Optional[torch.Tensor] = None
+
+
+class StreamingTTS:
+    """
+    Streaming synthesis with a FastPitch spectrogram generator and a HiFiGAN vocoder.
+
+    Text is split at sentence and phrase boundaries (see `split_text_for_streaming`), and audio is yielded
+    chunk by chunk, so that time-to-first-audio is the synthesis time of the first chunk rather than of
+    the whole text.
+
+    - Spectrogram: every chunk is generated with the last `context_tokens` tokens of the previous chunk
+      prepended, for prosody across the boundary. The frames of the context tokens, known from the predicted
+      durations, are dropped.
+    - Audio: every mel chunk is vocoded with the last `overlap_frames` frames of the previous mel chunk
+      prepended. The audio of these frames is crossfaded with the tail of the previous audio chunk, which is
+      held back until then.
+
+    Concurrent requests are synthesized together: at every step the next chunk of every request is batched
+    through the spectrogram generator and the vocoder.
+
+    Args:
+        spec_generator: FastPitch model, in eval mode.
+        vocoder: HiFiGAN model (or any vocoder whose output has a fixed number of samples per frame), in eval mode.
+        max_chunk_chars: maximum number of characters of a text chunk.
+        context_tokens: number of tokens of the previous chunk used as left context of the spectrogram generator.
+        overlap_frames: number of mel frames vocoded twice and crossfaded at chunk boundaries.
+        pace: pace of the speech, see `FastPitchModel.generate_spectrogram`.
+        mel_pad_value: value padding the mel spectrograms of a batch for the vocoder, the log-mel of silence.
+        sample_rate: sample rate of the audio, defaults to `vocoder.sample_rate`.
+    """
+
+    def __init__(
+        self,
+        spec_generator,
+        vocoder,
+        max_chunk_chars: int = 200,
+        context_tokens: int = 8,
+        overlap_frames: int = 8,
+        pace: float = 1.0,
+        mel_pad_value: float = -11.52,
+        sample_rate: Optional[int] = None,
+    ):
+        if spec_generator.training or vocoder.training:
+            logging.warning("StreamingTTS is meant to be used with models in eval mode.")
+        self.spec_generator = spec_generator
+        self.vocoder = vocoder
+        self.max_chunk_chars = max_chunk_chars
+        self.context_tokens = context_tokens
+        self.overlap_frames = overlap_frames
+        self.pace = pace
+        self.mel_pad_value = mel_pad_value
+        self.sample_rate = sample_rate if sample_rate is not None else vocoder.sample_rate
+        # metrics of the requests of the last call of `stream_batch`, updated as audio is yielded
+        self.metrics: List[StreamingMetrics] = []
+
+    def stream(self, text: str, speaker: Optional[int] = None) -> Iterator[torch.Tensor]:
+        """
+        Synthesizes text, yielding audio chunks of shape [T_audio] on the CPU as soon as they are available.
+        The metrics of the request are in `self.metrics[0]`.
+        """
+        for _, audio in self.stream_batch([text], speakers=None if speaker is None else [speaker]):
+            yield audio
+
+    @torch.no_grad()
+    def stream_batch(
+        self, texts: List[str], speakers: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, torch.Tensor]]:
+        """
+        Synthesizes several texts concurrently, yielding `(request index, audio chunk)` pairs, where audio chunks
+        are of shape [T_audio] on the CPU. The audio chunks of every request are yielded in order, and the metrics
+        of request `i` are in `self.metrics[i]`.
+
+        Args:
+            texts: text of every request.
+            speakers: speaker of every request, for multi-speaker models.
+        """
+        start_time = time.perf_counter()
+        speakers = speakers if speakers is not None else [None] * len(texts)
+        self.metrics = [StreamingMetrics() for _ in texts]
+        requests = [
+            _RequestState(split_text_for_streaming(text, self.max_chunk_chars), speaker, metrics)
+            for text, speaker, metrics in zip(texts, speakers, self.metrics)
+        ]
+
+        for step in range(max((len(request.chunks) for request in requests), default=0)):
+            active = [idx for idx, request in enumerate(requests) if step < len(request.chunks)]
+            mels = self._generate_mel_chunks([requests[idx] for idx in active], step)
+            audios = self._vocode_chunks([requests[idx] for idx in active], mels, step)
+            for idx, audio in zip(active, audios):
+                metrics = requests[idx].metrics
+                metrics.num_chunks += 1
+                metrics.audio_duration += audio.shape[0] / self.sample_rate
+                metrics.synthesis_time = time.perf_counter() - start_time
+                if metrics.first_chunk_latency is None:
+                    metrics.first_chunk_latency = metrics.synthesis_time
+                yield idx, audio
+
+    def _generate_mel_chunks(self, requests: List[_RequestState], step: int) -> List[torch.Tensor]:
+        """Returns the mel spectrogram [D, T_spec] of the text chunk `step` of every request."""
+        device = self.spec_generator.device
+        tokens, num_context_tokens = [], []
+        for request in requests:
+            chunk_tokens = self.spec_generator.parse(request.chunks[step]).squeeze(0)
+            context = request.prev_tokens[-self.context_tokens :] if request.prev_tokens is not None else None
+            if context is None or self.context_tokens <= 0:
+                context = chunk_tokens[:0]
+            tokens.append(torch.cat([context, chunk_tokens]))
+            num_context_tokens.append(len(context))
+            request.prev_tokens = chunk_tokens
+
+        padding_idx = self.spec_generator.fastpitch.encoder.padding_idx
+        text = torch.nn.utils.rnn.pad_sequence(tokens, batch_first=True, padding_value=padding_idx).to(device)
+        speaker = None
+        if requests[0].speaker is not None:
+            speaker = torch.tensor([request.speaker for request in requests], device=device)
+        spect, spect_lens, durs_predicted, *_ = self.spec_generator(text=text, speaker=speaker, pace=self.pace)
+
+        # frames of the context tokens, rounded like `regulate_len`
+        reps = (durs_predicted.float() / self.pace + 0.5).floor().long()
+        mels = []
+        for idx, num_context in enumerate(num_context_tokens):
+            context_frames = int(reps[idx, :num_context].sum())
+            mels.append(spect[idx, :, context_frames : spect_lens[idx]])
+        return mels
+
+    def _vocode_chunks(self, requests: List[_RequestState], mels: List[torch.Tensor], step: int) -> List[torch.Tensor]:
+        """Vocodes the mel chunks of the requests, and returns the audio chunks ready to be yielded."""
+        inputs, num_overlap_frames = [], []
+        for request, mel in zip(requests, mels):
+            prev_mel_tail = request.prev_mel_tail if request.prev_mel_tail is not None else mel[:, :0]
+            inputs.append(torch.cat([prev_mel_tail, mel], dim=1))
+            num_overlap_frames.append(prev_mel_tail.shape[1])
+
+        input_lens = [spec.shape[1] for spec in inputs]
+        spec = torch.nn.utils.rnn.pad_sequence(
+            [spec.transpose(0, 1) for spec in inputs], batch_first=True, padding_value=self.mel_pad_value
+        ).transpose(1, 2)
+        audio = self.vocoder.convert_spectrogram_to_audio(spec=spec).float()
+        hop_length = audio.shape[-1] // spec.shape[-1]
+
+        chunks = []
+        for idx, (request, mel) in enumerate(zip(requests, mels)):
+            chunk_audio = audio[idx, : input_lens[idx] * hop_length]
+            head = num_overlap_frames[idx] * hop_length
+            # hold back the audio of the last frames, unless this is the last chunk of the request
+            tail_frames = 0 if step == len(request.chunks) - 1 else min(self.overlap_frames, mel.shape[1])
+            tail = tail_frames * hop_length
+
+            if head > 0:
+                fade_in = torch.linspace(0.0, 1.0, head + 2, device=audio.device)[1:-1]
+                crossfade = request.pending_audio * (1.0 - fade_in) + chunk_audio[:head] * fade_in
+                chunk_audio = torch.cat([crossfade, chunk_audio[head:]])
+            request.pending_audio = chunk_audio[len(chunk_audio) - tail :] if tail > 0 else None
+            request.prev_mel_tail = mel[:, mel.shape[1] - tail_frames :] if tail_frames > 0 else None
+            chunks.append(chunk_audio[: len(chunk_audio) - tail].cpu())
+        return chunks
@@ -0,0 +1,190 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from nemo.utils import logging
+
+__all__ = ['CachedTextNormalizer']
+
+# splits a text after sentence-final punctuation, keeping the whitespace between sentences
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])(\s+)')
+
+
+class CachedTextNormalizer:
+    """
+    Text normalizer which memoizes normalized sentences, so that texts repeated across calls, such as prompt
+    templates at inference time or duplicated transcripts in manifests, are normalized only once.
+
+    Normalized sentences are kept in a bounded in-memory LRU cache and, if `cache_dir` is given, in a persistent
+    SQLite database shared by processes, with one database per normalizer config. The cache assumes that the
+    normalization of a sentence only depends on the sentence, the normalizer config and the call kwargs.
+
+    Args:
+        normalizer_call: function normalizing a text, such as `Normalizer.normalize`.
+        cache_size: maximum number of sentences kept in memory, the least recently used are evicted first.
+            The in-memory cache is disabled if 0.
+        cache_dir: directory of the persistent cache. The persistent cache is disabled if None.
+        config: description of the normalizer config, such as its YAML, which keys the persistent cache.
+            Normalizers with different configs must have different descriptions.
+        split_sentences: whether to split texts after sentence-final punctuation and normalize every sentence
+            separately, so that sentences repeated in different texts hit the cache. This can change the
+            normalization of abbreviations ending with a period, such as "Dr. Smith".
+    """
+
+    def __init__(
+        self,
+        normalizer_call: Callable[..., str],
+        cache_size: int = 1024,
+        cache_dir: Optional[Union[str, Path]] = None,
+        config: str = '',
+        split_sentences: bool = False,
+    ):
+        self.normalizer_call = normalizer_call
+        self.cache_size = cache_size
+        self.split_sentences = split_sentences
+        self.db_path = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+            self.db_path = Path(cache_dir) / f'text_normalization_{digest}.sqlite'
+
+        self._memo: Dict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def __getstate__(self):
+        # the lock can not be pickled, and the database is connected again in worker processes
+        state = self.__dict__.copy()
+        state.update(_lock=None, _db=None, _pid=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, **kwargs) -> str:
+        """Normalizes a text, `kwargs` are passed to `normalizer_call`."""
+        return self.normalize_batch([text], **kwargs)[0]
+
+    def normalize_batch(self, texts: List[str], num_workers: int = 1, **kwargs) -> List[str]:
+        """
+        Normalizes a list of texts, `kwargs` are passed to `normalizer_call`.
+
+        Args:
+            texts: texts to normalize.
+            num_workers: number of processes normalizing the sentences which are not cached. If -1, all CPUs are used.
+
+        Returns:
+            The normalized texts.
+        """
+        kwargs_key = json.dumps(kwargs, sort_keys=True, default=str)
+        if self.split_sentences:
+            parts = [_SENTENCE_SPLIT.split(text) for text in texts]
+        else:
+            parts = [[text] for text in texts]
+        # sentences are at even indices of the parts, and whitespaces at odd indices
+        sentences = list(dict.fromkeys(sentence for text_parts in parts for sentence in text_parts[::2]))
+
+        normalized = self._lookup(sentences, kwargs_key)
+        missing = [sentence for sentence in sentences if sentence not in normalized]
+        if missing:
+            if num_workers == 1 or len(missing) == 1:
+                missing_normalized = [self.normalizer_call(sentence, **kwargs) for sentence in missing]
+            else:
+                from joblib import Parallel, delayed
+
+                missing_normalized = Parallel(n_jobs=num_workers)(
+                    delayed(self.normalizer_call)(sentence, **kwargs) for sentence in missing
+                )
+            new_normalized = dict(zip(missing, missing_normalized))
+            self._store(new_normalized, kwargs_key)
+            normalized.update(new_normalized)
+
+        return [
+            ''.join(normalized[part] if idx % 2 == 0 else part for idx, part in enumerate(text_parts))
+            for text_parts in parts
+        ]
+
+    def _lookup(self, sentences: List[str], kwargs_key: str) -> Dict[str, str]:
+        normalized = {}
+        with self._lock:
+            for sentence in sentences:
+                key = f'{kwargs_key}\n{sentence}'
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    normalized[sentence] = self._memo[key]
+
+            missing = [sentence for sentence in sentences if sentence not in normalized]
+            db = self._get_db() if missing else None
+            if db is not None:
+                try:
+                    for sentence in missing:
+                        row = db.execute(
+                            'SELECT value FROM cache WHERE key = ?', (f'{kwargs_key}\n{sentence}',)
+                        ).fetchone()
+                        if row is not None:
+                            normalized[sentence] = row[0]
+                            self._memoize(f'{kwargs_key}\n{sentence}', row[0])
+                except sqlite3.Error as e:
+                    self._disable_db(e)
+        return normalized
+
+    def _store(self, normalized: Dict[str, str], kwargs_key: str):
+        items = [(f'{kwargs_key}\n{sentence}', value) for sentence, value in normalized.items()]
+        with self._lock:
+            for key, value in items:
+                self._memoize(key, value)
+            db = self._get_db()
+            if db is not None:
+                try:
+                    with db:
+                        db.executemany('INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)', items)
+                except sqlite3.Error as e:
+                    self._disable_db(e)
+
+    def _memoize(self, key: str, value: str):
+        if self.cache_size <= 0:
+            return
+        self._memo[key] = value
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        if self._db is None or self._pid != os.getpid():
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self.db_path, timeout=60, check_same_thread=False)
+                with self._db:
+                    self._db.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+                self._pid = os.getpid()
+            except (OSError, sqlite3.Error) as e:
+                self._disable_db(e)
+        return self._db
+
+    def _disable_db(self, error: Exception):
+        logging.warning(f"Disabling the text normalization cache in {self.db_path}: {error}")
+        self.db_path = None
+        self._db = None
@@ -26,6 +26,7 @@ class DataConfig:
     reset_position_ids: bool = False  # Option to reset the position IDs in the dataset at an interval
     reset_attention_mask: bool = False  # Option to reset the attention mask from the dataset
     eod_mask_loss: bool = False  # Option to enable the EOD mask loss
+    index_mapping_dir: Optional[str] = None  # Directory of the line index of .jsonl files, next to them if None
 
 
 @dataclass
@@ -34,6 +35,7 @@ class ImageDataConfig(DataConfig):
     media_token: MultiModalToken = field(default_factory=lambda: ImageToken())
     image_folder: Optional[str] = None
     image_process_mode: str = 'pad'
+    num_image_decode_threads: int = 0  # Threads decoding the images of a sample, 0 to decode them sequentially
 
 
 @dataclass
@@ -0,0 +1,155 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import tarfile
+import tempfile
+from typing import Optional, Tuple
+
+import numpy as np
+
+__all__ = ['IndexedTarReader', 'build_tar_index']
+
+
+def _index_paths(tar_path: str) -> Tuple[str, str]:
+    return f'{tar_path}.names.npy', f'{tar_path}.offsets.npy'
+
+
+def _save_atomic(path: str, array: np.ndarray):
+    """Saves an array through a temporary file, so that concurrent readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npy.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def build_tar_index(tar_path: str, save: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the index of the regular files of an uncompressed tar archive, reading only the member headers.
+
+    Args:
+        tar_path: path to the tar archive.
+        save: whether to save the index alongside the archive, as `<tar_path>.names.npy` and
+            `<tar_path>.offsets.npy`. If the directory is not writable, the index is only returned.
+
+    Returns:
+        The sorted member names as a bytes array, and the byte offset and size of the data of every member,
+        as an array of shape `(number of members, 2)`.
+    """
+    members = []
+    with tarfile.open(tar_path, 'r:') as tar:
+        for member in tar:
+            if member.isfile():
+                members.append((member.name.encode('utf-8'), member.offset_data, member.size))
+    members.sort()
+    names = np.array([name for name, _, _ in members], dtype=bytes)
+    offsets = np.array([(offset, size) for _, offset, size in members], dtype=np.int64).reshape(-1, 2)
+
+    if save:
+        names_path, offsets_path = _index_paths(tar_path)
+        try:
+            # offsets are written last, their presence marks a complete index
+            _save_atomic(names_path, names)
+            _save_atomic(offsets_path, offsets)
+        except OSError as e:
+            logging.warning(f"Could not save the index of {tar_path}, it will be rebuilt next time: {e}")
+    return names, offsets
+
+
+class IndexedTarReader:
+    """
+    Random access to the files of an uncompressed tar archive, without parsing the archive on every access.
+
+    The index of the archive (see `build_tar_index`) is built once and saved alongside it, and memory-mapped by
+    every reader, so that workers share it through the page cache. Files are looked up by binary search in the
+    sorted names, and read with a single `pread` of their exact byte range through one file descriptor per process,
+    which is safe to share between threads.
+
+    Args:
+        tar_path: path to the tar archive.
+    """
+
+    def __init__(self, tar_path: str):
+        self.tar_path = tar_path
+        self._names: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._load_index()
+
+    def _load_index(self):
+        names_path, offsets_path = _index_paths(self.tar_path)
+        if os.path.exists(offsets_path) and os.path.getmtime(offsets_path) >= os.path.getmtime(self.tar_path):
+            self._names = np.load(names_path, mmap_mode='r')
+            self._offsets = np.load(offsets_path, mmap_mode='r')
+        else:
+            logging.info(f"Building the index of {self.tar_path}")
+            self._names, self._offsets = build_tar_index(self.tar_path)
+
+    def __getstate__(self):
+        # the index is memory-mapped again and the file opened again in worker processes
+        state = self.__dict__.copy()
+        state.update(_names=None, _offsets=None, _fd=None, _pid=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._load_index()
+
+    def __del__(self):
+        if getattr(self, '_fd', None) is not None and self._pid == os.getpid():
+            os.close(self._fd)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def _find(self, name: str) -> Optional[int]:
+        key = name.encode('utf-8')
+        if len(self._names) == 0 or len(key) > self._names.dtype.itemsize:
+            return None
+        idx = int(np.searchsorted(self._names, key))
+        if idx < len(self._names) and self._names[idx] == key:
+            return idx
+        return None
+
+    def _get_fd(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.tar_path, os.O_RDONLY)
+            self._pid = os.getpid()
+        return self._fd
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Returns the content of the file `name` of the archive, or None if there is no such file."""
+        idx = self._find(name)
+        if idx is None:
+            return None
+        offset, size = (int(value) for value in self._offsets[idx])
+        fd = self._get_fd()
+        chunks = []
+        while size > 0:
+            chunk = os.pread(fd, size, offset)
+            if not chunk:
+                raise EOFError(f"{self.tar_path} ended while reading {name}")
+            chunks.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
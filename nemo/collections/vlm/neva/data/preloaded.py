@@ -13,11 +13,12 @@
 # limitations under the License.
 # pylint: disable=C0115,C0116
 
+import io
 import json
 import logging
 import os
 import re
-import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Sequence
 
 import decord
@@ -31,9 +32,11 @@ from torch.utils import data
 from torch.utils.data import DataLoader, Dataset, default_collate
 from transformers import CLIPImageProcessor, SiglipImageProcessor
 
+from nemo.collections.nlp.data.language_modeling.text_memmap_dataset import JSONLMemMapDataset
 from nemo.collections.nlp.modules.common.megatron.utils import get_ltor_masks_and_position_ids
 from nemo.collections.vlm.neva.data.config import DataConfig, ImageDataConfig
 from nemo.collections.vlm.neva.data.conversation import conv_templates as supported_conv_templates
+from nemo.collections.vlm.neva.data.indexed_tar import IndexedTarReader
 from nemo.collections.vlm.neva.data.multimodal_tokens import IGNORE_INDEX, SPECIAL_TOKEN_MAP
 from nemo.lightning.pytorch.plugins import MegatronDataSampler
 
@@ -43,63 +46,68 @@ class TarOrFolderImageLoader:
     A class for loading images from a tar archive or a regular folder.
 
     This class provides functionality to open and read images from either a tar archive
-    (.tar file) or a standard directory with image files. It builds an index of images
-    if the source is a tar archive for efficient access.
+    (.tar file) or a standard directory with image files. Images of a tar archive are read
+    with an `IndexedTarReader`, whose offset index is built once and saved alongside the archive.
 
     Attributes:
         image_folder (str): The path to the tar archive or image folder.
-        tar_index (dict): A dictionary that maps file names to their tarfile member
-                          objects if the image source is a tar archive.
+        tar_reader (IndexedTarReader): The reader of the tar archive, if the image source is a tar archive.
+        num_decode_threads (int): The number of threads decoding the images of `open_images`,
+                                  0 to decode them in the calling thread.
 
     Methods:
-        __init__(self, image_folder): Initializes the loader with the specified image folder.
-        build_index(self): Builds an index of image file names and their corresponding
-                           tarfile member objects for a tar archive.
+        __init__(self, image_folder, num_decode_threads): Initializes the loader with the specified image folder.
         open_image(self, file_name): Opens and returns an image by its file name. The image
                                      is returned as an RGB PIL Image object.
+        open_images(self, file_names): Opens and returns a list of images, decoded in a thread pool.
     """
 
-    def __init__(self, image_folder):
+    def __init__(self, image_folder, num_decode_threads=0):
         self.image_folder = image_folder
-        self.tar_index = {}
-        if self.image_folder.endswith('.tar'):
-            self.build_index()
+        self.num_decode_threads = num_decode_threads
+        self.tar_reader = IndexedTarReader(self.image_folder) if self.image_folder.endswith('.tar') else None
+        self._executor = None
+        self._executor_pid = None
 
-    def build_index(self):
-        with tarfile.open(self.image_folder, 'r') as tar:
-            for member in tar.getmembers():
-                self.tar_index[member.name] = member
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_executor=None, _executor_pid=None)
+        return state
 
     def open_image(self, file_name):
-        if self.image_folder.endswith('.tar'):
-            with tarfile.open(self.image_folder, 'r') as tar:
-                member = self.tar_index.get(file_name)
-                if member:
-                    f = tar.extractfile(member)
-                    return Image.open(f).convert('RGB')
+        if self.tar_reader is not None:
+            data = self.tar_reader.read(file_name)
+            if data is not None:
+                return Image.open(io.BytesIO(data)).convert('RGB')
         else:
             return Image.open(os.path.join(self.image_folder, file_name)).convert('RGB')
         return None
 
+    def open_images(self, file_names):
+        if self.num_decode_threads <= 0 or len(file_names) <= 1:
+            return [self.open_image(file_name) for file_name in file_names]
+        if self._executor is None or self._executor_pid != os.getpid():
+            # one pool per process, dataloader workers do not inherit the threads of the parent
+            self._executor = ThreadPoolExecutor(max_workers=self.num_decode_threads)
+            self._executor_pid = os.getpid()
+        return list(self._executor.map(self.open_image, file_names))
+
 
 class TarOrFolderVideoLoader:
     """
     A class for loading videos from a tar archive or a regular folder.
 
     This class provides functionality to open and read videos from either a tar archive
-    (.tar file) or a standard directory with video files. It builds an index of videos
-    if the source is a tar archive for efficient access.
+    (.tar file) or a standard directory with video files. Videos of a tar archive are read
+    with an `IndexedTarReader`, whose offset index is built once and saved alongside the archive.
 
     Attributes:
         video_folder (str): The path to the tar archive or video folder.
         data_config (dict): A dictionary of configuration options for video decoding to frames
-        tar_index (dict): A dictionary that maps file names to their tarfile member
-                          objects if the video source is a tar archive.
+        tar_reader (IndexedTarReader): The reader of the tar archive, if the video source is a tar archive.
 
     Methods:
         __init__(self, video_folder): Initializes the loader with the specified video folder.
-        build_index(self): Builds an index of image file names and their corresponding
-                           tarfile member objects for a tar archive.
         open_video(self, file_name): Opens and returns an video by its file name. The video
                                      is returned as a list of RGB PIL Image objects.
         flatten_frames(self, cap): Converts decord VideoReader video object to list of frame
@@ -109,23 +117,14 @@ class TarOrFolderVideoLoader:
     def __init__(self, video_folder, data_config):
         self.video_folder = video_folder
         self.data_config = data_config
-        self.tar_index = {}
-        if self.video_folder.endswith('.tar'):
-            self.build_index()
-
-    def build_index(self):
-        with tarfile.open(self.video_folder, 'r') as tar:
-            for member in tar.getmembers():
-                self.tar_index[member.name] = member
+        self.tar_reader = IndexedTarReader(self.video_folder) if self.video_folder.endswith('.tar') else None
 
     def open_video(self, file_name):
-        if self.video_folder.endswith('.tar'):
-            with tarfile.open(self.video_folder, 'r') as tar:
-                member = self.tar_index.get(file_name)
-                if member:
-                    f = tar.extractfile(member)
-                    cap = decord.VideoReader(f)
-                    return self.flatten_frames(cap)
+        if self.tar_reader is not None:
+            data = self.tar_reader.read(file_name)
+            if data is not None:
+                cap = decord.VideoReader(io.BytesIO(data))
+                return self.flatten_frames(cap)
         else:
             # decord.bridge.set_bridge("torch")
             cap = decord.VideoReader(os.path.join(self.video_folder, file_name))
@@ -254,11 +253,18 @@ class LazySupervisedDataset(Dataset):
         image_processor,
     ):
         super().__init__()
-        if data_path is not None:
+        if data_path is None:
+            list_data_dict = []
+        elif data_path.endswith(".jsonl"):
+            # records are parsed when accessed, through a memory-mapped index of the line offsets, so that
+            # memory does not grow with the size of the dataset in every rank and dataloader worker
+            list_data_dict = JSONLMemMapDataset(
+                dataset_paths=[data_path], index_mapping_dir=getattr(data_config, "index_mapping_dir", None)
+            )
+        else:
+            logging.warning(f"Loading all the records of {data_path}, use a .jsonl file to load them lazily.")
             with open(data_path, "r") as file:
                 list_data_dict = json.load(file)
-        else:
-            list_data_dict = []
 
         logging.warning("Formatting inputs...Skip in lazy mode")
         self.data_config = data_config
@@ -276,15 +282,16 @@ class LazySupervisedDataset(Dataset):
 
         image_folder = getattr(data_config, "image_folder", None)
         video_folder = getattr(data_config, "video_folder", None)
+        num_image_decode_threads = getattr(data_config, "num_image_decode_threads", 0)
 
-        self.image_loader = TarOrFolderImageLoader(image_folder) if image_folder else None
+        self.image_loader = TarOrFolderImageLoader(image_folder, num_image_decode_threads) if image_folder else None
         self.video_loader = TarOrFolderVideoLoader(video_folder, data_config) if video_folder else None
 
     def __len__(self):
         return len(self.list_data_dict)
 
     def __getitem__(self, i) -> Dict[str, torch.Tensor]:
-        source = self.list_data_dict[i]
+        source = self._get_source(i)
         conversations = self._apply_prompt_templates(source, use_plain=self.conv_template == "plain")
         tokens, labels = self._tokenize_and_label(conversations)
 
@@ -296,6 +303,9 @@ class LazySupervisedDataset(Dataset):
         )
         return data_dict
 
+    def _get_source(self, i):
+        return self.list_data_dict[i]
+
     def _process_images(self, source):
         media_tensors = torch.tensor([])
         if 'image' in source:
@@ -303,8 +313,7 @@ class LazySupervisedDataset(Dataset):
                 source['image'] = [source['image']]
 
             images = []
-            for image_file in source['image']:
-                image = self.image_loader.open_image(image_file)
+            for image_file, image in zip(source['image'], self.image_loader.open_images(source['image'])):
                 if image is None:
                     logging.warning(f"Image {image_file} could not be found!")
                 image = process_image(self.image_processor, image, self.image_process_mode)
@@ -398,38 +407,41 @@ class NevaDataset(LazySupervisedDataset):
 
         if data_path.endswith(".json"):
             super().__init__(data_path, data_config, tokenizer, image_processor)
+            self.steerlm_format = False
 
         elif data_path.endswith(".jsonl"):
-            super().__init__(None, data_config, tokenizer, image_processor)
-            logging.warning("Loading image inputs from SteerLM Dataset...")
-            if data_config.media_type == 'image':
-                image_folder = data_config.image_folder
-                for line in open(data_path, "r"):
-                    record = json.loads(line)
-
-                    # This currently supports only a single image
-                    # search for <img src="/absolute/path/to/image" in the conversation
-                    #   add it as record['image'], remove src tag from the <img> tag
-
-                    record['image'] = []
-                    for turn in record['conversations']:
-                        matches = re.finditer('<img src="([^"]+)"', turn['value'])
-                        for match in matches:
-                            image_name = match.group(1).split("/")[-1]
-                            image_path = os.path.join(image_folder, image_name)
-                            if not os.path.isfile(image_path):
-                                logging.warning(f"Image not found: {image_path}")
-                                continue
-                            record['image'].append(image_name)  # url
-                        turn['value'] = re.sub('<img src="([^"]+)">', "<image>", turn['value'])
-
-                    self.list_data_dict.append(record)
+            super().__init__(data_path, data_config, tokenizer, image_processor)
+            self.steerlm_format = data_config.media_type == 'image'
+            if self.steerlm_format:
+                logging.warning("Loading image inputs from SteerLM Dataset...")
 
         else:
             raise ValueError(f"Formatting of {data_path} is not supported in Neva.")
         self.packed_sequence = packed_sequence
         self.num_image_embeddings_per_tile = num_image_embeddings_per_tile
 
+    def _get_source(self, i):
+        record = super()._get_source(i)
+        if not self.steerlm_format or 'image' in record:
+            return record
+
+        # This currently supports only a single image
+        # search for <img src="/absolute/path/to/image" in the conversation
+        #   add it as record['image'], remove src tag from the <img> tag
+        image_folder = self.data_config.image_folder
+        record['image'] = []
+        for turn in record['conversations']:
+            matches = re.finditer('<img src="([^"]+)"', turn['value'])
+            for match in matches:
+                image_name = match.group(1).split("/")[-1]
+                image_path = os.path.join(image_folder, image_name)
+                if not os.path.isfile(image_path):
+                    logging.warning(f"Image not found: {image_path}")
+                    continue
+                record['image'].append(image_name)  # url
+            turn['value'] = re.sub('<img src="([^"]+)">', "<image>", turn['value'])
+        return record
+
     def collate_fn(self, instances: Sequence[Dict]) -> Dict[str, torch.Tensor]:
         data_config = self.data_config
         packed_sequence = self.packed_sequence
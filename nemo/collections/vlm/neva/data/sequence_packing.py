@@ -13,67 +13,208 @@
 # limitations under the License.
 
 import bisect
-from typing import List
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from megatron.core.packed_seq_params import PackedSeqParams
 
 
-# pylint:disable=line-too-long
-# Based on https://github.com/hiyouga/LLaMA-Factory/blob/641d0dab08d96a93c34657742213d8994d9ed476/src/llamafactory/data/processors/processor_utils.py#L19
-# Copyright (c) 2024 LLaMA-Factory. Apache license 2.0.
-def search_for_fit(numbers: List[int], capacity: int) -> int:
-    """Finds the index of largest number that fits into the knapsack with the given capacity."""
-    index = bisect.bisect(numbers, capacity)
-    return -1 if index == 0 else (index - 1)
+# below this number of items, removing items from sorted lists is faster than updating a Fenwick tree, although
+# every removal shifts the following items
+SORTED_LIST_MAX_ITEMS = 32768
+
+
+class _SizeCounts:
+    """Fenwick tree of the number of remaining items of every distinct size, for largest-fit queries in
+    O(log num_sizes).
+    """
+
+    def __init__(self, sizes: List[int]):
+        counts = {}
+        for size in sizes:
+            counts[size] = counts.get(size, 0) + 1
+        self.sizes = sorted(counts)
+        self.positions = {size: pos for pos, size in enumerate(self.sizes, start=1)}
+        self.num_sizes = len(self.sizes)
+        self.tree = [0] + [counts[size] for size in self.sizes]
+        for i in range(1, self.num_sizes + 1):
+            parent = i + (i & -i)
+            if parent <= self.num_sizes:
+                self.tree[parent] += self.tree[i]
+        self.top_bit = 1 << self.num_sizes.bit_length()
+
+    def remove(self, size: int):
+        i = self.positions[size]
+        while i <= self.num_sizes:
+            self.tree[i] -= 1
+            i += i & -i
+
+    def largest_at_most(self, capacity: int) -> int:
+        """Returns the largest remaining size which is at most `capacity`, or -1 if there is none."""
+        # number of remaining items of size at most `capacity`
+        count, i = 0, bisect.bisect_right(self.sizes, capacity)
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        if count == 0:
+            return -1
+        # the size of the `count`-th remaining item in order of size
+        pos, step = 0, self.top_bit
+        while step:
+            if pos + step <= self.num_sizes and self.tree[pos + step] < count:
+                pos += step
+                count -= self.tree[pos]
+            step >>= 1
+        return self.sizes[pos]
 
 
 # pylint: disable=line-too-long
 # Based on https://github.com/hiyouga/LLaMA-Factory/blob/641d0dab08d96a93c34657742213d8994d9ed476/src/llamafactory/data/processors/processor_utils.py#L27
 # Copyright (c) 2024 LLaMA-Factory. Apache license 2.0.
-def greedy_knapsack(item_sizes: List[int], samples: List, max_capacity: int) -> List:
-    """Greedy algorithm with binary search for the knapsack problem.
+def greedy_knapsack_indices(item_sizes: List[int], max_capacity: int) -> List[List[int]]:
+    """Greedy algorithm for the knapsack problem, returning the indices of the items of every knapsack.
 
-    Pack as many samples as possible given a maximum capacity and capacities of individual samples.
-    Used if sequence packing is enabled.
+    Every knapsack is filled by repeatedly adding the largest remaining item which fits, the last one in the
+    input order among items of the same size. Up to `SORTED_LIST_MAX_ITEMS` items, like the small buffers packed by
+    the energon task encoder, items are kept in a sorted list and found by bisection. Larger datasets count the
+    remaining items per distinct size in a Fenwick tree instead, so that packing N items takes O(N log N).
     """
-    assert len(item_sizes) == len(samples), "sample lengths and samples must have the same length."
+    item_sizes = [int(size) for size in item_sizes]
+    if not item_sizes:
+        return []
+    if max(item_sizes) > max_capacity:
+        raise ValueError(
+            f"knapsack: A sample is larger {max(item_sizes)} than the max_sequence_length {max_capacity}."
+        )
+    if len(item_sizes) <= SORTED_LIST_MAX_ITEMS:
+        return _greedy_knapsack_sorted_lists(item_sizes, max_capacity)
 
-    knapsacks = []
+    # indices of the remaining items of every size, in input order
+    items_by_size = {}
+    for idx, size in enumerate(item_sizes):
+        items_by_size.setdefault(size, []).append(idx)
+    counts = _SizeCounts(item_sizes)
 
-    if len(item_sizes) == 0:
-        return knapsacks
+    knapsacks = []
+    num_remaining = len(item_sizes)
+    while num_remaining:
+        current_knapsack = []
+        remaining_capacity = max_capacity
+        while True:
+            size = counts.largest_at_most(remaining_capacity)
+            if size == -1:
+                break  # Can't fit more samples.
+            counts.remove(size)
+            current_knapsack.append(items_by_size[size].pop())
+            remaining_capacity -= size
+        num_remaining -= len(current_knapsack)
+        knapsacks.append(current_knapsack)
+    return knapsacks
 
-    # Sort sample lengths and samples together.
-    sorted_item_sizes, sorted_samples = zip(*sorted(zip(item_sizes, samples), key=lambda x: x[0]))
-    sorted_item_sizes = list(sorted_item_sizes)
-    sorted_samples = list(sorted_samples)
 
-    # Check if all samples fit in the knapsack capacity.
-    if sorted_item_sizes[-1] > max_capacity:
-        raise ValueError(
-            f"knapsack: A sample is larger {sorted_item_sizes[-1]} than the max_sequence_length {max_capacity}."
-        )
+def _greedy_knapsack_sorted_lists(item_sizes: List[int], max_capacity: int) -> List[List[int]]:
+    """`greedy_knapsack_indices` with the remaining items in lists sorted by size, in O(N^2)."""
+    # stable sort, so that the last item of a size found by bisection is the last one in the input order
+    sorted_indices = sorted(range(len(item_sizes)), key=item_sizes.__getitem__)
+    sorted_sizes = [item_sizes[idx] for idx in sorted_indices]
 
-    while sorted_item_sizes:
+    knapsacks = []
+    while sorted_sizes:
         current_knapsack = []
         remaining_capacity = max_capacity
-
         while True:
-            idx = search_for_fit(sorted_item_sizes, remaining_capacity)
-            if idx == -1:
+            # index of the largest size which fits
+            pos = bisect.bisect(sorted_sizes, remaining_capacity) - 1
+            if pos == -1:
                 break  # Can't fit more samples.
+            remaining_capacity -= sorted_sizes.pop(pos)
+            current_knapsack.append(sorted_indices.pop(pos))
+        knapsacks.append(current_knapsack)
+    return knapsacks
 
-            remaining_capacity -= sorted_item_sizes[idx]
 
-            sorted_item_sizes.pop(idx)
-            sample = sorted_samples.pop(idx)
-            current_knapsack.append(sample)
+def _sizes_digest(item_sizes: np.ndarray, max_capacity: int, num_shards: int) -> str:
+    digest = hashlib.sha256(np.ascontiguousarray(item_sizes, dtype=np.int64).tobytes())
+    digest.update(f'{max_capacity},{num_shards}'.encode())
+    return digest.hexdigest()
 
-        knapsacks.append(current_knapsack)
 
-    return knapsacks
+def _load_knapsacks(path: str, digest: str) -> Optional[List[List[int]]]:
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as assignments:
+        if str(assignments['digest']) != digest:
+            return None
+        indices, offsets = assignments['indices'], assignments['offsets']
+    return [indices[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _save_knapsacks(path: str, knapsacks: List[List[int]], digest: str):
+    offsets = np.cumsum([0] + [len(knapsack) for knapsack in knapsacks], dtype=np.int64)
+    indices = np.fromiter((idx for knapsack in knapsacks for idx in knapsack), dtype=np.int64, count=offsets[-1])
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, indices=indices, offsets=offsets, digest=np.array(digest))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def greedy_knapsack(
+    item_sizes: List[int],
+    samples: List,
+    max_capacity: int,
+    num_shards: int = 1,
+    assignments_path: Optional[str] = None,
+) -> List:
+    """Greedy algorithm for the knapsack problem, see `greedy_knapsack_indices`.
+
+    Pack as many samples as possible given a maximum capacity and capacities of individual samples.
+    Used if sequence packing is enabled.
+
+    Args:
+        item_sizes: size of every sample.
+        samples: the samples to pack.
+        max_capacity: capacity of every knapsack.
+        num_shards: number of contiguous shards of the samples packed separately, in parallel processes.
+            Samples are only packed with samples of the same shard.
+        assignments_path: path of a `.npz` file of the knapsacks of the samples. If it exists and was computed
+            for the same sizes, capacity and shards, the knapsacks are loaded from it instead of computed,
+            otherwise they are computed and saved to it.
+    """
+    assert len(item_sizes) == len(samples), "sample lengths and samples must have the same length."
+
+    digest = None
+    knapsacks = None
+    if assignments_path is not None:
+        digest = _sizes_digest(np.asarray(item_sizes), max_capacity, num_shards)
+        knapsacks = _load_knapsacks(assignments_path, digest)
+
+    if knapsacks is None:
+        if num_shards > 1 and len(item_sizes) > num_shards:
+            bounds = np.linspace(0, len(item_sizes), num_shards + 1, dtype=np.int64).tolist()
+            shards = [list(item_sizes[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+            with ProcessPoolExecutor(max_workers=num_shards) as executor:
+                shard_knapsacks = executor.map(greedy_knapsack_indices, shards, [max_capacity] * num_shards)
+                knapsacks = [
+                    [start + idx for idx in knapsack]
+                    for start, knapsacks_of_shard in zip(bounds, shard_knapsacks)
+                    for knapsack in knapsacks_of_shard
+                ]
+        else:
+            knapsacks = greedy_knapsack_indices(item_sizes, max_capacity)
+        if assignments_path is not None:
+            _save_knapsacks(assignments_path, knapsacks, digest)
+
+    return [[samples[idx] for idx in knapsack] for knapsack in knapsacks]
 
 
 def predict_seq_len(instance_tokens: torch.Tensor, num_image_embeddings_per_tile: int, media_token_index: int) -> int:
@@ -112,45 +253,41 @@ def convert_to_packed(
         ignore_index (int): Value to use for padding labels.
         pad_to_multiple_of (int): Sequence length will be padded to a multiple of this value. Default is 8.
     """
-    packed_tokens = []
-    packed_labels = []
-    packed_position_ids = []
-    seqlens_padded = []
-    cu_seqlens = [0]
-    cu_seqlens_padded = [0]
-
-    for instance_tokens, instance_labels in zip(tokens, labels):
-        seqlen = predict_seq_len(instance_tokens, num_image_embeddings_per_tile, media_token_index)
-        seqlen_padded = (seqlen + pad_to_multiple_of - 1) // pad_to_multiple_of * pad_to_multiple_of
-        pad_len = seqlen_padded - seqlen
-
-        if pad_len > 0:
-            instance_tokens = F.pad(instance_tokens, (0, pad_len), 'constant', 0)
-            instance_labels = F.pad(instance_labels, (0, pad_len), 'constant', ignore_index)
-
-        packed_tokens.append(instance_tokens)
-        packed_labels.append(instance_labels)
-        packed_position_ids.append(torch.arange(len(instance_tokens), dtype=torch.int, device=instance_tokens.device))
-        seqlens_padded.append(seqlen_padded)
-        cu_seqlens.append(cu_seqlens[-1] + seqlen)
-        cu_seqlens_padded.append(cu_seqlens_padded[-1] + seqlen_padded)
-
-    packed_tokens = torch.cat(packed_tokens, dim=0).unsqueeze(0)
-    packed_labels = torch.cat(packed_labels, dim=0).unsqueeze(0)
-    packed_position_ids = torch.cat(packed_position_ids, dim=0).unsqueeze(0)
+    # number of media tokens of every instance, with a single device synchronization
+    num_images = torch.stack([(instance_tokens == media_token_index).sum() for instance_tokens in tokens]).cpu()
+    num_tokens = torch.tensor([len(instance_tokens) for instance_tokens in tokens])
+    seqlens = num_tokens + (num_image_embeddings_per_tile - 1) * num_images
+    seqlens_padded = (seqlens + pad_to_multiple_of - 1) // pad_to_multiple_of * pad_to_multiple_of
+    # tokens are padded by as many positions as the sequence
+    num_tokens_padded = num_tokens + seqlens_padded - seqlens
+    token_offsets = F.pad(torch.cumsum(num_tokens_padded, dim=0), (1, 0))
+    total_tokens = int(token_offsets[-1])
+
+    # fill preallocated packed tensors, rather than padding and concatenating every instance
+    device = tokens[0].device
+    packed_tokens = tokens[0].new_zeros(total_tokens)
+    packed_labels = labels[0].new_full((total_tokens,), ignore_index)
+    for instance_tokens, instance_labels, offset in zip(tokens, labels, token_offsets.tolist()):
+        packed_tokens[offset : offset + len(instance_tokens)] = instance_tokens
+        packed_labels[offset : offset + len(instance_labels)] = instance_labels
+    packed_tokens = packed_tokens.unsqueeze(0)
+    packed_labels = packed_labels.unsqueeze(0)
+
+    starts = torch.repeat_interleave(token_offsets[:-1], num_tokens_padded).to(device)
+    packed_position_ids = (torch.arange(total_tokens, device=device) - starts).int().unsqueeze(0)
     packed_loss_mask = torch.ones_like(packed_labels, dtype=torch.float, device=packed_labels.device)
     packed_loss_mask[packed_labels < 0] = 0.0
 
-    cu_seqlens = torch.IntTensor(cu_seqlens)
-    cu_seqlens_padded = torch.IntTensor(cu_seqlens_padded)
+    cu_seqlens = F.pad(torch.cumsum(seqlens, dim=0), (1, 0)).int()
+    cu_seqlens_padded = F.pad(torch.cumsum(seqlens_padded, dim=0), (1, 0)).int()
 
     packed_seq_params = PackedSeqParams(
         cu_seqlens_q=cu_seqlens,
         cu_seqlens_kv=cu_seqlens,
         cu_seqlens_q_padded=cu_seqlens_padded,
         cu_seqlens_kv_padded=cu_seqlens_padded,
-        max_seqlen_q=int(max(seqlens_padded)),
-        max_seqlen_kv=int(max(seqlens_padded)),
+        max_seqlen_q=int(seqlens_padded.max()),
+        max_seqlen_kv=int(seqlens_padded.max()),
         qkv_format='thd',
     )
 
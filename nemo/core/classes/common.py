@@ -50,6 +50,10 @@ __all__ = ['Typing', 'FileIO', 'Model', 'Serialization', 'typecheck', 'Pretraine
 
 _TYPECHECK_ENABLED = True
 _TYPECHECK_SEMANTIC_CHECK_ENABLED = True
+# Number of fully validated calls after which typed methods are trusted, None to validate every call
+_TYPECHECK_NUM_VALIDATED_CALLS = None
+# Compiled plans of the typed methods, keyed by decorator, class and names of the arguments
+_TYPECHECK_PLANS = {}
 # TODO @blisc: Remove _HAS_HYDRA
 _HAS_HYDRA = True
 
@@ -155,6 +159,65 @@ class TypecheckMetadata:
         }
 
 
+@dataclass
+class TypecheckPlan:
+    """
+    Validation plan of a typed method, compiled once from the types of its fully validated calls
+    and used for its calls once they are trusted (see `typecheck.set_num_validated_calls`).
+
+    # Primary attributes
+    input_types: The input types of the method, or None.
+
+    output_types: The output types of the method, or None.
+
+    ignore_collections: Same as in `TypecheckMetadata`.
+
+    # Derived attributes
+    input_axes: Dictionary mapping `str: tuple` - the axes of every input which declares its axes.
+
+    output_metadata: TypecheckMetadata of the output types, or None.
+
+    num_validated_calls: Number of fully validated calls of the method with this plan.
+
+    """
+
+    input_types: Optional[Dict[str, NeuralType]]
+    output_types: Optional[Dict[str, NeuralType]]
+    ignore_collections: bool
+
+    input_axes: Dict[str, tuple] = field(init=False)
+    output_metadata: Optional[TypecheckMetadata] = field(init=False)
+    num_validated_calls: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.input_axes = {}
+        if self.input_types is not None:
+            input_metadata = TypecheckMetadata(
+                original_types=self.input_types, ignore_collections=self.ignore_collections
+            )
+            for type_key, type_val in input_metadata.base_types.items():
+                if type_val.axes is not None:
+                    self.input_axes[type_key] = type_val.axes
+
+        if self.output_types is not None:
+            self.output_metadata = TypecheckMetadata(
+                original_types=self.output_types, ignore_collections=self.ignore_collections
+            )
+        else:
+            self.output_metadata = None
+
+    def check_input_ranks(self, instance, kwargs):
+        """Checks only the number of dimensions of the tensor inputs, on the hot path of trusted calls."""
+        for key, value in kwargs.items():
+            axes = self.input_axes.get(key)
+            if axes is not None and hasattr(value, 'shape') and len(value.shape) != len(axes):
+                raise TypeError(
+                    f"Input shape mismatch occured for {key} in module {instance.__class__.__name__} : \n"
+                    f"Input shape expected = {axes} | \n"
+                    f"Input shape found : {value.shape}"
+                )
+
+
 class Typing(ABC):
     """
     An interface which endows module with neural types
@@ -258,7 +321,9 @@ class Typing(ABC):
                         """
                         self.__check_neural_type(val, metadata, depth=1, name=key)
 
-    def _attach_and_validate_output_types(self, out_objects, ignore_collections=False, output_types=None):
+    def _attach_and_validate_output_types(
+        self, out_objects, ignore_collections=False, output_types=None, metadata: Optional[TypecheckMetadata] = None
+    ):
         """
         This function does a few things.
 
@@ -277,11 +342,13 @@ class Typing(ABC):
             ignore_collections: For backward compatibility, container support can be disabled explicitly
                 using this flag. When set to True, all nesting is ignored and nest-depth checks are skipped.
             out_objects: The outputs of the wrapped function.
+            metadata: Precomputed TypecheckMetadata of `output_types`, computed here if not provided.
         """
         # TODO: Properly implement this
         if output_types is not None:
             # Precompute metadata
-            metadata = TypecheckMetadata(original_types=output_types, ignore_collections=ignore_collections)
+            if metadata is None:
+                metadata = TypecheckMetadata(original_types=output_types, ignore_collections=ignore_collections)
             out_types_list = list(metadata.base_types.items())
             mandatory_out_types_list = list(metadata.mandatory_types.items())
 
@@ -983,6 +1050,15 @@ class typecheck:
 
         When you call this function, all arguments must be passed using kwargs only.
 
+    3) Every call is fully validated by default, which reads the `input_types` and `output_types` of the
+        instance and compares them with the neural types of the arguments.
+
+        With `typecheck.set_num_validated_calls(N)` (or the `typecheck.validate_first_calls(N)` context),
+        only the first N calls of a method of a class with a given set of arguments are fully validated.
+        The types of these calls are compiled into a `TypecheckPlan`, and later calls only check the number
+        of dimensions of the tensors and attach the compiled output types. This assumes that the types of
+        a class do not change between calls or instances.
+
     """
 
     class TypeState(Enum):
@@ -1042,6 +1118,27 @@ class typecheck:
         if not isinstance(instance, Typing):
             raise RuntimeError("Only classes which inherit nemo.core.Typing can use this decorator !")
 
+        # Trusted calls use the compiled plan of the method, without reading the types of the instance
+        num_validated_calls = _TYPECHECK_NUM_VALIDATED_CALLS
+        if num_validated_calls is not None:
+            plan_key = (self, type(instance), tuple(kwargs))
+            plan = _TYPECHECK_PLANS.get(plan_key)
+            if plan is not None and plan.num_validated_calls >= num_validated_calls:
+                if plan.input_types is not None:
+                    if len(args) > 0:
+                        raise TypeError("All arguments must be passed by kwargs only for typed methods")
+                    plan.check_input_ranks(instance, kwargs)
+
+                outputs = wrapped(*args, **kwargs)
+
+                instance._attach_and_validate_output_types(
+                    output_types=plan.output_types,
+                    ignore_collections=self.ignore_collections,
+                    out_objects=outputs,
+                    metadata=plan.output_metadata,
+                )
+                return outputs
+
         if hasattr(instance, 'input_ports') or hasattr(instance, 'output_ports'):
             raise RuntimeError(
                 "Typing requires override of `input_types()` and `output_types()`, "
@@ -1084,6 +1181,14 @@ class typecheck:
             output_types=output_types, ignore_collections=self.ignore_collections, out_objects=outputs
         )
 
+        if num_validated_calls is not None:
+            if plan is None:
+                plan = TypecheckPlan(
+                    input_types=input_types, output_types=output_types, ignore_collections=self.ignore_collections
+                )
+                _TYPECHECK_PLANS[plan_key] = plan
+            plan.num_validated_calls += 1
+
         return outputs
 
     @staticmethod
@@ -1132,6 +1237,33 @@ class typecheck:
         finally:
             typecheck.set_semantic_check_enabled(enabled=True)
 
+    @staticmethod
+    def set_num_validated_calls(num_calls: Optional[int] = None):
+        """
+        Global method to only fully validate the first calls of typed methods, and trust later calls.
+        Compiled plans are reset, so that the next calls are validated again.
+
+        Args:
+            num_calls: number of fully validated calls of every typed method of a class with a given set of
+                arguments, after which calls only check the number of dimensions of the tensors.
+                None validates every call.
+        """
+        global _TYPECHECK_NUM_VALIDATED_CALLS
+        _TYPECHECK_NUM_VALIDATED_CALLS = num_calls
+        _TYPECHECK_PLANS.clear()
+
+    @staticmethod
+    @contextmanager
+    def validate_first_calls(num_calls: int = 1):
+        """
+        Context manager that temporarily only fully validates the first calls of typed methods within its context.
+        """
+        typecheck.set_num_validated_calls(num_calls)
+        try:
+            yield
+        finally:
+            typecheck.set_num_validated_calls(None)
+
     @staticmethod
     def enable_wrapping(enabled: bool = True):
         typecheck.set_typecheck_enabled(enabled)
@@ -14,12 +14,13 @@
 
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
 import torch.distributed
 import wrapt
+from megatron.core import parallel_state
 from megatron.core.inference.common_inference_params import CommonInferenceParams
 from megatron.core.inference.inference_request import InferenceRequest
 
@@ -200,6 +201,77 @@ class MegatronLLMDeployableNemo2(ITritonDeployable):
         )
         return list(results)
 
+    @torch.no_grad()
+    def score(
+        self,
+        context_token_ids: List[List[int]],
+        continuation_token_ids: List[List[int]],
+        max_batch_size: int = 4,
+    ) -> Tuple[List[float], List[bool]]:
+        """
+        Computes the log-likelihood of continuations given their contexts, as needed by log-likelihood
+        evaluation tasks. Only the log-probabilities of the continuation tokens leave the GPU, instead of the
+        logits over the whole vocabulary.
+
+        Args:
+            context_token_ids (List[List[int]]): token ids of the contexts, each with at least one token.
+            continuation_token_ids (List[List[int]]): token ids of the continuations, each with at least one token.
+            max_batch_size (int): The maximum batch size used for the forward passes.
+
+        Returns:
+            Tuple[List[float], List[bool]]: the sum of the log-probabilities of the tokens of every continuation,
+            and whether every continuation is the greedy continuation of its context.
+        """
+        if not self.supports_scoring():
+            raise NotImplementedError("Scoring is not supported with pipeline parallelism.")
+
+        num_requests = len(context_token_ids)
+        logprobs = torch.zeros(num_requests, dtype=torch.float32, device="cuda")
+        num_mismatches = torch.zeros(num_requests, dtype=torch.long, device="cuda")
+        # sort by length so that sequences of similar lengths are batched together, which reduces padding
+        order = sorted(
+            range(num_requests), key=lambda i: len(context_token_ids[i]) + len(continuation_token_ids[i]), reverse=True
+        )
+        for start in range(0, num_requests, max_batch_size):
+            indices = order[start : start + max_batch_size]
+            sequences = [context_token_ids[i] + continuation_token_ids[i] for i in indices]
+            max_length = max(len(sequence) for sequence in sequences)
+            tokens = torch.full((len(indices), max_length), self.mcore_tokenizer.eod, dtype=torch.long)
+            rows, positions, targets, requests = [], [], [], []
+            for row, (idx, sequence) in enumerate(zip(indices, sequences)):
+                tokens[row, : len(sequence)] = torch.tensor(sequence, dtype=torch.long)
+                # the logits at position `p` predict the token at position `p + 1`
+                context_length, continuation_length = len(context_token_ids[idx]), len(continuation_token_ids[idx])
+                rows.extend([row] * continuation_length)
+                positions.extend(range(context_length - 1, context_length + continuation_length - 1))
+                targets.extend(continuation_token_ids[idx])
+                requests.extend([idx] * continuation_length)
+            tokens = tokens.cuda()
+
+            self.inference_wrapped_model.prep_model_for_inference(prompts_tokens=tokens)
+            inference_input = self.inference_wrapped_model.get_batch_for_context_window(0, max_length)
+            logits = self.inference_wrapped_model.run_one_forward_step(inference_input)
+
+            rows, positions, targets, requests = (
+                torch.tensor(x, dtype=torch.long, device="cuda") for x in (rows, positions, targets, requests)
+            )
+            # discard the logits of the padded vocabulary
+            continuation_logits = logits[rows, positions, : self.mcore_tokenizer.vocab_size].float()
+            token_logprobs = torch.log_softmax(continuation_logits, dim=-1).gather(1, targets[:, None]).squeeze(1)
+            logprobs.index_add_(0, requests, token_logprobs)
+            num_mismatches.index_add_(0, requests, (continuation_logits.argmax(dim=-1) != targets).long())
+
+        return logprobs.tolist(), (num_mismatches == 0).tolist()
+
+    def supports_scoring(self) -> bool:
+        """
+        Returns whether `score` can be used, which is not the case with pipeline parallelism.
+        """
+        return (
+            not parallel_state.model_parallel_is_initialized()
+            or parallel_state.get_pipeline_model_parallel_world_size() == 1
+        )
+
     def generate_other_ranks(self):
         """
         Generate function for ranks other than the rank 0.
@@ -208,7 +280,10 @@ class MegatronLLMDeployableNemo2(ITritonDeployable):
         while True:
             message = torch.empty(1, dtype=torch.long, device="cuda")
             torch.distributed.broadcast(message, src=0)
-            if message == 0:
+            if message == 2:
+                context_token_ids, continuation_token_ids, max_batch_size = broadcast_list(data=[None], src=0)
+                self.score(context_token_ids, continuation_token_ids, max_batch_size)
+            elif message == 0:
                 prompts = broadcast_list(data=[None], src=0)
                 max_batch_size, random_seed, temperature, top_k, top_p, num_tokens_to_generate, log_probs = (
                     broadcast_list(data=[None], src=0)
@@ -228,8 +303,14 @@ class MegatronLLMDeployableNemo2(ITritonDeployable):
 
     @property
     def get_triton_input(self):
-        inputs = (
-            Tensor(name="prompts", shape=(-1,), dtype=bytes),
+        inputs = (Tensor(name="prompts", shape=(-1,), dtype=bytes, optional=True),)
+        if self.supports_scoring():
+            # clients check for these inputs to score requests on the server, see `NemoQueryLLM.query_loglikelihood`
+            inputs += (
+                Tensor(name="context_token_ids", shape=(-1,), dtype=np.int_, optional=True),
+                Tensor(name="continuation_token_ids", shape=(-1,), dtype=np.int_, optional=True),
+            )
+        inputs += (
             Tensor(name="max_length", shape=(-1,), dtype=np.int_, optional=True),
             Tensor(name="max_batch_size", shape=(-1,), dtype=np.int_, optional=True),
             Tensor(name="top_k", shape=(-1,), dtype=np.int_, optional=True),
@@ -246,10 +327,15 @@ class MegatronLLMDeployableNemo2(ITritonDeployable):
         return (
             Tensor(name="sentences", shape=(-1,), dtype=bytes),
             Tensor(name="log_probs", shape=(-1,), dtype=np.single),
+            Tensor(name="logprobs_sum", shape=(-1,), dtype=np.single),
+            Tensor(name="is_greedy", shape=(-1,), dtype=np.bool_),
         )
 
     @batch
     def triton_infer_fn(self, **inputs: np.ndarray):
+        if "context_token_ids" in inputs:
+            return self.triton_score_fn(inputs)
+
         output_infer = {}
         try:
             prompts = str_ndarray2list(inputs.pop("prompts"))
@@ -305,3 +391,31 @@ class MegatronLLMDeployableNemo2(ITritonDeployable):
             output_infer["sentences"] = cast_output([err_msg], np.bytes_)
 
         return output_infer
+
+    def triton_score_fn(self, inputs: Dict[str, np.ndarray]):
+        """
+        Scores requests with token ids sent as rows of `context_token_ids` and `continuation_token_ids`, padded with
+        negative ids, see `score`.
+        """
+        output_infer = {}
+        try:
+            if not self.supports_scoring():
+                # checked before the other ranks are notified, which would otherwise wait for the scoring forever
+                raise NotImplementedError("Scoring is not supported with pipeline parallelism.")
+            context_token_ids = [row[row >= 0].tolist() for row in inputs.pop("context_token_ids")]
+            continuation_token_ids = [row[row >= 0].tolist() for row in inputs.pop("continuation_token_ids")]
+            max_batch_size = int(inputs.pop("max_batch_size")[0][0]) if "max_batch_size" in inputs else 4
+
+            if torch.distributed.is_initialized():
+                if torch.distributed.get_world_size() > 1:
+                    torch.distributed.broadcast(torch.tensor([2], dtype=torch.long, device="cuda"), src=0)
+                    broadcast_list([context_token_ids, continuation_token_ids, max_batch_size], src=0)
+
+            logprobs, is_greedy = self.score(context_token_ids, continuation_token_ids, max_batch_size)
+            output_infer["logprobs_sum"] = cast_output(logprobs, np.single)
+            output_infer["is_greedy"] = cast_output(is_greedy, np.bool_)
+        except Exception as error:
+            err_msg = "An error occurred: {0}".format(str(error))
+            output_infer["sentences"] = cast_output([err_msg], np.bytes_)
+
+        return output_infer
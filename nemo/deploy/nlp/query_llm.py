@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import contextlib
+import threading
 import time
 from abc import ABC
 
@@ -21,15 +24,84 @@ from nemo.deploy.utils import str_list2numpy
 
 use_pytriton = True
 try:
-    from pytriton.client import DecoupledModelClient, ModelClient
+    from pytriton.client import AsyncioModelClient, DecoupledModelClient, ModelClient
 except Exception:
     use_pytriton = False
 
 
+def _pad_token_ids(token_ids):
+    """
+    Returns lists of token ids as the rows of an array, padded with -1 since token ids are not negative.
+    """
+    padded = np.full((len(token_ids), max((len(ids) for ids in token_ids), default=0)), -1, dtype=np.int_)
+    for row, ids in enumerate(token_ids):
+        padded[row, : len(ids)] = ids
+    return padded
+
+
 class NemoQueryLLMBase(ABC):
+    """
+    Base class of the LLM query clients. Connections to the Triton server are kept open across queries, with one
+    client per thread since Triton HTTP clients cannot be shared between threads. Call `close` (or use the query
+    object as a context manager) to close them.
+    """
+
     def __init__(self, url, model_name):
         self.url = url
         self.model_name = model_name
+        self._local = threading.local()
+        # open clients, with the thread which created them
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _model_client(self, init_timeout=60.0):
+        """
+        Yields the client of the current thread, created on first use. A client which raised an error is closed
+        and created again for the next query. The clients of threads which have exited are closed when a new client
+        is created, so that short-lived threads do not keep connections open.
+        """
+        client = getattr(self._local, "client", None)
+        if client is None:
+            with self._clients_lock:
+                dead_clients = [other for other, thread in self._clients.items() if not thread.is_alive()]
+            for dead_client in dead_clients:
+                self._close_client(dead_client)
+            client = ModelClient(self.url, self.model_name, init_timeout_s=init_timeout)
+            self._local.client = client
+            with self._clients_lock:
+                self._clients[client] = threading.current_thread()
+        try:
+            yield client
+        except Exception:
+            self._local.client = None
+            self._close_client(client)
+            raise
+
+    def _close_client(self, client):
+        with self._clients_lock:
+            self._clients.pop(client, None)
+        try:
+            client.close()
+        except Exception:
+            # clients using gevent can only be closed from the thread which created them
+            pass
+
+    def close(self):
+        """
+        Closes the connections to the Triton server.
+        """
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            self._close_client(client)
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class NemoQueryLLMPyTorch(NemoQueryLLMBase):
@@ -94,6 +166,44 @@ class NemoQueryLLMPyTorch(NemoQueryLLMBase):
             max_length (int): max generated tokens.
             init_timeout (flat): timeout for the connection.
         """
+        inputs = self._prepare_inputs(
+            prompts,
+            use_greedy=use_greedy,
+            temperature=temperature,
+            top_k=top_k,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            add_BOS=add_BOS,
+            all_probs=all_probs,
+            compute_logprob=compute_logprob,
+            end_strings=end_strings,
+            min_length=min_length,
+            max_length=max_length,
+        )
+        with self._model_client(init_timeout) as client:
+            result_dict = client.infer_batch(**inputs)
+            output_type = client.model_config.outputs[0].dtype
+        return self._parse_response(result_dict, output_type)
+
+    def _prepare_inputs(
+        self,
+        prompts,
+        use_greedy: bool = None,
+        temperature: float = None,
+        top_k: int = None,
+        top_p: float = None,
+        repetition_penalty: float = None,
+        add_BOS: bool = None,
+        all_probs: bool = None,
+        compute_logprob: bool = None,
+        end_strings=None,
+        min_length: int = None,
+        max_length: int = None,
+        **kwargs,
+    ):
+        """
+        Returns the Triton inputs of a query, see `query_llm` for the arguments.
+        """
         prompts = str_list2numpy(prompts)
         inputs = {
             "prompts": prompts,
@@ -120,34 +230,35 @@ class NemoQueryLLMPyTorch(NemoQueryLLMBase):
             inputs["min_length"] = np.full(prompts.shape, min_length, dtype=np.int_)
         if max_length is not None:
             inputs["max_length"] = np.full(prompts.shape, max_length, dtype=np.int_)
+        return inputs
 
-        with ModelClient(self.url, self.model_name, init_timeout_s=init_timeout) as client:
-            result_dict = client.infer_batch(**inputs)
-            output_type = client.model_config.outputs[0].dtype
-
-            log_probs_output = None
-            if "log_probs" in result_dict.keys():
-                log_probs_output = result_dict["log_probs"]
-
-            if output_type == np.bytes_:
-                if "sentences" in result_dict.keys():
-                    output = result_dict["sentences"]
-                else:
-                    return "Unknown output keyword."
+    def _parse_response(self, result_dict, output_type, **kwargs):
+        """
+        Returns the response to a query from the outputs of the Triton server.
+        """
+        log_probs_output = None
+        if "log_probs" in result_dict.keys():
+            log_probs_output = result_dict["log_probs"]
 
-                sentences = np.char.decode(output.astype("bytes"), "utf-8")
-                openai_response = {
-                    "id": f"cmpl-{int(time.time())}",
-                    "object": "text_completion",
-                    "created": int(time.time()),
-                    "model": self.model_name,
-                    "choices": [{"text": sentences}],
-                }
-                if log_probs_output is not None:
-                    openai_response["log_probs"] = log_probs_output
-                return openai_response
+        if output_type == np.bytes_:
+            if "sentences" in result_dict.keys():
+                output = result_dict["sentences"]
             else:
-                return result_dict["sentences"]
+                return "Unknown output keyword."
+
+            sentences = np.char.decode(output.astype("bytes"), "utf-8")
+            openai_response = {
+                "id": f"cmpl-{int(time.time())}",
+                "object": "text_completion",
+                "created": int(time.time()),
+                "model": self.model_name,
+                "choices": [{"text": sentences}],
+            }
+            if log_probs_output is not None:
+                openai_response["log_probs"] = log_probs_output
+            return openai_response
+        else:
+            return result_dict["sentences"]
 
 
 class NemoQueryLLM(NemoQueryLLMBase):
@@ -219,7 +330,66 @@ class NemoQueryLLM(NemoQueryLLMBase):
             openai_format_response: return response similar to OpenAI API format
             output_generation_logits: return generation logits from model on PyTriton
         """
+        inputs = self._prepare_inputs(
+            prompts,
+            stop_words_list=stop_words_list,
+            bad_words_list=bad_words_list,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            min_output_len=min_output_len,
+            max_output_len=max_output_len,
+            top_k=top_k,
+            top_p=top_p,
+            temperature=temperature,
+            random_seed=random_seed,
+            task_id=task_id,
+            lora_uids=lora_uids,
+            use_greedy=use_greedy,
+            repetition_penalty=repetition_penalty,
+            add_BOS=add_BOS,
+            all_probs=all_probs,
+            compute_logprob=compute_logprob,
+            end_strings=end_strings,
+            output_context_logits=output_context_logits,
+            output_generation_logits=output_generation_logits,
+        )
+        with self._model_client(init_timeout) as client:
+            result_dict = client.infer_batch(**inputs)
+            output_type = client.model_config.outputs[0].dtype
+        return self._parse_response(
+            result_dict,
+            output_type,
+            openai_format_response=openai_format_response,
+            output_context_logits=output_context_logits,
+            output_generation_logits=output_generation_logits,
+        )
 
+    def _prepare_inputs(
+        self,
+        prompts,
+        stop_words_list=None,
+        bad_words_list=None,
+        no_repeat_ngram_size=None,
+        min_output_len=None,
+        max_output_len=None,
+        top_k=None,
+        top_p=None,
+        temperature=None,
+        random_seed=None,
+        task_id=None,
+        lora_uids=None,
+        use_greedy: bool = None,
+        repetition_penalty: float = None,
+        add_BOS: bool = None,
+        all_probs: bool = None,
+        compute_logprob: bool = None,
+        end_strings=None,
+        output_context_logits: bool = False,
+        output_generation_logits: bool = False,
+        **kwargs,
+    ):
+        """
+        Returns the Triton inputs of a query, see `query_llm` for the arguments.
+        """
         prompts = str_list2numpy(prompts)
         inputs = {"prompts": prompts}
 
@@ -281,37 +451,88 @@ class NemoQueryLLM(NemoQueryLLMBase):
 
         if output_generation_logits is not None:
             inputs["output_generation_logits"] = np.full(prompts.shape, output_generation_logits, dtype=np.bool_)
+        return inputs
 
-        with ModelClient(self.url, self.model_name, init_timeout_s=init_timeout) as client:
-            result_dict = client.infer_batch(**inputs)
-            output_type = client.model_config.outputs[0].dtype
+    def _parse_response(
+        self,
+        result_dict,
+        output_type,
+        openai_format_response: bool = False,
+        output_context_logits: bool = False,
+        output_generation_logits: bool = False,
+        **kwargs,
+    ):
+        """
+        Returns the response to a query from the outputs of the Triton server.
+        """
+        if output_type == np.bytes_:
+            if "outputs" in result_dict.keys():
+                output = result_dict["outputs"]
+            elif "sentences" in result_dict.keys():
+                output = result_dict["sentences"]
+            else:
+                return "Unknown output keyword."
 
-            if output_type == np.bytes_:
-                if "outputs" in result_dict.keys():
-                    output = result_dict["outputs"]
-                elif "sentences" in result_dict.keys():
-                    output = result_dict["sentences"]
-                else:
-                    return "Unknown output keyword."
-
-                sentences = np.char.decode(output.astype("bytes"), "utf-8")
-                if openai_format_response:
-                    openai_response = {
-                        "id": f"cmpl-{int(time.time())}",
-                        "object": "text_completion",
-                        "created": int(time.time()),
-                        "model": self.model_name,
-                        "choices": [{"text": sentences}],
-                    }
-                    if output_generation_logits:
-                        openai_response["choices"][0]["generation_logits"] = result_dict["generation_logits"]
-                    if output_context_logits:
-                        openai_response["choices"][0]["context_logits"] = result_dict["context_logits"]
-                    return openai_response
-                else:
-                    return sentences
+            sentences = np.char.decode(output.astype("bytes"), "utf-8")
+            if openai_format_response:
+                openai_response = {
+                    "id": f"cmpl-{int(time.time())}",
+                    "object": "text_completion",
+                    "created": int(time.time()),
+                    "model": self.model_name,
+                    "choices": [{"text": sentences}],
+                }
+                if output_generation_logits:
+                    openai_response["choices"][0]["generation_logits"] = result_dict["generation_logits"]
+                if output_context_logits:
+                    openai_response["choices"][0]["context_logits"] = result_dict["context_logits"]
+                return openai_response
             else:
-                return result_dict["outputs"]
+                return sentences
+        else:
+            return result_dict["outputs"]
+
+    def supports_loglikelihood(self, init_timeout=60.0) -> bool:
+        """
+        Returns whether the deployed model can score continuations on the server with `query_loglikelihood`.
+        """
+        with self._model_client(init_timeout) as client:
+            return any(tensor.name == "context_token_ids" for tensor in client.model_config.inputs)
+
+    def query_loglikelihood(
+        self,
+        context_token_ids,
+        continuation_token_ids,
+        max_batch_size=None,
+        init_timeout=60.0,
+    ):
+        """
+        Query the Triton server for the log-likelihood of continuations given their contexts.
+
+        Args:
+            context_token_ids (List(List(int))): token ids of the contexts, each with at least one token.
+            continuation_token_ids (List(List(int))): token ids of the continuations.
+            max_batch_size (int): max batch size of the forward passes on the server.
+            init_timeout (flat): timeout for the connection.
+
+        Returns:
+            the sum of the log-probabilities of the tokens of every continuation, and whether every continuation
+            is the greedy continuation of its context.
+        """
+        inputs = {
+            "context_token_ids": _pad_token_ids(context_token_ids),
+            "continuation_token_ids": _pad_token_ids(continuation_token_ids),
+        }
+
+        if max_batch_size is not None:
+            inputs["max_batch_size"] = np.full((len(context_token_ids), 1), max_batch_size, dtype=np.int_)
+
+        with self._model_client(init_timeout) as client:
+            result_dict = client.infer_batch(**inputs)
+
+        if "logprobs_sum" not in result_dict:
+            raise RuntimeError(np.char.decode(result_dict["sentences"].astype("bytes"), "utf-8").flatten()[0])
+        return result_dict["logprobs_sum"].reshape(-1).tolist(), result_dict["is_greedy"].reshape(-1).tolist()
 
     def query_llm_streaming(
         self,
@@ -390,3 +611,146 @@ class NemoQueryLLM(NemoQueryLLMBase):
                     yield sentences
                 else:
                     yield partial_result_dict["outputs"]
+
+
+class AsyncNemoQueryLLM:
+    """
+    Sends queries to Triton for LLM inference from asyncio code.
+
+    Every query holds a single prompt. Queries with the same generation parameters which arrive within
+    `max_batch_delay` seconds of each other are sent to the server as one batched request, of at most
+    `max_batch_size` prompts, and at most `max_concurrent_requests` requests are in flight at a time. A single
+    connection to the server is kept open and shared by all the queries, it is replaced after a failed request.
+
+    Example:
+        from nemo.deploy.nlp import AsyncNemoQueryLLM
+
+        nq = AsyncNemoQueryLLM(url="localhost", model_name="GPT-2B")
+        outputs = await asyncio.gather(
+            nq.query_llm("hello, testing GPT inference", max_output_len=100),
+            nq.query_llm("another GPT inference test?", max_output_len=100),
+        )
+        await nq.close()
+
+    Args:
+        url (str): url of the Triton server.
+        model_name (str): name of the deployed model.
+        max_batch_size (int): max number of prompts sent in a single request.
+        max_batch_delay (float): max time in seconds a query waits for other queries to batch with.
+        max_concurrent_requests (int): max number of requests in flight.
+        init_timeout (float): timeout for the connection.
+        query_class (type): query class building the inputs and parsing the outputs of the deployed model,
+            `NemoQueryLLM` or `NemoQueryLLMPyTorch`.
+    """
+
+    def __init__(
+        self,
+        url,
+        model_name,
+        max_batch_size: int = 8,
+        max_batch_delay: float = 0.005,
+        max_concurrent_requests: int = 4,
+        init_timeout: float = 60.0,
+        query_class=None,
+    ):
+        self.url = url
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_concurrent_requests = max_concurrent_requests
+        self.init_timeout = init_timeout
+        # only used to build the inputs and parse the outputs, it never opens a connection
+        self._query = (query_class or NemoQueryLLM)(url=url, model_name=model_name)
+        self._client = None
+        self._output_type = None
+        self._client_lock = None
+        self._semaphore = None
+        self._pending = {}
+        self._tasks = set()
+
+    async def query_llm(self, prompt: str, **kwargs):
+        """
+        Queries the Triton server with a single prompt.
+
+        Args:
+            prompt (str): the prompt.
+            kwargs: generation parameters, see `query_llm` of the query class.
+
+        Returns:
+            the response of `query_llm` of the query class for the prompt.
+        """
+        kwargs.pop("init_timeout", None)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = repr(sorted(kwargs.items()))
+        batch, _ = self._pending.get(key, (None, None))
+        if batch is None:
+            batch = []
+            self._pending[key] = (batch, kwargs)
+            loop.call_later(self.max_batch_delay, self._flush, key, batch, kwargs)
+        batch.append((prompt, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(key, batch, kwargs)
+        return await future
+
+    def _flush(self, key, batch, kwargs):
+        # the batch was already sent when it became full before the end of the delay
+        if self._pending.get(key, (None, None))[0] is not batch:
+            return
+        del self._pending[key]
+        task = asyncio.ensure_future(self._infer(batch, kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _get_client(self):
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                self._client = AsyncioModelClient(self.url, self.model_name, init_timeout_s=self.init_timeout)
+            return self._client
+
+    async def _drop_client(self, client):
+        # the connection may be broken, the next request opens a new one
+        if self._client is not client:
+            return
+        self._client = None
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+    async def _infer(self, batch, kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        try:
+            inputs = self._query._prepare_inputs([prompt for prompt, _ in batch], **kwargs)
+            async with self._semaphore:
+                client = await self._get_client()
+                try:
+                    result_dict = await client.infer_batch(**inputs)
+                    if self._output_type is None:
+                        self._output_type = (await client.model_config).outputs[0].dtype
+                except Exception:
+                    await self._drop_client(client)
+                    raise
+            for idx, (_, future) in enumerate(batch):
+                if not future.done():
+                    row = {name: value[idx : idx + 1] for name, value in result_dict.items()}
+                    future.set_result(self._query._parse_response(row, self._output_type, **kwargs))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        """
+        Waits for the requests in flight and closes the connection to the Triton server.
+        """
+        for key, (batch, kwargs) in list(self._pending.items()):
+            self._flush(key, batch, kwargs)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
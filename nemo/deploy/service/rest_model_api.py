@@ -8,7 +8,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
+from collections import OrderedDict
 from pathlib import Path
 import requests
 
@@ -16,7 +18,7 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
-from nemo.deploy.nlp import NemoQueryLLM
+from nemo.deploy.nlp import AsyncNemoQueryLLM
 from nemo.utils import logging
 
 
@@ -33,6 +35,10 @@ class TritonSettings(BaseSettings):
             self._triton_request_timeout = int(os.environ.get('TRITON_REQUEST_TIMEOUT', 60))
             self._openai_format_response = os.environ.get('OPENAI_FORMAT_RESPONSE', 'False').lower() == 'true'
             self._output_generation_logits = os.environ.get('OUTPUT_GENERATION_LOGITS', 'False').lower() == 'true'
+            self._client_max_batch_size = int(os.environ.get('TRITON_CLIENT_MAX_BATCH_SIZE', 8))
+            self._client_max_batch_delay_ms = float(os.environ.get('TRITON_CLIENT_MAX_BATCH_DELAY_MS', 5))
+            self._client_max_concurrent_requests = int(os.environ.get('TRITON_CLIENT_MAX_CONCURRENT_REQUESTS', 4))
+            self._client_max_models = int(os.environ.get('TRITON_CLIENT_MAX_MODELS', 16))
         except Exception as error:
             logging.error("An exception occurred trying to retrieve set args in TritonSettings class. Error:", error)
             return
@@ -63,9 +69,73 @@ class TritonSettings(BaseSettings):
         """
         return self._output_generation_logits
 
+    @property
+    def client_max_batch_size(self):
+        """
+        Returns the max number of concurrent completion requests batched into a single Triton request.
+        """
+        return self._client_max_batch_size
+
+    @property
+    def client_max_batch_delay_ms(self):
+        """
+        Returns the max time in milliseconds a completion request waits for other requests to batch with.
+        """
+        return self._client_max_batch_delay_ms
+
+    @property
+    def client_max_concurrent_requests(self):
+        """
+        Returns the max number of requests in flight to the Triton server for a model.
+        """
+        return self._client_max_concurrent_requests
+
+    @property
+    def client_max_models(self):
+        """
+        Returns the max number of models with an open client, the least recently queried ones are closed first.
+        """
+        return self._client_max_models
+
 
 app = FastAPI()
 triton_settings = TritonSettings()
+# one client per model, shared by all the completion requests so that they are batched over a single connection,
+# in least recently used order
+query_clients = OrderedDict()
+# evicted clients which are waiting for their requests in flight before closing
+closing_query_clients = set()
+
+
+def get_query_client(model_name: str) -> AsyncNemoQueryLLM:
+    if model_name in query_clients:
+        query_clients.move_to_end(model_name)
+        return query_clients[model_name]
+
+    url = triton_settings.triton_service_ip + ":" + str(triton_settings.triton_service_port)
+    query_clients[model_name] = AsyncNemoQueryLLM(
+        url=url,
+        model_name=model_name,
+        max_batch_size=triton_settings.client_max_batch_size,
+        max_batch_delay=triton_settings.client_max_batch_delay_ms / 1000,
+        max_concurrent_requests=triton_settings.client_max_concurrent_requests,
+        init_timeout=triton_settings.triton_request_timeout,
+    )
+    while len(query_clients) > max(triton_settings.client_max_models, 1):
+        _, nq = query_clients.popitem(last=False)
+        task = asyncio.ensure_future(nq.close())
+        closing_query_clients.add(task)
+        task.add_done_callback(closing_query_clients.discard)
+    return query_clients[model_name]
+
+
+@app.on_event("shutdown")
+async def close_query_clients():
+    for nq in query_clients.values():
+        await nq.close()
+    query_clients.clear()
+    if closing_query_clients:
+        await asyncio.gather(*closing_query_clients, return_exceptions=True)
 
 
 class CompletionRequest(BaseModel):
@@ -106,18 +176,16 @@ async def check_triton_health():
 
 
 @app.post("/v1/completions/")
-def completions_v1(request: CompletionRequest):
+async def completions_v1(request: CompletionRequest):
     try:
-        url = triton_settings.triton_service_ip + ":" + str(triton_settings.triton_service_port)
-        nq = NemoQueryLLM(url=url, model_name=request.model)
-        output = nq.query_llm(
-            prompts=[request.prompt],
+        nq = get_query_client(request.model)
+        output = await nq.query_llm(
+            request.prompt,
             max_output_len=request.max_tokens,
             # when these below params are passed as None
             top_k=request.top_k,
             top_p=request.top_p,
             temperature=request.temperature,
-            init_timeout=triton_settings.triton_request_timeout,
             openai_format_response=triton_settings.openai_format_response,
             output_generation_logits=triton_settings.output_generation_logits,
         )
@@ -139,12 +139,13 @@ def add_megatron_sampler(
     global_batch_size: int,
     rampup_batch_size: Optional[List[int]] = None,
     consumed_samples: int = 0,
-    dataloader_type: Literal["single", "cyclic", "batch"] = "single",
+    dataloader_type: Literal["single", "cyclic", "batch", "length_grouped"] = "single",
     drop_last: bool = True,
     pad_samples_to_global_batch_size: bool = False,
     dataloader_mode: Literal["train", "validation", "test", "predict"] = "train",
     rank: int = 0,
     world_size: int = 1,
+    seed: int = 0,
     # data_sharding: bool = False
 ) -> DataLoader:
     """
@@ -168,6 +169,10 @@ def add_megatron_sampler(
                   use for fine-tuning workloads, where sequence lengths are variable between samples.
                   Sampling the entire global batch together ensures that sequences in a global batch are
                   padded to the same lengths.
+                - "length_grouped": Uses `MegatronLengthGroupedBatchSampler`, which is the "batch" sampler
+                  grouping samples of similar lengths into the same global batch to reduce padding. The dataset
+                  must provide the lengths of its samples with a `get_sample_lengths` method, otherwise
+                  "batch" is used.
             Defaults to "single".
         drop_last (bool, optional): Whether to drop the last incomplete batch
             (defaults to True).
@@ -175,10 +180,18 @@ def add_megatron_sampler(
             batch to the `global_batch_size`  (defaults to False, only applies when
             `drop_last` is False).
         dataloader_mode (Literal["train", "validation", "test", "predict"]): The mode of dataloader.
+        seed (int, optional): The seed of the "length_grouped" sampler, which only shuffles in train mode.
 
     Returns:
         DataLoader: A new DataLoader instance with the configured Megatron sampler.
     """
+    if dataloader_type == 'length_grouped':
+        get_sample_lengths = getattr(dataloader.dataset, 'get_sample_lengths', None)
+        lengths = get_sample_lengths() if get_sample_lengths is not None else None
+        if lengths is None:
+            logging.warning("The dataset does not provide sample lengths, falling back to the 'batch' sampler.")
+            dataloader_type = 'batch'
+
     if dataloader_type == 'single':
         batch_sampler = MegatronPretrainingSampler(
             total_samples=len(dataloader.dataset),
@@ -201,6 +214,24 @@ def add_megatron_sampler(
             drop_last=drop_last,
             # data_sharding=data_sharding
         )
+    elif dataloader_type == 'length_grouped':
+        from nemo.collections.nlp.data.language_modeling.megatron.megatron_batch_samplers import (
+            MegatronLengthGroupedBatchSampler,
+        )
+
+        batch_sampler = MegatronLengthGroupedBatchSampler(
+            total_samples=len(dataloader.dataset),
+            consumed_samples=consumed_samples,
+            micro_batch_size=micro_batch_size,
+            global_batch_size=global_batch_size,
+            data_parallel_rank=rank,
+            data_parallel_size=world_size,
+            drop_last=drop_last,
+            lengths=lengths,
+            pad_samples_to_global_batch_size=not drop_last,
+            seed=seed,
+            shuffle=dataloader_mode == "train",
+        )
     elif dataloader_type == 'batch':
         from nemo.collections.nlp.data.language_modeling.megatron.megatron_batch_samplers import (
             MegatronPretrainingBatchSampler,
@@ -40,11 +40,12 @@ class MegatronDataSampler(DataSampler):
         micro_batch_size: int = 4,
         global_batch_size: int = 8,
         rampup_batch_size: Optional[List[int]] = None,
-        dataloader_type: Literal["single", "cyclic", "batch"] = "single",
+        dataloader_type: Literal["single", "cyclic", "batch", "length_grouped"] = "single",
         init_consumed_samples: int = 0,
         init_global_step: int = 0,
         output_log: bool = True,
         decoder_seq_len: Optional[int] = None,
+        seed: int = 0,
     ):
         self.seq_len = seq_len
         self.decoder_seq_len = decoder_seq_len
@@ -58,6 +59,7 @@ class MegatronDataSampler(DataSampler):
         self.if_first_step = 0
         self.prev_global_batch_size = None
         self.init_global_step = init_global_step
+        self.seed = seed
 
     def setup(self, global_rank: int) -> None:
         from nemo.lightning.data import setup_microbatch_calculator
@@ -84,6 +86,7 @@ class MegatronDataSampler(DataSampler):
             dataloader_mode=mode,  # dataloader wrapped with nemo.lightning.data.WrappedDataLoader has mode attribute
             rank=data_parallel_rank,
             world_size=data_parallel_size,
+            seed=self.seed,
         )
 
     def compute_consumed_samples(self, steps_since_resume=0) -> int:
@@ -13,10 +13,10 @@
 # limitations under the License.
 
 import collections
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional, Union
 
 import numpy as np
-from tqdm import tqdm
 
 from nemo.utils import logging
 
@@ -201,47 +201,191 @@ def fill_packing_strategy(
 
     Returns:
           output_data: A list of dictionaries, where each dictionary represents a packed sequence with its input IDs,
-                        loss mask (if available), and starting indices.
-    """
-    ifile_handles = dict()
-    for seq_len in tqdm(range(pack_size + 1)):
-        per_seq_data = sequences[seq_len]
-        if len(per_seq_data) > 0:
-            perm = np.random.permutation(len(per_seq_data))
-            input_ids = np.array([x['input_ids'] for x in per_seq_data])[perm].tolist()
-            try:
-                loss_mask = np.array(
-                    [
-                        [
-                            idx >= x['answer_start_idx'] and x['input_ids'][idx] != pad_id
-                            for idx in range(len(x['input_ids']))
-                        ]
-                        for x in per_seq_data
-                    ]
-                )[perm].tolist()
-            except KeyError:
-                loss_mask = None
-            ifile_handles[seq_len] = (input_ids, loss_mask)
-
-    input_ids, loss_mask, seq_start_id = {}, {}, {}
-
-    for oindex, assignment in tqdm(enumerate(assignments), total=len(assignments)):
-        _input_ids, _loss_mask, _seq_start_id = [], [], [0]
-
-        for seq_length in assignment:
-            _input_ids.extend(ifile_handles[seq_length][0].pop())
-            _loss_mask.extend(ifile_handles[seq_length][1].pop())
-            _seq_start_id.append(len(_input_ids))
-
-        input_ids[oindex] = _input_ids
-        loss_mask[oindex] = _loss_mask
-        seq_start_id[oindex] = _seq_start_id[:-1]
+                        loss mask (None if the sequences have no `answer_start_idx`), and starting indices.
+    """
+    # sequences are flattened in the order `fill_packing_strategy_columnar` shuffles them in
+    per_seq_data = [x for seq_len in range(pack_size + 1) for x in sequences.get(seq_len, [])]
+    lengths = [len(x['input_ids']) for x in per_seq_data]
+    offsets = np.zeros(len(per_seq_data) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    input_ids = np.fromiter(
+        (token for x in per_seq_data for token in x['input_ids']), dtype=np.int64, count=offsets[-1]
+    )
+    if all('answer_start_idx' in x for x in per_seq_data):
+        answer_start_idx = np.array([x['answer_start_idx'] for x in per_seq_data], dtype=np.int64)
+    else:
+        answer_start_idx = None
 
+    packed_data = fill_packing_strategy_columnar(assignments, input_ids, offsets, answer_start_idx, pack_size, pad_id)
+    index, loss_mask = packed_data['index'], packed_data['loss_mask']
     output_data = []
-    for i in range(len(input_ids)):
-        item_dict = {'input_ids': input_ids[i], 'loss_mask': loss_mask[i], 'seq_start_id': seq_start_id[i]}
-        output_data.append(item_dict)
-
-    assert all(not seq[0] for seq in ifile_handles.values()), "Error: There are items left over from the assignment"
-    assert all(not seq[1] for seq in ifile_handles.values()), "Error: There are items left over from the assignment"
+    for (token_start, seq_start), (token_end, seq_end) in zip(index[:-1].tolist(), index[1:].tolist()):
+        output_data.append(
+            {
+                'input_ids': packed_data['input_ids'][token_start:token_end].tolist(),
+                'loss_mask': loss_mask[token_start:token_end].tolist() if loss_mask is not None else None,
+                'seq_start_id': packed_data['seq_start_id'][seq_start:seq_end].tolist(),
+            }
+        )
     return output_data
+
+
+# Columnar packed format: `<name>.npy` holds one PACKED_INDEX_DTYPE record per pack (plus a final end record) pointing
+# into flat per-token and per-sequence arrays saved next to it as `<name>.<column>.npy`.
+PACKED_INDEX_DTYPE = np.dtype([('token_offset', np.int64), ('seq_offset', np.int64)])
+PACKED_COLUMNS = ('input_ids', 'loss_mask', 'seq_start_id')
+
+
+def get_packed_column_path(path: str, column: str) -> str:
+    """
+    Returns the path of a column of a packed dataset saved in the columnar format, e.g. `packed.input_ids.npy` for
+    the `input_ids` column of `packed.npy`.
+    """
+    root, _ = os.path.splitext(str(path))
+    return f"{root}.{column}.npy"
+
+
+def fill_packing_strategy_columnar(
+    assignments: List[List[int]],
+    input_ids: np.ndarray,
+    offsets: np.ndarray,
+    answer_start_idx: Optional[np.ndarray],
+    pack_size: int,
+    pad_id: int,
+) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Columnar counterpart of `fill_packing_strategy`, which takes the tokenized dataset as flat arrays and returns the
+    packed sequences as flat arrays instead of a list of dictionaries. Sequences are assigned to packs in the same
+    order as `fill_packing_strategy`, which consumes the global numpy random state in the same way, so both functions
+    produce the same packs for the same seed.
+
+    Args:
+          assignments: A list of lists, where each inner list represents a bin and contains the indices of the
+                        sequence lengths assigned to that bin (output of 'create_packing_strategy').
+          input_ids: Token ids of all the sequences of the dataset, concatenated.
+          offsets: Array of size `num_sequences + 1` with the start of every sequence in `input_ids`.
+          answer_start_idx: Index of the first answer token of every sequence, or None if the sequences have none,
+                        in which case there is no loss mask.
+          pack_size: The maximum capacity of each bin.
+          pad_id: The tokenizer's padding token.
+
+    Returns:
+          packed_data: A dictionary with the flat `input_ids`, `loss_mask` (None without `answer_start_idx`) and
+                        `seq_start_id` columns (the start of each sequence relative to the start of its pack), and the
+                        `index` of the packs into them.
+    """
+    # lengths used for packing are one token shorter than the sequences, see `create_hist`
+    seq_lens = np.diff(offsets) - 1
+    queues = {}
+    for seq_len in range(pack_size + 1):
+        bucket = np.flatnonzero(seq_lens == seq_len)
+        if len(bucket) > 0:
+            perm = np.random.permutation(len(bucket))
+            queues[seq_len] = bucket[perm].tolist()
+
+    order = [queues[seq_len].pop() for assignment in assignments for seq_len in assignment]
+    assert all(not queue for queue in queues.values()), "Error: There are items left over from the assignment"
+    order = np.asarray(order, dtype=np.int64)
+
+    # gather the tokens of the selected sequences, in packing order
+    lengths = seq_lens[order] + 1
+    seq_starts = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=seq_starts[1:])
+    token_seq_start = np.repeat(seq_starts[:-1], lengths)
+    position = np.arange(seq_starts[-1], dtype=np.int64) - token_seq_start
+    packed_input_ids = input_ids[np.repeat(offsets[order], lengths) + position]
+    if answer_start_idx is not None:
+        loss_mask = (position >= np.repeat(answer_start_idx[order], lengths)) & (packed_input_ids != pad_id)
+    else:
+        loss_mask = None
+
+    index = np.zeros(len(assignments) + 1, dtype=PACKED_INDEX_DTYPE)
+    np.cumsum([len(assignment) for assignment in assignments], out=index['seq_offset'][1:])
+    index['token_offset'] = seq_starts[index['seq_offset']]
+    pack_of_seq = np.repeat(np.arange(len(assignments)), np.diff(index['seq_offset']))
+    seq_start_id = seq_starts[:-1] - index['token_offset'][pack_of_seq]
+
+    return {'index': index, 'input_ids': packed_input_ids, 'loss_mask': loss_mask, 'seq_start_id': seq_start_id}
+
+
+def save_packed_sequences(path: str, packed_data: Dict[str, np.ndarray]):
+    """
+    Saves the output of `fill_packing_strategy_columnar` to `path` (a `.npy` file holding the index of the packs)
+    and the column files next to it. The index is written last, so an existing `path` implies complete columns.
+    A `loss_mask` of None is not saved.
+    """
+    for column in PACKED_COLUMNS:
+        if packed_data[column] is not None:
+            np.save(get_packed_column_path(path, column), packed_data[column])
+    np.save(path, packed_data['index'])
+
+
+class PackedSequenceArrays:
+    """
+    Read-only view of a packed dataset saved by `save_packed_sequences`. All columns are memory-mapped, so that
+    ranks and dataloader workers share the page cache instead of holding a copy of the dataset each. Items have the
+    same keys as the dictionaries produced by `fill_packing_strategy`, with `input_ids` and `loss_mask` as arrays,
+    and a `loss_mask` of None if the dataset was saved without one.
+
+    Args:
+        path: Path of the `.npy` index file of the packed dataset.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._columns = None
+        self._open()
+
+    def _open(self):
+        self.index = np.load(self.path, mmap_mode='r')
+        self._columns = {}
+        for column in PACKED_COLUMNS:
+            column_path = get_packed_column_path(self.path, column)
+            self._columns[column] = np.load(column_path, mmap_mode='r') if os.path.exists(column_path) else None
+
+    def __getstate__(self):
+        # memory maps are reopened by every process instead of being pickled with their content
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self.index) - 1
+
+    def __getitem__(self, idx: int) -> Dict[str, Union[np.ndarray, List[int]]]:
+        if idx < 0:
+            idx += len(self)
+        token_start, seq_start = self.index[idx]
+        token_end, seq_end = self.index[idx + 1]
+        loss_mask = self._columns['loss_mask']
+        return {
+            'input_ids': self._columns['input_ids'][token_start:token_end],
+            'loss_mask': loss_mask[token_start:token_end] if loss_mask is not None else None,
+            'seq_start_id': self._columns['seq_start_id'][seq_start:seq_end].tolist(),
+        }
+
+
+def is_columnar_packed_file(path: str) -> bool:
+    """
+    Returns True if `path` is the index of a packed dataset saved by `save_packed_sequences`, and False if it is
+    a pickled array of dictionaries produced by `fill_packing_strategy`.
+    """
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            _, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            _, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return dtype == PACKED_INDEX_DTYPE
+
+
+def load_packed_sequences(path: str) -> Union[np.ndarray, PackedSequenceArrays]:
+    """
+    Loads a packed dataset saved either by `save_packed_sequences` (memory-mapped) or as a pickled array of
+    dictionaries produced by `fill_packing_strategy` (loaded in memory).
+    """
+    if is_columnar_packed_file(path):
+        return PackedSequenceArrays(path)
+    return np.load(path, allow_pickle=True)
@@ -0,0 +1,132 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This script tokenizes the audio of a manifest with an audio codec, for example to prepare speech-LLM training data.
+Audio is encoded chunk by chunk (see `AudioCodecModel.encode_chunked`), so that memory does not grow with the length
+of the recordings, and the tokens are written to a sharded, memory-mapped `AudioCodeStore` in 'codes_dir'.
+The output manifest is the input manifest, with the index of every utterance in the store as 'codes_index'.
+
+$ python <nemo_root_path>/scripts/dataset_processing/tts/compute_audio_codes.py \
+    --codec_model_path=<codec_root_path>/audio_codec.nemo \
+    --manifest_path=<data_root_path>/manifest.json \
+    --audio_dir=<data_root_path>/audio \
+    --codes_dir=<data_root_path>/codes \
+    --output_manifest_path=<data_root_path>/manifest_codes.json \
+    --batch_size=16 \
+    --num_workers=4
+"""
+
+import argparse
+from pathlib import Path
+
+import torch
+from tqdm import tqdm
+
+from nemo.collections.asr.parts.utils.manifest_utils import read_manifest, write_manifest
+from nemo.collections.tts.models import AudioCodecModel
+from nemo.collections.tts.parts.utils.audio_code_store import AudioCodeStoreWriter
+from nemo.collections.tts.parts.utils.tts_dataset_utils import load_audio, stack_tensors
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Tokenize audio with an audio codec into a memory-mapped code store.",
+    )
+    parser.add_argument("--codec_model_path", required=True, type=Path, help="Path to the .nemo audio codec model.")
+    parser.add_argument("--manifest_path", required=True, type=Path, help="Path to the manifest to tokenize.")
+    parser.add_argument("--audio_dir", required=True, type=Path, help="Path to base directory with audio data.")
+    parser.add_argument("--codes_dir", required=True, type=Path, help="Directory where the code store is written.")
+    parser.add_argument(
+        "--output_manifest_path", required=True, type=Path, help="Path to the output manifest, with 'codes_index'."
+    )
+    parser.add_argument("--batch_size", default=16, type=int, help="Number of utterances encoded together.")
+    parser.add_argument("--num_workers", default=4, type=int, help="Number of workers loading audio.")
+    parser.add_argument("--chunk_duration", default=30.0, type=float, help="Duration of encoded chunks, in seconds.")
+    parser.add_argument("--overlap_duration", default=1.0, type=float, help="Context on each side of a chunk, in s.")
+    parser.add_argument("--max_shard_frames", default=2**24, type=int, help="Number of frames of every shard.")
+    parser.add_argument("--dtype", default="int16", type=str, help="Integer type the tokens are stored as.")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu", type=str)
+    args = parser.parse_args()
+    return args
+
+
+class AudioDataset(torch.utils.data.Dataset):
+    def __init__(self, entries, audio_dir, sample_rate):
+        self.entries = entries
+        self.audio_dir = audio_dir
+        self.sample_rate = sample_rate
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, idx):
+        audio, _, _ = load_audio(
+            manifest_entry=self.entries[idx], audio_dir=self.audio_dir, sample_rate=self.sample_rate
+        )
+        return idx, torch.tensor(audio, dtype=torch.float32)
+
+
+def collate_fn(batch):
+    indices, audio_list = zip(*batch)
+    audio_len = torch.tensor([audio.shape[0] for audio in audio_list], dtype=torch.int32)
+    audio = stack_tensors(audio_list, max_lens=[audio_len.max().item()])
+    return list(indices), audio, audio_len
+
+
+def main():
+    args = get_args()
+
+    if not args.manifest_path.exists():
+        raise ValueError(f"Manifest {args.manifest_path} does not exist.")
+
+    codec_model = AudioCodecModel.restore_from(args.codec_model_path, map_location=args.device).eval()
+    samples_per_frame = codec_model.samples_per_frame
+    frame_rate = codec_model.sample_rate / samples_per_frame
+    chunk_frames = max(1, int(args.chunk_duration * frame_rate))
+    overlap_frames = int(args.overlap_duration * frame_rate)
+
+    entries = read_manifest(args.manifest_path)
+    # encode utterances of similar durations together, to limit padding
+    order = sorted(range(len(entries)), key=lambda idx: entries[idx].get("duration", 0.0))
+    dataset = AudioDataset([entries[idx] for idx in order], args.audio_dir, codec_model.sample_rate)
+    data_loader = torch.utils.data.DataLoader(
+        dataset, batch_size=args.batch_size, num_workers=args.num_workers, collate_fn=collate_fn
+    )
+
+    writer = None
+    with torch.no_grad():
+        for indices, audio, audio_len in tqdm(data_loader):
+            tokens, tokens_len = codec_model.encode_chunked(
+                audio=audio.to(args.device),
+                audio_len=audio_len.to(args.device),
+                chunk_frames=chunk_frames,
+                overlap_frames=overlap_frames,
+            )
+            tokens, tokens_len = tokens.cpu().numpy(), tokens_len.cpu().numpy()
+            if writer is None:
+                writer = AudioCodeStoreWriter(
+                    args.codes_dir, tokens.shape[1], dtype=args.dtype, max_shard_frames=args.max_shard_frames
+                )
+            for idx, utt_tokens, utt_tokens_len in zip(indices, tokens, tokens_len):
+                entries[order[idx]]["codes_index"] = writer.add(utt_tokens[:, :utt_tokens_len])
+
+    if writer is not None:
+        writer.finalize()
+    write_manifest(args.output_manifest_path, entries, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks reading GPT samples from a MMapIndexedDataset with a cold page cache:
+  - "get": one read per document of a sample, concatenated, as GPTDataset did so far
+  - "get_many": `MMapIndexedDataset.get_many`, assembling a sample in a single output buffer
+  - "read_ahead=N": `get_many`, reading the next N samples of the shuffled order ahead in the background
+
+The latency of page faults depends on the filesystem, so pass datasets on different filesystems (e.g. local NVMe,
+NFS, Lustre) to compare them. A synthetic dataset is written at every prefix which does not exist yet, e.g.
+
+    python benchmark_indexed_dataset_io.py /raid/bench/data /nfs/bench/data --read_ahead 16 64
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import torch
+
+from nemo.collections.nlp.data.language_modeling.megatron.gpt_dataset import (
+    _build_doc_idx,
+    _build_sample_idx_parallel,
+    _get_sample_ranges,
+)
+from nemo.collections.nlp.data.language_modeling.megatron.indexed_dataset import (
+    MMapIndexedDataset,
+    MMapIndexedDatasetBuilder,
+    data_file_path,
+    index_file_path,
+)
+
+
+def write_synthetic_dataset(prefix, num_docs, mean_doc_length, seed):
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    rng = np.random.default_rng(seed)
+    builder = MMapIndexedDatasetBuilder(data_file_path(prefix), dtype=np.int32)
+    for length in rng.geometric(1.0 / mean_doc_length, size=num_docs):
+        builder.add_item(torch.from_numpy(rng.integers(0, 50000, size=length, dtype=np.int32)))
+        builder.end_document()
+    builder.finalize(index_file_path(prefix))
+
+
+def drop_page_cache(path):
+    """Evicts the pages of a file from the page cache, so that reads hit the filesystem."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def run(dataset, ranges, method, read_ahead):
+    latencies = []
+    read_ahead_end = 0
+    start_time = time.perf_counter()
+    for i, (doc_ids, offsets, lengths) in enumerate(ranges):
+        sample_start = time.perf_counter()
+        # keep the next `read_ahead` samples read ahead, like GPTDataset
+        upcoming = ranges[max(i + 1, read_ahead_end) : i + 1 + read_ahead]
+        if upcoming:
+            dataset.read_ahead(*(np.concatenate(arrays) for arrays in zip(*upcoming)))
+            read_ahead_end = i + 1 + read_ahead
+        if method == 'get':
+            sample = np.concatenate(
+                [dataset.get(doc_id, offset, length) for doc_id, offset, length in zip(doc_ids, offsets, lengths)]
+            )
+        else:
+            sample = dataset.get_many(doc_ids, offsets, lengths)
+        sample.sum()  # touch the data
+        latencies.append(time.perf_counter() - sample_start)
+    total_time = time.perf_counter() - start_time
+    latencies = np.array(latencies) * 1000
+    return len(ranges) / total_time, np.median(latencies), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks MMapIndexedDataset reads with a cold page cache")
+    parser.add_argument('data_prefixes', type=str, nargs='+', help='Dataset prefixes, on the filesystems to compare')
+    parser.add_argument('--seq_length', type=int, default=2048, help='Sample length in tokens')
+    parser.add_argument('--num_samples', type=int, default=2000, help='Number of samples read per method')
+    parser.add_argument('--read_ahead', type=int, nargs='*', default=[16, 64], help='Read-ahead depths to compare')
+    parser.add_argument('--num_docs', type=int, default=200000, help='Documents of synthetic datasets')
+    parser.add_argument('--mean_doc_length', type=int, default=1000, help='Mean tokens of synthetic documents')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    methods = [('get', 0), ('get_many', 0)] + [('get_many', depth) for depth in args.read_ahead]
+    for prefix in args.data_prefixes:
+        if not MMapIndexedDataset.exists(prefix):
+            print(f'Writing synthetic dataset {prefix}')
+            write_synthetic_dataset(prefix, args.num_docs, args.mean_doc_length, args.seed)
+
+        dataset = MMapIndexedDataset(prefix, skip_warmup=True)
+        rng = np.random.RandomState(args.seed)
+        doc_idx = _build_doc_idx(np.arange(len(dataset)), 1, rng, False)
+        tokens = int(dataset.sizes.sum(dtype=np.int64))
+        sample_idx = _build_sample_idx_parallel(dataset.sizes, doc_idx, args.seq_length, 1, tokens)
+        order = rng.permutation(len(sample_idx) - 1)[: args.num_samples]
+        ranges = [_get_sample_ranges(dataset.sizes, doc_idx, sample_idx, idx) for idx in order]
+
+        print(f'\n{prefix}: {len(dataset)} documents, {tokens} tokens, {len(ranges)} samples')
+        print(f'{"method":>24} {"samples/s":>10} {"p50 ms":>8} {"p99 ms":>8}')
+        for method, read_ahead in methods:
+            drop_page_cache(data_file_path(prefix))
+            throughput, p50, p99 = run(dataset, ranges, method, read_ahead)
+            name = f'{method}, read_ahead={read_ahead}' if read_ahead else method
+            print(f'{name:>24} {throughput:>10.1f} {p50:>8.3f} {p99:>8.3f}')
+        del dataset
+
+
+if __name__ == '__main__':
+    main()
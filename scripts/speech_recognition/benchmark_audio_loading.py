@@ -0,0 +1,89 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks the per-sample latency of loading audio as ASR datasets do, with `WaveformFeaturizer.process`, on
+synthetic WAV, FLAC and OPUS files, for a full file and for a segment read with an offset and a duration.
+Decoding with `soundfile` alone is given as a reference for the cost of the decoding itself.
+OPUS files are decoded with pydub, and are skipped if it is not installed.
+
+For example
+
+    python benchmark_audio_loading.py --sample_rates 16000 44100 --duration 10 --num_iters 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from nemo.collections.asr.parts.preprocessing.features import WaveformFeaturizer
+from nemo.collections.asr.parts.preprocessing.segment import HAVE_PYDUB
+
+# soundfile format, subtype and sample rates of every file type
+FORMATS = {
+    'wav': ('WAV', 'PCM_16', None),
+    'flac': ('FLAC', 'PCM_16', None),
+    'opus': ('OGG', 'OPUS', (8000, 12000, 16000, 24000, 48000)),
+}
+
+
+def benchmark(fn, num_iters):
+    fn()
+    start_time = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return (time.perf_counter() - start_time) / num_iters * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the per-sample latency of audio loading")
+    parser.add_argument('--sample_rates', type=int, nargs='+', default=[16000, 44100])
+    parser.add_argument('--target_sr', type=int, default=16000)
+    parser.add_argument('--duration', type=float, default=10.0, help="Duration of the files, in seconds")
+    parser.add_argument('--segment_duration', type=float, default=2.0, help="Duration of segments, in seconds")
+    parser.add_argument('--num_iters', type=int, default=50)
+    args = parser.parse_args()
+
+    featurizer = WaveformFeaturizer(sample_rate=args.target_sr)
+    offset = args.duration / 2
+    print(f'{"file":>14}{"decode ms":>12}{"full ms":>12}{"segment ms":>12}')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for sample_rate in args.sample_rates:
+            samples = 0.1 * np.random.randn(int(args.duration * sample_rate))
+            for extension, (file_format, subtype, sample_rates) in FORMATS.items():
+                if sample_rates is not None and sample_rate not in sample_rates:
+                    continue
+                if extension == 'opus' and not HAVE_PYDUB:
+                    print(f'{extension:>6} {sample_rate:>7} skipped, pydub is not installed')
+                    continue
+                audio_file = os.path.join(tmpdir, f'audio_{sample_rate}.{extension}')
+                sf.write(audio_file, samples, sample_rate, format=file_format, subtype=subtype)
+
+                times = [
+                    benchmark(lambda: sf.read(audio_file, dtype='float32'), args.num_iters),
+                    benchmark(lambda: featurizer.process(audio_file), args.num_iters),
+                    benchmark(
+                        lambda: featurizer.process(audio_file, offset=offset, duration=args.segment_duration),
+                        args.num_iters,
+                    ),
+                ]
+                print(f'{extension:>6} {sample_rate:>7}' + ''.join(f'{time_ms:>12.2f}' for time_ms in times))
+
+
+if __name__ == '__main__':
+    main()
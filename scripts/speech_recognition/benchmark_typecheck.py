@@ -0,0 +1,102 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks the overhead of the `typecheck` decorator on the forward of small ASR modules, with small batches
+as in inference services:
+  - "validated": every call is fully validated, the default
+  - "trusted": only the first calls are validated, see `typecheck.validate_first_calls`
+  - "disabled": no type checks, see `typecheck.disable_checks`
+
+For example
+
+    python benchmark_typecheck.py --device cuda --batch_size 1 --num_iters 1000
+"""
+
+import argparse
+import time
+from contextlib import nullcontext
+
+import torch
+
+from nemo.collections.asr.modules import ConformerEncoder, ConvASRDecoder, RNNTDecoder, RNNTJoint
+from nemo.core import typecheck
+
+
+def benchmark(fn, num_iters, device):
+    for _ in range(10):
+        fn()
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    start_time = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start_time) / num_iters * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the overhead of type checks on ASR modules")
+    parser.add_argument('--device', type=str, default='cuda' if torch.cuda.is_available() else 'cpu')
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument('--num_frames', type=int, default=100)
+    parser.add_argument('--d_model', type=int, default=176)
+    parser.add_argument('--num_iters', type=int, default=200)
+    args = parser.parse_args()
+
+    device = torch.device(args.device)
+    vocab_size = 128
+    encoder = ConformerEncoder(feat_in=80, n_layers=2, d_model=args.d_model, n_heads=4).to(device).eval()
+    ctc_decoder = ConvASRDecoder(feat_in=args.d_model, num_classes=vocab_size).to(device).eval()
+    rnnt_decoder = RNNTDecoder(prednet={'pred_hidden': 320, 'pred_rnn_layers': 1}, vocab_size=vocab_size)
+    rnnt_decoder = rnnt_decoder.to(device).eval()
+    rnnt_joint = RNNTJoint(
+        jointnet={'encoder_hidden': args.d_model, 'pred_hidden': 320, 'joint_hidden': 320, 'activation': 'relu'},
+        num_classes=vocab_size,
+    )
+    rnnt_joint = rnnt_joint.to(device).eval()
+
+    audio_signal = torch.randn(args.batch_size, 80, args.num_frames, device=device)
+    length = torch.full((args.batch_size,), args.num_frames, device=device)
+    targets = torch.randint(0, vocab_size, (args.batch_size, 1), device=device)
+    target_length = torch.ones(args.batch_size, dtype=torch.long, device=device)
+    with torch.no_grad():
+        encoded, _ = encoder(audio_signal=audio_signal, length=length)
+        decoded, *_ = rnnt_decoder(targets=targets, target_length=target_length)
+
+    calls = {
+        'ConformerEncoder': lambda: encoder(audio_signal=audio_signal, length=length),
+        'ConvASRDecoder': lambda: ctc_decoder(encoder_output=encoded),
+        'RNNTDecoder': lambda: rnnt_decoder(targets=targets, target_length=target_length),
+        'RNNTJoint': lambda: rnnt_joint(encoder_outputs=encoded, decoder_outputs=decoded),
+    }
+    modes = {
+        'validated': nullcontext,
+        'trusted': lambda: typecheck.validate_first_calls(1),
+        'disabled': typecheck.disable_checks,
+    }
+
+    print(f'{"module":>18}' + ''.join(f'{f"{mode} us":>14}' for mode in modes))
+    with torch.no_grad():
+        for name, call in calls.items():
+            times = []
+            for context in modes.values():
+                with context():
+                    times.append(benchmark(call, args.num_iters, device))
+            print(f'{name:>18}' + ''.join(f'{time_us:>14.1f}' for time_us in times))
+
+
+if __name__ == '__main__':
+    main()
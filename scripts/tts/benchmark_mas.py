@@ -0,0 +1,82 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks monotonic alignment search (MAS) as run by the TTS aligners every training step:
+  - "numba": copy to the host, `b_mas` with numba, copy back, the default of `binarize_attention_parallel`
+  - "torch": `batched_mas_width1` on the device of the attention, with `use_torch_mas=True`
+
+Both give the same alignments, which is checked for every shape. For example
+
+    python benchmark_mas.py --device cuda --batch_size 32 --mel_lens 400 800 1600 --text_lens 100 200
+"""
+
+import argparse
+import time
+
+import torch
+
+from nemo.collections.tts.parts.utils.helpers import b_mas, batched_mas_width1
+
+
+def numba_mas(log_attn, in_lens, out_lens):
+    attn_out = b_mas(log_attn.cpu().numpy(), in_lens.cpu().numpy(), out_lens.cpu().numpy(), width=1)
+    return torch.from_numpy(attn_out).to(log_attn.device)
+
+
+def benchmark(fn, log_attn, in_lens, out_lens, num_iters):
+    fn(log_attn, in_lens, out_lens)  # warmup, compiles numba
+    if log_attn.is_cuda:
+        torch.cuda.synchronize()
+    start_time = time.perf_counter()
+    for _ in range(num_iters):
+        attn_out = fn(log_attn, in_lens, out_lens)
+    if log_attn.is_cuda:
+        torch.cuda.synchronize()
+    return attn_out, (time.perf_counter() - start_time) / num_iters * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks batched MAS against the numba implementation")
+    parser.add_argument('--device', type=str, default='cuda' if torch.cuda.is_available() else 'cpu')
+    parser.add_argument('--batch_size', type=int, default=32)
+    parser.add_argument('--mel_lens', type=int, nargs='+', default=[200, 400, 800, 1600])
+    parser.add_argument('--text_lens', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--num_iters', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = torch.Generator().manual_seed(args.seed)
+    print(f'{"mel x text":>12} {"numba ms":>10} {"torch ms":>10}')
+    for max_mel_len in args.mel_lens:
+        for max_text_len in args.text_lens:
+            if max_text_len > max_mel_len:
+                continue
+            # ragged lengths, like a training batch
+            out_lens = torch.randint(max_mel_len // 2, max_mel_len + 1, (args.batch_size,), generator=generator)
+            in_lens = torch.minimum(
+                torch.randint(max_text_len // 2, max_text_len + 1, (args.batch_size,), generator=generator), out_lens
+            )
+            attn = torch.softmax(torch.randn(args.batch_size, 1, max_mel_len, max_text_len, generator=generator), -1)
+            log_attn = torch.log(attn).to(args.device)
+            in_lens, out_lens = in_lens.to(args.device), out_lens.to(args.device)
+
+            expected, numba_time = benchmark(numba_mas, log_attn, in_lens, out_lens, args.num_iters)
+            attn_out, torch_time = benchmark(batched_mas_width1, log_attn, in_lens, out_lens, args.num_iters)
+            assert torch.equal(attn_out, expected)
+            print(f'{f"{max_mel_len} x {max_text_len}":>12} {numba_time:>10.2f} {torch_time:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares time-to-first-audio and real-time factor of FastPitch + HiFiGAN synthesis:
+  - "whole": `generate_spectrogram` and `convert_spectrogram_to_audio` on the whole text of every request
+  - "streaming": `StreamingTTS`, all requests batched chunk by chunk
+
+For example
+
+    python benchmark_streaming_tts.py --text_file paragraphs.txt --num_requests 8 --output_dir /tmp/streaming
+
+where every line of the text file is a request. Streamed audio is written to `output_dir` to listen to boundaries.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import soundfile as sf
+import torch
+
+from nemo.collections.tts.models import FastPitchModel, HifiGanModel
+from nemo.collections.tts.parts.utils.streaming_utils import StreamingTTS
+
+DEFAULT_TEXT = (
+    "Streaming synthesis splits the input text at sentence and phrase boundaries. Every chunk is synthesized "
+    "with the end of the previous one as context, so that prosody carries over the boundary, and its audio is "
+    "crossfaded with the previous audio chunk. The first audio is therefore available once the first sentence "
+    "is synthesized, rather than once the whole paragraph is, which matters for long inputs like this one."
+)
+
+
+def synchronize(device):
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+
+
+@torch.no_grad()
+def benchmark_whole(spec_generator, vocoder, texts):
+    start_time = time.perf_counter()
+    audio_duration = 0.0
+    for text in texts:
+        spect = spec_generator.generate_spectrogram(tokens=spec_generator.parse(text))
+        audio = vocoder.convert_spectrogram_to_audio(spec=spect)
+        audio_duration += audio.shape[-1] / vocoder.sample_rate
+    synchronize(spec_generator.device)
+    synthesis_time = time.perf_counter() - start_time
+    # every request waits for the requests synthesized before it, and for its whole text
+    return synthesis_time, synthesis_time / audio_duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks streaming FastPitch + HiFiGAN synthesis")
+    parser.add_argument('--spec_generator', type=str, default='tts_en_fastpitch')
+    parser.add_argument('--vocoder', type=str, default='tts_en_hifigan')
+    parser.add_argument('--text_file', type=str, default=None, help='One request per line')
+    parser.add_argument('--num_requests', type=int, default=4)
+    parser.add_argument('--max_chunk_chars', type=int, default=200)
+    parser.add_argument('--context_tokens', type=int, default=8)
+    parser.add_argument('--overlap_frames', type=int, default=8)
+    parser.add_argument('--output_dir', type=str, default=None)
+    args = parser.parse_args()
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    spec_generator = FastPitchModel.from_pretrained(args.spec_generator).eval().to(device)
+    vocoder = HifiGanModel.from_pretrained(args.vocoder).eval().to(device)
+
+    texts = [DEFAULT_TEXT]
+    if args.text_file is not None:
+        with open(args.text_file) as f:
+            texts = [line.strip() for line in f if line.strip()]
+    texts = (texts * args.num_requests)[: args.num_requests]
+
+    tts = StreamingTTS(
+        spec_generator,
+        vocoder,
+        max_chunk_chars=args.max_chunk_chars,
+        context_tokens=args.context_tokens,
+        overlap_frames=args.overlap_frames,
+    )
+    list(tts.stream(texts[0]))  # warmup
+    benchmark_whole(spec_generator, vocoder, texts[:1])
+
+    synthesis_time, rtf = benchmark_whole(spec_generator, vocoder, texts)
+    print(f'whole:     first audio after {synthesis_time / len(texts):.3f}s to {synthesis_time:.3f}s, RTF {rtf:.3f}')
+
+    audios = [[] for _ in texts]
+    for idx, audio in tts.stream_batch(texts):
+        audios[idx].append(audio)
+    latencies = [metrics.first_chunk_latency for metrics in tts.metrics]
+    rtfs = [metrics.rtf for metrics in tts.metrics]
+    print(
+        f'streaming: first audio after {np.mean(latencies):.3f}s on average (max {np.max(latencies):.3f}s), '
+        f'RTF {np.mean(rtfs):.3f} on average, {np.mean([m.num_chunks for m in tts.metrics]):.1f} chunks per request'
+    )
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for idx, chunks in enumerate(audios):
+            sf.write(os.path.join(args.output_dir, f'{idx}.wav'), torch.cat(chunks).numpy(), tts.sample_rate)
+
+
+if __name__ == '__main__':
+    main()
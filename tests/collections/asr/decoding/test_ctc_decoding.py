@@ -366,3 +366,38 @@ class TestCTCDecoding:
                 assert torch.all(hyp.y_sequence == batched_hyp.y_sequence)
                 if timestamps:
                     assert hyp.timestamp == batched_hyp.timestamp
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('input_is_labels', [False, True])
+    @pytest.mark.parametrize('length_is_none', [False, True])
+    def test_batched_decoding_text_only(self, tmp_tokenizer, input_is_labels, length_is_none):
+        cfg = CTCBPEDecodingConfig(strategy='greedy_batch')
+        decoding = CTCBPEDecoding(decoding_cfg=cfg, tokenizer=tmp_tokenizer)
+
+        torch.manual_seed(1)
+        B, T = 4, 20
+        V = decoding.tokenizer.tokenizer.vocab_size + 1
+        input_signal = torch.randn(size=(B, T, V))
+        # Make blanks and repeated tokens likely, so that the ctc collapse has work to do.
+        input_signal[:, 0:2, V - 1] = 1000
+        input_signal[:, 5:8, 3] = 1000
+        if input_is_labels:
+            input_signal = input_signal.argmax(dim=-1)
+        if length_is_none:
+            length = None
+        else:
+            length = torch.randint(low=1, high=T, size=[B])
+
+        with torch.inference_mode():
+            hyps = decoding.ctc_decoder_predictions_tensor(
+                input_signal, length, fold_consecutive=True, return_hypotheses=True
+            )
+            text_hyps = decoding.ctc_decoder_predictions_tensor(
+                input_signal, length, fold_consecutive=True, return_hypotheses=False
+            )
+
+        assert len(hyps) == len(text_hyps) == B
+        for hyp, text_hyp in zip(hyps, text_hyps):
+            assert text_hyp.text == hyp.text
+            assert abs(text_hyp.score - hyp.score) <= 1e-5
+            assert torch.all(text_hyp.y_sequence == hyp.y_sequence)
@@ -18,12 +18,13 @@ import tempfile
 from collections import namedtuple
 from typing import List, Type, Union
 
+import librosa
 import numpy as np
 import pytest
 import soundfile as sf
 
 from nemo.collections.asr.parts.preprocessing.perturb import NoisePerturbation, SilencePerturbation
-from nemo.collections.asr.parts.preprocessing.segment import AudioSegment, select_channels
+from nemo.collections.asr.parts.preprocessing.segment import AudioSegment, resample, select_channels
 
 
 class TestSelectChannels:
@@ -485,3 +486,36 @@ class TestAudioSegment:
 
                 # Test
                 assert audio_segment_1 == audio_segment_2, f'trim setup {trim_setup}, loaded segments not matching'
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("num_channels", [1, 2])
+    @pytest.mark.parametrize("orig_sr, target_sr", [(44100, 16000), (8000, 16000), (22050, 16000)])
+    def test_resample_matches_librosa(self, num_channels, orig_sr, target_sr):
+        """Test resampling with reused resamplers matches librosa, along the time axis."""
+        for num_samples in [orig_sr, orig_sr // 3 + 1]:
+            samples = np.random.randn(num_samples, num_channels).astype(np.float32)
+            if num_channels == 1:
+                samples = samples[:, 0]
+            ref_samples = librosa.resample(samples.transpose(), orig_sr=orig_sr, target_sr=target_sr).transpose()
+
+            # the second call reuses the resampler
+            for _ in range(2):
+                resampled = resample(samples, orig_sr=orig_sr, target_sr=target_sr)
+                assert resampled.dtype == ref_samples.dtype
+                assert resampled.shape == ref_samples.shape
+                assert np.array_equal(resampled, ref_samples)
+
+    @pytest.mark.unit
+    def test_init_copies_samples(self):
+        """Test segments do not modify samples they are created from, unless `copy` is False."""
+        samples = np.random.randn(self.num_samples).astype(np.float32)
+        ref_samples = samples.copy()
+
+        audio_segment = AudioSegment(samples, self.sample_rate)
+        audio_segment.gain_db(6.0)
+        assert np.array_equal(samples, ref_samples)
+
+        audio_segment = AudioSegment(samples, self.sample_rate, copy=False)
+        audio_segment.gain_db(6.0)
+        assert np.shares_memory(audio_segment._samples, samples)
+        assert not np.array_equal(samples, ref_samples)
@@ -0,0 +1,236 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+import torch
+
+from nemo.collections.asr.parts.utils.streaming_utils import (
+    BatchedFeatureFrameBufferer,
+    FeatureBuffersBatcher,
+    FeatureFrameBufferer,
+    FeatureRingBuffer,
+    MultiStreamFrameBatchChunkedASR,
+)
+
+N_FEAT = 4
+WINDOW_STRIDE = 0.01
+SAMPLE_RATE = 16000
+
+
+def asr_model(log=True):
+    return SimpleNamespace(
+        preprocessor=SimpleNamespace(log=log),
+        _cfg=SimpleNamespace(
+            sample_rate=SAMPLE_RATE, preprocessor=SimpleNamespace(window_stride=WINDOW_STRIDE, features=N_FEAT)
+        ),
+        device=torch.device('cpu'),
+    )
+
+
+def random_frames(rng, num_frames, frame_len, last_frame_len=None):
+    frames = [rng.standard_normal([N_FEAT, frame_len]).astype(np.float32) for _ in range(num_frames)]
+    if last_frame_len is not None:
+        frames.append(rng.standard_normal([N_FEAT, last_frame_len]).astype(np.float32))
+    return frames
+
+
+def reference_frame_buffers(frames, buffer_len, batch_size, fill_value, pad_to_buffer_len=True):
+    """The previous `FeatureFrameBufferer`, which shifted the whole buffer for every frame."""
+    buffer = np.full([N_FEAT, buffer_len], fill_value, dtype=np.float32)
+    batches = []
+    for start in range(0, len(frames), batch_size):
+        batch = []
+        for frame in frames[start : start + batch_size]:
+            if frame.shape[1] < buffer_len and not pad_to_buffer_len:
+                feature_buffer = np.copy(frame)
+            else:
+                buffer[:, : -frame.shape[1]] = buffer[:, frame.shape[1] :]
+                buffer[:, -frame.shape[1] :] = frame
+                feature_buffer = np.copy(buffer)
+            mean = np.mean(feature_buffer, axis=1).reshape(N_FEAT, 1)
+            stdev = np.std(feature_buffer, axis=1).reshape(N_FEAT, 1)
+            batch.append((feature_buffer - mean) / (stdev + 1e-5))
+        batches.append(batch)
+    return batches
+
+
+def reference_batched_frame_buffers(streams, buffer_len, fill_value):
+    """The previous `BatchedFeatureFrameBufferer`, which shifted the buffer of every sample for every frame."""
+    buffer = np.full([len(streams), N_FEAT, buffer_len], fill_value, dtype=np.float32)
+    steps = []
+    for step in range(max(len(frames) for frames in streams) + 1):
+        for idx, frames in enumerate(streams):
+            if step < len(frames):
+                buffer[idx, :, : -frames[step].shape[1]] = buffer[idx, :, frames[step].shape[1] :]
+                buffer[idx, :, -frames[step].shape[1] :] = frames[step]
+            else:
+                buffer[idx, :, :] *= 0.0
+        mean = np.mean(buffer, axis=2, keepdims=True)
+        stdev = np.std(buffer, axis=2, keepdims=True)
+        steps.append([(buffer[idx : idx + 1] - mean[idx]) / (stdev[idx] + 1e-8) for idx in range(len(streams))])
+    return steps
+
+
+class TestFeatureRingBuffer:
+    @pytest.mark.unit
+    def test_windows_match_shifted_buffer(self):
+        ring = FeatureRingBuffer(n_feat=3, buffer_len=5, capacity=4, fill_value=-1.0)
+        reference = np.full([3, 5], -1.0, dtype=np.float32)
+        windows, references = [], []
+        for step in range(7):
+            frame = np.full([3, 2], step, dtype=np.float32)
+            reference = np.concatenate([reference[:, 2:], frame], axis=1)
+            windows.append(ring.append(frame))
+            references.append(reference)
+
+        # earlier windows are not overwritten when the storage is reallocated
+        for window, reference in zip(windows, references):
+            np.testing.assert_array_equal(window, reference)
+
+    @pytest.mark.unit
+    def test_batched_windows(self):
+        ring = FeatureRingBuffer(n_feat=2, buffer_len=3, capacity=3, batch_shape=(2,))
+        ring.append(np.ones([2, 2, 2], dtype=np.float32))
+        window = ring.append(2 * np.ones([2, 2, 2], dtype=np.float32))
+        assert window.shape == (2, 2, 3)
+        np.testing.assert_array_equal(window[:, :, 0], 1.0)
+        np.testing.assert_array_equal(window[:, :, 1:], 2.0)
+
+
+class TestFeatureFrameBufferer:
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "frame_len, total_buffer, batch_size, pad_to_buffer_len, last_frame_len",
+        [
+            (0.16, 0.4, 4, True, None),
+            (0.16, 0.4, 1, True, None),
+            (0.16, 0.4, 3, False, 7),
+            (0.4, 0.4, 3, False, 13),
+        ],
+    )
+    def test_matches_shifted_buffer(self, frame_len, total_buffer, batch_size, pad_to_buffer_len, last_frame_len):
+        rng = np.random.default_rng(0)
+        bufferer = FeatureFrameBufferer(
+            asr_model(),
+            frame_len=frame_len,
+            batch_size=batch_size,
+            total_buffer=total_buffer,
+            pad_to_buffer_len=pad_to_buffer_len,
+        )
+        # the ring buffer wraps around several times per stream, and is reused after a reset
+        for num_frames in [11, 6]:
+            frames = random_frames(rng, num_frames, bufferer.n_frame_len, last_frame_len)
+            expected = reference_frame_buffers(
+                frames, bufferer.feature_buffer_len, batch_size, bufferer.ZERO_LEVEL_SPEC_DB_VAL, pad_to_buffer_len
+            )
+
+            bufferer.reset()
+            bufferer.set_frame_reader(iter(frames))
+            for expected_buffers in expected:
+                buffers = bufferer.get_buffers_batch()
+                assert len(buffers) == len(expected_buffers)
+                for buffer, expected_buffer in zip(buffers, expected_buffers):
+                    np.testing.assert_array_equal(buffer, expected_buffer)
+            assert bufferer.get_buffers_batch() == []
+
+    @pytest.mark.unit
+    def test_batched_matches_shifted_buffer(self):
+        rng = np.random.default_rng(1)
+        bufferer = BatchedFeatureFrameBufferer(asr_model(), frame_len=0.16, batch_size=3, total_buffer=0.4)
+        for lengths in [[5, 2, 9], [3, 3, 1]]:
+            streams = [random_frames(rng, length, bufferer.n_frame_len) for length in lengths]
+            expected = reference_batched_frame_buffers(
+                streams, bufferer.feature_buffer_len, bufferer.ZERO_LEVEL_SPEC_DB_VAL
+            )
+
+            bufferer.reset()
+            for idx, frames in enumerate(streams):
+                bufferer.set_frame_reader(iter(frames), idx)
+            for expected_buffers in expected:
+                buffers = bufferer.get_buffers_batch()
+                assert len(buffers) == len(expected_buffers)
+                for buffer, expected_buffer in zip(buffers, expected_buffers):
+                    np.testing.assert_array_equal(buffer, expected_buffer)
+            assert bufferer.get_buffers_batch() == []
+            assert bufferer.signal_end_index == lengths
+
+
+class TestFeatureBuffersBatcher:
+    @pytest.mark.unit
+    def test_collate_pads_and_reuses_batch(self):
+        batcher = FeatureBuffersBatcher(device=torch.device('cpu'))
+        signals = [np.ones([4, 6], dtype=np.float32), 2 * np.ones([4, 3], dtype=np.float32)]
+        batcher.set_signal(signals)
+        (signal, length), *rest = list(batcher)
+        assert not rest
+        assert signal.shape == (2, 4, 6)
+        assert length.tolist() == [6, 3]
+        assert torch.all(signal[1, :, 3:] == 0.0) and torch.all(signal[1, :, :3] == 2.0)
+
+        batcher.set_signal(signals[:1])
+        (next_signal, _), *_ = list(batcher)
+        assert next_signal.data_ptr() == signal.data_ptr()
+
+
+class TestMultiStreamFrameBatchChunkedASR:
+    @pytest.mark.unit
+    def test_streams_of_different_lengths(self, tmp_path):
+        class Preprocessor:
+            _cfg = {'window_stride': WINDOW_STRIDE}
+
+            def __call__(self, input_signal, length):
+                num_frames = int(length[0]) // int(WINDOW_STRIDE * SAMPLE_RATE)
+                return torch.ones([1, N_FEAT, num_frames]), torch.tensor([num_frames])
+
+        batch_sizes = []
+
+        class FrameASR:
+            frame_len = 1.0
+            total_buffer = 1.0
+            batch_size = 2
+            raw_preprocessor = Preprocessor()
+
+            def __init__(self):
+                self.asr_model = asr_model(log=False)
+
+            def decode_feature_batch(self, feat_signal, feat_signal_len):
+                batch_sizes.append(feat_signal.shape[0])
+                # every chunk is transcribed to its number of feature frames
+                return [str(length) for length in feat_signal_len.tolist()]
+
+        durations = {'a': 2.5, 'b': 0.7, 'c': 4.2}
+        for stream_id, duration in durations.items():
+            sf.write(str(tmp_path / f'{stream_id}.wav'), np.zeros(int(duration * SAMPLE_RATE)), SAMPLE_RATE)
+
+        asr = MultiStreamFrameBatchChunkedASR(FrameASR())
+        for _ in range(2):
+            for stream_id in durations:
+                asr.add_stream(stream_id, str(tmp_path / f'{stream_id}.wav'))
+            with pytest.raises(ValueError):
+                asr.add_stream('a', str(tmp_path / 'a.wav'))
+            assert asr.num_active_streams == 3
+
+            batch_sizes.clear()
+            transcripts = asr.transcribe()
+            assert transcripts == {'a': '100 100 50', 'b': '70', 'c': '100 100 100 100 20'}
+            assert asr.num_active_streams == 0
+            # every step transcribes a full batch of chunks while at least two streams are left
+            assert batch_sizes == [2, 2, 2, 1, 1, 1]
+
+            asr.reset()
+            assert asr.num_active_streams == 0 and asr.transcribe() == {}
@@ -0,0 +1,317 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nemo.collections.asr.parts.submodules.ctc_decoding import CTCBPEDecoding, CTCDecoding, CTCDecodingConfig
+from nemo.collections.asr.parts.utils.rnnt_utils import Hypothesis
+from nemo.collections.asr.parts.utils.timestamp_utils import (
+    TimestampTokenTable,
+    compute_batch_char_word_offsets,
+    compute_batch_subword_word_offsets,
+    compute_batch_token_offsets,
+    get_word_offsets_from_step_offsets,
+    lengths_to_row_splits,
+    refine_punctuation_offsets,
+    segmented_cumsum,
+)
+
+SUBWORD_VOCAB = ['▁he', 'llo', '▁world', '.', '▁a']
+SENTENCEPIECE_VOCAB = ['▁he', 'llo', '▁world', '.', '▁a', 'b', 'c', '▁', '?', "'s"]
+CHAR_VOCAB = [' ', 'a', 'b', "'", '.', '?']
+
+
+def subword_table():
+    def ids_to_tokens(ids):
+        return [SUBWORD_VOCAB[i] for i in ids]
+
+    def tokens_to_str(ids):
+        return ''.join(SUBWORD_VOCAB[i] for i in ids).replace('▁', ' ').strip()
+
+    return TimestampTokenTable(ids_to_tokens, tokens_to_str, supported_punctuation={'.'}), tokens_to_str
+
+
+class SentencePieceLikeTokenizer:
+    """Decodes `SENTENCEPIECE_VOCAB` the way SentencePiece does, replacing the word start marker with a space."""
+
+    def __init__(self):
+        self.vocab = SENTENCEPIECE_VOCAB
+        self.tokenizer = SimpleNamespace(vocab_size=len(self.vocab))
+
+    def ids_to_tokens(self, ids):
+        return [self.vocab[i] for i in ids]
+
+    def ids_to_text(self, ids):
+        return ''.join(self.ids_to_tokens(ids)).replace('▁', ' ').strip()
+
+    def ids_to_text_batch(self, ids_batch):
+        return [self.ids_to_text(ids) for ids in ids_batch]
+
+
+def reference_compute_offsets(hypothesis, token_lengths, ctc_token):
+    """The previous `AbstractCTCDecoding._compute_offsets`."""
+    start_index = 0
+    if hypothesis.timestamp is not None and len(hypothesis.timestamp) > 0:
+        start_index = max(0, hypothesis.timestamp[0] - 1)
+
+    end_indices = np.asarray(token_lengths).cumsum()
+    start_indices = np.concatenate(([start_index], end_indices[:-1]))
+    offsets = [
+        {"char": t, "start_offset": s, "end_offset": e} for t, s, e in zip(hypothesis.text, start_indices, end_indices)
+    ]
+    return list(filter(lambda offsets: offsets["char"] != ctc_token, offsets))
+
+
+def reference_refine_timestamps(char_offsets, supported_punctuation=None):
+    """The previous `AbstractCTCDecoding._refine_timestamps`."""
+    if not supported_punctuation:
+        return char_offsets
+    for i, offset in enumerate(char_offsets):
+        if offset['char'] and offset['char'][0] in supported_punctuation and i > 0:
+            offset['end_offset'] = offset['start_offset']
+    return char_offsets
+
+
+def reference_word_offsets_chars(offsets, word_delimiter_char=" "):
+    """The previous `AbstractCTCDecoding._get_word_offsets_chars`."""
+    word_offsets = []
+    last_state = "SPACE"
+    word = ""
+    start_offset = 0
+    end_offset = 0
+    for offset in offsets:
+        char = offset["char"]
+        state = "SPACE" if char == word_delimiter_char else "WORD"
+        if state == last_state:
+            end_offset = offset["end_offset"]
+            word += char
+        elif state == "SPACE":
+            word_offsets.append({"word": word, "start_offset": start_offset, "end_offset": end_offset})
+        else:
+            start_offset = offset["start_offset"]
+            end_offset = offset["end_offset"]
+            word = char
+        last_state = state
+    if last_state == "WORD":
+        word_offsets.append({"word": word, "start_offset": start_offset, "end_offset": end_offset})
+    return word_offsets
+
+
+def reference_word_offsets_subwords_sentencepiece(offsets, hypothesis, decode_ids_to_tokens, decode_tokens_to_str):
+    """The previous `AbstractCTCDecoding._get_word_offsets_subwords_sentencepiece`."""
+    word_offsets = []
+    built_token = []
+    previous_token_index = 0
+    for i, char in enumerate(hypothesis.text):
+        token = decode_ids_to_tokens([char])[0]
+        token_text = decode_tokens_to_str([char])
+        if token != token_text:
+            if len(built_token) > 0:
+                word_offsets.append(
+                    {
+                        "word": decode_tokens_to_str(built_token),
+                        "start_offset": offsets[previous_token_index]["start_offset"],
+                        "end_offset": offsets[i - 1]["end_offset"],
+                    }
+                )
+            built_token.clear()
+            built_token.append(char)
+            previous_token_index = i
+        else:
+            built_token.append(char)
+
+    if len(word_offsets) == 0:
+        if len(built_token) > 0:
+            word_offsets.append(
+                {
+                    "word": decode_tokens_to_str(built_token),
+                    "start_offset": offsets[0]["start_offset"],
+                    "end_offset": offsets[-1]["end_offset"],
+                }
+            )
+    else:
+        word_offsets[0]["start_offset"] = offsets[0]["start_offset"]
+        if len(built_token) > 0:
+            word_offsets.append(
+                {
+                    "word": decode_tokens_to_str(built_token),
+                    "start_offset": offsets[-(len(built_token))]["start_offset"],
+                    "end_offset": offsets[-1]["end_offset"],
+                }
+            )
+    return word_offsets
+
+
+def reference_ctc_timestamps(decoding, hypothesis):
+    """The previous per-hypothesis `AbstractCTCDecoding.compute_ctc_timestamps`, for `timestamp_type="all"`."""
+    decoded_prediction, token_lengths = hypothesis.text
+    hypothesis.text = decoded_prediction
+
+    char_offsets = reference_compute_offsets(hypothesis, token_lengths, decoding.blank_id)
+    for i, char in enumerate(hypothesis.text):
+        char_offsets[i]["char"] = decoding.decode_tokens_to_str([char])
+    char_offsets = reference_refine_timestamps(char_offsets, decoding.supported_punctuation)
+
+    if any(len(list(v["char"])) > 1 for v in char_offsets):
+        word_offsets = reference_word_offsets_subwords_sentencepiece(
+            char_offsets, hypothesis, decoding.decode_ids_to_tokens, decoding.decode_tokens_to_str
+        )
+    else:
+        word_offsets = reference_word_offsets_chars(char_offsets, word_delimiter_char=decoding.word_seperator)
+    segment_offsets = decoding._get_segment_offsets(
+        word_offsets,
+        segment_delimiter_tokens=decoding.segment_seperators,
+        supported_punctuation=decoding.supported_punctuation,
+        segment_gap_threshold=decoding.segment_gap_threshold,
+    )
+
+    hypothesis.timestamp = {
+        "timestep": hypothesis.timestamp,
+        "char": char_offsets,
+        "word": word_offsets,
+        "segment": segment_offsets,
+    }
+    hypothesis.text = decoding.decode_tokens_to_str(hypothesis.text)
+    return hypothesis
+
+
+def random_greedy_hypotheses(rng, num_hypotheses, blank_id):
+    """
+    Frame level greedy predictions with runs of blanks and repeated tokens, collapsed by `decode_hypothesis`
+    into tokens and their lengths.
+    """
+    hypotheses = []
+    for _ in range(num_hypotheses):
+        labels = []
+        for _ in range(rng.integers(0, 40)):
+            if labels and rng.random() < 0.3:
+                labels.append(labels[-1])
+            elif rng.random() < 0.4:
+                labels.append(blank_id)
+            else:
+                labels.append(int(rng.integers(0, blank_id)))
+        non_blank = [t for t, label in enumerate(labels) if label != blank_id]
+        hypotheses.append(Hypothesis(score=0.0, y_sequence=labels, timestamp=non_blank, length=len(labels)))
+    return hypotheses
+
+
+class TestTimestampUtils:
+    @pytest.mark.unit
+    def test_segmented_cumsum(self):
+        row_splits = lengths_to_row_splits([2, 0, 3])
+        assert row_splits.tolist() == [0, 2, 2, 5]
+        result = segmented_cumsum(np.array([1, 2, 3, 4, 5]), row_splits)
+        assert result.tolist() == [1, 3, 3, 7, 12]
+
+    @pytest.mark.unit
+    def test_token_table_is_filled_lazily(self):
+        table, _ = subword_table()
+        table.update(np.array([3, 0]))
+        assert table.token_text[0] == 'he' and table.token_text[3] == '.'
+        assert table.starts_word[0] and not table.starts_word[3]
+        assert table.is_punctuation[3] and not table.is_punctuation[0]
+        assert len(table.token_text) == 4
+
+    @pytest.mark.unit
+    def test_batch_token_offsets_and_refinement(self):
+        table, _ = subword_table()
+        token_ids = np.array([0, 1, 3, 2])
+        table.update(token_ids)
+        row_splits = lengths_to_row_splits([3, 1])
+        starts, ends = compute_batch_token_offsets(np.array([2, 1, 4, 3]), row_splits, np.array([1, 0]))
+        assert starts.tolist() == [1, 2, 3, 0]
+        assert ends.tolist() == [2, 3, 7, 3]
+        ends = refine_punctuation_offsets(token_ids, starts, ends, row_splits, table)
+        assert ends.tolist() == [2, 3, 3, 3]
+
+    @pytest.mark.unit
+    def test_batch_subword_word_offsets(self):
+        table, _ = subword_table()
+        # "hello world." and "a world"
+        token_ids = np.array([0, 1, 2, 3, 4, 2])
+        table.update(token_ids)
+        row_splits = lengths_to_row_splits([4, 2])
+        starts = np.array([0, 2, 4, 6, 1, 3])
+        ends = np.array([2, 4, 6, 6, 3, 5])
+        words = compute_batch_subword_word_offsets(
+            token_ids, np.arange(len(token_ids)), row_splits, starts, ends, row_splits, table
+        )
+        assert words['row_splits'].tolist() == [0, 2, 4]
+        assert words['first_token'].tolist() == [0, 2, 4, 5]
+        assert words['last_token'].tolist() == [1, 3, 4, 5]
+        assert words['start_offset'].tolist() == [0, 4, 1, 3]
+        assert words['end_offset'].tolist() == [4, 6, 3, 5]
+
+    @pytest.mark.unit
+    def test_batch_char_word_offsets(self):
+        table = TimestampTokenTable(
+            lambda ids: [' ab'[i] for i in ids], lambda ids: ''.join(' ab'[i] for i in ids), vocab_size=3
+        )
+        # " ab a" and "b"
+        token_ids = np.array([0, 1, 2, 0, 1, 2])
+        row_splits = lengths_to_row_splits([5, 1])
+        starts = np.arange(6)
+        ends = np.arange(6) + 1
+        words = compute_batch_char_word_offsets(token_ids, starts, ends, row_splits, table, word_delimiter_char=' ')
+        assert words['row_splits'].tolist() == [0, 2, 3]
+        assert words['first_token'].tolist() == [1, 4, 5]
+        assert words['last_token'].tolist() == [2, 4, 5]
+        assert words['start_offset'].tolist() == [1, 4, 5]
+        assert words['end_offset'].tolist() == [3, 5, 6]
+
+    @pytest.mark.unit
+    def test_word_offsets_from_step_offsets(self):
+        table, tokens_to_str = subword_table()
+        blank = len(SUBWORD_VOCAB)
+        # the second step emits the end of the first word and the beginning of the second one
+        step_offsets = [
+            {'char': [0, blank], 'start_offset': 0, 'end_offset': 2},
+            {'char': [1, 2, blank], 'start_offset': 2, 'end_offset': 5},
+            {'char': [3, blank], 'start_offset': 5, 'end_offset': 6},
+        ]
+        word_offsets = get_word_offsets_from_step_offsets(step_offsets, table, tokens_to_str)
+        assert word_offsets == [
+            {'word': 'hello', 'start_offset': 0, 'end_offset': 2},
+            {'word': 'world.', 'start_offset': 2, 'end_offset': 6},
+        ]
+        assert get_word_offsets_from_step_offsets([], table, tokens_to_str) == []
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("model_type", ["char", "subword"])
+    @pytest.mark.parametrize("segment_gap_threshold", [None, 3])
+    def test_ctc_timestamps_match_previous_implementation(self, model_type, segment_gap_threshold):
+        cfg = CTCDecodingConfig(
+            strategy='greedy', compute_timestamps=True, segment_gap_threshold=segment_gap_threshold
+        )
+        if model_type == "char":
+            decoding = CTCDecoding(decoding_cfg=cfg, vocabulary=CHAR_VOCAB)
+        else:
+            decoding = CTCBPEDecoding(decoding_cfg=cfg, tokenizer=SentencePieceLikeTokenizer())
+
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            hypotheses = random_greedy_hypotheses(rng, 8, decoding.blank_id)
+            hypotheses = decoding.decode_hypothesis(hypotheses, fold_consecutive=True)
+            for hypothesis in hypotheses:
+                hypothesis.text = hypothesis.text[:2]
+            expected = [reference_ctc_timestamps(decoding, copy.deepcopy(hypothesis)) for hypothesis in hypotheses]
+
+            hypotheses = decoding.compute_ctc_timestamps_batch(hypotheses)
+            for hypothesis, expected_hypothesis in zip(hypotheses, expected):
+                assert hypothesis.text == expected_hypothesis.text
+                assert hypothesis.timestamp == expected_hypothesis.timestamp
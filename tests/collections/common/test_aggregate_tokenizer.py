@@ -0,0 +1,79 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from nemo.collections.common.tokenizers.aggregate_tokenizer import AggregateTokenizer
+
+
+class VocabTokenizer:
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.num_calls = 0
+
+    def ids_to_tokens(self, ids):
+        self.num_calls += 1
+        return [self.vocab[id] for id in ids]
+
+
+@pytest.fixture()
+def aggregate_tokenizer():
+    return AggregateTokenizer(
+        {
+            'en': VocabTokenizer(['<unk>', '▁the', '▁cat', 's', '▁sat']),
+            'es': VocabTokenizer(['<unk>', '▁el', '▁gato', 's']),
+            'de': VocabTokenizer(['<unk>', '▁die', '▁Katze']),
+        }
+    )
+
+
+class TestAggregateTokenizer:
+    @pytest.mark.unit
+    def test_lookup_tables(self, aggregate_tokenizer):
+        assert aggregate_tokenizer.vocab_size == 12
+        assert aggregate_tokenizer.offset_token_ids_by_token_id.tolist() == [0, 1, 2, 3, 4, 0, 1, 2, 3, 0, 1, 2]
+        assert aggregate_tokenizer.langs_by_token_id[7] == 'es'
+        assert aggregate_tokenizer.tokenizers_by_token_id[10] is aggregate_tokenizer.tokenizers_dict['de']
+
+    @pytest.mark.unit
+    def test_ids_to_text(self, aggregate_tokenizer):
+        ids = [1, 2, 3, 6, 7, 8, 11]
+        assert aggregate_tokenizer.ids_to_text(ids) == ' the cats el gatos Katze'
+        # one call per run of consecutive ids of the same tokenizer
+        assert aggregate_tokenizer.tokenizers_dict['en'].num_calls == 1
+        assert aggregate_tokenizer.ids_to_text(torch.tensor(ids)) == ' the cats el gatos Katze'
+        assert aggregate_tokenizer.ids_to_tokens(ids) == ['▁the', '▁cat', 's', '▁el', '▁gato', 's', '▁Katze']
+        assert aggregate_tokenizer.ids_to_text_batch([ids[:3], [], ids[3:]]) == [' the cats', '', ' el gatos Katze']
+
+        with pytest.raises(KeyError):
+            aggregate_tokenizer.ids_to_text([12])
+
+    @pytest.mark.unit
+    def test_ids_to_langs(self, aggregate_tokenizer):
+        ids = [1, 2, 8, 6, 7, 3]
+        assert aggregate_tokenizer.ids_to_lang(ids) == 'en'
+        assert aggregate_tokenizer.ids_to_lang([7, 2]) == 'es'
+        assert aggregate_tokenizer.ids_to_lang([]) == ''
+        assert aggregate_tokenizer.ids_to_text_and_langs(ids[:3]) == [
+            {'char': 'the', 'lang': 'en'},
+            {'char': 'cat', 'lang': 'en'},
+            {'char': 's', 'lang': 'es'},
+        ]
+        assert aggregate_tokenizer.ids_to_words_and_langs(ids) == [
+            {'word': 'the', 'lang': 'en'},
+            {'word': 'cats', 'lang': 'en'},
+            {'word': 'el', 'lang': 'es'},
+            {'word': 'gatos', 'lang': 'es'},
+        ]
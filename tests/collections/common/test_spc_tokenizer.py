@@ -169,6 +169,16 @@ class TestSentencePieceTokenizer:
 
         assert text == result
 
+    @pytest.mark.unit
+    def test_ids_to_text_batch(self, test_data_dir):
+        tokenizer = SentencePieceTokenizer(test_data_dir + self.model_name)
+
+        texts = ["<cls> a b c <sep> e f g h i </s>", "", "f g h"]
+        ids_batch = [tokenizer.text_to_ids(text) for text in texts]
+        result = tokenizer.ids_to_text_batch(ids_batch)
+
+        assert result == texts
+
     @pytest.mark.unit
     def test_tokens_to_ids(self, test_data_dir):
         tokenizer = SentencePieceTokenizer(test_data_dir + self.model_name)
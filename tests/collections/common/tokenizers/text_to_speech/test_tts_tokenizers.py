@@ -83,6 +83,22 @@ class TestTTSTokenizers:
         assert chars == expected_output
         assert len(tokens) == len(expected_output)
 
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_english_chars_tokenizer_encode_batch(self):
+        input_texts = ["Hello world!", "Hey  🙂 there ", ""]
+
+        tokenizer = EnglishCharsTokenizer()
+        tokens, lengths = tokenizer.encode_batch(input_texts)
+
+        expected_tokens = [tokenizer.encode(text) for text in input_texts]
+        assert tokens.shape == (3, max(len(ids) for ids in expected_tokens))
+        assert lengths.tolist() == [len(ids) for ids in expected_tokens]
+        for ids, length, expected_ids in zip(tokens.tolist(), lengths.tolist(), expected_tokens):
+            assert ids[:length] == expected_ids
+            assert ids[length:] == [tokenizer.pad] * (len(ids) - length)
+        assert tokenizer.decode(expected_tokens[1]) == "hey there"
+
     @pytest.mark.run_only_on('CPU')
     @pytest.mark.unit
     def test_english_chars_tokenizer_accented_character(self):
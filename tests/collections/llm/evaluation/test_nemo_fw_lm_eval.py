@@ -0,0 +1,220 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nemo.collections.common.tokenizers.huggingface.auto_tokenizer import AutoTokenizer
+from nemo.collections.common.tokenizers.sentencepiece_tokenizer import SentencePieceTokenizer
+from nemo.collections.llm.evaluation import base
+from nemo.deploy.nlp import query_llm
+
+VOCAB = ["<bos>", "<eos>", "the", "capital", "of", "france", "is", "paris", "london", "a", "b", "▁"]
+BOS_ID, EOS_ID, SPACE_ID = 0, 1, 11
+
+
+class WordTokenizer:
+    """Hugging Face like tokenizer of whitespace separated words, which adds BOS with `add_special_tokens`."""
+
+    def encode(self, text, add_special_tokens=True):
+        return [BOS_ID] * add_special_tokens + [VOCAB.index(word) for word in text.split()]
+
+    def decode(self, ids):
+        return " ".join(VOCAB[id] for id in np.atleast_1d(ids))
+
+
+class WordAutoTokenizer(AutoTokenizer):
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+
+    @property
+    def eos_id(self):
+        return EOS_ID
+
+
+class WordSentencePieceProcessor:
+    """SentencePiece like tokenizer of whitespace separated words, which encodes a leading space as a piece."""
+
+    def encode(self, text, add_bos=False):
+        return [BOS_ID] * add_bos + [SPACE_ID] * text.startswith(" ") + [VOCAB.index(word) for word in text.split()]
+
+    def decode(self, ids):
+        return " ".join(VOCAB[id] for id in np.atleast_1d(ids))
+
+
+class WordSentencePieceTokenizer(SentencePieceTokenizer):
+    def __init__(self):
+        self.tokenizer = WordSentencePieceProcessor()
+
+    @property
+    def eos_id(self):
+        return EOS_ID
+
+
+class FakeNemoQueryLLM:
+    """Stands for `NemoQueryLLM`, the log-likelihood of a continuation is minus its number of tokens."""
+
+    server_side_scoring = True
+
+    def __init__(self, url, model_name):
+        self.loglikelihood_queries = []
+        self.llm_queries = []
+
+    def supports_loglikelihood(self):
+        return self.server_side_scoring
+
+    def query_loglikelihood(self, context_token_ids, continuation_token_ids, max_batch_size=None):
+        self.loglikelihood_queries.append((context_token_ids, continuation_token_ids))
+        return [-float(len(ids)) for ids in continuation_token_ids], [True] * len(continuation_token_ids)
+
+    def query_llm(self, prompts, output_generation_logits=False, **kwargs):
+        assert output_generation_logits
+        self.llm_queries.append(prompts)
+        logits = np.zeros((len(prompts), 1, 1, len(VOCAB)), dtype=np.float32)
+        logits[..., VOCAB.index("a")] = 1.0
+        return {"choices": [{"generation_logits": logits}]}
+
+    def close(self):
+        pass
+
+
+class FakeModelClient:
+    """Stands for the pytriton `ModelClient` of a model scoring on the server, like `FakeNemoQueryLLM`."""
+
+    model_config = SimpleNamespace(inputs=[SimpleNamespace(name="context_token_ids")])
+
+    def __init__(self, url, model_name, init_timeout_s=None):
+        self.closed = False
+
+    def infer_batch(self, context_token_ids, continuation_token_ids, **inputs):
+        assert not self.closed
+        lengths = (continuation_token_ids >= 0).sum(axis=1, keepdims=True)
+        return {"logprobs_sum": -lengths.astype(np.float32), "is_greedy": np.ones_like(lengths, dtype=bool)}
+
+    def close(self):
+        self.closed = True
+
+
+def _evaluator(monkeypatch, server_side_scoring=True, **kwargs):
+    monkeypatch.setattr(FakeNemoQueryLLM, "server_side_scoring", server_side_scoring)
+    monkeypatch.setattr(base, "NemoQueryLLM", FakeNemoQueryLLM)
+    kwargs = dict(
+        dict(
+            model_name="triton_model",
+            api_url="http://localhost:8000",
+            tokenizer=WordAutoTokenizer(),
+            batch_size=2,
+            max_tokens_to_generate=1,
+            temperature=1e-6,
+            top_p=0.0,
+            top_k=1,
+            add_bos=True,
+        ),
+        **kwargs,
+    )
+    return base.NeMoFWLMEval(**kwargs)
+
+
+def _requests(pairs, task_name="arc_easy"):
+    return [SimpleNamespace(arguments=pair, task_name=task_name) for pair in pairs]
+
+
+class TestNeMoFWLMEvalLoglikelihood:
+    @pytest.mark.unit
+    def test_server_side_token_ids(self, monkeypatch):
+        evaluator = _evaluator(monkeypatch)
+        pairs = [("the capital of france is", "paris"), ("the capital of france is", "london is"), ("a", "b")]
+        results = evaluator.loglikelihood(_requests(pairs + pairs[:1]))
+
+        assert results == [(-1.0, True), (-2.0, True), (-1.0, True), (-1.0, True)]
+        sent = {
+            (tuple(context), tuple(continuation))
+            for contexts, continuations in evaluator._nq.loglikelihood_queries
+            for context, continuation in zip(contexts, continuations)
+        }
+        # the context starts with BOS, the continuation does not, and duplicated requests are scored once
+        assert sent == {((0, 2, 3, 4, 5, 6), (7,)), ((0, 2, 3, 4, 5, 6), (8, 6)), ((0, 9), (10,))}
+        assert all(len(contexts) <= evaluator.batch_size for contexts, _ in evaluator._nq.loglikelihood_queries)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("add_bos", [True, False])
+    def test_server_side_token_ids_sentencepiece(self, monkeypatch, add_bos):
+        evaluator = _evaluator(monkeypatch, tokenizer=WordSentencePieceTokenizer(), add_bos=add_bos)
+        pairs = [("the capital of france is", " paris"), ("a", " london is")]
+        results = evaluator.loglikelihood(_requests(pairs))
+
+        # the context keeps BOS and its first word, only the first token of the continuation, BOS or the space
+        # piece, is dropped
+        if add_bos:
+            expected = [((BOS_ID, 2, 3, 4, 5, 6), (SPACE_ID, 7)), ((BOS_ID, 9), (SPACE_ID, 8, 6))]
+        else:
+            expected = [((2, 3, 4, 5, 6), (7,)), ((9,), (8, 6))]
+        sent = {
+            (tuple(context), tuple(continuation))
+            for contexts, continuations in evaluator._nq.loglikelihood_queries
+            for context, continuation in zip(contexts, continuations)
+        }
+        assert sent == set(expected)
+        assert results == [(-float(len(continuation)), True) for _, continuation in expected]
+
+    @pytest.mark.unit
+    def test_cache_is_keyed_by_scoring_mode(self, monkeypatch, tmp_path):
+        cache_path = str(tmp_path / "loglikelihood_cache.jsonl")
+        pairs = [("the capital of france is", "a"), ("the capital of france is", "b")]
+
+        evaluator = _evaluator(monkeypatch, loglikelihood_cache_path=cache_path)
+        assert evaluator.loglikelihood(_requests(pairs)) == [(-1.0, True), (-1.0, True)]
+        assert len(evaluator._nq.loglikelihood_queries) == 1
+
+        # results of the same mode are read back from the cache file
+        evaluator = _evaluator(monkeypatch, loglikelihood_cache_path=cache_path)
+        assert evaluator.loglikelihood(_requests(pairs)) == [(-1.0, True), (-1.0, True)]
+        assert evaluator._nq.loglikelihood_queries == []
+
+        # but not when scoring from logits
+        evaluator = _evaluator(monkeypatch, server_side_scoring=False, loglikelihood_cache_path=cache_path)
+        logprob = float(np.log(np.e / (np.e + len(VOCAB) - 1)))
+        results = evaluator.loglikelihood(_requests(pairs, "mmlu_anatomy"))
+        assert results == [pytest.approx((logprob, True)), pytest.approx((logprob - 1.0, False))]
+        assert len(evaluator._nq.llm_queries) == 1
+        evaluator = _evaluator(monkeypatch, server_side_scoring=False, loglikelihood_cache_path=cache_path)
+        assert evaluator.loglikelihood(_requests(pairs, "mmlu_anatomy")) == results
+        assert evaluator._nq.llm_queries == []
+
+        # nor when predicting a single token or not
+        assert evaluator._request_hash(*pairs[0], False, True) != evaluator._request_hash(*pairs[0], False, False)
+
+    @pytest.mark.unit
+    def test_connections_are_reused_and_closed(self, monkeypatch):
+        clients = []
+
+        def create_client(*args, **kwargs):
+            clients.append(FakeModelClient(*args, **kwargs))
+            return clients[-1]
+
+        monkeypatch.setattr(query_llm, "ModelClient", create_client, raising=False)
+        evaluator = _evaluator(monkeypatch, max_concurrent_requests=2)
+        monkeypatch.setattr(evaluator, "_nq", query_llm.NemoQueryLLM(url="localhost", model_name="triton_model"))
+        words = ["the", "capital", "of", "france", "is", "paris", "london", "a", "b"]
+        for word in words:
+            pairs = [(word, continuation) for continuation in words]
+            assert evaluator.loglikelihood(_requests(pairs)) == [(-1.0, True)] * len(pairs)
+
+        # the threads and their connections are kept across calls, and closed with the evaluator
+        assert len(clients) <= 3
+        assert not any(client.closed for client in clients)
+        evaluator.close()
+        assert all(client.closed for client in clients)
@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
+import numpy as np
+
 from nemo.collections import llm
 
 DATA_PATH = "/home/TestData/lite/hf_cache/squad/"
@@ -164,3 +168,34 @@ def test_validate_dataset_asset_accessibility_file_is_none():
         exception_msg = str(e)
 
     assert exception_msg == expected_msg, exception_msg
+
+
+def _tokenize(example):
+    input_ids = [ord(char) for char in example['text']]
+    return dict(input_ids=input_ids, labels=input_ids[1:] + [0], loss_mask=[1] * len(input_ids))
+
+
+def test_map_with_cache(tmp_path):
+    dataset_dict = {'text': ['a', 'hello', 'abc', 'hello world']}
+    ds = llm.HFDatasetDataModule.from_dict(
+        dataset_dict, split='train', map_num_proc=2, map_cache_dir=str(tmp_path), pad_token_id=-1
+    )
+    ds.map(_tokenize, fingerprint='char-tokenizer-v1', remove_columns=['text'])
+    cache_files = sorted(os.listdir(tmp_path))
+    assert len(cache_files) == 2  # one per process
+    assert isinstance(ds.train[1]['input_ids'], np.ndarray)
+
+    batch = ds.collate_fn([ds.train[i] for i in range(3)], pad_token_id=-1)
+    assert batch['input_ids'].tolist() == [[97, -1, -1, -1, -1], [104, 101, 108, 108, 111], [97, 98, 99, -1, -1]]
+    assert batch['loss_mask'].tolist() == [[1, 0, 0, 0, 0], [1, 1, 1, 1, 1], [1, 1, 1, 0, 0]]
+
+    # later runs load the result from the cache instead of mapping the dataset again
+    def fail(example):
+        raise AssertionError("the dataset should not be mapped again")
+
+    rerun = llm.HFDatasetDataModule.from_dict(
+        dataset_dict, split='train', map_num_proc=2, map_cache_dir=str(tmp_path), pad_token_id=-1
+    )
+    rerun.map(fail, fingerprint='char-tokenizer-v1', remove_columns=['text'])
+    assert sorted(os.listdir(tmp_path)) == cache_files
+    assert rerun.train[3]['input_ids'].tolist() == ds.train[3]['input_ids'].tolist()
@@ -0,0 +1,95 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nemo.collections.llm.gpt.data import packed_sequence
+from nemo.collections.llm.gpt.data.core import GPTSFTPackedDataset
+from nemo.utils.sequence_packing_utils import (
+    fill_packing_strategy_columnar,
+    load_packed_sequences,
+    save_packed_sequences,
+)
+
+MAX_SEQ_LENGTH = 8
+
+
+def _tokenized_arrays(lengths, with_answer_start_idx=True):
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    input_ids = np.arange(3, 3 + offsets[-1], dtype=np.int64)
+    answer_start_idx = np.ones(len(lengths), dtype=np.int64) if with_answer_start_idx else None
+    return input_ids, offsets, answer_start_idx
+
+
+class TestPreparePackedSequenceData:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("with_answer_start_idx", [True, False])
+    def test_long_sequences_are_dropped(self, tmp_path, monkeypatch, with_answer_start_idx):
+        # sequences of length 12 and 10 are longer than MAX_SEQ_LENGTH + 1
+        lengths = [3, 12, 5, 9, 10, 2]
+        arrays = _tokenized_arrays(lengths, with_answer_start_idx)
+        monkeypatch.setattr(packed_sequence, "tokenize_dataset_to_arrays", lambda *args, **kwargs: arrays)
+        warnings = []
+        monkeypatch.setattr(packed_sequence.logging, "warning", warnings.append)
+
+        output_path = os.path.join(tmp_path, "packed.npy")
+        packed_sequence.prepare_packed_sequence_data(
+            input_path=None,
+            output_path=output_path,
+            output_metadata_path=None,
+            packed_sequence_size=16,
+            tokenizer=SimpleNamespace(eos_id=1),
+            max_seq_length=MAX_SEQ_LENGTH,
+        )
+
+        assert any("2 sequences are longer than max_seq_length" in message for message in warnings)
+        packed = load_packed_sequences(output_path)
+        input_ids, offsets, _ = arrays
+        kept = [input_ids[offsets[i] : offsets[i + 1]].tolist() for i, length in enumerate(lengths) if length <= 9]
+        packed_sequences = []
+        for idx in range(len(packed)):
+            item = packed[idx]
+            bounds = item['seq_start_id'] + [len(item['input_ids'])]
+            packed_sequences.extend(item['input_ids'][start:end].tolist() for start, end in zip(bounds, bounds[1:]))
+            assert (item['loss_mask'] is None) == (not with_answer_start_idx)
+        assert sorted(packed_sequences) == sorted(kept)
+
+
+class TestGPTSFTPackedDataset:
+    @pytest.mark.unit
+    def test_padding_item_without_loss_mask(self, tmp_path):
+        # sequences without answer_start_idx are packed without a loss mask
+        input_ids, offsets, answer_start_idx = _tokenized_arrays([3, 5, 2, 4], with_answer_start_idx=False)
+        output_path = os.path.join(tmp_path, "packed.npy")
+        save_packed_sequences(
+            output_path,
+            fill_packing_strategy_columnar([[2, 4], [1, 3]], input_ids, offsets, answer_start_idx, 16, pad_id=0),
+        )
+
+        # only the attributes used to get items
+        dataset = GPTSFTPackedDataset.__new__(GPTSFTPackedDataset)
+        dataset.indexed_dataset = load_packed_sequences(output_path)
+        dataset.samples_mapping = None
+        dataset.answer_only_loss = True
+        assert dataset[0]['loss_mask'] is None
+
+        # negative indices are padding items, which get an empty loss mask
+        item = dataset[-1]
+        assert len(item['input_ids']) == 6
+        assert item['loss_mask'] == [0] * 6
+        assert not dataset._build_loss_mask(item).any()
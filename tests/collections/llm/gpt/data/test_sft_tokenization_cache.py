@@ -0,0 +1,109 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import pytest
+import torch
+
+from nemo.collections.common.tokenizers import TokenizerSpec
+from nemo.collections.llm.gpt.data.core import GPTSFTChatDataset, GPTSFTDataset
+
+
+class CharTokenizer(TokenizerSpec):
+    vocab_size = 300
+    eos_id = 1
+    bos_id = 2
+
+    def text_to_ids(self, text):
+        return [3 + ord(char) % 290 for char in text]
+
+    def ids_to_text(self, ids):
+        return ''.join(chr(id - 3) for id in ids)
+
+    def text_to_tokens(self, text):
+        return list(text)
+
+    def tokens_to_text(self, tokens):
+        return ''.join(tokens)
+
+    def tokens_to_ids(self, tokens):
+        return self.text_to_ids(''.join(tokens))
+
+    def ids_to_tokens(self, ids):
+        return list(self.ids_to_text(ids))
+
+
+def _write_jsonl(path, examples):
+    with open(path, 'w') as f:
+        for example in examples:
+            f.write(json.dumps(example) + '\n')
+    return str(path)
+
+
+def _cache_files(directory):
+    return sorted(name for name in os.listdir(directory) if '.tok-' in name)
+
+
+class TestSFTTokenizationCache:
+    @pytest.mark.unit
+    def test_cached_examples_match(self, tmp_path):
+        path = _write_jsonl(
+            tmp_path / 'data.jsonl',
+            [{'input': f'question {i} ' * (i % 5 + 1), 'output': f'answer {i}', 'id': i} for i in range(30)],
+        )
+        kwargs = dict(
+            file_path=path,
+            tokenizer=CharTokenizer(),
+            max_seq_length=40,
+            prompt_template='{input} {output}',
+            label_key='output',
+            truncation_field='input',
+            memmap_workers=2,
+        )
+        dataset = GPTSFTDataset(**kwargs)
+        cached_dataset = GPTSFTDataset(tokenization_cache=True, **kwargs)
+        for idx in range(len(dataset)):
+            assert cached_dataset[idx] == dataset[idx]
+
+        # the cache is keyed on the prompt template
+        assert len(_cache_files(tmp_path)) == 3
+        GPTSFTDataset(tokenization_cache=True, **dict(kwargs, prompt_template='Q: {input}\nA: {output}'))
+        assert len(_cache_files(tmp_path)) == 6
+
+    @pytest.mark.unit
+    def test_cached_chat_examples_match(self, tmp_path):
+        path = _write_jsonl(
+            tmp_path / 'chat.jsonl',
+            [
+                {
+                    'system': 'system prompt',
+                    'mask': 'User',
+                    'conversations': [
+                        {'from': 'User', 'value': f'hi {i}'},
+                        {'from': 'Assistant', 'value': f'hello there {i}'},
+                    ],
+                }
+                for i in range(10)
+            ],
+        )
+        kwargs = dict(file_path=path, tokenizer=CharTokenizer(), max_seq_length=100, memmap_workers=1)
+        dataset = GPTSFTChatDataset(**kwargs)
+        cached_dataset = GPTSFTChatDataset(tokenization_cache=True, **kwargs)
+        for idx in range(len(dataset)):
+            expected, example = dataset[idx], cached_dataset[idx]
+            for key in ('input_ids', 'mask', 'context_ids', 'answer_ids'):
+                assert torch.equal(example[key], expected[key])
+            assert example['metadata'] == expected['metadata']
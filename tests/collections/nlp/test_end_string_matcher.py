@@ -0,0 +1,133 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from nemo.collections.common.tokenizers.sentencepiece_tokenizer import SentencePieceTokenizer, create_spt_model
+from nemo.collections.nlp.modules.common.end_string_matcher import EndStringMatcher
+from nemo.collections.nlp.modules.common.text_generation_strategy import TextGenerationStrategy
+
+EOD_ID = 1
+
+
+class PieceTokenizer:
+    """Tokenizer whose decoding concatenates the strings of the tokens, tokenizing greedily."""
+
+    pieces = ["<unk>", "<eod>", "a", "b", "c", "d", "e", "n", "o", "s", "t", " ", ".", "!", "do", "ne", "done", "st"]
+
+    def __init__(self):
+        self.vocab_size = len(self.pieces)
+
+    def text_to_ids(self, text):
+        ids = []
+        while text:
+            piece = max((piece for piece in self.pieces[2:] if text.startswith(piece)), key=len, default=None)
+            ids.append(self.pieces.index(piece) if piece is not None else 0)
+            text = text[len(piece) if piece is not None else 1 :]
+        return ids
+
+    def ids_to_text(self, ids):
+        return ''.join(self.pieces[id] if id != EOD_ID else '' for id in ids)
+
+    def ids_to_text_batch(self, ids_batch):
+        return [self.ids_to_text(ids) for ids in ids_batch]
+
+
+def reference_end_of_generation_condition(strategy, tokens, prev, end_strings):
+    """Previous implementation of `end_of_generation_condition`, which decodes every sequence at every step."""
+    end_tokens, end_strings_to_check = strategy._get_end_of_generation_tokens_and_strings(EOD_ID, end_strings)
+    is_end = torch.isin(prev, torch.tensor(list(end_tokens)))
+    for idx, token_seq in enumerate(tokens):
+        text = strategy.model.tokenizer.ids_to_text(token_seq.tolist())
+        is_end[idx] |= any(text.endswith(end_string) for end_string in end_strings_to_check)
+    return is_end
+
+
+def check_generation(strategy, tokens, context_length, end_strings, max_length=None, reset=True):
+    """Runs the end of generation checks of `sample_sequence_batch` on the tokens, against the reference."""
+    if reset:
+        strategy.reset_end_of_generation_state()
+    for context_length in range(context_length, max_length or tokens.size(1)):
+        step_tokens, prev = tokens[:, : context_length + 1], tokens[:, context_length]
+        is_end = strategy.end_of_generation_condition(step_tokens, prev, EOD_ID, end_strings)
+        expected = reference_end_of_generation_condition(strategy, step_tokens, prev, end_strings)
+        assert is_end.tolist() == expected.tolist(), f"mismatch after {context_length + 1} tokens"
+
+
+class TestEndStringMatcher:
+    @pytest.mark.unit
+    def test_matches_decoded_text(self):
+        tokenizer = PieceTokenizer()
+        strategy = TextGenerationStrategy(SimpleNamespace(training=False, tokenizer=tokenizer))
+        # end strings of several tokens, which are also parts of single tokens such as "done" and "st"
+        end_strings = ["one", "a.", "st!", "bb"]
+        generator = torch.Generator().manual_seed(0)
+        tokens = torch.randint(2, tokenizer.vocab_size, (16, 48), generator=generator)
+        generated_pieces = [
+            ["done"],
+            ["do", "ne"],
+            ["o", "ne"],
+            ["b", "a", "."],
+            ["st", "!"],
+            ["s", "t", "!"],
+            ["b", "b"],
+        ]
+        for idx, pieces in enumerate(generated_pieces):
+            tokens[idx, 10 + idx : 10 + idx + len(pieces)] = torch.tensor([tokenizer.pieces.index(p) for p in pieces])
+        check_generation(strategy, tokens, 4, end_strings)
+
+    @pytest.mark.unit
+    def test_consecutive_generations(self):
+        tokenizer = PieceTokenizer()
+        strategy = TextGenerationStrategy(SimpleNamespace(training=False, tokenizer=tokenizer))
+        end_strings = ["done", "st!"]
+        generator = torch.Generator().manual_seed(1)
+        tokens = torch.randint(2, tokenizer.vocab_size, (8, 32), generator=generator)
+        check_generation(strategy, tokens, 2, end_strings, max_length=20)
+
+        # a new generation in the same buffer, with a context as long as the previous generation
+        tokens.copy_(torch.randint(2, tokenizer.vocab_size, (8, 32), generator=generator))
+        check_generation(strategy, tokens, 20, end_strings)
+        # in another buffer of another batch size
+        check_generation(strategy, tokens[:3].clone(), 5, end_strings, max_length=20)
+
+        # without a reset, the state of the previous generation is not used for the buffer of another generation,
+        # even if the context is as long as the previous generation and ends in the middle of an end string
+        tokens = torch.randint(2, tokenizer.vocab_size, (3, 32), generator=generator)
+        tokens[:, 19:21] = torch.tensor([tokenizer.pieces.index("st"), tokenizer.pieces.index("!")])
+        check_generation(strategy, tokens, 20, end_strings, reset=False)
+
+    @pytest.mark.unit
+    def test_sentencepiece_byte_fallback(self, tmp_path):
+        data_file = tmp_path / "data.txt"
+        data_file.write_text("hello world, this is a test of the end strings.\nthe quick brown fox is done\n" * 50)
+        model_path, _ = create_spt_model(
+            str(data_file), vocab_size=400, sample_size=-1, do_lower_case=False, bos=True, eos=True, byte_fallback=True
+        )
+        tokenizer = SentencePieceTokenizer(model_path)
+        strategy = TextGenerationStrategy(SimpleNamespace(training=False, tokenizer=tokenizer))
+
+        end_strings = ["done", "é", "日本!", "fox is"]
+        matcher = EndStringMatcher.from_tokenizer(tokenizer, end_strings)
+        # characters outside of the vocabulary are generated as bytes, which are only matched in the decoded text
+        assert sorted(matcher.decoded_end_strings) == ["é", "日本!"]
+
+        texts = ["ok é then done", "the fox is here 日本!", "日本 and é?", "is this done? é"]
+        tokens = [tokenizer.text_to_ids(text) for text in texts]
+        max_len = max(len(ids) for ids in tokens)
+        tokens = torch.tensor([ids + [tokenizer.eos_id] * (max_len - len(ids)) for ids in tokens])
+        check_generation(strategy, tokens, 1, end_strings)
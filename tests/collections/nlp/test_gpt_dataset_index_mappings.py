@@ -0,0 +1,174 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+import pytest
+
+from nemo.collections.nlp.data.language_modeling.megatron.gpt_dataset import (
+    _build_doc_idx,
+    _build_sample_idx_parallel,
+    _build_shuffle_idx,
+    _index_file,
+)
+
+
+def reference_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, shuffle=True):
+    """The previous `_build_doc_idx`, which built the whole mapping in memory."""
+    if not separate_last_epoch or num_epochs == 1:
+        doc_idx = np.mgrid[0:num_epochs, 0 : len(documents)][1]
+        doc_idx[:] = documents
+        doc_idx = doc_idx.reshape(-1).astype(np.int32)
+        if shuffle:
+            np_rng.shuffle(doc_idx)
+        return doc_idx
+
+    doc_idx_first = reference_doc_idx(documents, num_epochs - 1, np_rng, False, shuffle)
+    doc_idx_last = reference_doc_idx(documents, 1, np_rng, False, shuffle)
+    return np.concatenate((doc_idx_first, doc_idx_last))
+
+
+def reference_sample_idx(sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch, drop_last, add_extra_token):
+    """Port of the C++ helper `build_sample_idx`, which built the sample index mapping before."""
+    num_tokens = num_epochs * tokens_per_epoch - add_extra_token
+    if not drop_last:
+        num_samples = int(np.ceil(np.float32(num_tokens) / np.float32(seq_length)))
+    else:
+        num_samples = num_tokens // seq_length
+    sample_idx = np.zeros([num_samples + 1, 2], dtype=np.int32)
+
+    sample_index, doc_idx_index, doc_offset = 1, 0, 0
+    while sample_index <= num_samples:
+        remaining_seq_length = seq_length + add_extra_token
+        while remaining_seq_length != 0:
+            doc_length = sizes[doc_idx[doc_idx_index]] - doc_offset
+            remaining_seq_length -= doc_length
+            if remaining_seq_length <= 0:
+                doc_offset += remaining_seq_length + doc_length - add_extra_token
+                remaining_seq_length = 0
+            else:
+                if doc_idx_index == len(doc_idx) - 1:
+                    assert sample_index == num_samples
+                    doc_offset = sizes[doc_idx[doc_idx_index]] - add_extra_token
+                    break
+                doc_idx_index += 1
+                doc_offset = 0
+        sample_idx[sample_index] = doc_idx_index, doc_offset
+        sample_index += 1
+    return sample_idx
+
+
+def _dataset(seed):
+    rng = np.random.default_rng(seed)
+    # includes empty documents, and documents which are not part of the split
+    sizes = rng.integers(0, 30, size=60).astype(np.int32)
+    documents = np.sort(rng.choice(len(sizes), 45, replace=False)).astype(np.int32)
+    return sizes, documents
+
+
+class TestIndexMappings:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("num_epochs", [1, 3])
+    @pytest.mark.parametrize("separate_last_epoch", [False, True])
+    @pytest.mark.parametrize("add_extra_token", [0, 1])
+    @pytest.mark.parametrize("drop_last", [True, False])
+    def test_matches_previous_implementation(
+        self, tmp_path, num_epochs, separate_last_epoch, add_extra_token, drop_last
+    ):
+        sizes, documents = _dataset(num_epochs)
+        seq_length = 7
+        tokens_per_epoch = int(sizes[documents].sum())
+
+        def build(build_doc_idx, build_sample_idx):
+            np_rng = np.random.RandomState(1234)
+            doc_idx = build_doc_idx(np_rng)
+            sample_idx = build_sample_idx(doc_idx)
+            # the shuffle index mapping continues with the random state left by the document index mapping
+            num_samples = len(sample_idx) - 1
+            num_shuffled = num_samples // 2 if separate_last_epoch else num_samples
+            return doc_idx, sample_idx, _build_shuffle_idx(num_shuffled, num_samples, np_rng)
+
+        def build_doc_idx(np_rng):
+            filename = str(tmp_path / "doc_idx.npy")
+            with _index_file(filename, np.int32, (num_epochs * len(documents),)) as doc_idx:
+                _build_doc_idx(documents, num_epochs, np_rng, separate_last_epoch, out=doc_idx)
+            return np.load(filename, mmap_mode='r')
+
+        def build_sample_idx(doc_idx):
+            filename = str(tmp_path / "sample_idx.npy")
+            num_samples = reference_sample_idx(
+                sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch, drop_last, add_extra_token
+            ).shape[0]
+            with _index_file(filename, np.int32, (num_samples, 2)) as sample_idx:
+                # small chunks, so that samples span several chunks
+                _build_sample_idx_parallel(
+                    sizes,
+                    doc_idx,
+                    seq_length,
+                    num_epochs,
+                    tokens_per_epoch,
+                    drop_last,
+                    add_extra_token,
+                    out=sample_idx,
+                    chunk_size=4,
+                    num_workers=3,
+                )
+            return np.load(filename, mmap_mode='r')
+
+        expected = build(
+            lambda np_rng: reference_doc_idx(documents, num_epochs, np_rng, separate_last_epoch),
+            lambda doc_idx: reference_sample_idx(
+                sizes, doc_idx, seq_length, num_epochs, tokens_per_epoch, drop_last, add_extra_token
+            ),
+        )
+        mappings = build(build_doc_idx, build_sample_idx)
+        for mapping, expected_mapping in zip(mappings, expected):
+            assert mapping.dtype == expected_mapping.dtype
+            np.testing.assert_array_equal(mapping, expected_mapping)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("add_extra_token", [0, 1])
+    def test_sample_idx_in_memory(self, add_extra_token):
+        sizes, documents = _dataset(0)
+        np_rng = np.random.RandomState(0)
+        doc_idx = _build_doc_idx(documents, 2, np_rng, False)
+        np.testing.assert_array_equal(doc_idx, reference_doc_idx(documents, 2, np.random.RandomState(0), False))
+
+        tokens_per_epoch = int(sizes[documents].sum())
+        for seq_length in [2, 5, 64, tokens_per_epoch]:
+            np.testing.assert_array_equal(
+                _build_sample_idx_parallel(sizes, doc_idx, seq_length, 2, tokens_per_epoch, True, add_extra_token),
+                reference_sample_idx(sizes, doc_idx, seq_length, 2, tokens_per_epoch, True, add_extra_token),
+            )
+
+
+class TestIndexFile:
+    @pytest.mark.unit
+    def test_file_is_written_on_completion(self, tmp_path):
+        filename = str(tmp_path / "mapping.npy")
+        with _index_file(filename, np.int64, (3, 2)) as mapping:
+            mapping[:] = np.arange(6).reshape(3, 2)
+            assert not os.path.exists(filename)
+        np.testing.assert_array_equal(np.load(filename), np.arange(6).reshape(3, 2))
+        assert os.listdir(tmp_path) == ["mapping.npy"]
+
+    @pytest.mark.unit
+    def test_interrupted_build_leaves_no_file(self, tmp_path):
+        filename = str(tmp_path / "mapping.npy")
+        with pytest.raises(KeyboardInterrupt):
+            with _index_file(filename, np.int32, (10,)) as mapping:
+                mapping[:5] = 1
+                raise KeyboardInterrupt
+        assert os.listdir(tmp_path) == []
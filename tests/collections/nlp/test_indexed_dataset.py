@@ -0,0 +1,151 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import torch
+
+from nemo.collections.nlp.data.language_modeling.megatron import indexed_dataset
+from nemo.collections.nlp.data.language_modeling.megatron.gpt_dataset import (
+    GPTDataset,
+    _build_doc_idx,
+    _build_sample_idx_parallel,
+)
+from nemo.collections.nlp.data.language_modeling.megatron.indexed_dataset import (
+    MMapIndexedDataset,
+    MMapIndexedDatasetBuilder,
+    _coalesce_ranges,
+    data_file_path,
+    index_file_path,
+)
+
+
+@pytest.fixture
+def mmap_dataset(tmp_path):
+    prefix = str(tmp_path / "dataset")
+    rng = np.random.default_rng(0)
+    builder = MMapIndexedDatasetBuilder(data_file_path(prefix), dtype=np.int32)
+    for length in rng.integers(1, 40, size=50):
+        builder.add_item(torch.from_numpy(rng.integers(0, 50000, size=length, dtype=np.int32)))
+        builder.end_document()
+    builder.finalize(index_file_path(prefix))
+    return MMapIndexedDataset(prefix, skip_warmup=True)
+
+
+def _random_portions(dataset, rng, num_portions):
+    doc_ids = rng.integers(0, len(dataset), size=num_portions)
+    # runs of consecutive documents, whose portions follow each other in the data file
+    doc_ids[5:15] = np.arange(20, 30)
+    doc_ids[15:18] = doc_ids[14]
+    offsets = rng.integers(0, dataset.sizes[doc_ids] + 1)
+    lengths = rng.integers(0, dataset.sizes[doc_ids] - offsets + 1)
+    offsets[5:15], lengths[5:15] = 0, dataset.sizes[doc_ids[5:15]]
+    return doc_ids, offsets, lengths
+
+
+class TestCoalesceRanges:
+    @pytest.mark.unit
+    def test_merges_adjacent_ranges(self):
+        starts = np.array([0, 10, 30, 35, 35, 40, 40, 20])
+        lengths = np.array([10, 5, 5, 5, 5, 0, 8, 10])
+        merged_starts, merged_lengths = _coalesce_ranges(starts, lengths)
+        # ranges are merged when they start where the previous one ends, not when they overlap or go back
+        assert merged_starts.tolist() == [0, 30, 35, 20]
+        assert merged_lengths.tolist() == [15, 10, 13, 10]
+
+    @pytest.mark.unit
+    def test_empty(self):
+        starts, lengths = _coalesce_ranges(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        assert len(starts) == 0 and len(lengths) == 0
+
+
+class TestMMapIndexedDataset:
+    @pytest.mark.unit
+    def test_get_many(self, mmap_dataset):
+        rng = np.random.default_rng(1)
+        doc_ids, offsets, lengths = _random_portions(mmap_dataset, rng, 40)
+        expected = np.concatenate(
+            [mmap_dataset.get(doc_id, offset, length) for doc_id, offset, length in zip(doc_ids, offsets, lengths)]
+        )
+        np.testing.assert_array_equal(mmap_dataset.get_many(doc_ids, offsets, lengths), expected)
+
+        out = np.full(len(expected) + 3, -1, dtype=np.int32)
+        assert mmap_dataset.get_many(doc_ids, offsets, lengths, out=out) is out
+        np.testing.assert_array_equal(out[: len(expected)], expected)
+
+        # whole documents by default, and the rest of the documents with offsets only
+        doc_ids = np.array([3, 4, 5, 5, 0, 49])
+        expected = np.concatenate([mmap_dataset.get(doc_id) for doc_id in doc_ids])
+        np.testing.assert_array_equal(mmap_dataset.get_many(doc_ids), expected)
+        offsets = np.minimum(mmap_dataset.sizes[doc_ids], 2)
+        expected = np.concatenate([mmap_dataset.get(doc_id, offset) for doc_id, offset in zip(doc_ids, offsets)])
+        np.testing.assert_array_equal(mmap_dataset.get_many(doc_ids, offsets), expected)
+
+    @pytest.mark.unit
+    def test_read_ahead(self, mmap_dataset, monkeypatch):
+        reads = []
+        monkeypatch.setattr(indexed_dataset, "_read_ahead", lambda fd, start, length: reads.append((start, length)))
+        rng = np.random.default_rng(2)
+        doc_ids, offsets, lengths = _random_portions(mmap_dataset, rng, 40)
+        mmap_dataset.read_ahead(doc_ids, offsets, lengths)
+        mmap_dataset._read_ahead_pool.shutdown(wait=True)
+
+        # every element of the portions is read
+        itemsize = np.dtype(np.int32).itemsize
+        starts = mmap_dataset._index._pointers[doc_ids] + offsets * itemsize
+        expected = set()
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            expected.update(range(start, start + length * itemsize))
+        read = set()
+        for start, length in reads:
+            read.update(range(start, start + length))
+        assert read == expected
+        # portions which follow each other are read at once
+        assert len(reads) < len(doc_ids)
+
+    @pytest.mark.unit
+    def test_read_ahead_after_fork(self, mmap_dataset):
+        mmap_dataset.read_ahead(np.arange(len(mmap_dataset)))
+        pool = mmap_dataset._read_ahead_pool
+        pool.shutdown(wait=True)
+        # in a forked process, the reads run on a new thread pool, since the threads of the parent do not exist
+        mmap_dataset._read_ahead_pid = None
+        mmap_dataset.read_ahead([0, 1])
+        assert mmap_dataset._read_ahead_pool is not pool
+
+
+class TestGPTDatasetSampleRanges:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("add_extra_token", [0, 1])
+    def test_get_many_matches_get(self, mmap_dataset, add_extra_token):
+        seq_length = 16
+        sizes = mmap_dataset.sizes
+        np_rng = np.random.RandomState(3)
+        doc_idx = _build_doc_idx(np.arange(len(mmap_dataset)), 2, np_rng, False)
+        tokens_per_epoch = int(sizes.sum())
+        sample_idx = _build_sample_idx_parallel(
+            sizes, doc_idx, seq_length, 2, tokens_per_epoch, add_extra_token=add_extra_token
+        )
+
+        # only the attributes used to read samples
+        dataset = GPTDataset.__new__(GPTDataset)
+        dataset.indexed_dataset = mmap_dataset
+        dataset.doc_idx, dataset.sample_idx = doc_idx, sample_idx
+        dataset.shuffle_idx = np_rng.permutation(len(sample_idx) - 1)
+        dataset.add_extra_token = add_extra_token
+        for idx in range(len(dataset)):
+            ranges = dataset._get_sample_ranges(idx)
+            sample = mmap_dataset.get_many(*ranges)
+            np.testing.assert_array_equal(sample, dataset._get_text_from_documents(idx))
+            assert len(sample) == seq_length + add_extra_token
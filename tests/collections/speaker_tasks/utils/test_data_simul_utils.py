@@ -20,13 +20,16 @@ import torch
 from omegaconf import DictConfig
 
 from nemo.collections.asr.parts.utils.data_simulation_utils import (
+    AudioReadCache,
     DataAnnotator,
     SpeechSampler,
     add_silence_to_alignments,
+    append_completed_session,
     binary_search_alignments,
     get_cleaned_base_path,
     get_split_points_in_alignments,
     normalize_audio,
+    read_completed_sessions,
     read_noise_manifest,
 )
 from nemo.collections.asr.parts.utils.manifest_utils import get_ctm_line
@@ -362,6 +365,33 @@ class TestDataSimulatorUtils:
             assert audio_manifest['alignments'] == alignments
             assert audio_manifest['words'] == words
 
+    def test_audio_read_cache_evicts_least_recently_used(self):
+        cache = AudioReadCache(max_items=2)
+        cache['a#0'] = (torch.zeros(1), 16000, {})
+        cache['b#0'] = (torch.ones(1), 16000, {})
+        # access 'a' so that 'b' becomes the least recently used entry
+        _ = cache['a#0']
+        cache['c#0'] = (torch.ones(2), 16000, {})
+        assert 'a#0' in cache and 'c#0' in cache
+        assert 'b#0' not in cache
+        assert len(cache) == 2
+
+    def test_audio_read_cache_invalid_size(self):
+        with pytest.raises(ValueError):
+            AudioReadCache(max_items=0)
+
+    def test_completed_sessions_round_trip(self, tmp_path):
+        progress_filepath = str(tmp_path / "simulation_progress.txt")
+        assert read_completed_sessions(progress_filepath) == []
+        for sess_idx in [3, 0, 3, 7]:
+            append_completed_session(progress_filepath, sess_idx)
+        # simulate a partially written line left behind by an interrupted run
+        with open(progress_filepath, "a") as f:
+            f.write("1")
+        with open(progress_filepath, "a") as f:
+            f.write("x\n")
+        assert read_completed_sessions(progress_filepath) == [0, 3, 7]
+
 
 class TestDataAnnotator:
     def test_init(self, annotator):
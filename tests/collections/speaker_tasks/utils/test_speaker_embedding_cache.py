@@ -0,0 +1,133 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+
+import pytest
+import torch
+
+from nemo.collections.asr.parts.utils.speaker_embedding_cache import SpeakerEmbeddingCache, get_model_fingerprint
+
+
+@pytest.fixture()
+def audio_files(tmp_path):
+    paths = []
+    for idx in range(2):
+        path = os.path.join(tmp_path, f'audio_{idx}.wav')
+        with open(path, 'wb') as audio_file:
+            audio_file.write(bytes([idx]) * 64)
+        paths.append(path)
+    return paths
+
+
+class TestSpeakerEmbeddingCache:
+    @pytest.mark.unit
+    def test_add_and_reload(self, tmp_path, audio_files):
+        cache_dir = os.path.join(tmp_path, 'cache')
+        cache = SpeakerEmbeddingCache(cache_dir)
+        keys = [cache.segment_key(path, 0.5, 1.5, 'model') for path in audio_files]
+        assert keys[0] != keys[1]
+        assert cache.lookup(keys) == ([], [0, 1])
+
+        embeddings = torch.randn(2, 4)
+        cache.add(keys, embeddings)
+        cache.add(keys[:1], torch.randn(1, 4))  # already cached, ignored
+        assert len(cache) == 2
+
+        reloaded = SpeakerEmbeddingCache(cache_dir)
+        new_key = reloaded.segment_key(audio_files[0], 2.0, 1.5, 'model')
+        assert reloaded.lookup([new_key] + keys) == ([1, 2], [0])
+        assert torch.equal(reloaded.get(keys[::-1]), embeddings.flip(0))
+
+    @pytest.mark.unit
+    def test_writers_sharing_a_store(self, tmp_path):
+        cache_dir = os.path.join(tmp_path, 'cache')
+        first, second = SpeakerEmbeddingCache(cache_dir), SpeakerEmbeddingCache(cache_dir)
+        embeddings = {f'key_{idx}': torch.full((4,), float(idx)) for idx in range(4)}
+
+        # the second writer appends after the rows of the first one, and skips the keys it added
+        first.add(['key_0', 'key_1'], torch.stack([embeddings['key_0'], embeddings['key_1']]))
+        second.add(['key_1', 'key_2'], torch.stack([embeddings['key_1'], embeddings['key_2']]))
+        first.add(['key_3'], embeddings['key_3'][None])
+        assert len(second) == 3 and len(first) == 4
+
+        reloaded = SpeakerEmbeddingCache(cache_dir)
+        assert reloaded.num_rows == 4
+        keys = list(embeddings)
+        assert torch.equal(reloaded.get(keys), torch.stack([embeddings[key] for key in keys]))
+        assert torch.equal(second.get(['key_1', 'key_2']), reloaded.get(['key_1', 'key_2']))
+
+    @pytest.mark.unit
+    def test_concurrent_writers(self, tmp_path):
+        cache_dir = os.path.join(tmp_path, 'cache')
+
+        def add(writer):
+            cache = SpeakerEmbeddingCache(cache_dir)
+            for batch in range(20):
+                # keys shared by all writers, and keys of this writer
+                keys = [f'shared_{batch}', f'writer_{writer}_{batch}']
+                cache.add(keys, torch.tensor([[batch, -1.0], [batch, writer]]))
+
+        threads = [threading.Thread(target=add, args=(writer,)) for writer in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reloaded = SpeakerEmbeddingCache(cache_dir)
+        assert len(reloaded) == reloaded.num_rows == 20 * 5
+        for batch in range(20):
+            assert reloaded.get([f'shared_{batch}']).tolist() == [[batch, -1.0]]
+            for writer in range(4):
+                assert reloaded.get([f'writer_{writer}_{batch}']).tolist() == [[batch, writer]]
+
+    @pytest.mark.unit
+    def test_interrupted_append(self, tmp_path):
+        cache_dir = os.path.join(tmp_path, 'cache')
+        cache = SpeakerEmbeddingCache(cache_dir)
+        cache.add(['key_0'], torch.zeros(1, 4))
+        # a run interrupted while writing a row and its index entry
+        with open(os.path.join(cache_dir, 'embeddings.f32'), 'ab') as data_file:
+            data_file.write(b'\x00' * 6)
+        with open(os.path.join(cache_dir, 'index.json'), 'a', encoding='utf-8') as index_file:
+            index_file.write('{"key": "key_1", "ro')
+
+        cache = SpeakerEmbeddingCache(cache_dir)
+        assert len(cache) == 1 and cache.num_rows == 1
+        cache.add(['key_1', 'key_2'], torch.ones(2, 4))
+        reloaded = SpeakerEmbeddingCache(cache_dir)
+        assert reloaded.index == {'key_0': 0, 'key_1': 1, 'key_2': 2}
+        assert torch.equal(reloaded.get(['key_2', 'key_0']), torch.stack([torch.ones(4), torch.zeros(4)]))
+
+    @pytest.mark.unit
+    def test_key_depends_on_audio_content_and_model(self, tmp_path, audio_files):
+        cache = SpeakerEmbeddingCache(os.path.join(tmp_path, 'cache'))
+        key = cache.segment_key(audio_files[0], 0.0, 1.0, 'model')
+        assert key != cache.segment_key(audio_files[0], 0.0, 1.0, 'other_model')
+
+        copy_path = os.path.join(tmp_path, 'copy.wav')
+        with open(audio_files[0], 'rb') as src, open(copy_path, 'wb') as dst:
+            dst.write(src.read())
+        assert key == cache.segment_key(copy_path, 0.0, 1.0, 'model')
+
+    @pytest.mark.unit
+    def test_model_fingerprint(self):
+        model = torch.nn.Linear(3, 2)
+        fingerprint = get_model_fingerprint(model)
+        assert fingerprint == get_model_fingerprint(model)
+        assert fingerprint != get_model_fingerprint(model, extra='sample_rate=8000')
+        with torch.no_grad():
+            model.weight.add_(1.0)
+        assert fingerprint != get_model_fingerprint(model)
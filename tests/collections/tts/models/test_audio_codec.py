@@ -0,0 +1,107 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from nemo.collections.tts.models import AudioCodecModel
+
+SAMPLES_PER_FRAME = 4
+# number of frames on each side of a frame which the encoder and the decoder of the fake codec look at
+RECEPTIVE_FIELD = 2
+
+
+def _mask(x, x_len):
+    return x * (torch.arange(x.shape[-1]) < x_len[:, None]).to(x.dtype)
+
+
+def _neighbourhood_sum(x, x_len):
+    """Weighted sum of the valid frames within `RECEPTIVE_FIELD` frames of every frame of `x` of shape (B, T)."""
+    x = F.pad(_mask(x, x_len), (RECEPTIVE_FIELD, RECEPTIVE_FIELD))
+    num_frames = x.shape[-1] - 2 * RECEPTIVE_FIELD
+    total = sum((k + 1) * x[:, k : k + num_frames] for k in range(2 * RECEPTIVE_FIELD + 1))
+    return _mask(total, x_len)
+
+
+class FakeAudioCodec:
+    """Codec with a limited receptive field and exact integer arithmetic, using the chunking of `AudioCodecModel`."""
+
+    samples_per_frame = SAMPLES_PER_FRAME
+    pad_audio = AudioCodecModel.pad_audio
+    _get_chunks = staticmethod(AudioCodecModel._get_chunks)
+    encode_chunked = AudioCodecModel.encode_chunked
+    stream_decode = AudioCodecModel.stream_decode
+    decode_chunked = AudioCodecModel.decode_chunked
+
+    def encode(self, audio, audio_len):
+        tokens_len = audio_len // SAMPLES_PER_FRAME
+        frames = _mask(audio, audio_len).reshape(audio.shape[0], -1, SAMPLES_PER_FRAME).sum(dim=-1)
+        tokens = _neighbourhood_sum(frames, tokens_len).long()
+        return torch.stack([tokens, tokens % 7], dim=1), tokens_len
+
+    def decode(self, tokens, tokens_len):
+        frames = _neighbourhood_sum(tokens.sum(dim=1).double(), tokens_len)
+        audio = frames[:, :, None] * torch.arange(1, SAMPLES_PER_FRAME + 1, dtype=frames.dtype)
+        return audio.reshape(tokens.shape[0], -1), tokens_len * SAMPLES_PER_FRAME
+
+
+def _audio_batch():
+    generator = torch.Generator().manual_seed(0)
+    audio_len = torch.tensor([150, 93, 3, 148])
+    audio = torch.randint(-8, 8, (len(audio_len), audio_len.max()), generator=generator).double()
+    return _mask(audio, audio_len), audio_len
+
+
+def _assert_equal_valid(x, y, lengths):
+    for idx, length in enumerate(lengths.tolist()):
+        assert torch.equal(x[idx, ..., :length], y[idx, ..., :length])
+
+
+class TestAudioCodecChunking:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("chunk_frames", [1, 3, 8, 100])
+    def test_chunked_matches_full(self, chunk_frames):
+        codec = FakeAudioCodec()
+        audio, audio_len = _audio_batch()
+
+        tokens, tokens_len = codec.encode(*codec.pad_audio(audio, audio_len))
+        chunked_tokens, chunked_tokens_len = codec.encode_chunked(
+            audio, audio_len, chunk_frames=chunk_frames, overlap_frames=RECEPTIVE_FIELD
+        )
+        assert torch.equal(chunked_tokens_len, tokens_len)
+        _assert_equal_valid(chunked_tokens, tokens, tokens_len)
+
+        output_audio, output_audio_len = codec.decode(tokens, tokens_len)
+        chunked_audio, chunked_audio_len = codec.decode_chunked(
+            tokens, tokens_len, chunk_frames=chunk_frames, overlap_frames=RECEPTIVE_FIELD
+        )
+        assert torch.equal(chunked_audio_len, output_audio_len)
+        _assert_equal_valid(chunked_audio, output_audio, output_audio_len)
+
+        # streamed chunks hold at most `chunk_frames` frames, and their valid lengths add up to the audio length
+        chunks = list(
+            codec.stream_decode(tokens, tokens_len, chunk_frames=chunk_frames, overlap_frames=RECEPTIVE_FIELD)
+        )
+        assert all(chunk.shape[1] <= chunk_frames * SAMPLES_PER_FRAME for chunk, _ in chunks)
+        assert torch.equal(sum(chunk_len for _, chunk_len in chunks), output_audio_len)
+
+    @pytest.mark.unit
+    def test_overlap_smaller_than_receptive_field(self):
+        codec = FakeAudioCodec()
+        audio, audio_len = _audio_batch()
+
+        tokens, tokens_len = codec.encode(*codec.pad_audio(audio, audio_len))
+        chunked_tokens, _ = codec.encode_chunked(audio, audio_len, chunk_frames=3, overlap_frames=RECEPTIVE_FIELD - 1)
+        assert not torch.equal(chunked_tokens[0, :, : tokens_len[0]], tokens[0, :, : tokens_len[0]])
@@ -0,0 +1,81 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from nemo.collections.tts.modules.aligner import AlignmentEncoder
+from nemo.collections.tts.modules.fastpitch import FastPitchModule, TemporalPredictor
+from nemo.collections.tts.modules.transformer import FFTransformerDecoder, FFTransformerEncoder
+from nemo.collections.tts.parts.utils import helpers
+
+N_MEL_CHANNELS = 8
+EMBEDDING_DIM = 16
+
+
+def _fastpitch_module(use_torch_mas):
+    torch.manual_seed(0)
+    transformer_kwargs = dict(n_layer=1, n_head=1, d_model=EMBEDDING_DIM, d_head=8, d_inner=32, kernel_size=3)
+    return FastPitchModule(
+        encoder_module=FFTransformerEncoder(
+            **transformer_kwargs, dropout=0.0, dropatt=0.0, n_embed=10, d_embed=EMBEDDING_DIM, padding_idx=0
+        ),
+        decoder_module=FFTransformerDecoder(**transformer_kwargs, dropout=0.0, dropatt=0.0),
+        duration_predictor=TemporalPredictor(EMBEDDING_DIM, filter_size=16, kernel_size=3, dropout=0.0),
+        pitch_predictor=TemporalPredictor(EMBEDDING_DIM, filter_size=16, kernel_size=3, dropout=0.0),
+        energy_predictor=None,
+        aligner=AlignmentEncoder(
+            n_mel_channels=N_MEL_CHANNELS, n_text_channels=EMBEDDING_DIM, n_att_channels=N_MEL_CHANNELS
+        ),
+        speaker_encoder=None,
+        n_speakers=1,
+        symbols_embedding_dim=EMBEDDING_DIM,
+        pitch_embedding_kernel_size=3,
+        energy_embedding_kernel_size=3,
+        n_mel_channels=N_MEL_CHANNELS,
+        use_torch_mas=use_torch_mas,
+    ).eval()
+
+
+class TestFastPitchModule:
+    @pytest.mark.unit
+    def test_use_torch_mas(self, monkeypatch):
+        calls = []
+        batched_mas_width1 = helpers.batched_mas_width1
+
+        def record_batched_mas_width1(*args, **kwargs):
+            calls.append(args)
+            return batched_mas_width1(*args, **kwargs)
+
+        monkeypatch.setattr(helpers, "batched_mas_width1", record_batched_mas_width1)
+
+        generator = torch.Generator().manual_seed(1)
+        text = torch.tensor([[3, 5, 2, 7, 9, 4], [6, 1, 8, 0, 0, 0]])
+        input_lens = torch.tensor([6, 3])
+        mel_lens = torch.tensor([20, 11])
+        spec = torch.randn(2, N_MEL_CHANNELS, 20, generator=generator)
+        pitch = torch.randn(2, 20, generator=generator)
+
+        attn_hard = []
+        for use_torch_mas in [False, True]:
+            with torch.no_grad():
+                outputs = _fastpitch_module(use_torch_mas)(
+                    text=text, pitch=pitch, spec=spec, mel_lens=mel_lens, input_lens=input_lens
+                )
+            # the attention is binarized on its device only when asked to
+            assert len(calls) == use_torch_mas
+            attn_hard.append(outputs[7])
+
+        assert torch.equal(attn_hard[0], attn_hard[1])
+        assert torch.equal(attn_hard[1].sum(dim=(2, 3))[:, 0], mel_lens.float())
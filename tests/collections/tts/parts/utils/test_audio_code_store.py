@@ -0,0 +1,48 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nemo.collections.tts.parts.utils.audio_code_store import AudioCodeStore, AudioCodeStoreWriter
+
+
+class TestAudioCodeStore:
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_round_trip(self, tmp_path):
+        rng = np.random.default_rng(0)
+        utterances = [rng.integers(0, 1024, size=(4, num_frames)) for num_frames in [10, 0, 35, 7, 50, 1]]
+        with AudioCodeStoreWriter(tmp_path, num_codebooks=4, max_shard_frames=40) as writer:
+            indices = [writer.add(tokens) for tokens in utterances]
+        assert indices == list(range(len(utterances)))
+        assert len(list(tmp_path.glob('shard_*.bin'))) == 5
+
+        store = AudioCodeStore(tmp_path)
+        assert len(store) == len(utterances)
+        assert store.num_frames.tolist() == [10, 0, 35, 7, 50, 1]
+        for idx, tokens in enumerate(utterances):
+            assert store[idx].dtype == np.int16
+            assert np.array_equal(store[idx], tokens)
+        assert np.array_equal(store.get(2, start=30, length=10), utterances[2][:, 30:])
+        assert np.array_equal(store.get(4, start=5, length=3), utterances[4][:, 5:8])
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_invalid_tokens(self, tmp_path):
+        writer = AudioCodeStoreWriter(tmp_path, num_codebooks=2, dtype='int16')
+        with pytest.raises(ValueError):
+            writer.add(np.zeros((3, 5), dtype=np.int64))
+        with pytest.raises(ValueError):
+            writer.add(np.full((2, 5), 2**16, dtype=np.int64))
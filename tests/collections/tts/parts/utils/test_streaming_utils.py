@@ -0,0 +1,109 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from nemo.collections.tts.parts.utils.streaming_utils import StreamingTTS, split_text_for_streaming
+
+TEXT = "The first sentence is short. The second one, which has a clause, is longer! Is this the third? Yes."
+
+
+class CharSpectrogramGenerator(torch.nn.Module):
+    """Every character lasts 1 to 3 frames, whose mel only depends on the character."""
+
+    device = torch.device('cpu')
+
+    def __init__(self):
+        super().__init__()
+        self.fastpitch = SimpleNamespace(encoder=SimpleNamespace(padding_idx=0))
+
+    def parse(self, text):
+        return torch.tensor([[1 + ord(char) % 50 for char in text]])
+
+    def forward(self, *, text, speaker=None, pace=1.0):
+        durs = (text % 3 + 1) * (text != 0)
+        spects = [
+            (tokens.float()[:, None] * torch.arange(1, 5)).repeat_interleave(token_durs, dim=0).T
+            for tokens, token_durs in zip(text, durs)
+        ]
+        spect_lens = torch.tensor([spect.shape[1] for spect in spects])
+        spect = torch.nn.utils.rnn.pad_sequence([spect.T for spect in spects], batch_first=True).transpose(1, 2)
+        return spect, spect_lens, durs
+
+
+class FrameVocoder(torch.nn.Module):
+    """Every frame is vocoded to `hop_length` samples of its mean."""
+
+    sample_rate = 100
+    hop_length = 4
+
+    def convert_spectrogram_to_audio(self, spec):
+        return spec.mean(dim=1).repeat_interleave(self.hop_length, dim=-1)
+
+
+def _synthesize(spec_generator, vocoder, texts):
+    tokens = torch.cat([spec_generator.parse(text) for text in texts], dim=1)
+    spect, _, _ = spec_generator(text=tokens)
+    return vocoder.convert_spectrogram_to_audio(spec=spect)[0]
+
+
+class TestStreamingUtils:
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_split_text_for_streaming(self):
+        chunks = split_text_for_streaming(TEXT, max_chars=30)
+        assert chunks == [
+            "The first sentence is short.",
+            "The second one,",
+            "which has a clause, is longer!",
+            "Is this the third?",
+            "Yes.",
+        ]
+        assert split_text_for_streaming("a bb ccc dddd eeeee", max_chars=8) == ["a bb ccc", "dddd", "eeeee"]
+        assert split_text_for_streaming("  ") == []
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    @pytest.mark.parametrize("overlap_frames", [0, 2, 50])
+    def test_stream_matches_full_synthesis(self, overlap_frames):
+        spec_generator, vocoder = CharSpectrogramGenerator().eval(), FrameVocoder().eval()
+        tts = StreamingTTS(
+            spec_generator, vocoder, max_chunk_chars=30, context_tokens=3, overlap_frames=overlap_frames
+        )
+        chunks = list(tts.stream(TEXT))
+
+        expected = _synthesize(spec_generator, vocoder, split_text_for_streaming(TEXT, max_chars=30))
+        assert torch.allclose(torch.cat(chunks), expected)
+        metrics = tts.metrics[0]
+        assert metrics.num_chunks == len(chunks) == 5
+        assert metrics.audio_duration == pytest.approx(len(expected) / vocoder.sample_rate)
+        assert 0 < metrics.first_chunk_latency <= metrics.synthesis_time
+        assert metrics.rtf == pytest.approx(metrics.synthesis_time / metrics.audio_duration)
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_stream_batch(self):
+        spec_generator, vocoder = CharSpectrogramGenerator().eval(), FrameVocoder().eval()
+        tts = StreamingTTS(spec_generator, vocoder, max_chunk_chars=30, context_tokens=3, overlap_frames=2)
+        texts = [TEXT, "One chunk.", "Two chunks. Really."]
+
+        chunks = [[] for _ in texts]
+        for idx, audio in tts.stream_batch(texts):
+            chunks[idx].append(audio)
+        assert [metrics.num_chunks for metrics in tts.metrics] == [5, 1, 2]
+        for text, text_chunks in zip(texts, chunks):
+            assert torch.allclose(torch.cat(text_chunks), torch.cat(list(tts.stream(text))))
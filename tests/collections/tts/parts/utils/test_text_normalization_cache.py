@@ -0,0 +1,77 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+
+import pytest
+
+from nemo.collections.tts.parts.utils.text_normalization_cache import CachedTextNormalizer
+
+
+class CountingNormalizer:
+    def __init__(self):
+        self.calls = []
+
+    def normalize(self, text, upper=False):
+        self.calls.append(text)
+        text = text.replace('2', 'two')
+        return text.upper() if upper else text
+
+
+class TestCachedTextNormalizer:
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_memoized_sentences(self):
+        normalizer = CountingNormalizer()
+        cached_normalizer = CachedTextNormalizer(normalizer.normalize, split_sentences=True)
+
+        assert cached_normalizer("I have 2 cats.  Hello!") == "I have two cats.  Hello!"
+        assert cached_normalizer("Hello! I have 2 cats.") == "Hello! I have two cats."
+        assert normalizer.calls == ["I have 2 cats.", "Hello!"]
+
+        # kwargs are part of the cache key
+        assert cached_normalizer("Hello!", upper=True) == "HELLO!"
+        assert normalizer.calls == ["I have 2 cats.", "Hello!", "Hello!"]
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_lru_eviction(self):
+        normalizer = CountingNormalizer()
+        cached_normalizer = CachedTextNormalizer(normalizer.normalize, cache_size=2)
+
+        for text in ["a", "b", "a", "c", "a", "b"]:
+            cached_normalizer(text)
+        # "b" is evicted by "c", as "a" was used more recently
+        assert normalizer.calls == ["a", "b", "c", "b"]
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_persistent_cache(self, tmp_path):
+        normalizer = CountingNormalizer()
+        texts = ["I have 2 cats.", "2 dogs", "I have 2 cats."]
+        cached_normalizer = CachedTextNormalizer(normalizer.normalize, cache_dir=tmp_path, config="en")
+        assert cached_normalizer.normalize_batch(texts) == ["I have two cats.", "two dogs", "I have two cats."]
+        assert normalizer.calls == ["I have 2 cats.", "2 dogs"]
+
+        # normalized texts are read back by other instances with the same config, and pickled instances
+        other_normalizer = CountingNormalizer()
+        other_cached_normalizer = pickle.loads(
+            pickle.dumps(CachedTextNormalizer(other_normalizer.normalize, cache_dir=tmp_path, config="en"))
+        )
+        assert other_cached_normalizer.normalize_batch(texts) == ["I have two cats.", "two dogs", "I have two cats."]
+        assert other_normalizer.calls == []
+
+        other_config_normalizer = CachedTextNormalizer(other_normalizer.normalize, cache_dir=tmp_path, config="de")
+        assert other_config_normalizer("2 dogs") == "two dogs"
+        assert other_normalizer.calls == ["2 dogs"]
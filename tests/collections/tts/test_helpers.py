@@ -12,10 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 import pytest
 import torch
 
-from nemo.collections.tts.parts.utils.helpers import regulate_len, sort_tensor, unsort_tensor
+from nemo.collections.tts.parts.utils.helpers import (
+    b_mas,
+    batched_mas_width1,
+    binarize_attention_parallel,
+    regulate_len,
+    sort_tensor,
+    unsort_tensor,
+)
 
 
 def sample_duration_input(max_length=64, group_size=2, batch_size=3):
@@ -51,3 +59,35 @@ def test_regulate_len():
     # make sure all round-ups are <= group_size
     diff = lens_out - durs_in.sum(dim=1)
     assert torch.max(diff) < group_size
+
+
+@pytest.mark.unit
+def test_batched_mas_width1():
+    generator = torch.Generator()
+    generator.manual_seed(0)
+    batch_size, max_mel_len, max_text_len = 8, 80, 30
+    out_lens = torch.randint(max_text_len, max_mel_len + 1, (batch_size,), generator=generator)
+    in_lens = torch.randint(2, max_text_len + 1, (batch_size,), generator=generator)
+    out_lens[0], in_lens[1] = max_mel_len, max_text_len
+    attn = torch.softmax(3 * torch.randn(batch_size, 1, max_mel_len, max_text_len, generator=generator), dim=-1)
+    # quantized attention, so that paths have ties
+    attn[::2] = torch.round(attn[::2] * 4) / 4 + 1e-4
+    log_attn = torch.log(attn)
+
+    attn_hard = batched_mas_width1(log_attn, in_lens, out_lens)
+    expected = b_mas(log_attn.numpy(), in_lens.numpy(), out_lens.numpy(), width=1)
+    assert np.array_equal(attn_hard.numpy(), expected)
+    assert torch.all(attn_hard.sum(dim=-1) == (torch.arange(max_mel_len) < out_lens.unsqueeze(1)).unsqueeze(1))
+
+
+@pytest.mark.unit
+def test_binarize_attention_parallel_use_torch_mas():
+    generator = torch.Generator()
+    generator.manual_seed(1)
+    batch_size, max_mel_len, max_text_len = 4, 40, 12
+    out_lens = torch.tensor([40, 31, 12, 25])
+    in_lens = torch.tensor([12, 7, 12, 3])
+    attn = torch.softmax(torch.randn(batch_size, 1, max_mel_len, max_text_len, generator=generator), dim=-1)
+
+    attn_hard = binarize_attention_parallel(attn, in_lens, out_lens)
+    assert torch.equal(binarize_attention_parallel(attn, in_lens, out_lens, use_torch_mas=True), attn_hard)
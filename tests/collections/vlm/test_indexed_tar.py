@@ -0,0 +1,56 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import pickle
+import tarfile
+
+import pytest
+
+from nemo.collections.vlm.neva.data.indexed_tar import IndexedTarReader
+
+
+@pytest.fixture()
+def tar_path(tmp_path):
+    files = {f'images/{idx:03d}.jpg': os.urandom(idx * 997) for idx in range(50)}
+    files['very/' * 40 + 'long_name.png'] = b'long name'
+    path = str(tmp_path / 'images.tar')
+    with tarfile.open(path, 'w') as tar:
+        directory = tarfile.TarInfo('images')
+        directory.type = tarfile.DIRTYPE
+        tar.addfile(directory)
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path, files
+
+
+class TestIndexedTarReader:
+    @pytest.mark.unit
+    def test_read(self, tar_path):
+        path, files = tar_path
+        reader = IndexedTarReader(path)
+        assert len(reader) == len(files)
+        for name, data in files.items():
+            assert reader.read(name) == data
+        assert reader.read('images/missing.jpg') is None
+        assert 'images' not in reader
+        assert 'images/007.jpg' in reader
+
+        # the saved index is reused, and reloaded when unpickling
+        assert os.path.exists(path + '.offsets.npy')
+        reader = pickle.loads(pickle.dumps(IndexedTarReader(path)))
+        assert reader.read('images/049.jpg') == files['images/049.jpg']
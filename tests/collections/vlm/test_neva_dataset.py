@@ -0,0 +1,57 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from nemo.collections.nlp.data.language_modeling.text_memmap_dataset import JSONLMemMapDataset
+from nemo.collections.vlm.neva.data.config import ImageDataConfig
+from nemo.collections.vlm.neva.data.preloaded import NevaDataset
+
+
+class TestNevaDataset:
+    @pytest.mark.unit
+    def test_jsonl_records_are_loaded_lazily(self, tmp_path):
+        (tmp_path / 'cat.jpg').write_bytes(b'')
+        records = [
+            {
+                'id': 'llava',
+                'image': 'dog.jpg',
+                'conversations': [
+                    {'from': 'human', 'value': '<image>\nWhat is this?'},
+                    {'from': 'gpt', 'value': 'A dog.'},
+                ],
+            },
+            {
+                'id': 'steerlm',
+                'conversations': [
+                    {'from': 'human', 'value': 'What is this? <img src="/images/cat.jpg">'},
+                    {'from': 'gpt', 'value': 'A cat.'},
+                ],
+            },
+        ]
+        data_path = tmp_path / 'data.jsonl'
+        data_path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+
+        data_config = ImageDataConfig(image_folder=str(tmp_path), index_mapping_dir=str(tmp_path / 'index'))
+        dataset = NevaDataset(str(data_path), data_config, tokenizer=None, image_processor=None)
+        assert isinstance(dataset.list_data_dict, JSONLMemMapDataset)
+        assert len(dataset) == 2
+
+        # records with images are used as they are, SteerLM records have their <img> tags converted
+        assert dataset._get_source(0) == records[0]
+        steerlm_record = dataset._get_source(1)
+        assert steerlm_record['image'] == ['cat.jpg']
+        assert steerlm_record['conversations'][0]['value'] == 'What is this? <image>'
@@ -0,0 +1,110 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import random
+
+import pytest
+import torch
+
+from nemo.collections.vlm.neva.data import sequence_packing
+from nemo.collections.vlm.neva.data.sequence_packing import convert_to_packed, greedy_knapsack
+
+
+def reference_greedy_knapsack(item_sizes, samples, max_capacity):
+    """Greedy knapsack with sorted lists, as originally implemented."""
+    knapsacks = []
+    if len(item_sizes) == 0:
+        return knapsacks
+    sorted_item_sizes, sorted_samples = zip(*sorted(zip(item_sizes, samples), key=lambda x: x[0]))
+    sorted_item_sizes, sorted_samples = list(sorted_item_sizes), list(sorted_samples)
+    while sorted_item_sizes:
+        current_knapsack = []
+        remaining_capacity = max_capacity
+        while True:
+            # index of the largest size which fits
+            idx = bisect.bisect(sorted_item_sizes, remaining_capacity) - 1
+            if idx == -1:
+                break
+            remaining_capacity -= sorted_item_sizes.pop(idx)
+            current_knapsack.append(sorted_samples.pop(idx))
+        knapsacks.append(current_knapsack)
+    return knapsacks
+
+
+class TestSequencePacking:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("sorted_list_max_items", [0, sequence_packing.SORTED_LIST_MAX_ITEMS])
+    def test_greedy_knapsack_matches_reference(self, monkeypatch, sorted_list_max_items):
+        # packed with a Fenwick tree, or with sorted lists
+        monkeypatch.setattr(sequence_packing, "SORTED_LIST_MAX_ITEMS", sorted_list_max_items)
+        rng = random.Random(0)
+        for _ in range(50):
+            max_capacity = rng.randint(1, 100)
+            item_sizes = [rng.randint(0, max_capacity) for _ in range(rng.randint(0, 200))]
+            samples = [f'sample_{idx}' for idx in range(len(item_sizes))]
+            expected = reference_greedy_knapsack(item_sizes, samples, max_capacity)
+            assert greedy_knapsack(item_sizes, samples, max_capacity) == expected
+
+        # a few samples of a large capacity, as packed from the buffer of the energon task encoder
+        item_sizes = [rng.randint(1, 16384) for _ in range(64)]
+        samples = list(range(len(item_sizes)))
+        assert greedy_knapsack(item_sizes, samples, 16384) == reference_greedy_knapsack(item_sizes, samples, 16384)
+
+    @pytest.mark.unit
+    def test_greedy_knapsack_too_large(self):
+        with pytest.raises(ValueError):
+            greedy_knapsack([3, 9, 4], ['a', 'b', 'c'], 8)
+
+    @pytest.mark.unit
+    def test_greedy_knapsack_shards(self):
+        rng = random.Random(1)
+        item_sizes = [rng.randint(1, 64) for _ in range(500)]
+        samples = list(range(len(item_sizes)))
+        knapsacks = greedy_knapsack(item_sizes, samples, 64, num_shards=3)
+        assert sorted(sample for knapsack in knapsacks for sample in knapsack) == samples
+        assert all(sum(item_sizes[sample] for sample in knapsack) <= 64 for knapsack in knapsacks)
+
+    @pytest.mark.unit
+    def test_greedy_knapsack_assignments_file(self, tmp_path):
+        rng = random.Random(2)
+        item_sizes = [rng.randint(1, 64) for _ in range(300)]
+        samples = list(range(len(item_sizes)))
+        path = str(tmp_path / 'assignments.npz')
+
+        expected = greedy_knapsack(item_sizes, samples, 64)
+        assert greedy_knapsack(item_sizes, samples, 64, assignments_path=path) == expected
+        assert greedy_knapsack(item_sizes, samples, 64, assignments_path=path) == expected
+        # assignments of other sizes are recomputed
+        assert greedy_knapsack(item_sizes, samples, 128, assignments_path=path) == greedy_knapsack(
+            item_sizes, samples, 128
+        )
+
+    @pytest.mark.unit
+    def test_convert_to_packed(self):
+        media_token_index, num_image_embeddings_per_tile = -200, 5
+        tokens = [torch.tensor([1, media_token_index, 2, 3]), torch.tensor([4, 5, 6])]
+        labels = [torch.tensor([-100, -100, 2, 3]), torch.tensor([5, 6, -100])]
+
+        packed_tokens, packed_labels, position_ids, loss_mask, params = convert_to_packed(
+            tokens, labels, num_image_embeddings_per_tile, media_token_index, -100, pad_to_multiple_of=4
+        )
+        # sequence lengths are 8 and 3, padded to 8 and 4, and tokens are padded by as many positions
+        assert packed_tokens.tolist() == [[1, media_token_index, 2, 3, 4, 5, 6, 0]]
+        assert packed_labels.tolist() == [[-100, -100, 2, 3, 5, 6, -100, -100]]
+        assert position_ids.tolist() == [[0, 1, 2, 3, 0, 1, 2, 3]]
+        assert loss_mask.tolist() == [[0.0, 0.0, 1.0, 1.0, 1.0, 1.0, 0.0, 0.0]]
+        assert params.cu_seqlens_q.tolist() == [0, 8, 11]
+        assert params.cu_seqlens_q_padded.tolist() == [0, 8, 12]
+        assert params.max_seqlen_q == 8
@@ -1190,3 +1190,52 @@ class TestNeuralTypeCheckSystem:
             # assert that even if semantic types are disabled, output is attached with appropriate types
             assert result.sum() == torch.tensor(10.0)
             assert result.neural_type.compare(NeuralType(('B',), LabelsType())) == NeuralTypeComparisonResult.SAME
+
+    @pytest.mark.unit
+    def test_validate_first_calls(self):
+        class InputOutputTypes(Typing):
+            def __init__(self):
+                self.num_type_reads = 0
+
+            @property
+            def input_types(self):
+                self.num_type_reads += 1
+                return {
+                    "x": NeuralType(('B', 'T'), LogprobsType()),
+                    "y": NeuralType(('B',), ElementType(), optional=True),
+                }
+
+            @property
+            def output_types(self):
+                return {"z": NeuralType(('B', 'T'), LabelsType())}
+
+            @typecheck()
+            def __call__(self, x, y=None):
+                return x + 1
+
+        obj = InputOutputTypes()
+        with typecheck.validate_first_calls(2):
+            for _ in range(5):
+                result = obj(x=torch.zeros(2, 3))
+            # the types are only read by the validated calls
+            num_type_reads = obj.num_type_reads
+            _ = obj(x=torch.zeros(2, 3))
+            assert obj.num_type_reads == num_type_reads
+
+            # trusted calls attach the output types, and check the number of dimensions of the inputs
+            assert result.neural_type.compare(NeuralType(('B', 'T'), LabelsType())) == NeuralTypeComparisonResult.SAME
+            with pytest.raises(TypeError):
+                _ = obj(x=torch.zeros(2))
+
+            # but not their semantics
+            input_data = torch.zeros(2, 3)
+            input_data.neural_type = NeuralType(('B', 'T'), LabelsType())
+            _ = obj(x=input_data)
+
+            # calls with other arguments are validated first
+            with pytest.raises(TypeError):
+                _ = obj(x=input_data, y=torch.zeros(2))
+
+        # every call is validated again outside of the context
+        with pytest.raises(TypeError):
+            _ = obj(x=input_data)
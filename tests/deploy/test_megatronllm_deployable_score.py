@@ -0,0 +1,134 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from nemo.deploy.nlp import megatronllm_deployable, query_llm
+from nemo.deploy.nlp.megatronllm_deployable import MegatronLLMDeployableNemo2
+from nemo.deploy.nlp.query_llm import NemoQueryLLM
+
+VOCAB_SIZE = 12
+PADDED_VOCAB_SIZE = 16
+
+CONTEXTS = [[3, 4, 5], [7], [2, 2, 9, 1, 4], [8, 3]]
+CONTINUATIONS = [[6], [1, 2, 3], [5, 5], [11, 10, 3, 3]]
+
+
+class BigramInferenceWrappedModel:
+    """Stands for the inference wrapped model, the logits at every position only depend on the token there."""
+
+    def __init__(self, device):
+        generator = torch.Generator().manual_seed(0)
+        self.logits = torch.randn(VOCAB_SIZE, PADDED_VOCAB_SIZE, generator=generator).to(device)
+
+    def prep_model_for_inference(self, prompts_tokens):
+        self.tokens = prompts_tokens
+
+    def get_batch_for_context_window(self, context_start_position, context_end_position):
+        return self.tokens[:, context_start_position:context_end_position]
+
+    def run_one_forward_step(self, inference_input):
+        return self.logits[inference_input]
+
+
+def reference_score(model, context_token_ids, continuation_token_ids):
+    logprobs, is_greedy = [], []
+    for context, continuation in zip(context_token_ids, continuation_token_ids):
+        previous = torch.tensor(context[-1:] + continuation[:-1])
+        logits = model.logits.cpu()[previous, :VOCAB_SIZE]
+        targets = torch.tensor(continuation)
+        logprobs.append(torch.log_softmax(logits, dim=-1).gather(1, targets[:, None]).sum().item())
+        is_greedy.append(bool((logits.argmax(dim=-1) == targets).all()))
+    return logprobs, is_greedy
+
+
+def _deployable(device):
+    deployable = MegatronLLMDeployableNemo2.__new__(MegatronLLMDeployableNemo2)
+    deployable.inference_wrapped_model = BigramInferenceWrappedModel(device)
+    deployable.mcore_tokenizer = SimpleNamespace(eod=0, vocab_size=VOCAB_SIZE)
+    return deployable
+
+
+class FakeModelClient:
+    """Stands for the pytriton `ModelClient`, sending the inputs to `triton_score_fn` of a deployable."""
+
+    deployable = None
+
+    def __init__(self, url, model_name, init_timeout_s=None):
+        self.inputs = []
+
+    def infer_batch(self, **inputs):
+        self.inputs.append(inputs)
+        return self.deployable.triton_score_fn(dict(inputs))
+
+    def close(self):
+        pass
+
+
+class TestMegatronLLMDeployableScore:
+    @pytest.mark.run_only_on('GPU')
+    @pytest.mark.unit
+    def test_score(self):
+        deployable = _deployable("cuda")
+        logprobs, is_greedy = deployable.score(CONTEXTS, CONTINUATIONS, max_batch_size=3)
+        expected_logprobs, expected_is_greedy = reference_score(
+            deployable.inference_wrapped_model, CONTEXTS, CONTINUATIONS
+        )
+        assert logprobs == pytest.approx(expected_logprobs, abs=1e-5)
+        assert is_greedy == expected_is_greedy
+
+    @pytest.mark.unit
+    def test_query_loglikelihood_sends_token_ids(self, monkeypatch):
+        deployable = _deployable("cpu")
+        scores = ([-1.5, -2.0, -0.5, -4.0], [True, False, True, False])
+        calls = []
+        monkeypatch.setattr(deployable, "score", lambda *args: calls.append(args) or scores)
+        monkeypatch.setattr(megatronllm_deployable.torch.distributed, "is_initialized", lambda: False)
+        monkeypatch.setattr(FakeModelClient, "deployable", deployable)
+        monkeypatch.setattr(query_llm, "ModelClient", FakeModelClient, raising=False)
+
+        nq = NemoQueryLLM(url="localhost", model_name="triton_model")
+        assert nq.query_loglikelihood(CONTEXTS, CONTINUATIONS, max_batch_size=3) == scores
+        # token ids are sent as integer arrays padded with negative ids
+        inputs = nq._local.client.inputs[0]
+        assert inputs["context_token_ids"].dtype.kind == "i"
+        assert inputs["context_token_ids"].shape == (len(CONTEXTS), 5)
+        assert calls == [(CONTEXTS, CONTINUATIONS, 3)]
+
+    @pytest.mark.unit
+    def test_no_scoring_with_pipeline_parallelism(self, monkeypatch):
+        deployable = _deployable("cpu")
+        broadcasts = []
+        monkeypatch.setattr(megatronllm_deployable.parallel_state, "model_parallel_is_initialized", lambda: True)
+        monkeypatch.setattr(megatronllm_deployable.parallel_state, "get_pipeline_model_parallel_world_size", lambda: 2)
+        monkeypatch.setattr(megatronllm_deployable.torch.distributed, "is_initialized", lambda: True)
+        monkeypatch.setattr(megatronllm_deployable.torch.distributed, "get_world_size", lambda: 2)
+        monkeypatch.setattr(
+            megatronllm_deployable.torch.distributed, "broadcast", lambda *args, **kwargs: broadcasts.append(args)
+        )
+
+        assert not deployable.supports_scoring()
+        assert "context_token_ids" not in [tensor.name for tensor in deployable.get_triton_input]
+        output = deployable.triton_score_fn(
+            {
+                "context_token_ids": query_llm._pad_token_ids(CONTEXTS),
+                "continuation_token_ids": query_llm._pad_token_ids(CONTINUATIONS),
+            }
+        )
+        # the other ranks are not asked to score, which they can not do either
+        assert broadcasts == []
+        assert "pipeline parallelism" in output["sentences"][0][0].decode()
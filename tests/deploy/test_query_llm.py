@@ -0,0 +1,187 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from nemo.deploy.nlp import query_llm
+from nemo.deploy.nlp.query_llm import AsyncNemoQueryLLM, NemoQueryLLM
+
+MODEL_CONFIG = SimpleNamespace(
+    inputs=[SimpleNamespace(name="prompts")], outputs=[SimpleNamespace(name="outputs", dtype=np.bytes_)]
+)
+
+
+class FakeModelClient:
+    """Stands for the pytriton `ModelClient`, which answers every prompt with the prompt in upper case."""
+
+    def __init__(self, url, model_name, init_timeout_s=None):
+        self.model_config = MODEL_CONFIG
+        self.thread = threading.current_thread()
+        self.closed = False
+        self.fail = False
+        self.requests = []
+
+    def infer_batch(self, prompts, **inputs):
+        assert not self.closed and threading.current_thread() is self.thread
+        if self.fail:
+            raise ConnectionError("connection lost")
+        self.requests.append(prompts)
+        return {"outputs": np.char.encode(np.char.upper(np.char.decode(prompts, "utf-8")), "utf-8")}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncioModelClient:
+    """Asyncio version of `FakeModelClient`, which answers requests after a delay."""
+
+    def __init__(self, url, model_name, init_timeout_s=None):
+        self.closed = False
+        self.fail = False
+        self.requests = []
+
+    @property
+    async def model_config(self):
+        return MODEL_CONFIG
+
+    async def infer_batch(self, prompts, **inputs):
+        assert not self.closed
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("connection lost")
+        self.requests.append(prompts)
+        suffix = f" {inputs['temperature'][0][0]:.1f}" if "temperature" in inputs else ""
+        outputs = [[prompt.decode("utf-8").upper() + suffix] for prompt in prompts.reshape(-1)]
+        return {"outputs": np.char.encode(np.array(outputs), "utf-8")}
+
+    async def close(self):
+        self.closed = True
+
+
+def _clients(monkeypatch, client_class=FakeModelClient, name="ModelClient"):
+    clients = []
+
+    def create_client(*args, **kwargs):
+        clients.append(client_class(*args, **kwargs))
+        return clients[-1]
+
+    monkeypatch.setattr(query_llm, name, create_client, raising=False)
+    return clients
+
+
+def _query_in_thread(nq, prompt):
+    outputs = []
+    thread = threading.Thread(target=lambda: outputs.append(nq.query_llm([prompt])))
+    thread.start()
+    thread.join()
+    return outputs[0]
+
+
+class TestNemoQueryLLM:
+    @pytest.mark.unit
+    def test_client_per_thread(self, monkeypatch):
+        clients = _clients(monkeypatch)
+        nq = NemoQueryLLM(url="localhost", model_name="model")
+
+        assert nq.query_llm(["hello"]).tolist() == [["HELLO"]]
+        assert nq.query_llm(["world"]).tolist() == [["WORLD"]]
+        assert len(clients) == 1
+
+        # threads get their own client, which is closed once the thread has exited
+        assert _query_in_thread(nq, "first").tolist() == [["FIRST"]]
+        assert _query_in_thread(nq, "second").tolist() == [["SECOND"]]
+        assert len(clients) == 3
+        assert [client.closed for client in clients] == [False, True, False]
+
+        nq.close()
+        assert all(client.closed for client in clients)
+        assert nq.query_llm(["again"]).tolist() == [["AGAIN"]]
+        assert len(clients) == 4
+
+    @pytest.mark.unit
+    def test_client_is_replaced_after_error(self, monkeypatch):
+        clients = _clients(monkeypatch)
+        with NemoQueryLLM(url="localhost", model_name="model") as nq:
+            nq.query_llm(["hello"])
+            clients[0].fail = True
+            with pytest.raises(ConnectionError):
+                nq.query_llm(["hello"])
+            assert clients[0].closed
+            assert nq.query_llm(["hello"]).tolist() == [["HELLO"]]
+            assert len(clients) == 2
+        assert all(client.closed for client in clients)
+
+
+class TestAsyncNemoQueryLLM:
+    @pytest.mark.unit
+    def test_queries_are_batched(self, monkeypatch):
+        clients = _clients(monkeypatch, FakeAsyncioModelClient, "AsyncioModelClient")
+        prompts = [f"prompt {idx}" for idx in range(7)]
+
+        async def run():
+            nq = AsyncNemoQueryLLM(url="localhost", model_name="model", max_batch_size=3, max_batch_delay=0.05)
+            outputs = await asyncio.gather(
+                *[nq.query_llm(prompt, max_output_len=8) for prompt in prompts],
+                *[nq.query_llm(prompt, max_output_len=8, temperature=0.5) for prompt in prompts[:2]],
+            )
+            await nq.close()
+            return outputs
+
+        outputs = asyncio.run(run())
+        # every query gets the output of its own prompt
+        assert [output.tolist() for output in outputs] == [[[prompt.upper()]] for prompt in prompts] + [
+            [[f"{prompt.upper()} 0.5"]] for prompt in prompts[:2]
+        ]
+        # full batches are sent right away, queries with other parameters are batched separately
+        assert len(clients) == 1
+        batches = sorted(np.char.decode(prompts, "utf-8").reshape(-1).tolist() for prompts in clients[0].requests)
+        assert batches == [prompts[0:2], prompts[0:3], prompts[3:6], prompts[6:]]
+        assert clients[0].closed
+
+    @pytest.mark.unit
+    def test_close_sends_pending_queries(self, monkeypatch):
+        clients = _clients(monkeypatch, FakeAsyncioModelClient, "AsyncioModelClient")
+
+        async def run():
+            nq = AsyncNemoQueryLLM(url="localhost", model_name="model", max_batch_delay=60.0)
+            query = asyncio.ensure_future(nq.query_llm("hello"))
+            await asyncio.sleep(0)
+            await nq.close()
+            return await query
+
+        assert asyncio.run(run()).tolist() == [["HELLO"]]
+        assert len(clients) == 1 and clients[0].closed
+
+    @pytest.mark.unit
+    def test_client_is_replaced_after_error(self, monkeypatch):
+        clients = _clients(monkeypatch, FakeAsyncioModelClient, "AsyncioModelClient")
+
+        async def run():
+            nq = AsyncNemoQueryLLM(url="localhost", model_name="model", max_batch_size=1)
+            assert (await nq.query_llm("hello")).tolist() == [["HELLO"]]
+            clients[0].fail = True
+            # concurrent requests on the broken connection fail, and it is closed only once
+            results = await asyncio.gather(nq.query_llm("hello"), nq.query_llm("world"), return_exceptions=True)
+            assert all(isinstance(result, ConnectionError) for result in results)
+            assert clients[0].closed
+            assert (await nq.query_llm("hello")).tolist() == [["HELLO"]]
+            await nq.close()
+
+        asyncio.run(run())
+        assert len(clients) == 2 and all(client.closed for client in clients)
@@ -0,0 +1,119 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+from nemo.deploy.nlp import query_llm
+from nemo.deploy.service import rest_model_api
+
+
+class FakeAsyncioModelClient:
+    """Stands for the pytriton `AsyncioModelClient`, which answers every prompt with the prompt in upper case."""
+
+    def __init__(self, url, model_name, init_timeout_s=None):
+        self.model_name = model_name
+        self.closed = False
+        self.requests = []
+
+    @property
+    async def model_config(self):
+        return SimpleNamespace(outputs=[SimpleNamespace(name="outputs", dtype=np.bytes_)])
+
+    async def infer_batch(self, prompts, **inputs):
+        assert not self.closed
+        self.requests.append(np.char.decode(prompts, "utf-8").reshape(-1).tolist())
+        await asyncio.sleep(0.01)
+        return {"outputs": np.char.encode(np.char.upper(np.char.decode(prompts, "utf-8")), "utf-8")}
+
+    async def close(self):
+        self.closed = True
+
+
+class TestCompletions:
+    @pytest.mark.unit
+    def test_requests_are_batched(self, monkeypatch):
+        clients = []
+
+        def create_client(*args, **kwargs):
+            clients.append(FakeAsyncioModelClient(*args, **kwargs))
+            return clients[-1]
+
+        monkeypatch.setattr(query_llm, "AsyncioModelClient", create_client, raising=False)
+        monkeypatch.setattr(rest_model_api.triton_settings, "_client_max_batch_size", 4)
+        monkeypatch.setattr(rest_model_api.triton_settings, "_client_max_batch_delay_ms", 50.0)
+        prompts = {"model_a": [f"prompt {idx}" for idx in range(6)], "model_b": ["another prompt"]}
+
+        async def run():
+            transport = httpx.ASGITransport(app=rest_model_api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    *[
+                        client.post("/v1/completions/", json={"model": model, "prompt": prompt, "max_tokens": 8})
+                        for model, model_prompts in prompts.items()
+                        for prompt in model_prompts
+                    ]
+                )
+            await rest_model_api.close_query_clients()
+            return [response.json() for response in responses]
+
+        outputs = asyncio.run(run())
+        # every request gets the output of its own prompt
+        assert outputs == [
+            {"output": prompt.upper()} for model_prompts in prompts.values() for prompt in model_prompts
+        ]
+        # requests to the same model are batched over a single client, which is closed on shutdown
+        assert sorted(client.model_name for client in clients) == ["model_a", "model_b"]
+        requests = {client.model_name: sorted(client.requests) for client in clients}
+        assert requests == {
+            "model_a": [prompts["model_a"][:4], prompts["model_a"][4:]],
+            "model_b": [prompts["model_b"]],
+        }
+        assert all(client.closed for client in clients)
+        assert rest_model_api.query_clients == {}
+
+    @pytest.mark.unit
+    def test_least_recently_used_clients_are_closed(self, monkeypatch):
+        clients = []
+
+        def create_client(*args, **kwargs):
+            clients.append(FakeAsyncioModelClient(*args, **kwargs))
+            return clients[-1]
+
+        monkeypatch.setattr(query_llm, "AsyncioModelClient", create_client, raising=False)
+        monkeypatch.setattr(rest_model_api.triton_settings, "_client_max_models", 2)
+        monkeypatch.setattr(rest_model_api.triton_settings, "_client_max_batch_delay_ms", 1.0)
+
+        async def run():
+            transport = httpx.ASGITransport(app=rest_model_api.app)
+            outputs = []
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                for model in ["model_a", "model_b", "model_a", "model_c"]:
+                    response = await client.post("/v1/completions/", json={"model": model, "prompt": model})
+                    outputs.append(response.json())
+            models = list(rest_model_api.query_clients)
+            await rest_model_api.close_query_clients()
+            return outputs, models
+
+        outputs, models = asyncio.run(run())
+        assert outputs == [{"output": model.upper()} for model in ["model_a", "model_b", "model_a", "model_c"]]
+        # model_b was the least recently used model when model_c was queried
+        assert models == ["model_a", "model_c"]
+        assert [client.model_name for client in clients] == ["model_a", "model_b", "model_c"]
+        assert all(client.closed for client in clients)
+        assert rest_model_api.query_clients == {} and rest_model_api.closing_query_clients == set()
@@ -0,0 +1,129 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from torch.utils.data import DataLoader, Dataset
+
+from nemo.collections.nlp.data.language_modeling.megatron.megatron_batch_samplers import (
+    MegatronLengthGroupedBatchSampler,
+    MegatronPretrainingBatchSampler,
+)
+from nemo.lightning.data import add_megatron_sampler
+
+NUM_SAMPLES = 1000
+GLOBAL_BATCH_SIZE = 16
+
+
+class LengthsDataset(Dataset):
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, idx):
+        return idx
+
+    def get_sample_lengths(self):
+        return self.lengths
+
+
+@pytest.fixture()
+def lengths():
+    return np.random.default_rng(0).lognormal(4.0, 1.0, size=NUM_SAMPLES).astype(np.int64) + 1
+
+
+def _make_sampler(lengths, data_parallel_rank=0, data_parallel_size=2, consumed_samples=0, **kwargs):
+    return MegatronLengthGroupedBatchSampler(
+        total_samples=len(lengths),
+        consumed_samples=consumed_samples,
+        micro_batch_size=GLOBAL_BATCH_SIZE // data_parallel_size,
+        global_batch_size=GLOBAL_BATCH_SIZE,
+        data_parallel_rank=data_parallel_rank,
+        data_parallel_size=data_parallel_size,
+        drop_last=True,
+        lengths=lengths,
+        megabatch_multiplier=8,
+        **kwargs,
+    )
+
+
+def _padded_tokens(batches, lengths):
+    return sum(len(batch) * lengths[batch].max() - lengths[batch].sum() for batch in batches)
+
+
+class TestMegatronLengthGroupedBatchSampler:
+    @pytest.mark.unit
+    def test_ranks_cover_global_batches(self, lengths):
+        samplers = [_make_sampler(lengths, data_parallel_rank=rank) for rank in range(2)]
+        assert len(samplers[0]) == NUM_SAMPLES // GLOBAL_BATCH_SIZE
+
+        seen = []
+        for global_batch, *rank_batches in zip(samplers[0].get_global_batches(0), *samplers):
+            assert sorted(sum(rank_batches, [])) == sorted(global_batch.tolist())
+            seen.extend(global_batch.tolist())
+        assert len(seen) == len(set(seen)) == NUM_SAMPLES - NUM_SAMPLES % GLOBAL_BATCH_SIZE
+
+    @pytest.mark.unit
+    def test_reduces_padding(self, lengths):
+        grouped = _make_sampler(lengths, data_parallel_size=1).get_global_batches(0)
+        batch_sampler = MegatronPretrainingBatchSampler(
+            total_samples=NUM_SAMPLES,
+            consumed_samples=0,
+            micro_batch_size=GLOBAL_BATCH_SIZE,
+            global_batch_size=GLOBAL_BATCH_SIZE,
+            data_parallel_rank=0,
+            data_parallel_size=1,
+            drop_last=True,
+        )
+        batches = [np.array(batch) for batch in batch_sampler]
+        assert _padded_tokens(grouped, lengths) < 0.5 * _padded_tokens(batches, lengths)
+
+    @pytest.mark.unit
+    def test_deterministic_and_resumable(self, lengths):
+        batches = list(_make_sampler(lengths, seed=1))
+        assert batches == list(_make_sampler(lengths, seed=1))
+        assert batches != list(_make_sampler(lengths, seed=2))
+
+        sampler = _make_sampler(lengths, seed=1)
+        for _ in range(5):
+            next(iter(sampler))
+        state_dict = sampler.state_dict()
+        resumed = _make_sampler(lengths)
+        resumed.load_state_dict(state_dict)
+        assert list(resumed) == batches[5:]
+
+        # the next epoch is shuffled differently
+        assert list(resumed) != batches
+
+    @pytest.mark.unit
+    def test_add_megatron_sampler(self, lengths):
+        dataloader = add_megatron_sampler(
+            DataLoader(LengthsDataset(lengths)),
+            micro_batch_size=GLOBAL_BATCH_SIZE,
+            global_batch_size=GLOBAL_BATCH_SIZE,
+            dataloader_type="length_grouped",
+            seed=3,
+        )
+        assert isinstance(dataloader.batch_sampler, MegatronLengthGroupedBatchSampler)
+        assert dataloader.batch_sampler.seed == 3
+
+        dataloader = add_megatron_sampler(
+            DataLoader(list(range(NUM_SAMPLES))),
+            micro_batch_size=GLOBAL_BATCH_SIZE,
+            global_batch_size=GLOBAL_BATCH_SIZE,
+            dataloader_type="length_grouped",
+        )
+        assert isinstance(dataloader.batch_sampler, MegatronPretrainingBatchSampler)
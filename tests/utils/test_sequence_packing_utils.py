@@ -0,0 +1,157 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from nemo.utils.sequence_packing_utils import (
+    PackedSequenceArrays,
+    create_hist,
+    create_packing_strategy,
+    fill_packing_strategy,
+    fill_packing_strategy_columnar,
+    get_packed_column_path,
+    load_packed_sequences,
+    save_packed_sequences,
+)
+
+PAD_ID = 0
+PACK_SIZE = 16
+
+
+@pytest.fixture()
+def tokenized_dataset():
+    rng = np.random.RandomState(0)
+    dataset = []
+    for _ in range(40):
+        length = rng.randint(2, 10)
+        input_ids = rng.randint(1, 100, size=length).tolist()
+        input_ids[-1] = PAD_ID
+        dataset.append({'input_ids': input_ids, 'answer_start_idx': rng.randint(0, length)})
+    return dataset
+
+
+def reference_fill_packing_strategy(assignments, sequences, pack_size, pad_id):
+    """Previous implementation of `fill_packing_strategy`, which the columnar packing must match."""
+    ifile_handles = dict()
+    for seq_len in range(pack_size + 1):
+        per_seq_data = sequences[seq_len]
+        if len(per_seq_data) > 0:
+            perm = np.random.permutation(len(per_seq_data))
+            input_ids = np.array([x['input_ids'] for x in per_seq_data])[perm].tolist()
+            loss_mask = np.array(
+                [
+                    [
+                        idx >= x['answer_start_idx'] and x['input_ids'][idx] != pad_id
+                        for idx in range(len(x['input_ids']))
+                    ]
+                    for x in per_seq_data
+                ]
+            )[perm].tolist()
+            ifile_handles[seq_len] = (input_ids, loss_mask)
+
+    output_data = []
+    for assignment in assignments:
+        _input_ids, _loss_mask, _seq_start_id = [], [], [0]
+        for seq_length in assignment:
+            _input_ids.extend(ifile_handles[seq_length][0].pop())
+            _loss_mask.extend(ifile_handles[seq_length][1].pop())
+            _seq_start_id.append(len(_input_ids))
+        output_data.append({'input_ids': _input_ids, 'loss_mask': _loss_mask, 'seq_start_id': _seq_start_id[:-1]})
+    return output_data
+
+
+def _pack_columnar(dataset):
+    lengths = [len(example['input_ids']) for example in dataset]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    input_ids = np.concatenate([example['input_ids'] for example in dataset])
+    answer_start_idx = np.array([example['answer_start_idx'] for example in dataset])
+
+    _, histogram = create_hist(dataset, PACK_SIZE)
+    assignments, _ = create_packing_strategy(histogram, PACK_SIZE, 'first_fit_shuffle')
+    return fill_packing_strategy_columnar(assignments, input_ids, offsets, answer_start_idx, PACK_SIZE, PAD_ID)
+
+
+def _pack_legacy(dataset, fill_fn=fill_packing_strategy):
+    sequences, histogram = create_hist(dataset, PACK_SIZE)
+    assignments, _ = create_packing_strategy(histogram, PACK_SIZE, 'first_fit_shuffle')
+    return fill_fn(assignments, sequences, PACK_SIZE, PAD_ID)
+
+
+class TestColumnarPackedSequences:
+    @pytest.mark.unit
+    def test_fill_packing_strategy_matches_reference(self, tokenized_dataset):
+        np.random.seed(1234)
+        expected = _pack_legacy(tokenized_dataset, reference_fill_packing_strategy)
+        np.random.seed(1234)
+        assert _pack_legacy(tokenized_dataset) == expected
+
+    @pytest.mark.unit
+    def test_columnar_packing_matches_legacy(self, tmp_path, tokenized_dataset):
+        np.random.seed(1234)
+        expected = _pack_legacy(tokenized_dataset, reference_fill_packing_strategy)
+        np.random.seed(1234)
+        packed_data = _pack_columnar(tokenized_dataset)
+
+        path = os.path.join(tmp_path, 'packed.npy')
+        save_packed_sequences(path, packed_data)
+        packed = load_packed_sequences(path)
+        assert isinstance(packed, PackedSequenceArrays)
+        assert len(packed) == len(expected)
+        for idx, item in enumerate(expected):
+            assert packed[idx]['input_ids'].tolist() == item['input_ids']
+            assert packed[idx]['loss_mask'].tolist() == item['loss_mask']
+            assert packed[idx]['seq_start_id'] == item['seq_start_id']
+        assert packed[-1]['input_ids'].tolist() == expected[-1]['input_ids']
+
+    @pytest.mark.unit
+    def test_load_legacy_and_pickle(self, tmp_path, tokenized_dataset):
+        np.random.seed(1234)
+        legacy_path = os.path.join(tmp_path, 'legacy.npy')
+        np.save(legacy_path, _pack_legacy(tokenized_dataset))
+        assert isinstance(load_packed_sequences(legacy_path), np.ndarray)
+
+        np.random.seed(1234)
+        path = os.path.join(tmp_path, 'packed.npy')
+        save_packed_sequences(path, _pack_columnar(tokenized_dataset))
+        packed = pickle.loads(pickle.dumps(load_packed_sequences(path)))
+        assert len(packed) == len(load_packed_sequences(legacy_path))
+        assert isinstance(packed[0]['input_ids'], np.memmap)
+
+    @pytest.mark.unit
+    def test_no_answer_start_idx(self, tmp_path, tokenized_dataset):
+        for example in tokenized_dataset:
+            del example['answer_start_idx']
+        np.random.seed(1234)
+        packed_data = _pack_legacy(tokenized_dataset)
+        assert all(item['loss_mask'] is None for item in packed_data)
+
+        np.random.seed(1234)
+        lengths = [len(example['input_ids']) for example in tokenized_dataset]
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        input_ids = np.concatenate([example['input_ids'] for example in tokenized_dataset])
+        _, histogram = create_hist(tokenized_dataset, PACK_SIZE)
+        assignments, _ = create_packing_strategy(histogram, PACK_SIZE, 'first_fit_shuffle')
+        path = os.path.join(tmp_path, 'packed.npy')
+        save_packed_sequences(
+            path, fill_packing_strategy_columnar(assignments, input_ids, offsets, None, PACK_SIZE, PAD_ID)
+        )
+        packed = load_packed_sequences(path)
+        assert not os.path.exists(get_packed_column_path(path, 'loss_mask'))
+        for idx, item in enumerate(packed_data):
+            assert packed[idx]['input_ids'].tolist() == item['input_ids']
+            assert packed[idx]['loss_mask'] is None